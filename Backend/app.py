@@ -14,7 +14,7 @@ from flask_cors import CORS
 from src.utils.logger import get_logger, log_section, log_success, log_error, log_warning
 from src.services.mqtt_service import initialize_mqtt, get_mqtt_client
 from src.controllers.routes import register_routes
-from config import ALLOWED_ORIGINS
+from config import ALLOWED_ORIGINS, MODEL_WATCH_INTERVAL_SECONDS, JOB_POOL_ENABLED, SHADOW_ENABLED
 
 
 # Hanya inisialisasi logger sekali (hindari duplikasi di Flask debug mode)
@@ -89,6 +89,30 @@ def create_app():
         log_error(logger, f"Error initializing MQTT service: {e}")
         log_warning(logger, "Application will continue without MQTT service")
     
+    logger.info("Starting model registry watcher...")
+    try:
+        from src.services.model_registry import model_registry
+        model_registry.start_watcher(MODEL_WATCH_INTERVAL_SECONDS)
+    except Exception as e:
+        log_error(logger, f"Error starting model registry watcher: {e}")
+    
+    if JOB_POOL_ENABLED:
+        logger.info("Starting job executor process pool...")
+        try:
+            from src.services.job_executor import job_executor
+            job_executor.start()
+        except Exception as e:
+            log_error(logger, f"Error starting job executor: {e}")
+            log_warning(logger, "Jobs will start the pool lazily on first submit")
+    
+    if SHADOW_ENABLED:
+        logger.info("Starting shadow evaluator...")
+        try:
+            from src.services.shadow_service import shadow_evaluator
+            shadow_evaluator.start()
+        except Exception as e:
+            log_error(logger, f"Error starting shadow evaluator: {e}")
+    
     # ========================================================================
     # HEALTH CHECK ENDPOINT
     # ========================================================================
@@ -159,6 +183,36 @@ def cleanup_resources():
     except Exception as e:
         log_error(logger, f"Error stopping MQTT client: {e}")
     
+    try:
+        from src.services.health_history_service import health_history_service
+        health_history_service.stop()
+    except Exception as e:
+        log_error(logger, f"Error flushing health snapshots: {e}")
+    
+    try:
+        from src.services.prediction_log_service import prediction_log_service
+        prediction_log_service.stop()
+    except Exception as e:
+        log_error(logger, f"Error flushing prediction log: {e}")
+    
+    try:
+        from src.services.model_registry import model_registry
+        model_registry.stop_watcher()
+    except Exception as e:
+        log_error(logger, f"Error stopping model registry watcher: {e}")
+    
+    try:
+        from src.services.job_executor import job_executor
+        job_executor.stop()
+    except Exception as e:
+        log_error(logger, f"Error stopping job executor: {e}")
+    
+    try:
+        from src.services.shadow_service import shadow_evaluator
+        shadow_evaluator.stop()
+    except Exception as e:
+        log_error(logger, f"Error stopping shadow evaluator: {e}")
+    
     # Give time for threads to cleanup
     import time
     time.sleep(0.2)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Backfill tabel downtime_events dari machine_logs yang sudah ada
+
+Setelah migrations/004_create_downtime_events.sql dijalankan, event baru
+dipelihara otomatis oleh jalur ingest (DatabaseService.log_machine_status).
+Script ini dijalankan sekali untuk membangun event dari histori lama; isi
+tabel diganti seluruhnya sehingga aman dijalankan ulang. Cube heatmap
+(migrations/007_create_downtime_heatmap.sql) dibangun ulang dari event hasil backfill.
+
+Usage:
+    python backfill_downtime_events.py
+"""
+
+import sys
+import time
+
+from src.services.downtime_service import downtime_service
+
+
+def backfill() -> bool:
+    print("=== BACKFILL downtime_events ===")
+    started = time.perf_counter()
+    try:
+        result = downtime_service.backfill_downtime_events()
+    except Exception as e:
+        print(f"❌ Backfill gagal: {e}")
+        return False
+
+    print(f"Events  : {result['events']}")
+    print(f"Ongoing : {result['ongoing']}")
+
+    try:
+        heatmap = downtime_service.rebuild_downtime_heatmap()
+    except Exception as e:
+        print(f"❌ Rebuild heatmap gagal: {e}")
+        return False
+
+    print(f"Heatmap : {heatmap['rows']} baris hari/komponen dari {heatmap['events']} event")
+    print(f"Waktu   : {time.perf_counter() - started:.1f} s")
+    print("✅ Backfill selesai")
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if backfill() else 1)
@@ -50,6 +50,86 @@ HEALTH_THRESHOLD_GOOD = 70  # >= 70: Sehat, < 70: Perlu Perhatian
 OEE_MIN = 0.0
 OEE_MAX = 100.0
 
+# ============================================================================
+# HEALTH HISTORY CONFIGURATION
+# ============================================================================
+# Snapshot health index disimpan per komponen per interval (bucket)
+HEALTH_SNAPSHOT_INTERVAL_SECONDS = int(os.getenv('HEALTH_SNAPSHOT_INTERVAL_SECONDS', 60))
+HEALTH_SNAPSHOT_BATCH_SIZE = 100       # Flush lebih awal jika buffer mencapai jumlah ini
+HEALTH_SNAPSHOT_FLUSH_SECONDS = 10.0   # Interval flush periodik writer
+HEALTH_TREND_MAX_POINTS = 500          # Maksimal titik per komponen pada trend query
+HEALTH_SIMULATION_MAX_SCENARIOS = 100000  # Batas jumlah skenario per request what-if
+
+# ============================================================================
+# PREDICTION CONFIGURATION
+# ============================================================================
+# Lookup table prediksi untuk ruang input terbatas (reason × shift × severity)
+PREDICTION_LOOKUP_TABLE = os.getenv('PREDICTION_LOOKUP_TABLE', 'true').lower() == 'true'
+PREDICTION_LOOKUP_VERIFY_SAMPLES = 32  # Jumlah entri yang dicek ulang terhadap model live saat load
+
+# Interval prediksi dari sebaran output per tree (persentil, 0-100)
+PREDICTION_INTERVAL_QUANTILES = (10, 90)
+
+# Single-flight: request prediksi identik yang bersamaan berbagi satu komputasi,
+# hasilnya di-cache sebentar untuk polling dashboard berikutnya (0 = tanpa cache)
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv('PREDICTION_CACHE_TTL_SECONDS', 2.0))
+PREDICTION_CACHE_MAX_ENTRIES = 1024
+
+# Engine inference: 'sklearn' (model.pkl) atau 'flat' (model.flat/ atau model.flat.npz, tanpa scikit-learn)
+# Artefak flat dibuat dengan: python export_flat_model.py [--mmap]
+# Layout --mmap (direktori .npy) dimuat dengan mmap_mode: array dibagi antar worker via page cache
+PREDICTION_ENGINE = os.getenv('PREDICTION_ENGINE', 'sklearn').lower()
+
+# Model registry: polling perubahan file di Model/ untuk hot reload (0 = nonaktif)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv('MODEL_WATCH_INTERVAL_SECONDS', 30))
+MODEL_REGISTRY_HISTORY = 10  # Jumlah versi per slot yang disimpan di riwayat registry
+
+# Shadow evaluation: sampel input prediksi live dicerminkan ke model kandidat
+# (Model/model_candidate.pkl) di background thread, hasilnya hanya diagregasi
+SHADOW_ENABLED = os.getenv('SHADOW_ENABLED', 'true').lower() == 'true'
+SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_QUEUE_SIZE = 10000                  # Sampel di atas ini dibuang (jalur request tidak pernah menunggu)
+SHADOW_BATCH_SIZE = 256                    # Maksimal sampel per panggilan predict kandidat
+SHADOW_AGREEMENT_TOLERANCE_MINUTES = 15.0  # |kandidat - primary| <= toleransi dihitung sepakat
+
+# ============================================================================
+# PREDICTION LOG CONFIGURATION
+# ============================================================================
+# Audit log prediksi (tabel prediction_log), ditulis batch di background
+PREDICTION_LOG_ENABLED = os.getenv('PREDICTION_LOG_ENABLED', 'true').lower() == 'true'
+PREDICTION_LOG_BATCH_SIZE = 500         # Flush lebih awal jika buffer mencapai jumlah ini
+PREDICTION_LOG_FLUSH_SECONDS = 5.0      # Interval flush periodik writer
+PREDICTION_LOG_MAX_BUFFER = 50000       # Record tertua dibuang jika database tidak tersedia terlalu lama
+PREDICTION_LOG_QUERY_LIMIT = 1000       # Default jumlah baris query log
+PREDICTION_LOG_BACKTEST_MAX_ROWS = 200000  # Batas baris prediksi yang dibaca per back-test
+
+# ============================================================================
+# DOWNTIME DETECTION CONFIGURATION
+# ============================================================================
+# Scan tunggal machine_logs untuk semua detektor (/api/downtime/detections)
+MACHINE_LOG_SCAN_FETCH_ROWS = 5000       # Baris per round-trip server-side cursor
+COUNTER_STALL_MIN_MINUTES = 5.0          # Running tanpa kenaikan produksi selama ini = counter stall
+
+# ============================================================================
+# RELIABILITY CONFIGURATION
+# ============================================================================
+# Laporan MTBF/MTTR/Pareto (/api/downtime/reliability), di-cache per kombinasi parameter
+RELIABILITY_CACHE_TTL_SECONDS = float(os.getenv('RELIABILITY_CACHE_TTL_SECONDS', 300))
+RELIABILITY_CACHE_MAX_ENTRIES = 64       # Batas entri cache (LRU)
+RELIABILITY_TOP_N = 10                   # Default jumlah grup di Pareto
+RELIABILITY_REPEAT_WINDOW_HOURS = 24.0   # Kegagalan grup sama dalam jarak ini dihitung berulang
+
+# ============================================================================
+# JOB EXECUTOR CONFIGURATION
+# ============================================================================
+# Process pool untuk batch prediction & analitik berat (di luar thread request)
+JOB_POOL_ENABLED = os.getenv('JOB_POOL_ENABLED', 'true').lower() == 'true'
+JOB_POOL_WORKERS = int(os.getenv('JOB_POOL_WORKERS', min(4, os.cpu_count() or 1)))
+JOB_CHUNK_ROWS = 5000            # Maksimal baris per task prediksi di worker
+JOB_RESULT_TTL_SECONDS = 3600    # Hasil job disimpan selama ini setelah selesai
+JOB_MAX_ACTIVE = 16              # Batas job queued/running bersamaan
+JOB_MAX_BATCH_ITEMS = 1000000    # Batas item per job batch prediction
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Export model RandomForest (.pkl) ke format flat forest (.flat.npz)
+
+Artefak .flat.npz dipakai PredictionService saat PREDICTION_ENGINE=flat
+sehingga scikit-learn tidak perlu di-import saat serving.
+
+Dengan --mmap, artefak ditulis sebagai direktori .flat/ (satu .npy per array)
+yang dimuat dengan mmap_mode: beberapa worker WSGI berbagi satu salinan array
+di page cache OS. Registry mengutamakan layout ini jika tersedia.
+
+Usage:
+    python export_flat_model.py                     # semua Model/*.pkl model
+    python export_flat_model.py ../Model/model.pkl  # model tertentu
+    python export_flat_model.py --mmap              # layout direktori mmap
+"""
+
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.services.forest_engine import export_forest, FlatForest, get_flat_model_path, get_mmap_model_path
+
+MODEL_DIR = Path(__file__).resolve().parent.parent / "Model"
+DEFAULT_MODELS = ["model.pkl", "model_improved.pkl"]
+
+
+def export_model(model_path: Path, mmap: bool = False) -> bool:
+    print(f"\n=== EXPORT {model_path.name} ===")
+    model = joblib.load(model_path)
+
+    if not hasattr(model, "estimators_") and not hasattr(model, "tree_"):
+        print(f"❌ {type(model).__name__} bukan model tree, dilewati")
+        return False
+
+    if mmap:
+        output = export_forest(model, get_mmap_model_path(model_path), layout="mmap")
+    else:
+        output = export_forest(model, get_flat_model_path(model_path))
+    flat = FlatForest.load(output)
+
+    # Verifikasi cepat pada input acak (parity lengkap: tests/test_forest_engine.py)
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(1000, flat.n_features_in_)).astype(np.float64)
+    max_diff = float(np.abs(model.predict(X) - flat.predict(X)).max())
+
+    print(f"Trees      : {flat.n_estimators}")
+    print(f"Nodes      : {flat.metadata['n_nodes']}")
+    size = sum(f.stat().st_size for f in output.iterdir()) if output.is_dir() else output.stat().st_size
+    print(f"Size       : {size / 1024:.1f} KB")
+    print(f"Mmap       : {flat.memory_mapped}")
+    print(f"Max |diff| : {max_diff:.3e}")
+    print(f"Output     : {output}")
+
+    if max_diff > 1e-9:
+        print("❌ Hasil flat forest berbeda dengan model asli")
+        return False
+    print("✅ Export berhasil")
+    return True
+
+
+if __name__ == "__main__":
+    import warnings
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    args = sys.argv[1:]
+    mmap = "--mmap" in args
+    paths = [Path(p) for p in args if p != "--mmap"] or [MODEL_DIR / name for name in DEFAULT_MODELS]
+    ok = True
+    for path in paths:
+        if not path.exists():
+            print(f"\n⚠ {path} tidak ditemukan, dilewati")
+            continue
+        ok = export_model(path, mmap=mmap) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,25 @@
+-- Migration: Create health_snapshots table
+-- Date: 2025-11-03
+-- Description: Compact per-component, per-interval history of the health index.
+--              One row per (component, bucket); repeated snapshots inside the same
+--              bucket are merged into a running average by the backend writer.
+
+CREATE TABLE IF NOT EXISTS public.health_snapshots (
+    component_name VARCHAR(255) NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    health_index REAL NOT NULL,
+    rpn_score REAL,
+    oee_score REAL,
+    min_health_index REAL,
+    max_health_index REAL,
+    sample_count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (component_name, bucket_start)
+);
+
+-- Range scan untuk trend semua komponen (PRIMARY KEY sudah melayani filter per komponen)
+CREATE INDEX IF NOT EXISTS idx_health_snapshots_bucket
+ON public.health_snapshots (bucket_start);
+
+COMMENT ON TABLE public.health_snapshots IS 'Per-component health index history aggregated per time bucket';
+COMMENT ON COLUMN public.health_snapshots.bucket_start IS 'Start of the snapshot interval (HEALTH_SNAPSHOT_INTERVAL_SECONDS)';
+COMMENT ON COLUMN public.health_snapshots.sample_count IS 'Number of health calculations merged into this bucket';
@@ -0,0 +1,39 @@
+-- Migration: Create prediction_log table
+-- Date: 2025-11-10
+-- Description: Durable audit record of every single prediction served by the backend
+--              (API requests and health auto-triggers). Rows are appended in bulk by the
+--              asynchronous writer in prediction_log_service and are used to back-test
+--              predictions against actual repair durations (RIWAYAT_PERBAIKAN).
+
+CREATE TABLE IF NOT EXISTS public.prediction_log (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL,
+    source VARCHAR(32) NOT NULL,
+    input_hash CHAR(16) NOT NULL,
+    reason TEXT,
+    mapped_reason TEXT,
+    shift VARCHAR(16),
+    model_slot VARCHAR(32),
+    model_version VARCHAR(16),
+    model_hash CHAR(12),
+    success BOOLEAN NOT NULL,
+    prediction REAL,
+    interval_low REAL,
+    interval_high REAL,
+    latency_ms REAL NOT NULL
+);
+
+-- Range scan untuk query log dan back-test per periode
+CREATE INDEX IF NOT EXISTS idx_prediction_log_created_at
+ON public.prediction_log (created_at);
+
+-- Back-test per reason (join ke riwayat perbaikan)
+CREATE INDEX IF NOT EXISTS idx_prediction_log_reason_created_at
+ON public.prediction_log (mapped_reason, created_at);
+
+COMMENT ON TABLE public.prediction_log IS 'Audit log of served predictions (written in batches by the backend)';
+COMMENT ON COLUMN public.prediction_log.source IS 'Trigger source: api, health_auto_trigger, ...';
+COMMENT ON COLUMN public.prediction_log.input_hash IS 'blake2b (64-bit hex) of the canonical JSON input';
+COMMENT ON COLUMN public.prediction_log.mapped_reason IS 'Reason translated to the training-data name (reason_matcher)';
+COMMENT ON COLUMN public.prediction_log.interval_low IS 'Lower prediction interval bound (PREDICTION_INTERVAL_QUANTILES)';
+COMMENT ON COLUMN public.prediction_log.latency_ms IS 'Time to serve the prediction including single-flight/cache';
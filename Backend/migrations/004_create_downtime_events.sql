@@ -0,0 +1,40 @@
+-- Migration: Create downtime_events table
+-- Date: 2025-11-20
+-- Description: One row per machine_status downtime segment (Running -> non-Running -> Running).
+--              Maintained by the ingest path (DatabaseService.log_machine_status): an event is
+--              opened on the transition out of Running, updated while the machine stays down
+--              and closed with its duration when the status returns to Running.
+--              Existing history: python backfill_downtime_events.py
+
+CREATE TABLE IF NOT EXISTS public.downtime_events (
+    id SERIAL PRIMARY KEY,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ,
+    machine_status VARCHAR(50),
+    start_performance REAL,
+    start_quality REAL,
+    duration_minutes REAL,
+    samples INTEGER NOT NULL DEFAULT 1,
+    avg_performance REAL,
+    min_performance REAL,
+    avg_quality REAL,
+    start_production INTEGER,
+    start_defects INTEGER,
+    production INTEGER DEFAULT 0,
+    defects INTEGER DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- History/statistik: range scan terbaru dulu; juga mencegah event ganda dari backfill + ingest
+CREATE UNIQUE INDEX IF NOT EXISTS idx_downtime_events_start_time
+ON public.downtime_events (start_time DESC);
+
+-- Paling banyak satu event terbuka; lookup event terbuka saat ingest
+CREATE UNIQUE INDEX IF NOT EXISTS idx_downtime_events_open
+ON public.downtime_events ((end_time IS NULL))
+WHERE end_time IS NULL;
+
+COMMENT ON TABLE public.downtime_events IS 'Downtime segments derived incrementally from machine_logs';
+COMMENT ON COLUMN public.downtime_events.end_time IS 'Timestamp of the Running sample that closed the event; NULL while ongoing';
+COMMENT ON COLUMN public.downtime_events.samples IS 'Number of non-Running machine_logs samples in the event';
+COMMENT ON COLUMN public.downtime_events.production IS 'cumulative_production delta since start_time';
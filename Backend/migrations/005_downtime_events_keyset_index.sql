@@ -0,0 +1,8 @@
+-- Migration: Keyset index for downtime_events history pagination
+-- Date: 2025-11-22
+-- Description: GET /api/downtime/history pages with WHERE (start_time, id) < (?, ?)
+--              ORDER BY start_time DESC, id DESC. A composite index on the full key
+--              turns every page, however deep, into a bounded index range scan.
+
+CREATE INDEX IF NOT EXISTS idx_downtime_events_keyset
+ON public.downtime_events (start_time DESC, id DESC);
@@ -0,0 +1,27 @@
+-- Migration: Stored component classification for downtime_events
+-- Date: 2025-11-24
+-- Description: Component is derived from machine_status and start_performance (the rules
+--              previously evaluated per request). As a stored generated column it can be
+--              filtered and indexed, so history component/status filters run in the database
+--              and page through (filter, start_time, id) index range scans.
+-- Requires: PostgreSQL 12+ (generated columns)
+
+ALTER TABLE public.downtime_events
+ADD COLUMN IF NOT EXISTS component VARCHAR(50) GENERATED ALWAYS AS (
+    CASE machine_status
+        WHEN 'Maintenance' THEN 'Maintenance'
+        WHEN 'Error' THEN 'System'
+        WHEN 'Stopped' THEN 'Operator'
+        WHEN 'Idle' THEN 'Material Supply'
+        ELSE CASE WHEN COALESCE(start_performance, 0) < 50 THEN 'System' ELSE 'Printing' END
+    END
+) STORED;
+
+-- Keyset pagination per filter: WHERE component = ? AND (start_time, id) < (?, ?)
+CREATE INDEX IF NOT EXISTS idx_downtime_events_component_keyset
+ON public.downtime_events (component, start_time DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_downtime_events_status_keyset
+ON public.downtime_events (machine_status, start_time DESC, id DESC);
+
+COMMENT ON COLUMN public.downtime_events.component IS 'Affected component derived from machine_status/start_performance';
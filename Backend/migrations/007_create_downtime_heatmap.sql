@@ -0,0 +1,22 @@
+-- Migration: Create downtime_heatmap cube
+-- Date: 2025-11-26
+-- Description: Precomputed hour-of-day heatmap of closed downtime_events: one row per
+--              (day, component) holding 24 hourly buckets of downtime minutes and event
+--              counts. Minutes are split over the hours (and days) an event spans; the count
+--              goes to the start hour. Rows are updated incrementally by the ingest path when
+--              an event closes; /api/downtime/heatmap reduces a date range to
+--              day-of-week x component x hour with vectorized sums.
+--              Existing history: python backfill_downtime_events.py
+
+CREATE TABLE IF NOT EXISTS public.downtime_heatmap (
+    day DATE NOT NULL,
+    component VARCHAR(50) NOT NULL,
+    minutes DOUBLE PRECISION[] NOT NULL CHECK (array_length(minutes, 1) = 24),
+    counts INTEGER[] NOT NULL CHECK (array_length(counts, 1) = 24),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, component)
+);
+
+COMMENT ON TABLE public.downtime_heatmap IS 'Per-day hourly downtime minutes/counts per component (closed downtime_events)';
+COMMENT ON COLUMN public.downtime_heatmap.minutes IS 'Downtime minutes per hour of day (index 0 = 00:00-01:00)';
+COMMENT ON COLUMN public.downtime_heatmap.counts IS 'Downtime events starting in each hour of day';
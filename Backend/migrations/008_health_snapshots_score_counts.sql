@@ -0,0 +1,19 @@
+-- Migration: Per-score sample counts for health_snapshots
+-- Date: 2025-12-01
+-- Description: rpn_score and oee_score are averaged over only the calculations that
+--              provided them, so merging buckets must weight each average by its own
+--              sample count rather than by sample_count (which also counts calculations
+--              without an RPN/OEE score).
+
+ALTER TABLE public.health_snapshots
+ADD COLUMN IF NOT EXISTS rpn_sample_count INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS oee_sample_count INTEGER NOT NULL DEFAULT 0;
+
+-- Baris lama: anggap setiap sampel bucket membawa skor jika skornya terisi
+UPDATE public.health_snapshots
+SET rpn_sample_count = CASE WHEN rpn_score IS NULL THEN 0 ELSE sample_count END,
+    oee_sample_count = CASE WHEN oee_score IS NULL THEN 0 ELSE sample_count END
+WHERE rpn_sample_count = 0 AND oee_sample_count = 0;
+
+COMMENT ON COLUMN public.health_snapshots.rpn_sample_count IS 'Number of merged calculations that provided rpn_score';
+COMMENT ON COLUMN public.health_snapshots.oee_sample_count IS 'Number of merged calculations that provided oee_score';
@@ -59,6 +59,34 @@ def get_api_documentation():
                         "color": "#00FF00",
                         "description": "Kondisi mesin baik, lakukan monitoring rutin"
                     }
+                },
+                "GET /api/health/history": {
+                    "description": "Trend health index historis per komponen (downsampled)",
+                    "parameters": {
+                        "component": "string - Filter komponen, boleh diulang (optional)",
+                        "start": "string - Awal rentang ISO 8601 (default: 7 hari terakhir)",
+                        "end": "string - Akhir rentang ISO 8601 (default: sekarang)",
+                        "bucket": "integer - Lebar bucket dalam detik (optional)",
+                        "max_points": "integer - Titik maksimum per komponen (default: 500)"
+                    },
+                    "returns": "Series health index per komponen",
+                    "example_url": "/api/health/history?component=Printing&start=2025-11-01T00:00:00Z"
+                },
+                "POST /api/health/simulate": {
+                    "description": "Simulasi what-if health index untuk grid RPN × OEE atau rencana aksi FMEA",
+                    "parameters": {
+                        "component": "string - Baseline RPN dari database (optional)",
+                        "rpn_max": "number - Wajib jika tanpa component",
+                        "rpn_values": "array atau {start, stop, step}",
+                        "oee_values": "array atau {start, stop, step} (default: OEE saat ini)",
+                        "fmea_actions": "array - {name, severity, occurrence, detection} | {name, rpn} | {name, rpn_reduction_pct}"
+                    },
+                    "returns": "Grid health index dan status (baris = RPN, kolom = OEE)",
+                    "example_request": {
+                        "rpn_max": 200,
+                        "rpn_values": {"start": 0, "stop": 200, "step": 10},
+                        "oee_values": [60, 70, 80, 90]
+                    }
                 }
             },
             "components": {
@@ -114,6 +142,13 @@ def get_api_documentation():
                     "example_response": {
                         "success": True,
                         "prediction": 120.45,
+                        "prediction_interval": {
+                            "p10": 85.0,
+                            "p90": 170.3,
+                            "std": 31.8,
+                            "method": "per-tree quantiles",
+                            "n_estimators": 200
+                        },
                         "prediction_formatted": "2 jam 0 menit",
                         "input": {
                             "total_produksi": 5000,
@@ -153,6 +188,126 @@ def get_api_documentation():
                             "class": "<class 'sklearn.linear_model._base.LinearRegression'>"
                         }
                     }
+                },
+                "GET /api/predict/coalescing": {
+                    "description": "Counter single-flight + cache TTL prediksi (computed, coalesced, cache_hits, saved)",
+                    "parameters": None,
+                    "returns": "Counter untuk prediction_service dan enhanced_prediction_service"
+                },
+                "GET /api/predict/log": {
+                    "description": "Audit log prediksi yang dilayani (tabel prediction_log, ditulis batch asinkron)",
+                    "parameters": {
+                        "start": "ISO 8601 (opsional, default 24 jam terakhir)",
+                        "end": "ISO 8601 (opsional, default sekarang)",
+                        "source": "string (opsional: api | health_auto_trigger)",
+                        "reason": "string (opsional)",
+                        "limit": "integer (opsional, default 1000, maks 10000)"
+                    },
+                    "returns": "Record prediksi terbaru (input hash, versi model, prediksi, interval, latency) dan status writer"
+                },
+                "GET /api/predict/backtest": {
+                    "description": "Back-test prediksi tercatat terhadap durasi perbaikan aktual (RIWAYAT_PERBAIKAN)",
+                    "parameters": {
+                        "start": "ISO 8601 (opsional, default 30 hari terakhir)",
+                        "end": "ISO 8601 (opsional, default sekarang)",
+                        "source": "string (opsional)",
+                        "window_days": "integer (opsional, default 1, maks 30)",
+                        "include_pairs": "boolean (opsional, sertakan pasangan per kejadian)"
+                    },
+                    "returns": "MAE, RMSE, bias, cakupan interval prediksi, dan metrik per versi model"
+                },
+                "GET /api/model/registry": {
+                    "description": "Status model registry: versi aktif per slot, content hash, dan riwayat versi",
+                    "parameters": None,
+                    "returns": "Status registry per slot (standard, improved, candidate)"
+                },
+                "POST /api/model/reload": {
+                    "description": "Hot reload model di background dengan swap atomik (admin only)",
+                    "body": {
+                        "slot": "string (opsional: standard | improved | candidate, default semua)",
+                        "wait": "boolean (opsional, tunggu sampai reload selesai)"
+                    },
+                    "returns": "Status reload per slot (scheduled/activated/unchanged/failed)"
+                },
+                "GET /api/model/shadow": {
+                    "description": "Shadow evaluation model kandidat (Model/model_candidate.pkl) pada sampel traffic live",
+                    "parameters": None,
+                    "returns": "Counter sampel (offered, dropped, evaluated) dan agregat per pasangan model: selisih mean/MAE/RMSE, korelasi, agreement rate, histogram"
+                },
+                "POST /api/model/shadow/reset": {
+                    "description": "Hapus agregat shadow evaluation (admin only)",
+                    "parameters": None,
+                    "returns": "Status shadow evaluator setelah reset"
+                }
+            },
+            "jobs": {
+                "POST /api/jobs/predict/batch": {
+                    "description": "Submit batch prediction besar ke process pool (shared-memory feature matrix)",
+                    "body": {
+                        "data": "array of objects (reason, shift, ...) - format sama dengan batch prediction"
+                    },
+                    "returns": "202 + job_id dan link status/result"
+                },
+                "POST /api/jobs/downtime/<analysis>": {
+                    "description": "Submit analisis downtime ke process pool",
+                    "parameters": {
+                        "analysis": "history | statistics | status_analysis | health_drops | detections"
+                    },
+                    "body": {
+                        "limit": "integer (opsional)",
+                        "start_date": "string YYYY-MM-DD (opsional)",
+                        "end_date": "string YYYY-MM-DD (opsional)"
+                    },
+                    "returns": "202 + job_id"
+                },
+                "GET /api/jobs/<job_id>": {
+                    "description": "Status dan progress job (queued/running/done/failed)",
+                    "returns": "Status job tanpa hasil"
+                },
+                "GET /api/jobs/<job_id>/result": {
+                    "description": "Hasil job (202 jika belum selesai)",
+                    "returns": "Hasil job"
+                },
+                "GET /api/jobs": {
+                    "description": "Status process pool dan jumlah job per status",
+                    "returns": "Status executor"
+                }
+            },
+            "downtime": {
+                "GET /api/downtime/heatmap": {
+                    "description": "Heatmap menit/jumlah downtime hari-dalam-minggu × jam × komponen dari cube harian",
+                    "parameters": {
+                        "start_date": "string YYYY-MM-DD (opsional)",
+                        "end_date": "string YYYY-MM-DD (opsional)",
+                        "component": "string - Filter komponen (opsional)"
+                    },
+                    "returns": "minutes/counts [7][24] per komponen, total, summary"
+                },
+                "GET /api/downtime/detections": {
+                    "description": "Satu scan machine_logs untuk semua detektor: transisi status, metric drop, counter stall",
+                    "parameters": {
+                        "limit": "integer - maksimal events (default 50)",
+                        "detectors": "status_transition,metric_drop,counter_stall (opsional, default semua)",
+                        "start_date": "string YYYY-MM-DD (opsional)",
+                        "end_date": "string YYYY-MM-DD (opsional)"
+                    },
+                    "returns": "Events gabungan (terbaru dulu), by_detector, rows_scanned"
+                },
+                "GET /api/downtime/reliability": {
+                    "description": "KPI reliabilitas per komponen/alasan: MTBF, MTTR, Pareto downtime, kegagalan berulang (di-cache)",
+                    "parameters": {
+                        "start_date": "string YYYY-MM-DD (opsional)",
+                        "end_date": "string YYYY-MM-DD (opsional)",
+                        "source": "machine,repairs (opsional, default keduanya)",
+                        "group_by": "component | reason (default component)",
+                        "top": "integer - jumlah grup Pareto (default 10)",
+                        "repeat_window_hours": "number - jarak maksimal kegagalan berulang (default 24)"
+                    },
+                    "returns": "Laporan per sumber: summary, groups, pareto, vital_few, repeat_clusters"
+                },
+                "POST /api/downtime/reliability/refresh": {
+                    "description": "Kosongkan cache laporan reliabilitas (admin only)",
+                    "returns": "Jumlah entri cache yang dihapus"
                 }
             },
             "documentation": {
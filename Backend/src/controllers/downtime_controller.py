@@ -1,10 +1,12 @@
 """
 Downtime Controller
-Controller untuk endpoint downtime history dan statistics
+Controller untuk endpoint downtime history, statistics, dan reliability
 """
 
 from flask import Blueprint, jsonify, request
 from src.services.downtime_service import downtime_service
+from src.services.reliability_service import reliability_service
+from src.controllers.auth_controller import require_admin
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,18 +25,22 @@ def get_downtime_history():
     Query Parameters:
     - limit: Maksimal jumlah events (default: 50)
     - component: Filter berdasarkan komponen (optional, default: all)
+    - status: Filter berdasarkan machine_status, mis. Error (optional, default: all)
     - start_date: Filter tanggal mulai (format: YYYY-MM-DD)
     - end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+    - page_token: Token halaman berikutnya dari response sebelumnya (optional)
     
     Returns:
-    - JSON dengan list downtime events
+    - JSON dengan list downtime events dan next_page_token (null di halaman terakhir)
     """
     try:
         # Ambil query parameters
         limit = request.args.get('limit', default=50, type=int)
         component = request.args.get('component', default=None, type=str)
+        status = request.args.get('status', default=None, type=str)
         start_date = request.args.get('start_date', default=None, type=str)
         end_date = request.args.get('end_date', default=None, type=str)
+        page_token = request.args.get('page_token', default=None, type=str)
         
         # Validasi limit
         if limit < 1 or limit > 500:
@@ -42,25 +48,39 @@ def get_downtime_history():
         
         logger.info(
             f"[API] GET /api/downtime/history - "
-            f"limit={limit}, component={component}, "
+            f"limit={limit}, component={component}, status={status}, "
             f"start_date={start_date}, end_date={end_date}"
         )
         
-        # Ambil downtime history dari service
-        downtime_events = downtime_service.get_downtime_history(
-            limit=limit,
-            component_filter=component,
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Ambil satu halaman downtime history dari service
+        try:
+            page = downtime_service.get_downtime_history_page(
+                limit=limit,
+                component_filter=component,
+                start_date=start_date,
+                end_date=end_date,
+                page_token=page_token,
+                status_filter=status
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
+        
+        downtime_events = page["events"]
         
         return jsonify({
             "success": True,
             "count": len(downtime_events),
             "data": downtime_events,
+            "next_page_token": page["next_page_token"],
+            "has_more": page["has_more"],
             "filters": {
                 "limit": limit,
                 "component": component or "all",
+                "status": status or "all",
                 "start_date": start_date,
                 "end_date": end_date
             }
@@ -85,6 +105,7 @@ def get_downtime_statistics():
     Query Parameters:
     - start_date: Filter tanggal mulai (format: YYYY-MM-DD)
     - end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+    - breakdown: Breakdown tambahan dipisah koma: hour, shift (optional)
     
     Returns:
     - JSON dengan statistik downtime
@@ -93,24 +114,35 @@ def get_downtime_statistics():
         # Ambil query parameters
         start_date = request.args.get('start_date', default=None, type=str)
         end_date = request.args.get('end_date', default=None, type=str)
+        breakdown = request.args.get('breakdown', default='', type=str)
+        breakdowns = [b.strip().lower() for b in breakdown.split(',') if b.strip()]
         
         logger.info(
             f"[API] GET /api/downtime/statistics - "
-            f"start_date={start_date}, end_date={end_date}"
+            f"start_date={start_date}, end_date={end_date}, breakdown={breakdowns}"
         )
         
         # Ambil statistik dari service
-        statistics = downtime_service.get_downtime_statistics(
-            start_date=start_date,
-            end_date=end_date
-        )
+        try:
+            statistics = downtime_service.get_downtime_statistics(
+                start_date=start_date,
+                end_date=end_date,
+                breakdowns=breakdowns
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
         
         return jsonify({
             "success": True,
             "data": statistics,
             "filters": {
                 "start_date": start_date,
-                "end_date": end_date
+                "end_date": end_date,
+                "breakdown": breakdowns
             }
         }), 200
         
@@ -121,3 +153,238 @@ def get_downtime_statistics():
             "error": "Internal Server Error",
             "message": str(e)
         }), 500
+
+
+@downtime_bp.route('/downtime/heatmap', methods=['GET'])
+def get_downtime_heatmap():
+    """
+    GET /api/downtime/heatmap
+    
+    Heatmap menit dan jumlah downtime per hari-dalam-minggu × jam × komponen,
+    direduksi dari cube harian downtime_heatmap.
+    
+    Query Parameters:
+    - start_date: Filter tanggal mulai (format: YYYY-MM-DD)
+    - end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+    - component: Filter berdasarkan komponen (optional, default: all)
+    
+    Returns:
+    - JSON dengan matriks [7][24] per komponen dan total
+    """
+    try:
+        start_date = request.args.get('start_date', default=None, type=str)
+        end_date = request.args.get('end_date', default=None, type=str)
+        component = request.args.get('component', default=None, type=str)
+        
+        logger.info(
+            f"[API] GET /api/downtime/heatmap - "
+            f"start_date={start_date}, end_date={end_date}, component={component}"
+        )
+        
+        try:
+            heatmap = downtime_service.get_downtime_heatmap(
+                start_date=start_date,
+                end_date=end_date,
+                component_filter=component
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": heatmap,
+            "filters": {
+                "start_date": start_date,
+                "end_date": end_date,
+                "component": component or "all"
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_downtime_heatmap: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+@downtime_bp.route('/downtime/detections', methods=['GET'])
+def get_downtime_detections():
+    """
+    GET /api/downtime/detections
+    
+    Event dari satu scan machine_logs untuk semua detektor sekaligus:
+    status_transition, metric_drop (P atau Q < 20%), counter_stall.
+    
+    Query Parameters:
+    - limit: Maksimal events per detektor dan hasil gabungan (default: 50)
+    - detectors: Nama detektor dipisah koma (optional, default: semua)
+    - start_date: Filter tanggal mulai (format: YYYY-MM-DD)
+    - end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+    
+    Returns:
+    - JSON dengan events gabungan (terbaru dulu) dan jumlah per detektor
+    """
+    try:
+        limit = request.args.get('limit', default=50, type=int)
+        detectors = request.args.get('detectors', default='', type=str)
+        detectors = [d.strip().lower() for d in detectors.split(',') if d.strip()]
+        start_date = request.args.get('start_date', default=None, type=str)
+        end_date = request.args.get('end_date', default=None, type=str)
+        
+        if limit < 1 or limit > 500:
+            limit = 50
+        
+        logger.info(
+            f"[API] GET /api/downtime/detections - "
+            f"limit={limit}, detectors={detectors or 'all'}, "
+            f"start_date={start_date}, end_date={end_date}"
+        )
+        
+        try:
+            result = downtime_service.detect_machine_log_events(
+                limit=limit,
+                start_date=start_date,
+                end_date=end_date,
+                detectors=detectors
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "count": len(result["events"]),
+            "data": result["events"],
+            "by_detector": result["by_detector"],
+            "rows_scanned": result["rows_scanned"],
+            "filters": {
+                "limit": limit,
+                "detectors": detectors or "all",
+                "start_date": start_date,
+                "end_date": end_date
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_downtime_detections: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+@downtime_bp.route('/downtime/reliability', methods=['GET'])
+def get_downtime_reliability():
+    """
+    GET /api/downtime/reliability
+    
+    KPI reliabilitas: MTBF, MTTR, Pareto menit downtime, dan cluster kegagalan
+    berulang per komponen atau per alasan. Sumber "machine" memakai tabel
+    downtime_events, sumber "repairs" memakai riwayat perbaikan CSV di Model/.
+    
+    Query Parameters:
+    - start_date: Filter tanggal mulai (format: YYYY-MM-DD)
+    - end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+    - source: Sumber dipisah koma: machine, repairs (default: keduanya)
+    - group_by: component atau reason (default: component)
+    - top: Jumlah grup di Pareto (default: 10)
+    - repeat_window_hours: Jarak maksimal antar kegagalan berulang (default: 24)
+    
+    Laporan di-cache per kombinasi parameter; cache dikosongkan lewat
+    POST /api/downtime/reliability/refresh (admin).
+    
+    Returns:
+    - JSON dengan laporan reliabilitas per sumber
+    """
+    try:
+        start_date = request.args.get('start_date', default=None, type=str)
+        end_date = request.args.get('end_date', default=None, type=str)
+        source = request.args.get('source', default='', type=str)
+        sources = [s.strip().lower() for s in source.split(',') if s.strip()]
+        group_by = request.args.get('group_by', default='component', type=str).lower()
+        top = request.args.get('top', default=10, type=int)
+        repeat_window_hours = request.args.get('repeat_window_hours', default=24.0, type=float)
+        
+        logger.info(
+            f"[API] GET /api/downtime/reliability - "
+            f"start_date={start_date}, end_date={end_date}, source={sources or 'all'}, "
+            f"group_by={group_by}, top={top}"
+        )
+        
+        try:
+            report = reliability_service.get_report(
+                start_date=start_date,
+                end_date=end_date,
+                sources=sources,
+                group_by=group_by,
+                top=top,
+                repeat_window_hours=repeat_window_hours
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": report,
+            "filters": {
+                "start_date": start_date,
+                "end_date": end_date,
+                "source": sources or "all",
+                "group_by": group_by,
+                "top": top,
+                "repeat_window_hours": repeat_window_hours
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_downtime_reliability: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@downtime_bp.route('/downtime/reliability/refresh', methods=['POST'])
+@require_admin
+def refresh_downtime_reliability():
+    """
+    POST /api/downtime/reliability/refresh (admin only)
+    
+    Mengosongkan cache laporan reliabilitas, mis. setelah backfill
+    downtime_events atau pembaruan CSV riwayat perbaikan.
+    
+    Returns:
+    - JSON dengan jumlah entri cache yang dihapus dan status cache
+    """
+    logger.info(f"Reliability cache refresh requested by {request.current_user.get('username')}")
+    
+    try:
+        dropped = reliability_service.refresh()
+        return jsonify({
+            "success": True,
+            "data": {
+                "dropped": dropped,
+                "cache": reliability_service.status()
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error refreshing reliability cache: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
@@ -3,11 +3,15 @@ Health Controller
 Endpoints untuk health check API dan komponen
 """
 
-from flask import Blueprint, jsonify
+import math
+from datetime import datetime, timezone
+import numpy as np
+from flask import Blueprint, jsonify, request
 from src.services.database_service import db_service
 from src.services.health_service import HealthService
+from src.services.health_history_service import health_history_service
 from src.utils.logger import get_logger, log_success, log_error, log_metric
-from config import APP_NAME, APP_VERSION
+from config import APP_NAME, APP_VERSION, HEALTH_SIMULATION_MAX_SCENARIOS
 
 # Setup
 health_bp = Blueprint('health', __name__)
@@ -40,6 +44,8 @@ def api_health_check():
             "endpoints_available": [
                 "GET /api/health",
                 "GET /api/health/<component_name>",
+                "GET /api/health/history",
+                "POST /api/health/simulate",
                 "GET /api/components",
                 "GET /api/components/<component_name>/health",
                 "POST /api/predict/maintenance",
@@ -64,6 +70,251 @@ def api_health_check():
         }), 500
 
 
+@health_bp.route('/health/history', methods=['GET'])
+def get_health_history():
+    """
+    GET /api/health/history
+    
+    Mengambil trend health index historis per komponen (downsampled di database).
+    
+    Query Parameters:
+    - component: Filter komponen, boleh diulang (optional, default: semua)
+    - start: Awal rentang ISO 8601 (default: 7 hari terakhir)
+    - end: Akhir rentang ISO 8601 (default: sekarang)
+    - bucket: Lebar bucket dalam detik (optional)
+    - max_points: Jumlah titik maksimum per komponen (default: 500)
+    
+    Returns:
+        JSON response dengan series health index per komponen
+    """
+    try:
+        components = request.args.getlist('component') or None
+        bucket = request.args.get('bucket', default=None, type=int)
+        max_points = request.args.get('max_points', default=500, type=int)
+        
+        try:
+            start = _parse_timestamp(request.args.get('start'))
+            end = _parse_timestamp(request.args.get('end'))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": f"Format waktu tidak valid: {e}"
+            }), 400
+        
+        if start and end and start >= end:
+            return jsonify({
+                "success": False,
+                "error": "Bad Request",
+                "message": "'start' harus lebih awal dari 'end'"
+            }), 400
+        
+        # Validasi max_points
+        if max_points < 1 or max_points > 5000:
+            max_points = 500
+        
+        logger.info(
+            f"[API] GET /api/health/history - components={components}, "
+            f"start={start}, end={end}, bucket={bucket}, max_points={max_points}"
+        )
+        
+        trend = health_history_service.get_health_trend(
+            components=components,
+            start=start,
+            end=end,
+            bucket_seconds=bucket,
+            max_points=max_points
+        )
+        
+        return jsonify({
+            "success": True,
+            "data": trend
+        }), 200
+        
+    except Exception as e:
+        log_error(logger, f"Error in get_health_history: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+def _parse_timestamp(value):
+    """
+    Parse timestamp ISO 8601 dari query parameter.
+    
+    Args:
+        value: String timestamp atau None
+        
+    Returns:
+        datetime timezone-aware (UTC jika tanpa offset) atau None
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@health_bp.route('/health/simulate', methods=['POST'])
+def simulate_health():
+    """
+    POST /api/health/simulate
+    
+    Simulasi what-if health index untuk grid nilai RPN × OEE atau rencana aksi FMEA.
+    
+    Request Body:
+    {
+        "component": "Printing",                      // optional, baseline RPN dari database
+        "rpn_value": 120,                             // optional, baseline RPN manual
+        "rpn_max": 200,                               // wajib jika tanpa component
+        "rpn_values": [40, 80, 120] | {"start": 0, "stop": 200, "step": 10},
+        "oee_values": [50, 70, 90] | {"start": 40, "stop": 95, "step": 5},  // default: OEE saat ini
+        "fmea_actions": [                             // alternatif untuk rpn_values
+            {"name": "Ganti roller", "severity": 6, "occurrence": 3, "detection": 4},
+            {"name": "SOP cleaning", "rpn_reduction_pct": 30}
+        ]
+    }
+    
+    Returns:
+        JSON response dengan grid health index dan status (baris = RPN, kolom = OEE)
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": "Request body harus berupa JSON object"
+        }), 400
+    
+    try:
+        component = data.get("component")
+        baseline_rpn = data.get("rpn_value")
+        rpn_max = data.get("rpn_max")
+        
+        if component:
+            db_rpn, db_max = db_service.get_component_rpn(component)
+            if db_rpn is None:
+                return jsonify({
+                    "success": False,
+                    "error": "Komponen tidak ditemukan",
+                    "message": f"Komponen '{component}' tidak ada di database"
+                }), 404
+            baseline_rpn = db_rpn if baseline_rpn is None else baseline_rpn
+            rpn_max = db_max if rpn_max is None else rpn_max
+        
+        if rpn_max is None:
+            raise ValueError("'rpn_max' wajib diisi jika 'component' tidak diberikan")
+        rpn_max = _finite_number(rpn_max, "rpn_max")
+        baseline_rpn = _finite_number(baseline_rpn, "rpn_value") if baseline_rpn is not None else None
+        
+        labels = None
+        if data.get("fmea_actions"):
+            if not isinstance(data["fmea_actions"], list):
+                raise ValueError("'fmea_actions' harus berupa array")
+            resolved = health_service.resolve_fmea_actions(data["fmea_actions"], baseline_rpn)
+            rpn_values = _finite_array(resolved["rpn_values"], "fmea_actions")
+            labels = resolved["labels"]
+            if baseline_rpn is not None:
+                rpn_values = np.concatenate(([baseline_rpn], rpn_values))
+                labels = ["Baseline"] + labels
+        elif "rpn_values" in data:
+            rpn_values = _parse_grid(data["rpn_values"], "rpn_values")
+        elif baseline_rpn is not None:
+            rpn_values = [baseline_rpn]
+        else:
+            raise ValueError("Berikan 'rpn_values', 'fmea_actions', atau baseline RPN")
+        
+        if "oee_values" in data:
+            oee_values = _parse_grid(data["oee_values"], "oee_values")
+        else:
+            oee_values = [health_service.generate_oee_score()["oee_score"]]
+        
+        result = health_service.simulate_health_scenarios(rpn_values, oee_values, rpn_max, labels)
+        result["component"] = component
+        result["baseline_rpn"] = baseline_rpn
+        
+        log_metric(logger, "Simulated scenarios", result["scenario_count"])
+        
+        return jsonify({
+            "success": True,
+            "data": result
+        }), 200
+        
+    except (ValueError, TypeError, OverflowError) as e:
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        log_error(logger, f"Error in simulate_health: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+def _parse_grid(spec, field_name: str):
+    """
+    Parse definisi grid: list angka atau range {"start", "stop", "step"} (stop inklusif).
+    
+    Args:
+        spec: List angka atau dict range
+        field_name: Nama field untuk pesan error
+        
+    Returns:
+        numpy array nilai grid
+    """
+    if isinstance(spec, dict):
+        try:
+            start = _finite_number(spec["start"], field_name)
+            stop = _finite_number(spec["stop"], field_name)
+            step = _finite_number(spec.get("step", 1), field_name)
+        except KeyError as e:
+            raise ValueError(f"'{field_name}' range membutuhkan key {e}")
+        if step <= 0 or stop < start:
+            raise ValueError(f"'{field_name}' range tidak valid (step > 0 dan stop >= start)")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        if count > HEALTH_SIMULATION_MAX_SCENARIOS:
+            raise ValueError(f"'{field_name}' menghasilkan terlalu banyak nilai ({count})")
+        return start + step * np.arange(count)
+    
+    if isinstance(spec, list):
+        return _finite_array(spec, field_name)
+    
+    raise ValueError(f"'{field_name}' harus berupa array atau object range")
+
+
+def _finite_number(value, field_name: str) -> float:
+    """
+    Konversi ke float; NaN/Infinity (mis. 1e400) ditolak karena tidak valid di JSON respons.
+    
+    Raises:
+        ValueError: Jika nilai bukan angka terhingga
+    """
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"'{field_name}' harus berupa angka terhingga")
+    return number
+
+
+def _finite_array(values, field_name: str) -> np.ndarray:
+    """
+    Konversi ke numpy array float; NaN/Infinity ditolak seperti _finite_number.
+    
+    Raises:
+        ValueError: Jika ada nilai yang bukan angka terhingga
+    """
+    array = np.asarray(values, dtype=float)
+    if not np.all(np.isfinite(array)):
+        raise ValueError(f"'{field_name}' harus berisi angka terhingga")
+    return array
+
+
 @health_bp.route('/health/<component_name>', methods=['GET'])
 def get_component_health(component_name: str):
     """
@@ -0,0 +1,177 @@
+"""
+Job Controller
+Endpoints job API (submit, poll, fetch) untuk batch prediction dan analitik downtime
+yang dijalankan di process pool
+"""
+
+from flask import Blueprint, jsonify, request
+from src.services.job_executor import job_executor, JOB_DONE, JOB_FAILED
+from src.services.prediction_service import prediction_service
+from src.services.downtime_service import downtime_service
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Create blueprint
+job_bp = Blueprint('jobs', __name__)
+
+# Parameter yang diteruskan ke method analisis downtime
+DOWNTIME_JOB_PARAMS = ('limit', 'start_date', 'end_date', 'component_filter')
+
+
+def _accepted(job):
+    """Response 202 standar untuk job yang baru disubmit."""
+    return jsonify({
+        "success": True,
+        "data": job.describe(),
+        "links": {
+            "status": f"/api/jobs/{job.id}",
+            "result": f"/api/jobs/{job.id}/result"
+        }
+    }), 202
+
+
+@job_bp.route('/jobs/predict/batch', methods=['POST'])
+def submit_prediction_job():
+    """
+    POST /api/jobs/predict/batch
+
+    Submit batch prediction besar sebagai job di process pool.
+
+    Expected JSON body:
+    {
+        "data": [
+            {"reason": "SLOTER LARI", "shift": 1},
+            ...
+        ]
+    }
+
+    Returns:
+    - 202 dengan job_id; hasil diambil dari /api/jobs/<job_id>/result
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        data_list = data.get('data')
+
+        job = prediction_service.submit_batch_job(data_list)
+        logger.info(f"[API] Prediction batch job {job.id} submitted ({len(data_list)} items)")
+        return _accepted(job)
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": str(e)
+        }), 400
+    except RuntimeError as e:
+        return jsonify({
+            "success": False,
+            "error": "Too Many Jobs",
+            "message": str(e)
+        }), 429
+    except Exception as e:
+        logger.error(f"Error submitting prediction job: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@job_bp.route('/jobs/downtime/<analysis>', methods=['POST'])
+def submit_downtime_job(analysis):
+    """
+    POST /api/jobs/downtime/<analysis>
+
+    Submit analisis downtime (history, statistics, status_analysis, health_drops, detections)
+    sebagai job di process pool.
+
+    Expected JSON body (opsional):
+    {
+        "limit": 1000,
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-31"
+    }
+
+    Returns:
+    - 202 dengan job_id
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        params = {key: data[key] for key in DOWNTIME_JOB_PARAMS if data.get(key) is not None}
+
+        job = downtime_service.submit_analysis_job(analysis, params)
+        logger.info(f"[API] Downtime {analysis} job {job.id} submitted")
+        return _accepted(job)
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": str(e)
+        }), 400
+    except RuntimeError as e:
+        return jsonify({
+            "success": False,
+            "error": "Too Many Jobs",
+            "message": str(e)
+        }), 429
+    except Exception as e:
+        logger.error(f"Error submitting downtime job: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    GET /api/jobs/<job_id>
+
+    Status dan progress job (tanpa hasil).
+    """
+    job = job_executor.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Not Found",
+            "message": "Job tidak ditemukan atau sudah kedaluwarsa"
+        }), 404
+
+    return jsonify({"success": True, "data": job.describe()}), 200
+
+
+@job_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    GET /api/jobs/<job_id>/result
+
+    Hasil job. 202 jika job belum selesai, 500 jika job gagal.
+    """
+    job = job_executor.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Not Found",
+            "message": "Job tidak ditemukan atau sudah kedaluwarsa"
+        }), 404
+
+    if job.status == JOB_FAILED:
+        return jsonify({"success": False, "data": job.describe(), "message": job.error}), 500
+
+    if job.status != JOB_DONE:
+        return jsonify({"success": True, "data": job.describe(), "message": "Job belum selesai"}), 202
+
+    return jsonify({"success": True, "data": job.describe(), "result": job.result}), 200
+
+
+@job_bp.route('/jobs', methods=['GET'])
+def get_executor_status():
+    """
+    GET /api/jobs
+
+    Status process pool dan jumlah job per status.
+    """
+    return jsonify({"success": True, "data": job_executor.status()}), 200
@@ -3,14 +3,19 @@ Prediction Controller
 Endpoints untuk machine learning predictions
 """
 
+from datetime import datetime, timezone
 from flask import Blueprint, jsonify, request
-from src.services.prediction_service import PredictionService
+from src.services.prediction_service import prediction_service, prediction_coalescer
+from src.services.enhanced_prediction_service import enhanced_prediction_coalescer
+from src.services.model_registry import model_registry
+from src.services.shadow_service import shadow_evaluator
+from src.services.prediction_log_service import prediction_log_service
+from src.controllers.auth_controller import require_admin
 from src.utils.logger import get_logger
 
 # Setup
 prediction_bp = Blueprint('predictions', __name__, url_prefix='/api')
 logger = get_logger(__name__)
-prediction_service = PredictionService()
 
 
 @prediction_bp.route('/predict/maintenance', methods=['POST'])
@@ -77,11 +82,13 @@ def predict_single_maintenance():
 def predict_batch_maintenance():
     """
     Endpoint untuk prediksi durasi maintenance batch/multiple.
+    Semua item diprediksi dalam satu panggilan model; item tidak valid
+    dilaporkan per item tanpa menggagalkan batch.
     
     Expected JSON body:
     {
         "data": [
-            {"total_produksi": 5000, "produk_cacat": 150},
+            {"total_produksi": 5000, "produk_cacat": 150, "reason": "SLOTER LARI", "shift": 1},
             {"total_produksi": 3000, "produk_cacat": 100}
         ]
     }
@@ -195,4 +202,291 @@ def get_model_information():
         return jsonify({
             "error": "Error getting model info",
             "message": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@prediction_bp.route('/model/registry', methods=['GET'])
+def get_model_registry():
+    """
+    Endpoint status model registry: versi aktif per slot dan riwayat versi.
+    
+    Returns:
+        JSON response dengan status registry
+    """
+    try:
+        return jsonify({
+            "success": True,
+            "data": model_registry.status()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting model registry status: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error getting model registry status",
+            "message": str(e)
+        }), 500
+
+
+@prediction_bp.route('/predict/coalescing', methods=['GET'])
+def get_prediction_coalescing_stats():
+    """
+    Endpoint counter single-flight + cache prediksi.
+    
+    Menampilkan berapa pemanggilan yang dilayani tanpa komputasi ulang
+    (coalesced: menunggu komputasi identik yang sedang berjalan; cache_hits:
+    dari cache TTL) untuk PredictionService dan EnhancedPredictionService.
+    
+    Returns:
+        JSON response dengan counter per service
+    """
+    try:
+        return jsonify({
+            "success": True,
+            "data": {
+                "prediction_service": prediction_coalescer.status(),
+                "enhanced_prediction_service": enhanced_prediction_coalescer.status()
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting coalescing stats: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error getting coalescing stats",
+            "message": str(e)
+        }), 500
+
+
+@prediction_bp.route('/model/reload', methods=['POST'])
+@require_admin
+def reload_model():
+    """
+    Endpoint hot reload model (admin only).
+    
+    Model baru dimuat dan di-warm di background thread, lalu di-swap secara
+    atomik. Request yang sedang berjalan tetap memakai versi lama.
+    
+    Expected JSON body (opsional):
+    {
+        "slot": "standard" | "improved" | "candidate",  # default: semua slot
+        "wait": false                      # tunggu sampai reload selesai
+    }
+    
+    Returns:
+        JSON response dengan status reload per slot
+    """
+    data = request.get_json(silent=True) or {}
+    slot = data.get('slot')
+    wait = bool(data.get('wait', False))
+    
+    logger.info(f"Model reload requested by {request.current_user.get('username')}: slot={slot or 'all'}")
+    
+    try:
+        results = model_registry.reload(slot, wait=wait)
+        failed = any(r.get('status') == 'failed' for r in results)
+        return jsonify({
+            "success": not failed,
+            "data": results,
+            "message": "Reload selesai" if wait else "Reload dijadwalkan di background"
+        }), 500 if failed else (200 if wait else 202)
+        
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": "Invalid slot",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error reloading model: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error reloading model",
+            "message": str(e)
+        }), 500
+
+
+@prediction_bp.route('/model/shadow', methods=['GET'])
+def get_shadow_evaluation():
+    """
+    Endpoint hasil shadow evaluation model kandidat.
+    
+    Sampel input prediksi live (SHADOW_SAMPLE_RATE) dicerminkan ke model di
+    slot 'candidate' oleh background worker. Hasil disimpan sebagai agregat
+    per pasangan (versi primary, versi kandidat).
+    
+    Returns:
+        JSON response dengan counter dan perbandingan per pasangan model
+    """
+    try:
+        return jsonify({
+            "success": True,
+            "data": shadow_evaluator.status()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting shadow evaluation: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error getting shadow evaluation",
+            "message": str(e)
+        }), 500
+
+
+@prediction_bp.route('/model/shadow/reset', methods=['POST'])
+@require_admin
+def reset_shadow_evaluation():
+    """
+    Endpoint reset agregat shadow evaluation (admin only).
+    
+    Returns:
+        JSON response dengan status shadow evaluator setelah reset
+    """
+    logger.info(f"Shadow evaluation reset by {request.current_user.get('username')}")
+    
+    try:
+        shadow_evaluator.reset()
+        return jsonify({
+            "success": True,
+            "data": shadow_evaluator.status(),
+            "message": "Agregat shadow evaluation dihapus"
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error resetting shadow evaluation: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error resetting shadow evaluation",
+            "message": str(e)
+        }), 500
+
+
+def _parse_timestamp(value):
+    """
+    Parse timestamp ISO 8601 dari query parameter.
+    
+    Args:
+        value: String timestamp atau None
+        
+    Returns:
+        datetime timezone-aware (UTC jika tanpa offset) atau None
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _parse_range():
+    """Parse query parameter start/end. Raises ValueError jika format/urutan tidak valid."""
+    start = _parse_timestamp(request.args.get('start'))
+    end = _parse_timestamp(request.args.get('end'))
+    if start and end and start >= end:
+        raise ValueError("'start' harus lebih awal dari 'end'")
+    return start, end
+
+
+@prediction_bp.route('/predict/log', methods=['GET'])
+def get_prediction_log():
+    """
+    Endpoint audit log prediksi yang dilayani (tabel prediction_log).
+    
+    Query Parameters:
+    - start: Awal rentang ISO 8601 (default: 24 jam terakhir)
+    - end: Akhir rentang ISO 8601 (default: sekarang)
+    - source: Filter pemicu (api, health_auto_trigger)
+    - reason: Filter reason (diterjemahkan ke nama training data)
+    - limit: Jumlah baris maksimum (default: 1000, maks 10000)
+    
+    Returns:
+        JSON response dengan record terbaru dan status writer
+    """
+    try:
+        start, end = _parse_range()
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": f"Rentang waktu tidak valid: {e}"
+        }), 400
+    
+    limit = request.args.get('limit', default=1000, type=int)
+    if limit < 1 or limit > 10000:
+        limit = 1000
+    
+    try:
+        log = prediction_log_service.get_log(
+            start=start,
+            end=end,
+            source=request.args.get('source'),
+            reason=request.args.get('reason'),
+            limit=limit
+        )
+        log['writer'] = prediction_log_service.status()
+        return jsonify({"success": True, "data": log}), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting prediction log: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error getting prediction log",
+            "message": str(e)
+        }), 500
+
+
+@prediction_bp.route('/predict/backtest', methods=['GET'])
+def backtest_predictions():
+    """
+    Endpoint back-test akurasi prediksi tercatat terhadap durasi perbaikan aktual.
+    
+    Setiap kejadian di riwayat perbaikan dipasangkan dengan prediksi pada
+    tanggal yang sama atau hingga window_days sebelumnya (reason paling mirip).
+    
+    Query Parameters:
+    - start: Awal rentang kejadian perbaikan ISO 8601 (default: 30 hari terakhir)
+    - end: Akhir rentang ISO 8601 (default: sekarang)
+    - source: Hanya prediksi dari pemicu ini (opsional)
+    - window_days: Hari sebelum perbaikan yang ikut dicari (default: 1, maks 30)
+    - include_pairs: true untuk menyertakan pasangan per kejadian
+    
+    Returns:
+        JSON response dengan MAE, RMSE, bias, cakupan interval, per versi model
+    """
+    try:
+        start, end = _parse_range()
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": "Bad Request",
+            "message": f"Rentang waktu tidak valid: {e}"
+        }), 400
+    
+    window_days = request.args.get('window_days', default=1, type=int)
+    if window_days < 0 or window_days > 30:
+        window_days = 1
+    
+    try:
+        result = prediction_log_service.backtest(
+            start=start,
+            end=end,
+            source=request.args.get('source'),
+            window_days=window_days,
+            include_pairs=request.args.get('include_pairs', 'false').lower() == 'true'
+        )
+        return jsonify({"success": True, "data": result}), 200
+        
+    except (FileNotFoundError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "error": "Repair history unavailable",
+            "message": str(e)
+        }), 404
+    except Exception as e:
+        logger.error(f"Error running prediction backtest: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error running prediction backtest",
+            "message": str(e)
+        }), 500
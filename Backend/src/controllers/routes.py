@@ -11,6 +11,7 @@ from src.controllers.docs_controller import docs_bp
 from src.controllers.downtime_controller import downtime_bp
 from src.controllers.sensor_controller import sensor_bp
 from src.controllers.auth_controller import auth_bp
+from src.controllers.job_controller import job_bp
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -32,6 +33,7 @@ def register_routes(app: Flask) -> None:
         app.register_blueprint(downtime_bp, url_prefix='/api')
         app.register_blueprint(sensor_bp, url_prefix='/api')
         app.register_blueprint(auth_bp, url_prefix='/api')
+        app.register_blueprint(job_bp, url_prefix='/api')
         
         logger.info("All routes registered successfully")
         
@@ -246,11 +246,32 @@ class DatabaseService:
                             data.get('cumulative_defects', 0),     # Default 0 if not present
                         ),
                     )
+                    self._track_downtime_event(cur, data)
                 conn.commit()
             logger.info(f"Machine status logged: Production={data.get('cumulative_production', 0)}, Defects={data.get('cumulative_defects', 0)}")
         except Exception as e:
             logger.error(f"Database error while logging machine status: {e}")
 
+    def _track_downtime_event(self, cursor, data):
+        """
+        Memperbarui downtime_events dalam transaksi ingest machine_logs.
+
+        Dijalankan di dalam SAVEPOINT: kegagalan (mis. migration 004 belum
+        dijalankan) tidak membatalkan log machine status.
+        """
+        # Import lokal: downtime_service mengimport db_service
+        from src.services.downtime_service import downtime_service
+
+        cursor.execute("SAVEPOINT downtime_event")
+        try:
+            change = downtime_service.track_status_sample(cursor, data)
+            cursor.execute("RELEASE SAVEPOINT downtime_event")
+            if change:
+                logger.info(f"Downtime event {change}: status={data.get('machine_status')} at {data.get('timestamp')}")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT downtime_event")
+            logger.error(f"Error tracking downtime event: {e}")
+
     def get_latest_machine_status(self) -> Optional[Dict[str, Any]]:
         """
         Mengambil status mesin terbaru dari database.
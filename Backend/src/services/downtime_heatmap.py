@@ -0,0 +1,118 @@
+"""
+Downtime Heatmap
+Cube heatmap downtime (hari × komponen × jam): pemecahan event ke bucket per jam
+dan reduksi rentang tanggal ke hari-dalam-minggu × komponen × jam secara vektor
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+HOURS = 24
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def split_event_hours(start: datetime, end: datetime) -> Dict[date, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Memecah satu event downtime ke bucket per jam per hari.
+
+    Menit dibagi ke setiap jam yang dilewati event (jam lokal timestamp);
+    hitungan event (1) masuk ke jam mulai.
+
+    Args:
+        start: Waktu mulai event
+        end: Waktu selesai event
+
+    Returns:
+        Dict day -> (minutes[24], counts[24])
+    """
+    cells: Dict[date, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def cell(day: date) -> Tuple[np.ndarray, np.ndarray]:
+        if day not in cells:
+            cells[day] = (np.zeros(HOURS), np.zeros(HOURS, dtype=np.int32))
+        return cells[day]
+
+    cell(start.date())[1][start.hour] += 1
+    cursor = start
+    while cursor < end:
+        next_hour = cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        segment_end = min(next_hour, end)
+        cell(cursor.date())[0][cursor.hour] += (segment_end - cursor).total_seconds() / 60.0
+        cursor = segment_end
+    return cells
+
+
+def build_cube(
+    events: Iterable[Tuple[datetime, datetime, str]]
+) -> Dict[Tuple[date, str], Tuple[np.ndarray, np.ndarray]]:
+    """
+    Membangun cube penuh dari daftar event tertutup (dipakai rebuild).
+
+    Args:
+        events: Iterable (start_time, end_time, component)
+
+    Returns:
+        Dict (day, component) -> (minutes[24], counts[24])
+    """
+    cube: Dict[Tuple[date, str], Tuple[np.ndarray, np.ndarray]] = {}
+    for start, end, component in events:
+        for day, (minutes, counts) in split_event_hours(start, end).items():
+            key = (day, component)
+            if key in cube:
+                cube[key][0][:] += minutes
+                cube[key][1][:] += counts
+            else:
+                cube[key] = (minutes, counts)
+    return cube
+
+
+def reduce_heatmap(
+    rows: List[Tuple[date, str, List[float], List[int]]],
+    components: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Mereduksi baris cube per hari menjadi heatmap hari-dalam-minggu × komponen × jam.
+
+    Seluruh baris diubah ke satu array (n, 24) lalu dijumlahkan dengan
+    np.add.at berdasarkan indeks (weekday, komponen) - tanpa loop per sel.
+
+    Args:
+        rows: Baris (day, component, minutes[24], counts[24])
+        components: Urutan komponen yang diutamakan (komponen lain ditambahkan di akhir)
+
+    Returns:
+        Dict heatmap: minutes/counts per komponen [7][24] dan total [7][24]
+    """
+    order = list(dict.fromkeys(list(components or []) + sorted({row[1] for row in rows})))
+    index = {component: i for i, component in enumerate(order)}
+
+    minutes = np.zeros((len(WEEKDAYS), len(order), HOURS))
+    counts = np.zeros((len(WEEKDAYS), len(order), HOURS), dtype=np.int64)
+    days = set()
+    if rows:
+        weekday = np.fromiter((row[0].weekday() for row in rows), dtype=np.intp, count=len(rows))
+        component = np.fromiter((index[row[1]] for row in rows), dtype=np.intp, count=len(rows))
+        np.add.at(minutes, (weekday, component), np.asarray([row[2] for row in rows], dtype=float))
+        np.add.at(counts, (weekday, component), np.asarray([row[3] for row in rows], dtype=np.int64))
+        days = {row[0] for row in rows}
+
+    total_minutes = minutes.sum(axis=1)
+    total_counts = counts.sum(axis=1)
+    return {
+        "weekdays": list(WEEKDAYS),
+        "hours": list(range(HOURS)),
+        "components": order,
+        "minutes": {c: np.round(minutes[:, i, :], 2).tolist() for c, i in index.items()},
+        "counts": {c: counts[:, i, :].tolist() for c, i in index.items()},
+        "total": {
+            "minutes": np.round(total_minutes, 2).tolist(),
+            "counts": total_counts.tolist()
+        },
+        "summary": {
+            "days_with_downtime": len(days),
+            "downtime_minutes": round(float(minutes.sum()), 1),
+            "events": int(counts.sum())
+        }
+    }
@@ -3,13 +3,129 @@ Downtime Service
 Service untuk analisis dan agregasi data downtime dari machine_logs
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import base64
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from psycopg2.extras import execute_values
+from config import MACHINE_LOG_SCAN_FETCH_ROWS, COUNTER_STALL_MIN_MINUTES
 from src.services.database_service import db_service
+from src.services.downtime_heatmap import split_event_hours, build_cube, reduce_heatmap
+from src.services.log_detectors import (
+    DETECTORS, SCAN_COLUMNS, CounterStallDetector, StatusSegmentCollector, scan_rows, merge_events
+)
+from src.services.job_executor import job_executor, Job, _worker_call
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Status produksi normal; deretan status lain di antaranya = satu segmen downtime
+RUNNING_STATUS = 'Running'
+
+# Selisih waktu dalam menit (PostgreSQL), {start}/{end} diisi nama kolom
+MINUTES_BETWEEN_SQL = "EXTRACT(EPOCH FROM ({end} - {start})) / 60.0"
+
+# Klasifikasi event downtime_events di SQL (dipakai history dan statistik).
+# Durasi event yang masih terbuka dihitung sampai sekarang.
+EVENT_DURATION_SQL = "COALESCE(duration_minutes, EXTRACT(EPOCH FROM (NOW() - start_time)) / 60.0)::float8"
+
+# Komponen terdampak: kolom generated downtime_events.component (migration 006)
+EVENT_COMPONENTS = ('Maintenance', 'System', 'Operator', 'Material Supply', 'Printing')
+EVENT_SEVERITY_SQL = """
+    CASE machine_status
+        WHEN 'Error' THEN CASE WHEN d.duration >= 30 THEN 'critical' ELSE 'high' END
+        WHEN 'Stopped' THEN CASE WHEN d.duration >= 15 THEN 'high' ELSE 'medium' END
+        WHEN 'Maintenance' THEN CASE WHEN d.duration >= 60 THEN 'medium' ELSE 'low' END
+        WHEN 'Idle' THEN CASE WHEN d.duration >= 10 THEN 'medium' ELSE 'low' END
+        ELSE CASE
+            WHEN d.duration >= 60 THEN 'critical'
+            WHEN d.duration >= 30 THEN 'high'
+            WHEN d.duration >= 10 THEN 'medium'
+            ELSE 'low'
+        END
+    END
+"""
+EVENT_TYPE_SQL = "CASE WHEN machine_status = 'Maintenance' THEN 'preventive' ELSE 'reactive' END"
+
+# Shift produksi dari jam mulai event (sama dengan auto-detect shift di health_service)
+EVENT_HOUR_SQL = "EXTRACT(HOUR FROM start_time)::int"
+EVENT_SHIFT_SQL = f"""
+    CASE
+        WHEN {EVENT_HOUR_SQL} >= 6 AND {EVENT_HOUR_SQL} < 14 THEN 1
+        WHEN {EVENT_HOUR_SQL} >= 14 AND {EVENT_HOUR_SQL} < 22 THEN 2
+        ELSE 3
+    END
+"""
+
+# Event tertutup lebih pendek dari ini tidak ditampilkan di history/statistik
+MIN_EVENT_MINUTES = 0.5
+
+
+def _parse_date_filter(value: Optional[str], name: str) -> Optional[date]:
+    """
+    Parse filter tanggal (YYYY-MM-DD atau ISO 8601) sebelum dikirim ke database.
+    
+    Raises:
+        ValueError: Jika format tanggal tidak valid
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        raise ValueError(f"{name} tidak valid: {value!r} (format: YYYY-MM-DD)")
+
+
+def _filters_fingerprint(filters: Dict[str, Any]) -> str:
+    """Hash pendek filter history; token hanya berlaku untuk filter yang sama."""
+    canonical = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=4).hexdigest()
+
+
+def encode_page_token(start_time: datetime, event_id: int, filters: Dict[str, Any]) -> str:
+    """
+    Membuat token halaman (opaque) dari kunci keyset baris terakhir.
+    
+    Args:
+        start_time: start_time baris terakhir halaman
+        event_id: id baris terakhir halaman
+        filters: Filter history yang dipakai halaman ini
+        
+    Returns:
+        String base64 URL-safe
+    """
+    payload = {"t": start_time.isoformat(), "i": int(event_id), "f": _filters_fingerprint(filters)}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_page_token(token: str, filters: Dict[str, Any]) -> Tuple[datetime, int]:
+    """
+    Membaca token halaman menjadi kunci keyset (start_time, id).
+    
+    Args:
+        token: Token dari encode_page_token
+        filters: Filter history request saat ini
+        
+    Returns:
+        Tuple (start_time, id)
+        
+    Raises:
+        ValueError: Jika token rusak atau dibuat untuk filter lain
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        key = (datetime.fromisoformat(payload["t"]), int(payload["i"]))
+        fingerprint = payload["f"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"page_token tidak valid: {e}")
+    
+    if fingerprint != _filters_fingerprint(filters):
+        raise ValueError("page_token dibuat untuk filter yang berbeda")
+    return key
+
 
 class DowntimeService:
     """Service untuk analisis downtime berdasarkan machine_logs."""
@@ -22,136 +138,152 @@ class DowntimeService:
         'Maintenance': 'maintenance'
     }
     
+    # Breakdown opsional get_downtime_statistics
+    STATISTICS_BREAKDOWNS = ('hour', 'shift')
+    
+    # Analisis yang dapat dijalankan sebagai job di process pool -> nama method
+    ANALYSIS_JOBS = {
+        'history': 'get_downtime_history',
+        'statistics': 'get_downtime_statistics',
+        'status_analysis': '_analyze_machine_status_downtime',
+        'health_drops': '_analyze_health_drops',
+        'detections': 'detect_machine_log_events'
+    }
+    
+    def submit_analysis_job(self, analysis: str, params: Dict[str, Any]) -> Job:
+        """
+        Menjalankan analisis downtime berat sebagai job di process pool.
+        
+        Query dan loop analisis berjalan di proses worker (koneksi DB sendiri),
+        sehingga thread request Flask tidak tertahan GIL.
+        
+        Args:
+            analysis: Jenis analisis (lihat ANALYSIS_JOBS)
+            params: Argumen keyword method (limit, start_date, end_date, ...)
+            
+        Returns:
+            Job yang terdaftar
+            
+        Raises:
+            ValueError: Jika jenis analisis tidak dikenal
+        """
+        method = self.ANALYSIS_JOBS.get(analysis)
+        if method is None:
+            raise ValueError(f"Analisis tidak dikenal: {analysis}. Pilihan: {', '.join(self.ANALYSIS_JOBS)}")
+        
+        def run(job: Job) -> Any:
+            return job_executor.run(_worker_call, __name__, 'downtime_service', method, params)
+        
+        return job_executor.submit(f"downtime_{analysis}", run, {"analysis": analysis, **params})
+    
     def get_downtime_history(
         self, 
         limit: int = 50,
         component_filter: Optional[str] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        status_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Mengambil history downtime dari database - pendekatan simpel.
-        Ambil semua record dengan machine_status = 'Downtime' dan hitung durasinya.
+        Mengambil history downtime dari tabel downtime_events.
+        
+        Event dibuka/ditutup saat telemetry masuk (track_status_sample), sehingga
+        history hanya berupa lookup terindeks; durasi event yang masih berjalan
+        dihitung sampai sekarang.
         
         Args:
             limit: Maksimal jumlah downtime events yang dikembalikan
             component_filter: Filter berdasarkan komponen (opsional)
             start_date: Filter tanggal mulai (format: YYYY-MM-DD)
             end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+            status_filter: Filter berdasarkan machine_status (opsional)
             
         Returns:
             List of downtime events dengan detail lengkap
         """
+        return self.get_downtime_history_page(
+            limit, component_filter, start_date, end_date, status_filter=status_filter
+        )["events"]
+    
+    def get_downtime_history_page(
+        self,
+        limit: int = 50,
+        component_filter: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_token: Optional[str] = None,
+        status_filter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Satu halaman history downtime dengan keyset pagination.
+        
+        Halaman diurutkan (start_time, id) terbaru dulu. Token berikutnya menyimpan
+        kunci baris terakhir, sehingga halaman sedalam apa pun hanya berupa range
+        scan index sebanyak limit + 1 baris (tanpa OFFSET).
+        
+        Args:
+            limit: Maksimal jumlah event per halaman
+            component_filter: Filter berdasarkan komponen (opsional)
+            start_date: Filter tanggal mulai (format: YYYY-MM-DD)
+            end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+            page_token: Token dari halaman sebelumnya (next_page_token)
+            status_filter: Filter berdasarkan machine_status (opsional)
+            
+        Returns:
+            Dict dengan events, next_page_token (None jika halaman terakhir), has_more
+            
+        Raises:
+            ValueError: Jika page_token tidak valid atau dibuat untuk filter lain
+        """
+        component_filter, status_filter = self._normalize_event_filters(component_filter, status_filter)
+        filters = {
+            "component": component_filter,
+            "status": status_filter,
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        after = decode_page_token(page_token, filters) if page_token else None
+        
         try:
-            logger.info(f"🔍 Getting downtime history - Simple approach (limit={limit})")
+            logger.info(f"🔍 Getting downtime history from downtime_events (limit={limit}, paged={after is not None})")
             
             with db_service.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # Query untuk mengambil semua record dengan machine_status = 'Downtime'
-                    query = """
-                        WITH downtime_periods AS (
-                            SELECT 
-                                timestamp,
-                                machine_status,
-                                performance_rate,
-                                quality_rate,
-                                LAG(timestamp) OVER (ORDER BY timestamp) as prev_timestamp,
-                                LAG(machine_status) OVER (ORDER BY timestamp) as prev_status,
-                                LEAD(timestamp) OVER (ORDER BY timestamp) as next_timestamp,
-                                LEAD(machine_status) OVER (ORDER BY timestamp) as next_status
-                            FROM machine_logs
-                            WHERE 1=1
-                    """
-                    params = []
-                    
-                    # Tambahkan filter tanggal jika ada
-                    if start_date:
-                        query += " AND timestamp >= %s"
-                        params.append(start_date)
-                    
-                    if end_date:
-                        query += " AND timestamp <= %s"
-                        params.append(end_date)
-                    
-                    query += """
-                            ORDER BY timestamp ASC
-                        ),
-                        downtime_starts AS (
-                            SELECT 
-                                timestamp as start_time,
-                                machine_status,
-                                performance_rate,
-                                quality_rate,
-                                next_timestamp as end_time,
-                                next_status
-                            FROM downtime_periods
-                            WHERE machine_status IN ('Downtime', 'Maintenance', 'Error', 'Idle', 'Stopped', 'Setup', 'Changeover')
-                            AND (prev_status IS NULL OR prev_status != machine_status)
-                        )
-                        SELECT 
+                    # Lookup event di downtime_events (dipelihara saat ingest, lihat track_status_sample)
+                    source, params = self._events_source(start_date, end_date, component_filter, status_filter)
+                    if after:
+                        source += " AND (e.start_time, e.id) < (%s, %s)"
+                        params.extend(after)
+                    query = f"""
+                        SELECT
+                            id,
                             start_time,
                             machine_status,
-                            performance_rate,
-                            quality_rate,
+                            COALESCE(start_performance, 0),
+                            COALESCE(start_quality, 0),
                             end_time,
-                            CASE 
-                                WHEN end_time IS NOT NULL THEN 
-                                    EXTRACT(EPOCH FROM (end_time - start_time))/60 
-                                ELSE 
-                                    EXTRACT(EPOCH FROM (NOW() - start_time))/60 
-                            END as duration_minutes
-                        FROM downtime_starts
-                        WHERE CASE 
-                                WHEN end_time IS NOT NULL THEN 
-                                    EXTRACT(EPOCH FROM (end_time - start_time))/60 
-                                ELSE 
-                                    EXTRACT(EPOCH FROM (NOW() - start_time))/60 
-                            END >= 0.5
-                        ORDER BY start_time DESC
+                            duration,
+                            component,
+                            severity,
+                            event_type
+                        FROM ({source}) AS events
+                        ORDER BY start_time DESC, id DESC
                         LIMIT %s
                     """
-                    params.append(limit)
+                    # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+                    params.append(limit + 1)
                     
                     cursor.execute(query, params)
                     results = cursor.fetchall()
+                    has_more = len(results) > limit
+                    results = results[:limit]
                     
                     logger.info(f"📊 Found {len(results)} downtime periods from database")
                     
                     downtime_events = []
                     
                     for i, row in enumerate(results):
-                        start_time, machine_status, performance, quality, end_time, duration = row
-                        
-                        # Tentukan komponen berdasarkan machine status dan metrics
-                        if machine_status == 'Maintenance':
-                            component = "Maintenance"
-                        elif machine_status == 'Error':
-                            component = "System"
-                        elif machine_status == 'Stopped':
-                            component = "Operator"
-                        elif machine_status == 'Idle':
-                            component = "Material Supply"
-                        else:  # Downtime or others
-                            component = "System" if performance < 50 else "Printing"
-                        
-                        # Tentukan severity berdasarkan machine status dan durasi
-                        if machine_status == 'Error':
-                            severity = "critical" if duration >= 30 else "high"
-                        elif machine_status == 'Stopped':
-                            severity = "high" if duration >= 15 else "medium"
-                        elif machine_status == 'Maintenance':
-                            severity = "medium" if duration >= 60 else "low"
-                        elif machine_status == 'Idle':
-                            severity = "medium" if duration >= 10 else "low"
-                        else:  # Downtime
-                            if duration >= 60:  # >= 1 jam
-                                severity = "critical"
-                            elif duration >= 30:  # >= 30 menit
-                                severity = "high"
-                            elif duration >= 10:  # >= 10 menit
-                                severity = "medium"
-                            else:
-                                severity = "low"
+                        event_id, start_time, machine_status, performance, quality, end_time, duration, component, severity, event_type = row
                         
                         # Generate reason based on machine status
                         if end_time:
@@ -188,7 +320,7 @@ class DowntimeService:
                             "component": component,
                             "reason": reason,
                             "duration": round(duration, 1),
-                            "type": "reactive",
+                            "type": event_type,
                             "severity": severity,
                             "status": status,
                             "technician": "Auto-detected",
@@ -199,112 +331,222 @@ class DowntimeService:
                         
                         downtime_events.append(event)
                     
-                    # Filter berdasarkan komponen jika diminta
-                    if component_filter and component_filter.lower() != 'all':
-                        downtime_events = [
-                            event for event in downtime_events 
-                            if event['component'].lower() == component_filter.lower()
-                        ]
+                    next_page_token = None
+                    if has_more:
+                        next_page_token = encode_page_token(results[-1][1], results[-1][0], filters)
                     
                     logger.info(f"✅ Generated {len(downtime_events)} downtime events")
-                    return downtime_events
+                    return {
+                        "events": downtime_events,
+                        "next_page_token": next_page_token,
+                        "has_more": has_more
+                    }
             
         except Exception as e:
             logger.error(f"Error getting downtime history: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return {"events": [], "next_page_token": None, "has_more": False}
+    
+    def _events_source(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        component: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        Subquery downtime_events dalam rentang tanggal beserta klasifikasinya.
+        
+        Kolom tambahan: duration (event terbuka dihitung sampai sekarang),
+        severity, event_type. Event tertutup yang lebih pendek dari
+        MIN_EVENT_MINUTES tidak disertakan. Filter komponen/status dijalankan
+        di database (kolom component + index, migration 006).
+        
+        Args:
+            start_date: Filter tanggal mulai (format: YYYY-MM-DD)
+            end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+            component: Filter komponen (sudah dinormalisasi)
+            status: Filter machine_status (sudah dinormalisasi)
             
-        except Exception as e:
-            logger.error(f"Error generating downtime history: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+        Returns:
+            Tuple (subquery, params)
+        """
+        query = f"""
+            SELECT
+                e.*,
+                d.duration,
+                {EVENT_SEVERITY_SQL} AS severity,
+                {EVENT_TYPE_SQL} AS event_type
+            FROM downtime_events e
+            CROSS JOIN LATERAL (SELECT {EVENT_DURATION_SQL} AS duration) d
+            WHERE (e.end_time IS NULL OR e.duration_minutes >= {MIN_EVENT_MINUTES})
+        """
+        params: List[Any] = []
+        
+        if start_date:
+            query += " AND e.start_time >= %s"
+            params.append(start_date)
+        
+        if end_date:
+            query += " AND e.start_time <= %s"
+            params.append(end_date)
+        
+        if component:
+            query += " AND e.component = %s"
+            params.append(component)
+        
+        if status:
+            query += " AND e.machine_status = %s"
+            params.append(status)
+        
+        return query, params
+    
+    def _normalize_event_filters(
+        self,
+        component: Optional[str],
+        status: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Menormalkan filter komponen/status ke nilai yang tersimpan di database.
+        
+        Pencocokan tidak peka huruf besar/kecil; 'all' atau kosong = tanpa filter.
+        
+        Args:
+            component: Filter komponen dari request
+            status: Filter machine_status dari request
+            
+        Returns:
+            Tuple (component, status) siap dipakai sebagai parameter query
+        """
+        def normalize(value: Optional[str], known) -> Optional[str]:
+            if not value or value.strip().lower() == 'all':
+                return None
+            value = value.strip()
+            return next((k for k in known if k.lower() == value.lower()), value)
+        
+        statuses = list(self.DOWNTIME_STATUS) + ['Setup', 'Changeover', 'Downtime']
+        return normalize(component, EVENT_COMPONENTS), normalize(status, statuses)
     
     def get_downtime_statistics(
         self,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        breakdowns: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Menghitung statistik downtime.
         
+        Semua angka dihitung dalam satu query agregasi di downtime_events
+        (GROUPING SETS + FILTER): total, per tipe, per severity, per komponen,
+        dan breakdown opsional per jam (hour) atau shift.
+        
         Args:
             start_date: Filter tanggal mulai (format: YYYY-MM-DD)
             end_date: Filter tanggal akhir (format: YYYY-MM-DD)
+            breakdowns: Breakdown tambahan, subset dari STATISTICS_BREAKDOWNS
             
         Returns:
             Dict dengan statistik downtime
+            
+        Raises:
+            ValueError: Jika breakdown tidak dikenal
         """
-        try:
-            downtime_events = self.get_downtime_history(
-                limit=1000, 
-                start_date=start_date, 
-                end_date=end_date
+        breakdowns = list(dict.fromkeys(breakdowns or []))
+        unknown = [b for b in breakdowns if b not in self.STATISTICS_BREAKDOWNS]
+        if unknown:
+            raise ValueError(
+                f"Breakdown tidak dikenal: {', '.join(unknown)}. "
+                f"Pilihan: {', '.join(self.STATISTICS_BREAKDOWNS)}"
             )
+        
+        empty = {
+            "total_downtime": 0,
+            "total_duration_minutes": 0,
+            "average_duration_minutes": 0,
+            "preventive_count": 0,
+            "reactive_count": 0,
+            "by_component": {},
+            "by_severity": {
+                "low": 0,
+                "medium": 0,
+                "high": 0,
+                "critical": 0
+            }
+        }
+        for breakdown in breakdowns:
+            empty[f"by_{breakdown}"] = {}
+        
+        try:
+            source, params = self._events_source(start_date, end_date)
+            keys = ["component"] + breakdowns
+            columns = [f"event_{key}" for key in keys]
+            grouping_sets = ", ".join(["()"] + [f"({column})" for column in columns])
             
-            if not downtime_events:
-                return {
-                    "total_downtime": 0,
-                    "total_duration_minutes": 0,
-                    "average_duration_minutes": 0,
-                    "preventive_count": 0,
-                    "reactive_count": 0,
-                    "by_component": {},
-                    "by_severity": {
-                        "low": 0,
-                        "medium": 0,
-                        "high": 0,
-                        "critical": 0
-                    }
-                }
-            
-            # Hitung statistik
-            total_duration = sum(event['duration'] for event in downtime_events)
-            preventive = sum(1 for e in downtime_events if e['type'] == 'preventive')
-            reactive = sum(1 for e in downtime_events if e['type'] == 'reactive')
+            query = f"""
+                SELECT
+                    {", ".join(f"GROUPING({column})" for column in columns)},
+                    {", ".join(columns)},
+                    COUNT(*),
+                    COALESCE(SUM(duration), 0),
+                    COUNT(*) FILTER (WHERE event_type = 'preventive'),
+                    COUNT(*) FILTER (WHERE event_type = 'reactive'),
+                    COUNT(*) FILTER (WHERE severity = 'low'),
+                    COUNT(*) FILTER (WHERE severity = 'medium'),
+                    COUNT(*) FILTER (WHERE severity = 'high'),
+                    COUNT(*) FILTER (WHERE severity = 'critical')
+                FROM (
+                    SELECT
+                        *,
+                        component AS event_component,
+                        {EVENT_HOUR_SQL} AS event_hour,
+                        {EVENT_SHIFT_SQL} AS event_shift
+                    FROM ({source}) AS classified
+                ) AS events
+                GROUP BY GROUPING SETS ({grouping_sets})
+            """
             
-            # Agregasi per komponen
-            by_component = {}
-            for event in downtime_events:
-                comp = event['component']
-                if comp not in by_component:
-                    by_component[comp] = {
-                        "count": 0,
-                        "total_duration": 0
-                    }
-                by_component[comp]["count"] += 1
-                by_component[comp]["total_duration"] += event['duration']
+            with db_service.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
             
-            # Agregasi per severity
-            by_severity = {
-                "low": sum(1 for e in downtime_events if e['severity'] == 'low'),
-                "medium": sum(1 for e in downtime_events if e['severity'] == 'medium'),
-                "high": sum(1 for e in downtime_events if e['severity'] == 'high'),
-                "critical": sum(1 for e in downtime_events if e['severity'] == 'critical')
-            }
+            statistics = empty
+            n = len(keys)
+            for row in rows:
+                grouping, values = row[:n], row[n:2 * n]
+                count, total, preventive, reactive, low, medium, high, critical = row[2 * n:]
+                total = round(float(total), 1)
+                
+                # Baris grand total: semua kolom grouping di-roll up
+                if all(grouping):
+                    statistics.update({
+                        "total_downtime": count,
+                        "total_duration_minutes": total,
+                        "average_duration_minutes": round(total / count, 2) if count else 0,
+                        "preventive_count": preventive,
+                        "reactive_count": reactive,
+                        "by_severity": {
+                            "low": low,
+                            "medium": medium,
+                            "high": high,
+                            "critical": critical
+                        }
+                    })
+                    continue
+                
+                position = list(grouping).index(0)
+                statistics[f"by_{keys[position]}"][values[position]] = {
+                    "count": count,
+                    "total_duration": total
+                }
             
-            return {
-                "total_downtime": len(downtime_events),
-                "total_duration_minutes": total_duration,
-                "average_duration_minutes": round(total_duration / len(downtime_events), 2),
-                "preventive_count": preventive,
-                "reactive_count": reactive,
-                "by_component": by_component,
-                "by_severity": by_severity
-            }
+            return statistics
             
         except Exception as e:
             logger.error(f"Error calculating downtime statistics: {e}")
-            return {
-                "total_downtime": 0,
-                "total_duration_minutes": 0,
-                "average_duration_minutes": 0,
-                "preventive_count": 0,
-                "reactive_count": 0,
-                "by_component": {},
-                "by_severity": {}
-            }
+            return {**empty, "by_severity": {}}
+    
     
     def _fetch_machine_logs(
         self, 
@@ -590,6 +832,140 @@ class DowntimeService:
     #     logger.warning("Mock data generator is disabled. Only real data from machine_logs is used.")
     #     return []
     
+    def build_status_segments_query(
+        self,
+        limit: Optional[int] = 50,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        minutes_sql: str = MINUTES_BETWEEN_SQL,
+        placeholder: str = "%s",
+        min_duration: float = 1.0
+    ) -> Tuple[str, List[Any]]:
+        """
+        Menyusun query gaps-and-islands untuk segmen downtime dari machine_status.
+        
+        Setiap baris diberi nomor grup = jumlah baris 'Running' sebelumnya, sehingga
+        satu grup berisi baris non-Running berurutan ditambah baris 'Running' yang
+        menutupnya. Segmen dimulai pada baris pertama setelah 'Running' (atau, di awal
+        rentang, pada status downtime pertama) - aturan yang sama dengan
+        _walk_status_segments. Hanya satu baris per segmen yang dikembalikan.
+        
+        Args:
+            limit: Maksimal segmen (terbaru dulu); None = semua segmen
+            start_date: Filter start date
+            end_date: Filter end date
+            minutes_sql: Template selisih menit ({start}, {end}) sesuai dialect
+            placeholder: Placeholder parameter driver DB
+            min_duration: Durasi minimum (menit) segmen tertutup; backfill memakai
+                MIN_EVENT_MINUTES agar sama dengan event yang disimpan ingest
+            
+        Returns:
+            Tuple (query, params). Kolom: start_time, end_time, machine_status,
+            start_performance, start_quality, duration_minutes, samples,
+            avg_performance, min_performance, avg_quality, production, defects.
+            end_time dan duration_minutes NULL untuk segmen yang masih berjalan.
+        """
+        filters = ""
+        params: List[Any] = []
+        if start_date:
+            filters += f' AND "timestamp" >= {placeholder}'
+            params.append(start_date)
+        if end_date:
+            filters += f' AND "timestamp" <= {placeholder}'
+            params.append(end_date)
+        
+        downtime_statuses = ", ".join(f"'{s}'" for s in self.DOWNTIME_STATUS)
+        not_running = f"COALESCE(machine_status, '') <> '{RUNNING_STATUS}'"
+        duration = minutes_sql.format(start="start_time", end="end_time")
+        
+        query = f"""
+            WITH ordered AS (
+                SELECT
+                    "timestamp" AS ts,
+                    machine_status,
+                    performance_rate,
+                    quality_rate,
+                    cumulative_production,
+                    cumulative_defects,
+                    LAG(machine_status) OVER w AS prev_status,
+                    COALESCE(SUM(CASE WHEN machine_status = '{RUNNING_STATUS}' THEN 1 ELSE 0 END)
+                             OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) AS grp,
+                    SUM(CASE WHEN machine_status IN ({downtime_statuses}) THEN 1 ELSE 0 END)
+                        OVER (w ROWS UNBOUNDED PRECEDING) AS downtime_seen
+                FROM machine_logs
+                WHERE 1=1{filters}
+                WINDOW w AS (ORDER BY "timestamp")
+            ),
+            flagged AS (
+                SELECT
+                    *,
+                    CASE WHEN {not_running}
+                              AND (prev_status = '{RUNNING_STATUS}'
+                                   OR (grp = 0 AND downtime_seen = 1 AND machine_status IN ({downtime_statuses})))
+                         THEN 1 ELSE 0 END AS is_start
+                FROM ordered
+                WHERE grp > 0 OR downtime_seen > 0
+            ),
+            segments AS (
+                SELECT
+                    MIN(ts) AS start_time,
+                    MIN(ts) FILTER (WHERE machine_status = '{RUNNING_STATUS}') AS end_time,
+                    MAX(machine_status) FILTER (WHERE is_start = 1) AS start_status,
+                    MAX(performance_rate) FILTER (WHERE is_start = 1) AS start_performance,
+                    MAX(quality_rate) FILTER (WHERE is_start = 1) AS start_quality,
+                    COUNT(*) FILTER (WHERE {not_running}) AS samples,
+                    AVG(performance_rate) FILTER (WHERE {not_running}) AS avg_performance,
+                    MIN(performance_rate) FILTER (WHERE {not_running}) AS min_performance,
+                    AVG(quality_rate) FILTER (WHERE {not_running}) AS avg_quality,
+                    MAX(cumulative_production) - MIN(cumulative_production) AS production,
+                    MAX(cumulative_defects) - MIN(cumulative_defects) AS defects
+                FROM flagged
+                GROUP BY grp
+                HAVING MAX(is_start) = 1
+            )
+            SELECT
+                start_time,
+                end_time,
+                start_status,
+                start_performance,
+                start_quality,
+                {duration} AS duration_minutes,
+                samples,
+                avg_performance,
+                min_performance,
+                avg_quality,
+                production,
+                defects
+            FROM segments
+            WHERE end_time IS NULL OR {duration} >= {placeholder}
+            ORDER BY start_time DESC
+            LIMIT {placeholder}
+        """
+        params.extend([min_duration, limit])
+        return query, params
+    
+    def _walk_status_segments(self, rows: List[tuple], limit: int = 50) -> List[tuple]:
+        """
+        Implementasi referensi (Python) dari build_status_segments_query.
+        
+        Baris diumpankan ke StatusSegmentCollector (state machine yang sama dengan
+        detektor status_transition); dipakai di benchmark untuk memverifikasi bahwa
+        query menghasilkan segmen yang sama.
+        
+        Args:
+            rows: (timestamp, machine_status, performance_rate, quality_rate,
+                  cumulative_production, cumulative_defects) urut timestamp naik
+            limit: Maksimal segmen (terbaru dulu)
+            
+        Returns:
+            List segmen dengan kolom yang sama seperti hasil query
+        """
+        collector = StatusSegmentCollector(self, limit)
+        for row in rows:
+            collector.feed(row)
+        collector.finish()
+        return collector.results()
+    
     def _analyze_machine_status_downtime(
         self,
         limit: int = 50,
@@ -600,6 +976,10 @@ class DowntimeService:
         Menganalisis machine_status dari machine_logs untuk mendeteksi downtime periods.
         Metode ini akan mendeteksi kapan machine_status berubah dari 'Running' ke status lain.
         
+        Deteksi segmen, durasi, dan agregat metrik dikerjakan database dalam satu
+        query window function (lihat build_status_segments_query); hanya satu baris
+        per segmen yang dikirim ke aplikasi.
+        
         Args:
             limit: Maksimal events
             start_date: Filter start date
@@ -609,160 +989,16 @@ class DowntimeService:
             List of downtime events detected from machine_status changes
         """
         try:
-            logger.info("📊 Analyzing machine_status changes for downtime detection...")
+            query, params = self.build_status_segments_query(limit, start_date, end_date)
             
-            # Fetch machine logs dengan machine_status
             with db_service.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    query = """
-                        SELECT 
-                            timestamp,
-                            machine_status,
-                            performance_rate,
-                            quality_rate,
-                            cumulative_production,
-                            cumulative_defects
-                        FROM machine_logs
-                        WHERE 1=1
-                    """
-                    params = []
-                    
-                    if start_date:
-                        query += " AND timestamp >= %s"
-                        params.append(start_date)
-                    
-                    if end_date:
-                        query += " AND timestamp <= %s"
-                        params.append(end_date)
-                    
-                    query += " ORDER BY timestamp ASC LIMIT %s"
-                    params.append(limit * 100)  # Fetch much more data for analysis
-                    
                     cursor.execute(query, params)
-                    results = cursor.fetchall()
-                    
-                    logger.info(f"📊 Query returned {len(results) if results else 0} machine_logs records")
-                    
-                    if not results:
-                        logger.warning("❌ No machine logs found for status analysis")
-                        return []
-                    
-                    # Analyze untuk menemukan perubahan status dari 'Running' ke non-running
-                    events = []
-                    in_downtime = False
-                    downtime_start = None
-                    downtime_status = None
-                    downtime_start_metrics = None
-                    prev_status = None
-                    status_changes = 0
-                    
-                    logger.info(f"🔍 Analyzing {len(results)} records for machine_status transitions...")
-                    
-                    for i, row in enumerate(results):
-                        timestamp = row[0]
-                        current_status = row[1]
-                        performance = float(row[2] or 0)
-                        quality = float(row[3] or 0)
-                        
-                        # Track status changes
-                        if prev_status and prev_status != current_status:
-                            status_changes += 1
-                            logger.info(f"📍 Status change #{status_changes}: {prev_status} → {current_status} at {timestamp}")
-                        
-                        # Deteksi mulai downtime: status berubah dari 'Running' ke status lain
-                        if (prev_status == 'Running' and current_status != 'Running') or (
-                            current_status in self.DOWNTIME_STATUS and not in_downtime
-                        ):
-                            in_downtime = True
-                            downtime_start = timestamp
-                            downtime_status = current_status
-                            downtime_start_metrics = {
-                                'performance': performance,
-                                'quality': quality,
-                                'status': current_status
-                            }
-                            logger.info(f"🔴 Downtime started: {current_status} at {timestamp}")
-                        
-                        # Deteksi akhir downtime: status kembali ke 'Running'
-                        elif current_status == 'Running' and in_downtime:
-                            in_downtime = False
-                            downtime_end = timestamp
-                            
-                            # Calculate duration
-                            duration = self._calculate_duration(downtime_start, downtime_end)
-                            logger.info(f"🟢 Downtime ended: Back to Running at {timestamp}, duration: {duration} minutes")
-                            
-                            if duration >= 1:  # Only record downtime >= 1 minute
-                                # Determine component based on downtime status
-                                component = self._map_status_to_component(downtime_status, downtime_start_metrics)
-                                
-                                # Determine severity based on status and duration
-                                severity = self._determine_severity(duration, downtime_status)
-                                
-                                # Generate reason based on status
-                                reason = self._generate_status_based_reason(downtime_status, component, downtime_start_metrics)
-                                
-                                event = {
-                                    "id": f"DT-{int(downtime_start.timestamp() * 1000) % 100000}" if hasattr(downtime_start, 'timestamp') else f"DT-{len(events)}",
-                                    "timestamp": downtime_start.isoformat() if hasattr(downtime_start, 'isoformat') else str(downtime_start),
-                                    "end_timestamp": downtime_end.isoformat() if hasattr(downtime_end, 'isoformat') else str(downtime_end),
-                                    "component": component,
-                                    "reason": reason,
-                                    "duration": duration,
-                                    "type": "preventive" if downtime_status == 'Maintenance' else "reactive",
-                                    "severity": severity,
-                                    "status": "resolved",
-                                    "technician": "Auto-detected from machine status",
-                                    "notes": f"Machine status changed from Running to {downtime_status}. Performance: {downtime_start_metrics['performance']:.1f}%, Quality: {downtime_start_metrics['quality']:.1f}%",
-                                    "ongoing": False,
-                                    "machine_status": downtime_status
-                                }
-                                events.append(event)
-                                logger.info(f"✅ Created downtime event: {component} - {duration} min (Status: {downtime_status})")
-                            
-                            # Reset for next downtime
-                            downtime_start = None
-                            downtime_status = None
-                            downtime_start_metrics = None
-                        
-                        prev_status = current_status
-                    
-                    # Handle ongoing downtime
-                    if in_downtime and downtime_start:
-                        from datetime import datetime
-                        downtime_end = datetime.now()
-                        duration = self._calculate_duration(downtime_start, downtime_end)
-                        
-                        component = self._map_status_to_component(downtime_status, downtime_start_metrics)
-                        severity = "high" if downtime_status in ['Error', 'Stopped'] else "medium"
-                        reason = f"Ongoing {downtime_status.lower()} - requires attention"
-                        
-                        event = {
-                            "id": f"DT-ONGOING-{int(datetime.now().timestamp() % 10000)}",
-                            "timestamp": downtime_start.isoformat() if hasattr(downtime_start, 'isoformat') else str(downtime_start),
-                            "end_timestamp": downtime_end.isoformat(),
-                            "component": component,
-                            "reason": reason,
-                            "duration": duration,
-                            "type": "reactive",
-                            "severity": severity,
-                            "status": "ongoing",
-                            "technician": "Pending",
-                            "notes": f"Machine is currently in {downtime_status} status. Waiting for resolution.",
-                            "ongoing": True,
-                            "machine_status": downtime_status
-                        }
-                        events.append(event)
-                        logger.info(f"⚠️ Ongoing downtime: {component} - {duration} min (Status: {downtime_status})")
-                    
-                    # Sort by timestamp descending (newest first)
-                    events.sort(key=lambda x: x['timestamp'], reverse=True)
-                    
-                    # Limit results
-                    events = events[:limit]
-                    
-                    logger.info(f"✅ Found {status_changes} status changes, generated {len(events)} downtime events")
-                    return events
+                    segments = cursor.fetchall()
+            
+            events = [self._status_segment_event(segment) for segment in segments]
+            logger.info(f"✅ Generated {len(events)} downtime events from machine_status segments")
+            return events
                     
         except Exception as e:
             logger.error(f"Error analyzing machine status downtime: {e}")
@@ -770,6 +1006,314 @@ class DowntimeService:
             traceback.print_exc()
             return []
     
+    def _status_segment_event(self, segment: tuple) -> Dict[str, Any]:
+        """
+        Membentuk downtime event dari satu baris segmen.
+        
+        Args:
+            segment: Baris hasil build_status_segments_query / _walk_status_segments
+            
+        Returns:
+            Dict downtime event
+        """
+        (downtime_start, downtime_end, downtime_status, start_performance, start_quality,
+         duration, samples, avg_performance, min_performance, avg_quality, production, defects) = segment
+        
+        downtime_start_metrics = {
+            'performance': float(start_performance or 0),
+            'quality': float(start_quality or 0),
+            'status': downtime_status
+        }
+        segment_metrics = {
+            'samples': int(samples or 0),
+            'avg_performance': round(float(avg_performance), 2) if avg_performance is not None else None,
+            'min_performance': round(float(min_performance), 2) if min_performance is not None else None,
+            'avg_quality': round(float(avg_quality), 2) if avg_quality is not None else None,
+            'production': int(production) if production is not None else None,
+            'defects': int(defects) if defects is not None else None
+        }
+        component = self._map_status_to_component(downtime_status, downtime_start_metrics)
+        start_str = downtime_start.isoformat() if hasattr(downtime_start, 'isoformat') else str(downtime_start)
+        
+        # Segmen terakhir yang belum ditutup baris 'Running'
+        if downtime_end is None:
+            now = datetime.now(downtime_start.tzinfo) if isinstance(downtime_start, datetime) else datetime.now()
+            return {
+                "id": f"DT-ONGOING-{int(now.timestamp() % 10000)}",
+                "timestamp": start_str,
+                "end_timestamp": now.isoformat(),
+                "component": component,
+                "reason": f"Ongoing {str(downtime_status).lower()} - requires attention",
+                "duration": self._calculate_duration(downtime_start, now),
+                "type": "reactive",
+                "severity": "high" if downtime_status in ['Error', 'Stopped'] else "medium",
+                "status": "ongoing",
+                "technician": "Pending",
+                "notes": f"Machine is currently in {downtime_status} status. Waiting for resolution.",
+                "ongoing": True,
+                "machine_status": downtime_status,
+                "metrics": segment_metrics
+            }
+        
+        duration = int(duration)
+        return {
+            "id": f"DT-{int(downtime_start.timestamp() * 1000) % 100000}" if hasattr(downtime_start, 'timestamp') else f"DT-{start_str}",
+            "timestamp": start_str,
+            "end_timestamp": downtime_end.isoformat() if hasattr(downtime_end, 'isoformat') else str(downtime_end),
+            "component": component,
+            "reason": self._generate_status_based_reason(downtime_status, component, downtime_start_metrics),
+            "duration": duration,
+            "type": "preventive" if downtime_status == 'Maintenance' else "reactive",
+            "severity": self._determine_severity(duration, downtime_status),
+            "status": "resolved",
+            "technician": "Auto-detected from machine status",
+            "notes": f"Machine status changed from Running to {downtime_status}. Performance: {downtime_start_metrics['performance']:.1f}%, Quality: {downtime_start_metrics['quality']:.1f}%",
+            "ongoing": False,
+            "machine_status": downtime_status,
+            "metrics": segment_metrics
+        }
+    
+    def track_status_sample(self, cursor, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Memperbarui downtime_events untuk satu sampel machine status yang baru masuk.
+        
+        Dipanggil jalur ingest dalam transaksi yang sama dengan INSERT machine_logs.
+        Aturannya sama dengan build_status_segments_query: event dibuka saat status
+        keluar dari 'Running' (atau status downtime tanpa 'Running' sebelumnya),
+        diperbarui selama mesin belum Running, dan ditutup beserta durasinya saat
+        status kembali 'Running'. Sampel yang lebih tua dari event terbuka diabaikan.
+        
+        Args:
+            cursor: Cursor transaksi ingest
+            data: Payload machine status (timestamp, machine_status, performance_rate, ...)
+            
+        Returns:
+            'opened', 'updated', 'closed', atau None jika tidak ada perubahan
+        """
+        params = {
+            'ts': data.get('timestamp'),
+            'status': data.get('machine_status'),
+            'performance': data.get('performance_rate'),
+            'quality': data.get('quality_rate'),
+            'production': data.get('cumulative_production', 0),
+            'defects': data.get('cumulative_defects', 0)
+        }
+        
+        if params['status'] == RUNNING_STATUS:
+            cursor.execute("""
+                UPDATE downtime_events
+                SET end_time = %(ts)s,
+                    duration_minutes = EXTRACT(EPOCH FROM (%(ts)s::timestamptz - start_time)) / 60.0,
+                    production = COALESCE(%(production)s - start_production, production),
+                    defects = COALESCE(%(defects)s - start_defects, defects),
+                    updated_at = NOW()
+                WHERE end_time IS NULL AND start_time <= %(ts)s
+                RETURNING start_time, end_time, component, duration_minutes
+            """, params)
+            closed = cursor.fetchone()
+            if closed is None:
+                return None
+            start_time, end_time, component, duration = closed
+            if duration is not None and duration >= MIN_EVENT_MINUTES:
+                self._add_event_to_heatmap(cursor, start_time, end_time, component)
+            return 'closed'
+        
+        cursor.execute("""
+            UPDATE downtime_events
+            SET samples = samples + 1,
+                avg_performance = COALESCE((avg_performance * samples + %(performance)s) / (samples + 1),
+                                           avg_performance, %(performance)s),
+                min_performance = LEAST(min_performance, %(performance)s),
+                avg_quality = COALESCE((avg_quality * samples + %(quality)s) / (samples + 1),
+                                       avg_quality, %(quality)s),
+                production = COALESCE(%(production)s - start_production, production),
+                defects = COALESCE(%(defects)s - start_defects, defects),
+                updated_at = NOW()
+            WHERE end_time IS NULL AND start_time <= %(ts)s
+        """, params)
+        if cursor.rowcount:
+            return 'updated'
+        
+        downtime_statuses = ", ".join(f"'{s}'" for s in self.DOWNTIME_STATUS)
+        cursor.execute(f"""
+            INSERT INTO downtime_events (
+                start_time, machine_status, start_performance, start_quality, samples,
+                avg_performance, min_performance, avg_quality, start_production, start_defects
+            )
+            SELECT
+                %(ts)s::timestamptz, %(status)s::varchar, %(performance)s::real, %(quality)s::real, 1,
+                %(performance)s::real, %(performance)s::real, %(quality)s::real,
+                %(production)s::integer, %(defects)s::integer
+            WHERE %(status)s IN ({downtime_statuses})
+               OR (
+                   SELECT machine_status FROM machine_logs
+                   WHERE "timestamp" < %(ts)s
+                   ORDER BY "timestamp" DESC
+                   LIMIT 1
+               ) = '{RUNNING_STATUS}'
+            ON CONFLICT DO NOTHING
+        """, params)
+        return 'opened' if cursor.rowcount else None
+    
+    def _add_event_to_heatmap(self, cursor, start_time: datetime, end_time: datetime, component: str) -> None:
+        """
+        Menambahkan satu event tertutup ke cube downtime_heatmap (migration 007).
+        
+        Args:
+            cursor: Cursor transaksi ingest
+            start_time: Waktu mulai event
+            end_time: Waktu selesai event
+            component: Komponen event (kolom generated downtime_events.component)
+        """
+        for day, (minutes, counts) in split_event_hours(start_time, end_time).items():
+            cursor.execute("""
+                INSERT INTO downtime_heatmap AS h (day, component, minutes, counts)
+                VALUES (%s, %s, %s::float8[], %s::int[])
+                ON CONFLICT (day, component) DO UPDATE SET
+                    minutes = ARRAY(
+                        SELECT a + b FROM unnest(h.minutes, EXCLUDED.minutes) WITH ORDINALITY AS u(a, b, i)
+                        ORDER BY i
+                    ),
+                    counts = ARRAY(
+                        SELECT a + b FROM unnest(h.counts, EXCLUDED.counts) WITH ORDINALITY AS u(a, b, i)
+                        ORDER BY i
+                    ),
+                    updated_at = NOW()
+            """, (day, component, minutes.tolist(), counts.tolist()))
+    
+    def rebuild_downtime_heatmap(self) -> Dict[str, int]:
+        """
+        Membangun ulang cube downtime_heatmap dari seluruh event tertutup.
+        
+        Dijalankan setelah backfill_downtime_events; tabel dikunci selama rebuild
+        sehingga event yang ditutup ingest bersamaan menunggu lalu ditambahkan.
+        
+        Returns:
+            Dict jumlah event yang dimasukkan dan baris cube yang ditulis
+        """
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("LOCK TABLE downtime_heatmap IN SHARE ROW EXCLUSIVE MODE")
+                cursor.execute("""
+                    SELECT start_time, end_time, component
+                    FROM downtime_events
+                    WHERE end_time IS NOT NULL AND duration_minutes >= %s
+                """, (MIN_EVENT_MINUTES,))
+                events = cursor.fetchall()
+                cube = build_cube(events)
+                
+                cursor.execute("DELETE FROM downtime_heatmap")
+                execute_values(
+                    cursor,
+                    "INSERT INTO downtime_heatmap (day, component, minutes, counts) VALUES %s",
+                    [(day, component, minutes.tolist(), counts.tolist())
+                     for (day, component), (minutes, counts) in cube.items()],
+                    template="(%s, %s, %s::float8[], %s::int[])",
+                    page_size=1000
+                )
+            conn.commit()
+        
+        logger.info(f"✅ Rebuilt downtime heatmap: {len(events)} events -> {len(cube)} day/component rows")
+        return {"events": len(events), "rows": len(cube)}
+    
+    def get_downtime_heatmap(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        component_filter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Heatmap downtime hari-dalam-minggu × jam × komponen untuk rentang tanggal.
+        
+        Membaca baris cube downtime_heatmap (satu per hari per komponen) lalu
+        mereduksinya dengan penjumlahan vektor (lihat downtime_heatmap.reduce_heatmap).
+        Hanya event yang sudah selesai yang masuk cube.
+        
+        Args:
+            start_date: Tanggal mulai (YYYY-MM-DD, inklusif)
+            end_date: Tanggal akhir (YYYY-MM-DD, inklusif)
+            component_filter: Filter komponen (optional, default: all)
+            
+        Returns:
+            Dict heatmap (lihat reduce_heatmap)
+            
+        Raises:
+            ValueError: Jika format tanggal tidak valid atau start_date > end_date
+        """
+        component_filter, _ = self._normalize_event_filters(component_filter, None)
+        start_day = _parse_date_filter(start_date, "start_date")
+        end_day = _parse_date_filter(end_date, "end_date")
+        if start_day and end_day and start_day > end_day:
+            raise ValueError("start_date tidak boleh setelah end_date")
+        
+        query = "SELECT day, component, minutes, counts FROM downtime_heatmap WHERE 1=1"
+        params: List[Any] = []
+        if start_day:
+            query += " AND day >= %s"
+            params.append(start_day)
+        if end_day:
+            query += " AND day <= %s"
+            params.append(end_day)
+        if component_filter:
+            query += " AND component = %s"
+            params.append(component_filter)
+        
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        
+        components = [component_filter] if component_filter else EVENT_COMPONENTS
+        return reduce_heatmap(rows, components)
+    
+    def backfill_downtime_events(self) -> Dict[str, int]:
+        """
+        Membangun ulang downtime_events dari seluruh machine_logs (sekali jalan).
+        
+        Segmen dihitung di database dengan build_status_segments_query lalu
+        di-INSERT langsung (INSERT ... SELECT). Tabel dikunci selama rebuild sehingga
+        ingest yang berjalan bersamaan menunggu lalu melanjutkan dari hasil backfill.
+        
+        Returns:
+            Dict jumlah event yang ditulis dan event yang masih terbuka
+        """
+        # Ambang sama dengan ingest/pembacaan (MIN_EVENT_MINUTES), bukan 1 menit
+        query, params = self.build_status_segments_query(limit=None, min_duration=MIN_EVENT_MINUTES)
+        
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("LOCK TABLE downtime_events IN SHARE ROW EXCLUSIVE MODE")
+                cursor.execute("DELETE FROM downtime_events")
+                cursor.execute(f"""
+                    INSERT INTO downtime_events (
+                        start_time, end_time, machine_status, start_performance, start_quality,
+                        duration_minutes, samples, avg_performance, min_performance, avg_quality,
+                        production, defects
+                    )
+                    SELECT * FROM ({query}) AS segments
+                """, params)
+                events = cursor.rowcount
+                
+                # Counter awal event terbuka, agar ingest dapat melanjutkan delta produksi
+                cursor.execute("""
+                    UPDATE downtime_events
+                    SET start_production = first_log.cumulative_production,
+                        start_defects = first_log.cumulative_defects
+                    FROM (
+                        SELECT cumulative_production, cumulative_defects
+                        FROM machine_logs
+                        WHERE "timestamp" >= (SELECT start_time FROM downtime_events WHERE end_time IS NULL)
+                        ORDER BY "timestamp" ASC
+                        LIMIT 1
+                    ) AS first_log
+                    WHERE end_time IS NULL
+                """)
+                ongoing = cursor.rowcount
+            conn.commit()
+        
+        logger.info(f"✅ Backfilled {events} downtime events ({ongoing} ongoing)")
+        return {"events": events, "ongoing": ongoing}
+    
     def _map_status_to_component(self, status: str, metrics: Dict[str, Any]) -> str:
         """
         Map machine status dan metrics ke komponen yang kemungkinan bermasalah.
@@ -842,6 +1386,75 @@ class DowntimeService:
         
         return base_reason
     
+    def detect_machine_log_events(
+        self,
+        limit: int = 50,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        detectors: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Satu scan streaming machine_logs untuk semua detektor sekaligus.
+        
+        Baris dibaca lewat server-side cursor (timestamp naik), di-decode sekali,
+        lalu diumpankan ke setiap detektor (lihat log_detectors.DETECTORS):
+        status_transition, metric_drop, counter_stall.
+        
+        Args:
+            limit: Maksimal events per detektor dan pada hasil gabungan
+            start_date: Filter start date
+            end_date: Filter end date
+            detectors: Nama detektor (default semua)
+            
+        Returns:
+            Dict {events (gabungan, terbaru dulu), by_detector, rows_scanned}
+            
+        Raises:
+            ValueError: Jika nama detektor tidak dikenal
+        """
+        names = list(dict.fromkeys(detectors or DETECTORS))
+        unknown = [name for name in names if name not in DETECTORS]
+        if unknown:
+            raise ValueError(f"Detektor tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(DETECTORS)}")
+        
+        active = []
+        for name in names:
+            if name == CounterStallDetector.name:
+                active.append(CounterStallDetector(self, limit, COUNTER_STALL_MIN_MINUTES))
+            else:
+                active.append(DETECTORS[name](self, limit))
+        
+        columns = ", ".join(f'"{c}"' for c in SCAN_COLUMNS)
+        query = f"SELECT {columns} FROM machine_logs WHERE 1=1"
+        params = []
+        if start_date:
+            query += ' AND "timestamp" >= %s'
+            params.append(start_date)
+        if end_date:
+            query += ' AND "timestamp" <= %s'
+            params.append(end_date)
+        query += ' ORDER BY "timestamp" ASC'
+        
+        rows_scanned = 0
+        try:
+            with db_service.get_connection() as conn:
+                # Named cursor: baris di-stream per MACHINE_LOG_SCAN_FETCH_ROWS
+                with conn.cursor(name='machine_log_scan') as cursor:
+                    cursor.itersize = MACHINE_LOG_SCAN_FETCH_ROWS
+                    cursor.execute(query, params)
+                    rows_scanned = scan_rows(cursor, active)
+        except Exception as e:
+            logger.error(f"Error scanning machine logs: {e}")
+            return {"events": [], "by_detector": {}, "rows_scanned": 0}
+        
+        by_detector = {detector.name: detector.detected for detector in active}
+        logger.info(f"✅ Scanned {rows_scanned} machine_logs records once for {names}: {by_detector}")
+        return {
+            "events": merge_events(active, limit),
+            "by_detector": by_detector,
+            "rows_scanned": rows_scanned
+        }
+    
     def _analyze_health_drops(
         self,
         limit: int = 50,
@@ -852,6 +1465,8 @@ class DowntimeService:
         Menganalisis health drops dari machine_logs berdasarkan OEE/Performance/Quality drops.
         Deteksi ketika metrics turun drastis (indikasi downtime).
         
+        Menggunakan scan tunggal detect_machine_log_events dengan detektor metric_drop.
+        
         Args:
             limit: Maksimal events
             start_date: Filter start date
@@ -860,178 +1475,9 @@ class DowntimeService:
         Returns:
             List of downtime events detected from metric drops
         """
-        try:
-            # Fetch machine logs dengan semua metrics
-            with db_service.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    query = """
-                        SELECT 
-                            timestamp,
-                            machine_status,
-                            performance_rate,
-                            quality_rate,
-                            cumulative_production,
-                            cumulative_defects
-                        FROM machine_logs
-                        WHERE 1=1
-                    """
-                    params = []
-                    
-                    if start_date:
-                        query += " AND timestamp >= %s"
-                        params.append(start_date)
-                    
-                    if end_date:
-                        query += " AND timestamp <= %s"
-                        params.append(end_date)
-                    
-                    query += " ORDER BY timestamp ASC LIMIT %s"
-                    params.append(limit * 10)
-                    
-                    cursor.execute(query, params)
-                    results = cursor.fetchall()
-                    
-                    logger.info(f"📊 Query returned {len(results) if results else 0} machine_logs records")
-                    
-                    if not results:
-                        logger.warning("❌ No machine logs found for health analysis")
-                        logger.warning("💡 TIP: Run sensor_simulator.py to populate machine_logs table")
-                        return []
-                    
-                    # Log sample data untuk debugging
-                    if results:
-                        sample = results[0]
-                        logger.info(f"📝 Sample data: timestamp={sample[0]}, status={sample[1]}, perf={sample[2]}, qual={sample[3]}")
-                    
-                    # Analyze untuk menemukan drops (performance < 20% atau quality < 20%)
-                    events = []
-                    critical_count = 0
-                    in_downtime = False
-                    downtime_start = None
-                    downtime_start_metrics = None
-                    
-                    logger.info(f"🔍 Analyzing {len(results)} machine log records for downtime patterns...")
-                    
-                    for i, row in enumerate(results):
-                        timestamp = row[0]
-                        status = row[1]
-                        performance = float(row[2] or 0)
-                        quality = float(row[3] or 0)
-                        
-                        # Deteksi downtime: performance atau quality < 20% ATAU status bukan 'Running'
-                        is_critical = (
-                            performance < 20 or 
-                            quality < 20 or 
-                            status != 'Running' or
-                            status == 'Downtime' or
-                            status in self.DOWNTIME_STATUS
-                        )
-                        
-                        if is_critical:
-                            critical_count += 1
-                            if critical_count <= 5:  # Log first 5 critical events
-                                logger.info(f"🔴 Critical #{critical_count}: P={performance:.1f}% Q={quality:.1f}% Status={status} at {timestamp}")
-                        
-                        if is_critical and not in_downtime:
-                            # Start downtime
-                            in_downtime = True
-                            downtime_start = timestamp
-                            downtime_start_metrics = {
-                                'performance': performance,
-                                'quality': quality,
-                                'status': status
-                            }
-                            logger.info(f"🟡 Downtime started at {timestamp}")
-                        
-                        elif not is_critical and in_downtime:
-                            # End downtime
-                            in_downtime = False
-                            downtime_end = timestamp
-                            
-                            # Calculate duration
-                            duration = self._calculate_duration(downtime_start, downtime_end)
-                            logger.info(f"🟢 Downtime ended at {timestamp}, duration: {duration} minutes")
-                            
-                            if duration >= 0:  # Record all events for now (including 0-minute events)
-                                # Determine component based on which metric dropped
-                                if downtime_start_metrics['quality'] < 20:
-                                    component = 'Printing'
-                                elif downtime_start_metrics['performance'] < 30:
-                                    component = 'Feeder'
-                                elif downtime_start_metrics['performance'] < 50:
-                                    component = 'Pre-Feeder'
-                                else:
-                                    components = ['Slotter', 'Stacker']
-                                    import random
-                                    component = random.choice(components)
-                                
-                                # Determine severity
-                                severity = self._determine_severity(duration, downtime_start_metrics['status'])
-                                
-                                # Format duration for display (convert 0-minute events to show seconds)
-                                if duration == 0:
-                                    # Calculate seconds for very short downtime
-                                    if hasattr(downtime_start, 'timestamp') and hasattr(downtime_end, 'timestamp'):
-                                        duration_seconds = int((downtime_end.timestamp() - downtime_start.timestamp()))
-                                        duration_display = max(duration_seconds, 1)  # Minimum 1 minute for display
-                                    else:
-                                        duration_display = 1
-                                else:
-                                    duration_display = duration
-                                
-                                event = {
-                                    "id": f"DT-{int(downtime_start.timestamp() * 1000) % 100000}" if hasattr(downtime_start, 'timestamp') else f"DT-{len(events)}",
-                                    "timestamp": downtime_start.isoformat() if hasattr(downtime_start, 'isoformat') else str(downtime_start),
-                                    "end_timestamp": downtime_end.isoformat() if hasattr(downtime_end, 'isoformat') else str(downtime_end),
-                                    "component": component,
-                                    "reason": f"{component} downtime detected - Status: {downtime_start_metrics['status']} (P:{downtime_start_metrics['performance']:.1f}% Q:{downtime_start_metrics['quality']:.1f}%)",
-                                    "duration": duration_display,
-                                    "type": "preventive" if downtime_start_metrics['status'] == 'Maintenance' else "reactive",
-                                    "severity": severity,
-                                    "status": "resolved",
-                                    "technician": "System Auto-detected",
-                                    "notes": f"Detected from machine logs. Performance: {downtime_start_metrics['performance']:.1f}%, Quality: {downtime_start_metrics['quality']:.1f}%, Status: {downtime_start_metrics['status']}",
-                                    "ongoing": False
-                                }
-                                events.append(event)
-                                logger.info(f"✅ Created downtime event: {component} - {duration_display} min")
-                    
-                    # Handle ongoing downtime
-                    if in_downtime and downtime_start:
-                        from datetime import datetime
-                        downtime_end = datetime.now()
-                        duration = self._calculate_duration(downtime_start, downtime_end)
-                        
-                        event = {
-                            "id": f"DT-ONGOING",
-                            "timestamp": downtime_start.isoformat() if hasattr(downtime_start, 'isoformat') else str(downtime_start),
-                            "end_timestamp": downtime_end.isoformat(),
-                            "component": "Multiple",
-                            "reason": "Ongoing downtime - system still degraded",
-                            "duration": duration,
-                            "type": "reactive",
-                            "severity": "high",
-                            "status": "ongoing",
-                            "technician": "Pending",
-                            "notes": "Downtime is currently ongoing. Waiting for resolution.",
-                            "ongoing": True
-                        }
-                        events.append(event)
-                    
-                    # Sort by timestamp descending
-                    events.sort(key=lambda x: x['timestamp'], reverse=True)
-                    
-                    # Limit results
-                    events = events[:limit]
-                    
-                    logger.info(f"✅ Found {critical_count} critical records, generated {len(events)} downtime events from health/metric analysis")
-                    return events
-                    
-        except Exception as e:
-            logger.error(f"Error analyzing health drops: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+        return self.detect_machine_log_events(
+            limit, start_date, end_date, detectors=['metric_drop']
+        )["events"]
 
 
 # Global downtime service instance
@@ -8,12 +8,16 @@ Memperbaiki hasil prediksi yang terlalu singkat dengan:
 4. Realistic range validation
 """
 
-import joblib
+import time
 import numpy as np
-import pandas as pd
-from pathlib import Path
 from typing import Dict, Any, List, Optional
+from config import PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_MAX_ENTRIES
 from src.utils.logger import get_logger
+from src.utils.single_flight import SingleFlight, freeze_key
+from src.services.feature_encoder import ReasonColumnIndex, SEVERITY_COLUMN, NONE_SHIFT_COLUMN, predict_rows
+from src.services.model_registry import model_registry, ModelBundle
+from src.services.reason_matcher import CATEGORY_ADJUSTMENTS, reason_matcher
+from src.services.prediction_log_service import prediction_log_service
 
 logger = get_logger(__name__)
 
@@ -43,54 +47,77 @@ SHIFT_MULTIPLIERS = {
     '_NONE_': 1.2  # Unknown shift - assume rata-rata
 }
 
-# Adjustment berdasarkan kategori masalah
-CATEGORY_ADJUSTMENTS = {
-    # Printing issues - kompleks karena melibatkan warna, register, dll
-    'printing': {
-        'base_multiplier': 1.4,
-        'keywords': ['PRINTING', 'PRINT', 'TINTA', 'WARNA', 'REGISTER', 'ANILOX']
-    },
-    
-    # Mechanical issues - butuh spare part dan skill tinggi  
-    'mechanical': {
-        'base_multiplier': 1.6,
-        'keywords': ['MEKANIK', 'BEARING', 'GEAR', 'PECAH', 'AUS', 'PNEUMATIC']
-    },
-    
-    # Electrical issues - troubleshooting kompleks
-    'electrical': {
-        'base_multiplier': 1.5,
-        'keywords': ['ELEKTRIK', 'LISTRIK', 'SENSOR', 'WIRING', 'MOTOR']
-    },
-    
-    # Feeder issues - kritis untuk kontinuitas produksi
-    'feeder': {
-        'base_multiplier': 1.3,
-        'keywords': ['FEEDER', 'VACUUM', 'BELT', 'CONVEYOR', 'FEEDING']
-    },
-    
-    # Quality issues - butuh fine tuning
-    'quality': {
-        'base_multiplier': 1.2,
-        'keywords': ['BLUR', 'BOTAK', 'LARI', 'MIRING', 'CACAT', 'REJECT']
-    }
-}
-
 # Range validasi realistis (dalam menit)
 MIN_REALISTIC_DURATION = 10   # Minimum 10 menit
 MAX_REALISTIC_DURATION = 960  # Maximum 16 jam (1 shift penuh)
 
+# Single-flight untuk polling dashboard: input (reason, shift, health) identik yang
+# bersamaan berbagi satu prediksi; hanya hasil sukses di-cache
+enhanced_prediction_coalescer = SingleFlight(
+    "enhanced_prediction_service", PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_MAX_ENTRIES,
+    cacheable=lambda result: result.get('success', False)
+)
+
+class FeatureLayout:
+    """
+    Posisi kolom fitur satu versi model (dibangun sekali per versi lewat warmer registry).
+    
+    Menggantikan pembuatan DataFrame dan scan substring semua kolom per request:
+    encoding cukup menyalin template baris nol dan mengisi kolom dari lookup dict.
+    """
+    
+    def __init__(self, feature_names: List[str]):
+        """
+        Args:
+            feature_names: Urutan fitur sesuai model
+        """
+        self.feature_names = list(feature_names)
+        self.column_index: Dict[str, int] = {name: i for i, name in enumerate(self.feature_names)}
+        self.template = np.zeros(len(self.feature_names), dtype=np.float64)
+        self.reason_index = ReasonColumnIndex(self.feature_names)
+        self.severity_idx = self.column_index.get(SEVERITY_COLUMN)
+        self.none_shift_idx = self.column_index.get(NONE_SHIFT_COLUMN)
+
+
 class EnhancedPredictionService:
     """Enhanced prediction service dengan realistic baseline dan adjustments"""
     
+    # Slot registry: model_improved.pkl, fallback ke model.pkl
+    MODEL_SLOT = "improved"
+    
     def __init__(self):
         """Initialize enhanced prediction service"""
-        self.model = None
-        self.feature_names = None
-        self.model_loaded = False
         self.historical_stats = self._load_historical_stats()
-        self._load_model()
-        self._load_feature_names()
+        # Layout fitur dibangun sebelum versi model dipublikasikan
+        model_registry.register_warmer(self.MODEL_SLOT, "enhanced_prediction_service", self._build_feature_layout)
+        bundle = model_registry.get(self.MODEL_SLOT)
+        if bundle is not None:
+            logger.info(f"✅ Using model {bundle.version} from: {bundle.model_path}")
+        else:
+            logger.error("❌ Model tidak tersedia, prediksi memakai enhanced baseline")
+    
+    @property
+    def model(self):
+        bundle = model_registry.get(self.MODEL_SLOT)
+        return bundle.model if bundle is not None else None
+    
+    @property
+    def feature_names(self) -> Optional[List[str]]:
+        bundle = model_registry.get(self.MODEL_SLOT)
+        return bundle.feature_names if bundle is not None else None
+    
+    @property
+    def model_loaded(self) -> bool:
+        return model_registry.get(self.MODEL_SLOT) is not None
+    
+    def _build_feature_layout(self, bundle: ModelBundle) -> Optional[FeatureLayout]:
+        """Warmer registry: layout fitur + inverted index reason untuk satu versi model."""
+        if bundle.feature_names is None:
+            return None
+        layout = FeatureLayout(bundle.feature_names)
+        logger.info(f"Reason column index built: {len(layout.reason_index.index)} keys, "
+                    f"{layout.reason_index.n_columns} columns")
+        return layout
     
     def _load_historical_stats(self) -> Dict[str, float]:
         """
@@ -107,74 +134,6 @@ class EnhancedPredictionService:
         logger.info(f"Historical stats loaded for baseline calibration")
         return stats
     
-    def _get_model_path(self) -> Path:
-        """Get path to model file"""
-        current_dir = Path(__file__).resolve().parent
-        backend_dir = current_dir.parent.parent
-        
-        # Coba model improved dulu, fallback ke model biasa
-        improved_path = backend_dir.parent / "Model" / "model_improved.pkl"
-        if improved_path.exists():
-            logger.info(f"Using improved model: {improved_path}")
-            return improved_path
-        
-        standard_path = backend_dir.parent / "Model" / "model.pkl"
-        logger.info(f"Using standard model: {standard_path}")
-        return standard_path
-    
-    def _get_feature_names_path(self) -> Path:
-        """Get path to feature names file"""
-        current_dir = Path(__file__).resolve().parent
-        backend_dir = current_dir.parent.parent
-        
-        # Coba feature names improved dulu
-        improved_path = backend_dir.parent / "Model" / "feature_names_improved.pkl"
-        if improved_path.exists():
-            return improved_path
-        
-        return backend_dir.parent / "Model" / "feature_names.pkl"
-    
-    def _load_model(self) -> None:
-        """Load model dengan enhanced error handling"""
-        try:
-            model_path = self._get_model_path()
-            logger.info(f"Loading model from: {model_path}")
-            
-            if not model_path.exists():
-                raise FileNotFoundError(f"Model file tidak ditemukan: {model_path}")
-            
-            self.model = joblib.load(model_path)
-            self.model_loaded = True
-            
-            logger.info(f"✅ Model loaded successfully!")
-            logger.info(f"   Model type: {type(self.model).__name__}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to load model: {e}")
-            self.model = None
-            self.model_loaded = False
-    
-    def _load_feature_names(self) -> None:
-        """Load feature names dengan enhanced error handling"""
-        try:
-            feature_names_path = self._get_feature_names_path()
-            logger.info(f"Loading feature names from: {feature_names_path}")
-            
-            if not feature_names_path.exists():
-                logger.warning(f"⚠ Feature names file tidak ditemukan: {feature_names_path}")
-                logger.warning("  Model akan menggunakan mode fallback")
-                self.feature_names = None
-                return
-            
-            self.feature_names = joblib.load(feature_names_path)
-            
-            logger.info(f"✅ Feature names loaded successfully!")
-            logger.info(f"   Total features: {len(self.feature_names)}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to load feature names: {e}")
-            self.feature_names = None
-    
     def _calculate_enhanced_baseline(self, real_time_data: Dict[str, Any]) -> float:
         """
         Kalkulasi baseline prediksi yang lebih realistis berdasarkan:
@@ -193,8 +152,11 @@ class EnhancedPredictionService:
         reason = str(real_time_data.get('reason', '')).upper()
         shift = real_time_data.get('shift', '_NONE_')
         
+        # Severity heuristik dan kategori dari satu scan automaton
+        match = reason_matcher.match(reason)
+        
         # 1. Hitung FMEA Severity untuk baseline
-        severity = self._get_fmea_severity_from_reason(reason)
+        severity = match.pattern_severity
         base_duration = MAINTENANCE_BASELINE.get(severity, 120)  # Default 2 jam
         
         logger.info(f"🎯 Enhanced baseline calculation:")
@@ -203,15 +165,8 @@ class EnhancedPredictionService:
         logger.info(f"   Base duration: {base_duration} menit")
         
         # 2. Aplikasikan multiplier berdasarkan kategori masalah
-        category_multiplier = 1.0
-        matched_category = None
-        
-        for category, config in CATEGORY_ADJUSTMENTS.items():
-            keywords = config['keywords']
-            if any(keyword in reason for keyword in keywords):
-                category_multiplier = config['base_multiplier']
-                matched_category = category
-                break
+        matched_category = match.category
+        category_multiplier = CATEGORY_ADJUSTMENTS[matched_category]['base_multiplier'] if matched_category else 1.0
         
         if matched_category:
             logger.info(f"   Kategori: {matched_category} (×{category_multiplier})")
@@ -296,27 +251,8 @@ class EnhancedPredictionService:
         Mapping reason ke FMEA severity
         Simplified version dari mapping di train_model.py
         """
-        # Simplified FMEA mapping untuk prediksi real-time
-        severity_patterns = {
-            10: ['EXPLOSION', 'FIRE', 'SAFETY'],
-            9: ['PECAH', 'CRACK', 'BROKEN', 'TOTAL_FAILURE', 'REGISTER_GESER'],
-            8: ['ELEKTRIK', 'ELECTRICAL', 'MEKANIK', 'MECHANICAL', 'SENSOR_ERROR'],
-            7: ['PRINTING', 'QUALITY', 'DEFECT', 'LARI', 'MIRING'],
-            6: ['FEEDER', 'VACUUM', 'CONVEYOR', 'FEEDING'],
-            5: ['ADJUSTMENT', 'SETTING', 'CLEANING'],
-            4: ['MINOR_REPAIR', 'OPERATOR_REPAIR'],
-            3: ['SETUP', 'CHANGEOVER', 'MOUNTING'],
-            2: ['BREAK', 'ISTIRAHAT', 'SCHEDULED'],
-            1: ['MEETING', 'BRIEFING', 'PRAYER']
-        }
-        
-        reason_upper = reason.upper()
-        
-        for severity, patterns in severity_patterns.items():
-            if any(pattern in reason_upper for pattern in patterns):
-                return severity
-        
-        return 5  # Default medium severity
+        # Simplified FMEA mapping untuk prediksi real-time (SEVERITY_PATTERNS)
+        return reason_matcher.match(reason).pattern_severity
     
     def _apply_post_processing_adjustment(self, 
                                         raw_prediction: float, 
@@ -374,7 +310,7 @@ class EnhancedPredictionService:
         else:
             return f"{remaining_minutes} menit"
     
-    def predict_downtime_enhanced(self, real_time_data: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_downtime_enhanced(self, real_time_data: Dict[str, Any], source: str = "api") -> Dict[str, Any]:
         """
         Enhanced prediction dengan multi-tier approach:
         1. Kalkulasi enhanced baseline
@@ -382,12 +318,30 @@ class EnhancedPredictionService:
         3. Post-processing adjustment
         4. Validation & formatting
         
+        Request identik yang bersamaan berbagi satu komputasi (single-flight),
+        hasilnya di-cache selama PREDICTION_CACHE_TTL_SECONDS. Setiap prediksi
+        yang dilayani dicatat ke prediction_log (asinkron).
+        
         Args:
             real_time_data: Data real-time sensor
+            source: Pemicu prediksi untuk audit log (api, health_auto_trigger, ...)
             
         Returns:
             Enhanced prediction result
         """
+        started = time.perf_counter()
+        # Snapshot bundle sekali agar hot reload tidak mengubah model di tengah prediksi
+        bundle = model_registry.get(self.MODEL_SLOT)
+        input_key = freeze_key(real_time_data)
+        key = (bundle.content_hash if bundle is not None else None, input_key) if input_key is not None else None
+        result = enhanced_prediction_coalescer.do(key, lambda: self._predict_enhanced(real_time_data, bundle))
+        prediction_log_service.record(
+            source, self.MODEL_SLOT, bundle, real_time_data, result, (time.perf_counter() - started) * 1000
+        )
+        return result
+    
+    def _predict_enhanced(self, real_time_data: Dict[str, Any], bundle: Optional[ModelBundle]) -> Dict[str, Any]:
+        """Enhanced prediction tanpa coalescing dengan bundle model yang sudah di-snapshot."""
         try:
             logger.info(f"🚀 Starting enhanced prediction...")
             logger.info(f"   Input: {real_time_data}")
@@ -397,15 +351,16 @@ class EnhancedPredictionService:
             
             # Step 2: ML Model prediction (jika tersedia)
             ml_prediction = None
-            if self.model_loaded and self.model is not None:
+            if bundle is not None:
                 try:
-                    if self.feature_names is not None:
+                    layout = bundle.artifacts.get("enhanced_prediction_service")
+                    if layout is not None:
                         # Advanced mode dengan feature engineering
-                        feature_df = self._prepare_feature_array(real_time_data)
-                        ml_prediction = float(self.model.predict(feature_df)[0])
+                        features = self._prepare_feature_array(real_time_data, layout)
+                        ml_prediction = float(predict_rows(bundle.model, features)[0])
                     else:
                         # Simple mode fallback
-                        ml_prediction = self._predict_simple_mode_value(real_time_data)
+                        ml_prediction = self._predict_simple_mode_value(real_time_data, bundle.model)
                     
                     # Jika model menggunakan log transform, inverse transform
                     if ml_prediction < 10:  # Likely in log space
@@ -445,8 +400,9 @@ class EnhancedPredictionService:
                     'enhanced_baseline': round(enhanced_baseline, 1),
                     'ml_prediction': round(ml_prediction, 1) if ml_prediction else None,
                     'adjustment_applied': ml_prediction is not None,
-                    'model_available': self.model_loaded,
-                    'feature_engineering': self.feature_names is not None,
+                    'model_available': bundle is not None,
+                    'model_version': bundle.version if bundle is not None else None,
+                    'feature_engineering': bundle is not None and bundle.feature_names is not None,
                     'prediction_range': f"{MIN_REALISTIC_DURATION}-{MAX_REALISTIC_DURATION} menit",
                     'confidence_level': 'High' if ml_prediction else 'Medium'
                 }
@@ -466,13 +422,13 @@ class EnhancedPredictionService:
                 'error_type': 'EnhancedPredictionError'
             }
     
-    def predict_downtime(self, real_time_data: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_downtime(self, real_time_data: Dict[str, Any], source: str = "api") -> Dict[str, Any]:
         """
         Alias untuk predict_downtime_enhanced untuk kompatibilitas dengan health_service
         """
-        return self.predict_downtime_enhanced(real_time_data)
+        return self.predict_downtime_enhanced(real_time_data, source)
     
-    def _predict_simple_mode_value(self, real_time_data: Dict[str, Any]) -> float:
+    def _predict_simple_mode_value(self, real_time_data: Dict[str, Any], model: Any) -> float:
         """Simple mode prediction untuk fallback"""
         try:
             production = float(real_time_data.get('production', 0))
@@ -480,7 +436,7 @@ class EnhancedPredictionService:
             
             # Model expects: [total_produksi, produk_cacat]
             X = np.array([[production, defects]])
-            prediction = self.model.predict(X)
+            prediction = model.predict(X)
             
             return float(prediction[0])
             
@@ -488,40 +444,38 @@ class EnhancedPredictionService:
             logger.error(f"Simple mode prediction error: {e}")
             return 120.0  # Default 2 jam
     
-    def _prepare_feature_array(self, real_time_data: Dict[str, Any]) -> pd.DataFrame:
+    def _prepare_feature_array(self, real_time_data: Dict[str, Any], layout: FeatureLayout) -> np.ndarray:
         """
         Prepare feature array untuk advanced model
-        Simplified version dari prediction_service.py
+        
+        Args:
+            real_time_data: Data input (reason, shift)
+            layout: Layout fitur versi model yang dipakai
+            
+        Returns:
+            numpy array (1, n_features) dengan urutan kolom model
         """
-        # Create DataFrame dengan semua fitur (inisialisasi ke 0)
-        df = pd.DataFrame(0, index=[0], columns=self.feature_names)
+        row = layout.template.copy()
         
         # Set FMEA_Severity
         reason = real_time_data.get('reason', '')
         severity = self._get_fmea_severity_from_reason(reason)
-        if 'FMEA_Severity' in df.columns:
-            df['FMEA_Severity'] = severity
+        if layout.severity_idx is not None:
+            row[layout.severity_idx] = severity
         
-        # Set kategorikal features (simplified)
+        # Set kategorikal features: nama sensor diterjemahkan, lalu lookup inverted index
         if reason:
-            # Cari matching columns
-            for col in df.columns:
-                if col.startswith('Scrab Description_') and reason.upper() in col:
-                    df[col] = 1
-                    break
-                elif col.startswith('Break Time Description_') and reason.upper() in col:
-                    df[col] = 1
-                    break
+            idx = layout.reason_index.lookup(reason_matcher.match(reason).mapped_reason)
+            if idx is not None:
+                row[idx] = 1
         
         # Set shift
         shift = str(real_time_data.get('shift', '_NONE_'))
-        shift_col = f'Shift_{shift}'
-        if shift_col in df.columns:
-            df[shift_col] = 1
-        elif 'Shift__NONE_' in df.columns:
-            df['Shift__NONE_'] = 1
+        idx = layout.column_index.get(f'Shift_{shift}', layout.none_shift_idx)
+        if idx is not None:
+            row[idx] = 1
         
-        return df
+        return row.reshape(1, -1)
 
 # Global instance
 _enhanced_service = None
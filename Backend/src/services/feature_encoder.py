@@ -0,0 +1,336 @@
+"""
+Feature Encoder
+Encoder fitur pra-indeks (nama fitur -> indeks kolom) untuk inference cepat tanpa DataFrame
+"""
+
+import re
+import warnings
+import numpy as np
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Peringatan sklearn untuk input ndarray pada model yang dilatih dengan DataFrame
+FEATURE_NAMES_WARNING = "X does not have valid feature names"
+
+REASON_PREFIXES = ("Scrab Description_", "Break Time Description_")
+NONE_REASON_COLUMNS = ("Scrab Description__NONE_", "Break Time Description__NONE_")
+NONE_SHIFT_COLUMN = "Shift__NONE_"
+SEVERITY_COLUMN = "FMEA_Severity"
+
+# Token reason: huruf/angka saja (spasi, tanda baca, underscore menjadi pemisah)
+REASON_TOKEN_PATTERN = re.compile(r"[A-Z0-9]+")
+
+# Batas entri cache resolusi (input reason bebas dari client tidak boleh menumpuk tanpa batas)
+MAX_CACHE_ENTRIES = 4096
+
+
+def predict_rows(model: Any, rows: np.ndarray) -> np.ndarray:
+    """
+    model.predict untuk matriks fitur tanpa nama kolom.
+
+    Model dilatih dengan DataFrame; kolom matriks encoder sudah dijamin mengikuti
+    urutan feature_names, sehingga peringatan nama fitur sklearn diredam hanya
+    selama panggilan ini (filter warning proses tidak diubah).
+
+    Args:
+        model: Model dengan method predict (sklearn atau FlatForest)
+        rows: Matriks fitur (n_rows, n_features)
+
+    Returns:
+        Array prediksi
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message=FEATURE_NAMES_WARNING, category=UserWarning)
+        return model.predict(rows)
+
+
+class FeatureEncoder:
+    """
+    Encoder one-hot untuk model "Murni Fishbone + Shift".
+
+    Dibangun sekali saat model dimuat: dict nama fitur -> indeks kolom dan
+    template baris nol. Setiap request hanya menyalin template dan mengisi
+    beberapa sel, tanpa konstruksi DataFrame atau scan kolom.
+    """
+
+    def __init__(
+        self,
+        feature_names: List[str],
+        resolve_reason: Callable[[str], Tuple[str, int]],
+        default_severity: int
+    ):
+        """
+        Args:
+            feature_names: Urutan fitur sesuai model
+            resolve_reason: Fungsi reason (uppercase) -> (reason training, severity)
+            default_severity: Severity jika reason kosong
+        """
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.feature_names)}
+        self.template = np.zeros(self.n_features, dtype=np.float64)
+
+        self._resolve_reason = resolve_reason
+        self._default_severity = default_severity
+        self._none_reason_idx = tuple(self.index[c] for c in NONE_REASON_COLUMNS if c in self.index)
+        self._none_shift_idx = (self.index[NONE_SHIFT_COLUMN],) if NONE_SHIFT_COLUMN in self.index else ()
+        self._severity_idx = self.index.get(SEVERITY_COLUMN)
+
+        # Cache hasil resolusi per nilai mentah (ruang reason/shift kecil dan terbatas)
+        self._reason_cache: Dict[str, Tuple[Tuple[int, ...], int, str]] = {}
+        self._shift_cache: Dict[str, Tuple[int, ...]] = {}
+
+        if self._severity_idx is None:
+            logger.warning("FMEA_Severity column not found in feature names. Model might be old version.")
+
+    def _encode_reason(self, raw_reason: Any) -> Tuple[Tuple[int, ...], int, str]:
+        """
+        Resolusi reason ke indeks kolom one-hot dan severity.
+
+        Returns:
+            Tuple (indeks kolom, severity, reason terjemahan)
+        """
+        key = str(raw_reason or '').strip().upper()
+        cached = self._reason_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if not key:
+            encoded = (self._none_reason_idx, self._default_severity, '')
+        else:
+            mapped_reason, severity = self._resolve_reason(key)
+            idx = None
+            for prefix in REASON_PREFIXES:
+                idx = self.index.get(prefix + mapped_reason)
+                if idx is not None:
+                    break
+            if idx is None:
+                logger.warning(f"Reason '{mapped_reason}' tidak ditemukan di training data, using _NONE_")
+                encoded = (self._none_reason_idx, severity, mapped_reason)
+            else:
+                encoded = ((idx,), severity, mapped_reason)
+
+        if len(self._reason_cache) >= MAX_CACHE_ENTRIES:
+            self._reason_cache.clear()
+        self._reason_cache[key] = encoded
+        return encoded
+
+    def _encode_shift(self, raw_shift: Any) -> Tuple[int, ...]:
+        """Resolusi shift (1/2/3, "1", 1.0) ke indeks kolom one-hot."""
+        key = str(raw_shift).strip()
+        cached = self._shift_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if not key or key == '_NONE_':
+            encoded = self._none_shift_idx
+        else:
+            try:
+                shift = f"{float(key):.1f}"
+            except ValueError:
+                shift = key
+            idx = self.index.get(f"Shift_{shift}")
+            if idx is None:
+                logger.warning(f"Shift '{shift}' tidak ditemukan di training data, using _NONE_")
+                encoded = self._none_shift_idx
+            else:
+                encoded = (idx,)
+
+        if len(self._shift_cache) >= MAX_CACHE_ENTRIES:
+            self._shift_cache.clear()
+        self._shift_cache[key] = encoded
+        return encoded
+
+    def _cells(self, data: Dict[str, Any]) -> Tuple[Tuple[int, ...], int]:
+        """Indeks kolom bernilai 1 dan severity untuk satu input."""
+        reason_idx, severity, _ = self._encode_reason(data.get('reason', ''))
+        shift_idx = self._encode_shift(data.get('shift', '_NONE_'))
+        return reason_idx + shift_idx, severity
+
+    def encode_key(self, data: Dict[str, Any]) -> Tuple[Tuple[int, ...], int]:
+        """
+        Key hashable yang menentukan baris fitur secara unik (sel one-hot, severity).
+
+        Args:
+            data: Dictionary dengan keys reason dan shift
+
+        Returns:
+            Tuple (indeks kolom bernilai 1, severity)
+        """
+        return self._cells(data)
+
+    def rows_from_keys(self, keys: List[Tuple[Tuple[int, ...], int]]) -> np.ndarray:
+        """
+        Membangun matriks fitur dari daftar key encode_key.
+
+        Args:
+            keys: List key (sel one-hot, severity)
+
+        Returns:
+            numpy array (len(keys), n_features)
+        """
+        X = np.zeros((len(keys), self.n_features), dtype=np.float64)
+        for i, (cells, severity) in enumerate(keys):
+            X[i, list(cells)] = 1.0
+            if self._severity_idx is not None:
+                X[i, self._severity_idx] = severity
+        return X
+
+    def enumerate_keys(self, severities: List[int]) -> List[Tuple[Tuple[int, ...], int]]:
+        """
+        Enumerasi seluruh ruang input yang dapat dihasilkan encoder.
+
+        Ruang input = (reason yang dikenal, atau _NONE_ dengan severity apa pun) × shift.
+
+        Args:
+            severities: Semua nilai severity yang mungkin untuk reason tidak dikenal
+
+        Returns:
+            List key unik (sel one-hot, severity)
+        """
+        reason_options = []
+        for name in self.feature_names:
+            for prefix in REASON_PREFIXES:
+                if name.startswith(prefix):
+                    _, severity = self._resolve_reason(name[len(prefix):])
+                    reason_options.append(((self.index[name],), severity))
+                    break
+        reason_options += [(self._none_reason_idx, severity) for severity in sorted(set(severities))]
+
+        shift_options = [(i,) for name, i in self.index.items() if name.startswith("Shift_") and name != NONE_SHIFT_COLUMN]
+        shift_options.append(self._none_shift_idx)
+
+        keys = []
+        seen = set()
+        for reason_cells, severity in reason_options:
+            for shift_cells in shift_options:
+                key = (reason_cells + shift_cells, severity)
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+        return keys
+
+    def describe(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ringkasan hasil encoding untuk satu input (untuk logging/debug).
+
+        Returns:
+            Dictionary berisi reason terjemahan, severity, dan fitur aktif
+        """
+        reason_idx, severity, mapped_reason = self._encode_reason(data.get('reason', ''))
+        shift_idx = self._encode_shift(data.get('shift', '_NONE_'))
+        return {
+            "mapped_reason": mapped_reason,
+            "fmea_severity": severity,
+            "active_features": [self.feature_names[i] for i in reason_idx + shift_idx]
+        }
+
+    def encode(self, data: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode satu input menjadi baris fitur 1-D.
+
+        Args:
+            data: Dictionary dengan keys reason dan shift
+            out: Buffer tujuan opsional (panjang n_features)
+
+        Returns:
+            numpy array 1-D sepanjang n_features
+        """
+        if out is None:
+            row = self.template.copy()
+        else:
+            row = out
+            row[:] = self.template
+        cells, severity = self._cells(data)
+        row[list(cells)] = 1.0
+        if self._severity_idx is not None:
+            row[self._severity_idx] = severity
+        return row
+
+    def encode_batch(self, data_list: List[Dict[str, Any]], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode banyak input sekaligus menjadi matriks 2-D.
+
+        Args:
+            data_list: List dictionary input
+            out: Buffer tujuan opsional (mis. di shared memory), di-reset lalu diisi
+
+        Returns:
+            numpy array (len(data_list), n_features)
+        """
+        n = len(data_list)
+        if out is None:
+            X = np.zeros((n, self.n_features), dtype=np.float64)
+        else:
+            X = out
+            X[:] = 0.0
+        rows: List[int] = []
+        cols: List[int] = []
+        severities = np.empty(n, dtype=np.float64)
+
+        for i, data in enumerate(data_list):
+            cells, severity = self._cells(data)
+            rows.extend([i] * len(cells))
+            cols.extend(cells)
+            severities[i] = severity
+
+        X[rows, cols] = 1.0
+        if self._severity_idx is not None:
+            X[:, self._severity_idx] = severities
+        return X
+
+
+class ReasonColumnIndex:
+    """
+    Inverted index reason -> posisi kolom one-hot reason.
+
+    Kunci index adalah deskripsi reason ternormalisasi (token huruf/angka dipisah
+    satu spasi) beserta setiap rangkaian token berurutan di dalamnya, sehingga
+    reason parsial seperti "LARI" tetap menemukan kolom. Satu kunci yang cocok ke
+    beberapa kolom diselesaikan sekali saat build dengan ranking tetap:
+    1. Deskripsi lengkap sebelum potongan token
+    2. Deskripsi dengan token paling sedikit (paling spesifik)
+    3. Urutan kolom model (Scrab Description sebelum Break Time Description)
+    """
+
+    def __init__(self, feature_names: List[str], prefixes: Tuple[str, ...] = REASON_PREFIXES):
+        """
+        Args:
+            feature_names: Urutan fitur sesuai model
+            prefixes: Prefix kolom one-hot reason
+        """
+        ranks: Dict[str, Tuple[int, int, int]] = {}
+        for position, name in enumerate(feature_names):
+            prefix = next((p for p in prefixes if name.startswith(p)), None)
+            if prefix is None:
+                continue
+            tokens = self.tokenize(name[len(prefix):])
+            for start in range(len(tokens)):
+                for stop in range(start + 1, len(tokens) + 1):
+                    key = " ".join(tokens[start:stop])
+                    rank = (0 if stop - start == len(tokens) else 1, len(tokens), position)
+                    if key not in ranks or rank < ranks[key]:
+                        ranks[key] = rank
+
+        self.index: Dict[str, int] = {key: rank[2] for key, rank in ranks.items()}
+        self.n_columns = len({rank[2] for rank in ranks.values()})
+
+    @staticmethod
+    def tokenize(reason: Any) -> List[str]:
+        """Token huruf/angka uppercase dari sebuah reason."""
+        return REASON_TOKEN_PATTERN.findall(str(reason).upper())
+
+    def lookup(self, reason: Any) -> Optional[int]:
+        """
+        Posisi kolom untuk sebuah reason.
+
+        Args:
+            reason: Reason mentah (nama training data)
+
+        Returns:
+            Indeks kolom, atau None jika tidak ada kolom yang cocok
+        """
+        return self.index.get(" ".join(self.tokenize(reason)))
@@ -0,0 +1,389 @@
+"""
+Forest Engine
+Inference random forest berbasis array NumPy kontigu (tanpa scikit-learn saat serving)
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Format file hasil export
+FLAT_FOREST_FORMAT = "flat-forest-v1"
+
+# Penanda node daun pada array left/right
+LEAF = -1
+
+# Jumlah baris per blok traversal
+APPLY_BLOCK_ROWS = 256
+
+# Array numerik yang disimpan per file .npy pada layout direktori (mmap)
+MMAP_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "tree_depth", "children")
+
+
+def build_children_table(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Tabel child berselang-seling [right, left] per node: next = children[2*node + go_left].
+
+    Daun menunjuk ke dirinya sendiri sehingga traversal tidak perlu masking.
+    """
+    node_ids = np.arange(len(left), dtype=np.int32)
+    is_leaf = left == LEAF
+    children = np.empty(2 * len(left), dtype=np.int32)
+    children[0::2] = np.where(is_leaf, node_ids, right)
+    children[1::2] = np.where(is_leaf, node_ids, left)
+    return children
+
+
+def flatten_forest(
+    model: Any,
+    feature_names: Optional[List[str]] = None
+) -> Tuple[Dict[str, np.ndarray], List[str], Dict[str, Any]]:
+    """
+    Flatten RandomForestRegressor scikit-learn menjadi array kontigu (in-memory).
+
+    Args:
+        model: RandomForestRegressor (atau DecisionTreeRegressor) yang sudah di-fit
+        feature_names: Urutan fitur (default: model.feature_names_in_)
+
+    Returns:
+        Tuple (arrays, feature_names, metadata)
+    """
+    estimators = getattr(model, "estimators_", None) or [model]
+
+    if feature_names is None and hasattr(model, "feature_names_in_"):
+        feature_names = list(model.feature_names_in_)
+
+    features, thresholds, lefts, rights, values, roots, depths = [], [], [], [], [], [], []
+    offset = 0
+    for est in estimators:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, LEAF, tree.children_left + offset)
+        right = np.where(is_leaf, LEAF, tree.children_right + offset)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(left)
+        rights.append(right)
+        values.append(tree.value.reshape(n, -1)[:, 0])
+        roots.append(offset)
+        depths.append(tree.max_depth)
+        offset += n
+
+    metadata = {
+        "format": FLAT_FOREST_FORMAT,
+        "source_type": type(model).__name__,
+        "n_estimators": len(estimators),
+        "max_depth": getattr(model, "max_depth", None),
+        "n_features": int(model.n_features_in_),
+        "n_nodes": offset
+    }
+
+    left = np.concatenate(lefts).astype(np.int32)
+    right = np.concatenate(rights).astype(np.int32)
+    arrays = {
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": left,
+        "right": right,
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "tree_depth": np.asarray(depths, dtype=np.int32),
+        "children": build_children_table(left, right)
+    }
+    feature_names = [str(n) for n in feature_names] if feature_names is not None else []
+    return arrays, feature_names, metadata
+
+
+def export_forest(
+    model: Any,
+    path: Union[str, Path],
+    feature_names: Optional[List[str]] = None,
+    layout: str = "npz"
+) -> Path:
+    """
+    Flatten RandomForestRegressor scikit-learn menjadi array kontigu dan simpan ke disk.
+
+    Semua tree digabung menjadi satu array per atribut node. Indeks child
+    (left/right) adalah offset absolut di array gabungan; daun ditandai LEAF.
+
+    Layout:
+        - "npz": satu file .npz (dimuat penuh ke memori setiap proses)
+        - "mmap": direktori berisi satu .npy per array + metadata.json. Array
+          dimuat dengan mmap_mode sehingga page cache OS dibagi oleh semua
+          worker yang memuat artefak yang sama.
+
+    Args:
+        model: RandomForestRegressor (atau DecisionTreeRegressor) yang sudah di-fit
+        path: Path file .npz / direktori tujuan
+        feature_names: Urutan fitur (default: model.feature_names_in_)
+        layout: "npz" atau "mmap"
+
+    Returns:
+        Path artefak yang ditulis
+    """
+    if layout not in ("npz", "mmap"):
+        raise ValueError(f"Layout tidak dikenal: {layout}")
+
+    arrays, feature_names, metadata = flatten_forest(model, feature_names)
+
+    path = Path(path)
+    if layout == "mmap":
+        return _write_mmap_dir(path, arrays, feature_names, metadata)
+
+    np.savez(
+        path,
+        feature_names=np.asarray(feature_names, dtype=str),
+        metadata=np.asarray(json.dumps(metadata)),
+        **arrays
+    )
+    return path
+
+
+def _write_mmap_dir(path: Path, arrays: Dict[str, np.ndarray], feature_names: List[str],
+                    metadata: Dict[str, Any]) -> Path:
+    """
+    Tulis layout direktori secara atomik (direktori sementara lalu rename).
+
+    File lama tidak pernah ditimpa in-place: worker yang masih me-mmap versi
+    lama tetap membaca inode lama sampai mereka reload.
+    """
+    tmp_dir = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+    (tmp_dir / "feature_names.json").write_text(json.dumps(feature_names))
+    # metadata.json ditulis terakhir: penanda artefak lengkap
+    (tmp_dir / "metadata.json").write_text(json.dumps(metadata))
+
+    old_dir = None
+    if path.exists():
+        old_dir = path.with_name(f"{path.name}.old-{os.getpid()}")
+        os.replace(path, old_dir)
+    os.replace(tmp_dir, path)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return path
+
+
+class FlatForest:
+    """
+    Random forest regressor dalam bentuk array datar.
+
+    Traversal dilakukan untuk semua (baris × tree) sekaligus: setiap iterasi
+    memajukan semua node aktif satu level, sebanyak kedalaman tree maksimum.
+    Hasil identik dengan RandomForestRegressor.predict (input di-cast ke float32
+    seperti scikit-learn sebelum dibandingkan dengan threshold).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Args:
+            arrays: Dict array hasil export_forest
+        """
+        # True jika array dibaca lewat memory map (dibagi antar proses)
+        self.memory_mapped = isinstance(arrays["threshold"], np.memmap)
+
+        # np.asarray: view ndarray biasa (tetap di-back mmap) agar hasil indexing bukan np.memmap
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        self.left = np.asarray(arrays["left"])
+        self.right = np.asarray(arrays["right"])
+        self.value = np.asarray(arrays["value"])
+        self.roots = np.asarray(arrays["roots"])
+
+        self.metadata = json.loads(str(arrays["metadata"]))
+        if self.metadata.get("format") != FLAT_FOREST_FORMAT:
+            raise ValueError(f"Format flat forest tidak dikenal: {self.metadata.get('format')}")
+
+        names = [str(n) for n in arrays["feature_names"]]
+        self.feature_names_in_ = np.asarray(names, dtype=object) if names else None
+        self.n_features_in_ = int(self.metadata["n_features"])
+        self.n_estimators = int(self.metadata["n_estimators"])
+        self.max_depth = self.metadata.get("max_depth")
+        self._traversal_depth = int(arrays["tree_depth"].max()) if len(arrays["tree_depth"]) else 0
+
+        # Artefak lama (tanpa tabel children) dihitung saat load
+        children = arrays.get("children")
+        self._children = np.asarray(children) if children is not None else build_children_table(self.left, self.right)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap_mode: Optional[str] = "r") -> "FlatForest":
+        """
+        Memuat flat forest dari file .npz atau direktori layout mmap.
+
+        Args:
+            path: Path hasil export_forest
+            mmap_mode: Mode memory map untuk layout direktori (None = baca penuh)
+
+        Returns:
+            Instance FlatForest
+        """
+        path = Path(path)
+        if path.is_dir():
+            arrays = {
+                name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+                for name in MMAP_ARRAYS if (path / f"{name}.npy").exists()
+            }
+            arrays["feature_names"] = np.asarray(json.loads((path / "feature_names.json").read_text()), dtype=str)
+            arrays["metadata"] = np.asarray((path / "metadata.json").read_text())
+            return cls(arrays)
+
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        return cls(arrays)
+
+    @classmethod
+    def from_model(cls, model: Any) -> "FlatForest":
+        """
+        Membangun flat forest langsung dari model scikit-learn (tanpa file).
+
+        Args:
+            model: RandomForestRegressor (atau DecisionTreeRegressor) yang sudah di-fit
+
+        Returns:
+            Instance FlatForest
+        """
+        arrays, feature_names, metadata = flatten_forest(model)
+        arrays["feature_names"] = np.asarray(feature_names, dtype=str)
+        arrays["metadata"] = np.asarray(json.dumps(metadata))
+        return cls(arrays)
+
+    def _as_matrix(self, X: Any) -> np.ndarray:
+        """Konversi input ke matriks float32 2-D (semantik threshold scikit-learn)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X memiliki {X.shape[1]} fitur, model membutuhkan {self.n_features_in_}")
+        return X
+
+    def apply(self, X: Any) -> np.ndarray:
+        """
+        Indeks daun yang dicapai setiap baris di setiap tree.
+
+        Args:
+            X: Matriks fitur (n_rows, n_features) atau satu baris 1-D
+
+        Returns:
+            Array int (n_rows, n_estimators) berisi indeks node daun
+        """
+        X = self._as_matrix(X)
+        leaves = np.empty((X.shape[0], self.n_estimators), dtype=np.int32)
+        # Blok baris kecil agar array sementara tetap di cache
+        for start in range(0, X.shape[0], APPLY_BLOCK_ROWS):
+            block = X[start:start + APPLY_BLOCK_ROWS]
+            leaves[start:start + len(block)] = self._apply_block(block)
+        return leaves
+
+    def _apply_block(self, X: np.ndarray) -> np.ndarray:
+        """Traversal level-per-level untuk satu blok baris."""
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_estimators)).copy()
+        for _ in range(self._traversal_depth):
+            go_left = flat_X[row_offset + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + go_left]
+        return nodes
+
+    def predict_per_tree(self, X: Any) -> np.ndarray:
+        """
+        Prediksi setiap tree.
+
+        Args:
+            X: Matriks fitur atau satu baris 1-D
+
+        Returns:
+            Array (n_rows, n_estimators)
+        """
+        return self.value[self.apply(X)]
+
+    def predict_stats(
+        self,
+        X: Any,
+        quantiles: Sequence[float] = (10, 90),
+        dedupe: bool = False
+    ) -> np.ndarray:
+        """
+        Sebaran prediksi antar tree dalam satu pass traversal.
+
+        Mean, standar deviasi, dan kuantil dihitung dari matriks prediksi per tree
+        yang sama (tanpa model kuantil terpisah).
+
+        Args:
+            X: Matriks fitur atau satu baris 1-D
+            quantiles: Persentil yang dihitung (0-100)
+            dedupe: Hitung hanya baris unik lalu sebar ke baris asal (efektif untuk
+                fitur one-hot dengan banyak baris identik)
+
+        Returns:
+            Array (n_rows, 2 + len(quantiles)): [mean, std, q_1, ..., q_k]
+        """
+        if dedupe:
+            X = np.ascontiguousarray(self._as_matrix(X))
+            rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+            _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+            if len(first) < len(rows):
+                return self.predict_stats(X[first], quantiles)[inverse.ravel()]
+
+        per_tree = self.predict_per_tree(X)
+        stats = np.empty((per_tree.shape[0], 2 + len(quantiles)), dtype=np.float64)
+        stats[:, 0] = per_tree.mean(axis=1)
+        stats[:, 1] = per_tree.std(axis=1)
+        if len(quantiles):
+            stats[:, 2:] = np.percentile(per_tree, quantiles, axis=1).T
+        return stats
+
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Prediksi rata-rata forest (pengganti RandomForestRegressor.predict).
+
+        Args:
+            X: Matriks fitur (n_rows, n_features) atau satu baris 1-D
+
+        Returns:
+            Array prediksi (n_rows,)
+        """
+        return self.predict_per_tree(X).mean(axis=1)
+
+
+def get_flat_model_path(model_path: Union[str, Path]) -> Path:
+    """
+    Path artefak flat forest untuk sebuah model pickle (model.pkl -> model.flat.npz).
+
+    Args:
+        model_path: Path model .pkl
+
+    Returns:
+        Path .npz pendamping
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.flat.npz")
+
+
+def get_mmap_model_path(model_path: Union[str, Path]) -> Path:
+    """
+    Path direktori layout mmap untuk sebuah model pickle (model.pkl -> model.flat/).
+
+    Args:
+        model_path: Path model .pkl
+
+    Returns:
+        Path direktori pendamping
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.flat")
@@ -0,0 +1,267 @@
+"""
+Health History Service
+Persistensi time series health index per komponen dan query trend dengan downsampling
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from config import (
+    HEALTH_SNAPSHOT_INTERVAL_SECONDS,
+    HEALTH_SNAPSHOT_BATCH_SIZE,
+    HEALTH_SNAPSHOT_FLUSH_SECONDS,
+    HEALTH_TREND_MAX_POINTS
+)
+from src.utils.logger import get_logger
+from src.utils.batch_writer import BatchWriter
+from src.services.database_service import db_service
+
+logger = get_logger(__name__)
+
+
+class HealthHistoryService:
+    """
+    Service untuk menyimpan snapshot health index dan membaca trend historisnya.
+
+    Snapshot dikelompokkan per (komponen, interval). Kalkulasi berulang dalam
+    interval yang sama digabung menjadi rata-rata sehingga tabel tetap ringkas.
+    """
+
+    def __init__(self, interval_seconds: int = HEALTH_SNAPSHOT_INTERVAL_SECONDS):
+        """
+        Args:
+            interval_seconds: Lebar interval snapshot (detik)
+        """
+        self.interval_seconds = max(int(interval_seconds), 1)
+        self.writer = BatchWriter(
+            name="health-snapshots",
+            flush_fn=self._write_snapshots,
+            batch_size=HEALTH_SNAPSHOT_BATCH_SIZE,
+            flush_interval=HEALTH_SNAPSHOT_FLUSH_SECONDS
+        )
+
+    def _bucket_start(self, timestamp: datetime) -> datetime:
+        """
+        Membulatkan timestamp ke awal interval snapshot.
+
+        Args:
+            timestamp: Waktu kalkulasi (naive dianggap UTC)
+
+        Returns:
+            Awal interval (timezone-aware UTC)
+        """
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        epoch = int(timestamp.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % self.interval_seconds, tz=timezone.utc)
+
+    def record_snapshot(
+        self,
+        component_name: str,
+        health_index: float,
+        rpn_score: Optional[float] = None,
+        oee_score: Optional[float] = None,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """
+        Mencatat satu snapshot health index (non-blocking, ditulis batch di background).
+
+        Args:
+            component_name: Nama komponen
+            health_index: Final health index
+            rpn_score: RPN score
+            oee_score: OEE score
+            timestamp: Waktu kalkulasi (default: sekarang)
+        """
+        bucket = self._bucket_start(timestamp or datetime.now(timezone.utc))
+        self.writer.append((component_name, bucket, float(health_index), rpn_score, oee_score))
+
+    def flush(self) -> int:
+        """Menulis semua snapshot yang masih di buffer. Returns jumlah snapshot."""
+        return self.writer.flush()
+
+    def stop(self) -> None:
+        """Menghentikan background writer dengan flush terakhir."""
+        self.writer.stop()
+
+    @staticmethod
+    def _aggregate(records: List[Tuple]) -> List[Tuple]:
+        """
+        Menggabungkan snapshot dengan key (komponen, bucket) yang sama sebelum ditulis.
+
+        Args:
+            records: List tuple (component, bucket, health, rpn, oee)
+
+        Returns:
+            List tuple siap insert (component, bucket, health, rpn, oee, min, max,
+            count, rpn_count, oee_count); rpn/oee dirata-rata hanya atas sampel
+            yang memiliki nilai tersebut
+        """
+        groups: Dict[Tuple, List[float]] = {}
+        for component, bucket, health, rpn, oee in records:
+            g = groups.get((component, bucket))
+            if g is None:
+                # [sum_health, sum_rpn, n_rpn, sum_oee, n_oee, min, max, count]
+                g = groups[(component, bucket)] = [0.0, 0.0, 0, 0.0, 0, health, health, 0]
+            g[0] += health
+            if rpn is not None:
+                g[1] += rpn
+                g[2] += 1
+            if oee is not None:
+                g[3] += oee
+                g[4] += 1
+            g[5] = min(g[5], health)
+            g[6] = max(g[6], health)
+            g[7] += 1
+
+        rows = []
+        for (component, bucket), g in groups.items():
+            rows.append((
+                component,
+                bucket,
+                g[0] / g[7],
+                g[1] / g[2] if g[2] else None,
+                g[3] / g[4] if g[4] else None,
+                g[5],
+                g[6],
+                g[7],
+                g[2],
+                g[4]
+            ))
+        return rows
+
+    def _write_snapshots(self, records: List[Tuple]) -> None:
+        """Flush callback: upsert snapshot teragregasi dalam satu statement."""
+        rows = self._aggregate(records)
+        if not rows:
+            return
+
+        query = """
+            INSERT INTO health_snapshots (
+                component_name, bucket_start, health_index, rpn_score, oee_score,
+                min_health_index, max_health_index, sample_count,
+                rpn_sample_count, oee_sample_count
+            ) VALUES %s
+            ON CONFLICT (component_name, bucket_start) DO UPDATE SET
+                health_index = (health_snapshots.health_index * health_snapshots.sample_count
+                                + EXCLUDED.health_index * EXCLUDED.sample_count)
+                               / (health_snapshots.sample_count + EXCLUDED.sample_count),
+                rpn_score = (COALESCE(health_snapshots.rpn_score * health_snapshots.rpn_sample_count, 0)
+                             + COALESCE(EXCLUDED.rpn_score * EXCLUDED.rpn_sample_count, 0))
+                            / NULLIF(health_snapshots.rpn_sample_count + EXCLUDED.rpn_sample_count, 0),
+                oee_score = (COALESCE(health_snapshots.oee_score * health_snapshots.oee_sample_count, 0)
+                             + COALESCE(EXCLUDED.oee_score * EXCLUDED.oee_sample_count, 0))
+                            / NULLIF(health_snapshots.oee_sample_count + EXCLUDED.oee_sample_count, 0),
+                min_health_index = LEAST(health_snapshots.min_health_index, EXCLUDED.min_health_index),
+                max_health_index = GREATEST(health_snapshots.max_health_index, EXCLUDED.max_health_index),
+                sample_count = health_snapshots.sample_count + EXCLUDED.sample_count,
+                rpn_sample_count = health_snapshots.rpn_sample_count + EXCLUDED.rpn_sample_count,
+                oee_sample_count = health_snapshots.oee_sample_count + EXCLUDED.oee_sample_count
+        """
+
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, query, rows, page_size=500)
+            conn.commit()
+
+        logger.debug(f"Persisted {len(rows)} health snapshots ({len(records)} samples)")
+
+    def resolve_bucket_seconds(
+        self,
+        start: datetime,
+        end: datetime,
+        bucket_seconds: Optional[int] = None,
+        max_points: int = HEALTH_TREND_MAX_POINTS
+    ) -> int:
+        """
+        Menentukan lebar bucket downsampling untuk rentang waktu tertentu.
+
+        Args:
+            start: Awal rentang
+            end: Akhir rentang
+            bucket_seconds: Lebar bucket yang diminta (opsional)
+            max_points: Jumlah titik maksimum per komponen
+
+        Returns:
+            Lebar bucket (kelipatan interval snapshot, minimal satu interval)
+        """
+        span = max((end - start).total_seconds(), 0)
+        minimum = math.ceil(span / max(max_points, 1)) if span else 0
+        seconds = max(int(bucket_seconds or 0), minimum, self.interval_seconds)
+        # Bulatkan ke kelipatan interval agar setiap snapshot masuk tepat satu bucket
+        return int(math.ceil(seconds / self.interval_seconds) * self.interval_seconds)
+
+    def get_health_trend(
+        self,
+        components: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket_seconds: Optional[int] = None,
+        max_points: int = HEALTH_TREND_MAX_POINTS
+    ) -> Dict[str, Any]:
+        """
+        Mengambil trend health index dengan downsampling di sisi database.
+
+        Args:
+            components: Filter nama komponen (None = semua)
+            start: Awal rentang (default: 7 hari terakhir)
+            end: Akhir rentang (default: sekarang)
+            bucket_seconds: Lebar bucket downsampling (opsional)
+            max_points: Jumlah titik maksimum per komponen
+
+        Returns:
+            Dictionary berisi series per komponen
+        """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=7)
+        bucket = self.resolve_bucket_seconds(start, end, bucket_seconds, max_points)
+
+        query = """
+            SELECT
+                component_name,
+                to_timestamp(floor(extract(epoch FROM bucket_start) / %s) * %s) AS bucket,
+                SUM(health_index * sample_count) / SUM(sample_count) AS health_index,
+                SUM(rpn_score * rpn_sample_count) / NULLIF(SUM(rpn_sample_count), 0) AS rpn_score,
+                SUM(oee_score * oee_sample_count) / NULLIF(SUM(oee_sample_count), 0) AS oee_score,
+                MIN(min_health_index) AS min_health_index,
+                MAX(max_health_index) AS max_health_index,
+                SUM(sample_count) AS samples
+            FROM health_snapshots
+            WHERE bucket_start >= %s AND bucket_start < %s
+        """
+        params: List[Any] = [bucket, bucket, start, end]
+        if components:
+            query += " AND component_name = ANY(%s)"
+            params.append(list(components))
+        query += " GROUP BY component_name, bucket ORDER BY component_name, bucket"
+
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for name, ts, health, rpn, oee, lo, hi, samples in rows:
+            series.setdefault(name, []).append({
+                "timestamp": ts.isoformat(),
+                "health_index": round(float(health), 2),
+                "rpn_score": round(float(rpn), 2) if rpn is not None else None,
+                "oee_score": round(float(oee), 2) if oee is not None else None,
+                "min_health_index": round(float(lo), 2) if lo is not None else None,
+                "max_health_index": round(float(hi), 2) if hi is not None else None,
+                "samples": int(samples)
+            })
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "bucket_seconds": bucket,
+            "components": series
+        }
+
+
+# Global instance
+health_history_service = HealthHistoryService()
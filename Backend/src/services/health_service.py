@@ -5,10 +5,15 @@ Service layer untuk kalkulasi health index dan metrics
 
 import random
 from datetime import datetime
-from typing import Dict, Any, List
-from config import RPN_WEIGHT, OEE_WEIGHT, HEALTH_THRESHOLD_GOOD, OEE_MIN, OEE_MAX
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+from config import (
+    RPN_WEIGHT, OEE_WEIGHT, HEALTH_THRESHOLD_GOOD, OEE_MIN, OEE_MAX,
+    HEALTH_SIMULATION_MAX_SCENARIOS
+)
 from src.utils.logger import get_logger
 from src.services.database_service import db_service
+from src.services.health_history_service import health_history_service
 
 logger = get_logger(__name__)
 
@@ -171,6 +176,174 @@ class HealthService:
         else:
             return "Perlu Perhatian"
     
+    # =========================================================================
+    # VECTORIZED WHAT-IF SIMULATION
+    # =========================================================================
+    
+    def calculate_rpn_scores(self, rpn_values: np.ndarray, rpn_max: float) -> np.ndarray:
+        """
+        Versi vektor dari calculate_rpn_score.
+        
+        Args:
+            rpn_values: Array nilai RPN
+            rpn_max: Nilai RPN maksimal
+            
+        Returns:
+            Array RPN Score (0-100)
+        """
+        rpn_values = np.asarray(rpn_values, dtype=float)
+        if rpn_max == 0:
+            return np.zeros_like(rpn_values)
+        return np.round((1 - rpn_values / rpn_max) * 100, 2)
+    
+    def calculate_final_health_indices(self, rpn_scores: np.ndarray, oee_scores: np.ndarray) -> np.ndarray:
+        """
+        Versi vektor dari calculate_final_health_index (mendukung broadcasting).
+        
+        Args:
+            rpn_scores: Array RPN Score
+            oee_scores: Array OEE Score
+            
+        Returns:
+            Array Final Health Index
+        """
+        return np.round(np.asarray(rpn_scores) * RPN_WEIGHT + np.asarray(oee_scores) * OEE_WEIGHT, 2)
+    
+    def determine_health_statuses(self, health_indices: np.ndarray) -> np.ndarray:
+        """
+        Versi vektor dari determine_health_status.
+        
+        Args:
+            health_indices: Array Final Health Index
+            
+        Returns:
+            Array status kesehatan
+        """
+        return np.where(np.asarray(health_indices) >= HEALTH_THRESHOLD_GOOD, "Sehat", "Perlu Perhatian")
+    
+    def simulate_health_scenarios(
+        self,
+        rpn_values: Sequence[float],
+        oee_values: Sequence[float],
+        rpn_max: float,
+        labels: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Mengevaluasi grid skenario RPN × OEE dalam satu operasi array.
+        
+        Args:
+            rpn_values: Daftar nilai RPN yang disimulasikan (baris grid)
+            oee_values: Daftar OEE Score yang disimulasikan (kolom grid)
+            rpn_max: Nilai RPN maksimal untuk normalisasi
+            labels: Label opsional per nilai RPN (misal nama aksi FMEA)
+            
+        Returns:
+            Dictionary berisi grid health index dan status
+            
+        Raises:
+            ValueError: Jika grid kosong atau melebihi batas skenario
+        """
+        rpn = np.asarray(rpn_values, dtype=float).ravel()
+        oee = np.asarray(oee_values, dtype=float).ravel()
+        
+        total = rpn.size * oee.size
+        if total == 0:
+            raise ValueError("Grid RPN dan OEE tidak boleh kosong")
+        if total > HEALTH_SIMULATION_MAX_SCENARIOS:
+            raise ValueError(
+                f"Jumlah skenario ({total}) melebihi batas {HEALTH_SIMULATION_MAX_SCENARIOS}"
+            )
+        
+        rpn_scores = self.calculate_rpn_scores(rpn, rpn_max)
+        oee_scores = np.clip(oee, float(OEE_MIN), float(OEE_MAX))
+        
+        # Broadcasting: baris = RPN, kolom = OEE
+        health = self.calculate_final_health_indices(rpn_scores[:, None], oee_scores[None, :])
+        statuses = self.determine_health_statuses(health)
+        healthy = health >= HEALTH_THRESHOLD_GOOD
+        
+        # OEE minimum per baris RPN agar status menjadi "Sehat"
+        if RPN_WEIGHT and OEE_WEIGHT:
+            required_oee = (HEALTH_THRESHOLD_GOOD - rpn_scores * RPN_WEIGHT) / OEE_WEIGHT
+            required_oee = np.where(required_oee > float(OEE_MAX), np.nan, np.maximum(required_oee, float(OEE_MIN)))
+        else:
+            required_oee = np.full(rpn.size, np.nan)
+        
+        return {
+            "scenario_count": int(total),
+            "rpn_max": rpn_max,
+            "rpn_values": rpn.tolist(),
+            "rpn_labels": labels,
+            "rpn_scores": rpn_scores.tolist(),
+            "oee_scores": oee_scores.tolist(),
+            "health_index": health.tolist(),
+            "status": statuses.tolist(),
+            "min_oee_for_healthy": [None if np.isnan(v) else round(float(v), 2) for v in required_oee],
+            "summary": {
+                "healthy_scenarios": int(healthy.sum()),
+                "attention_scenarios": int(total - healthy.sum()),
+                "min_health_index": float(health.min()),
+                "max_health_index": float(health.max()),
+                "mean_health_index": round(float(health.mean()), 2)
+            }
+        }
+    
+    def resolve_fmea_actions(self, actions: List[Dict[str, Any]], baseline_rpn: Optional[float]) -> Dict[str, Any]:
+        """
+        Mengubah rencana aksi FMEA menjadi nilai RPN hasil aksi.
+        
+        Setiap aksi dapat berisi salah satu dari:
+        - severity, occurrence, detection (RPN = S × O × D)
+        - rpn (nilai RPN setelah aksi)
+        - rpn_reduction_pct (persentase penurunan dari baseline_rpn)
+        
+        Args:
+            actions: List aksi FMEA
+            baseline_rpn: RPN komponen saat ini (wajib untuk rpn_reduction_pct)
+            
+        Returns:
+            Dictionary dengan keys: rpn_values, labels
+            
+        Raises:
+            ValueError: Jika aksi tidak valid
+        """
+        rpn_values = []
+        labels = []
+        
+        for i, action in enumerate(actions):
+            if not isinstance(action, dict):
+                raise ValueError(f"fmea_actions[{i}] harus berupa object")
+            
+            label = str(action.get("name", f"action_{i + 1}"))
+            
+            if all(k in action for k in ("severity", "occurrence", "detection")):
+                s, o, d = (float(action[k]) for k in ("severity", "occurrence", "detection"))
+                for key, val in (("severity", s), ("occurrence", o), ("detection", d)):
+                    if not 1 <= val <= 10:
+                        raise ValueError(f"fmea_actions[{i}].{key} harus di antara 1-10")
+                rpn = s * o * d
+            elif "rpn" in action:
+                rpn = float(action["rpn"])
+            elif "rpn_reduction_pct" in action:
+                if baseline_rpn is None:
+                    raise ValueError(f"fmea_actions[{i}] membutuhkan 'component' atau 'rpn_value' sebagai baseline")
+                pct = float(action["rpn_reduction_pct"])
+                if not 0 <= pct <= 100:
+                    raise ValueError(f"fmea_actions[{i}].rpn_reduction_pct harus di antara 0-100")
+                rpn = baseline_rpn * (1 - pct / 100.0)
+            else:
+                raise ValueError(
+                    f"fmea_actions[{i}] harus berisi severity/occurrence/detection, rpn, atau rpn_reduction_pct"
+                )
+            
+            if rpn < 0:
+                raise ValueError(f"fmea_actions[{i}] menghasilkan RPN negatif")
+            
+            rpn_values.append(rpn)
+            labels.append(label)
+        
+        return {"rpn_values": rpn_values, "labels": labels}
+    
     def generate_rule_based_recommendation(self, component_name: str, health_index: float) -> List[str]:
         """
         Menghasilkan rekomendasi tindakan perbaikan berbasis aturan FMEA dan Fishbone Diagram.
@@ -334,6 +507,12 @@ class HealthService:
         # Generate rekomendasi berbasis aturan FMEA
         recommendations = self.generate_rule_based_recommendation(component_name, final_health_index)
         
+        # Simpan snapshot untuk trend historis (ditulis batch di background)
+        try:
+            health_history_service.record_snapshot(component_name, final_health_index, rpn_score, oee_score)
+        except Exception as e:
+            logger.error(f"Failed to record health snapshot for {component_name}: {e}")
+        
         logger.info(
             f"Health calculated for {component_name} - RPN: {rpn_score}, OEE: {oee_score}, "
             f"Availability: {availability_rate}%, Final: {final_health_index}, "
@@ -457,7 +636,7 @@ class HealthService:
                 )
                 
                 # Panggil fungsi prediksi (gunakan predict_downtime untuk model Fishbone)
-                prediction_result = prediction_service.predict_downtime(real_time_data)
+                prediction_result = prediction_service.predict_downtime(real_time_data, source="health_auto_trigger")
                 auto_triggered = True
                 
                 # Log hasil prediksi
@@ -0,0 +1,393 @@
+"""
+Job Executor
+Process pool terkelola untuk job CPU-bound (batch prediction, analitik downtime)
+
+Job dijalankan di luar thread request Flask sehingga tidak menahan GIL proses
+web. Matriks fitur dikirim ke worker lewat shared memory (tanpa pickle/copy),
+dan hasil prediksi ditulis worker langsung ke segmen shared memory output.
+"""
+
+import importlib
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    JOB_POOL_WORKERS, JOB_CHUNK_ROWS, JOB_RESULT_TTL_SECONDS, JOB_MAX_ACTIVE
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Status job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+# ============================================================================
+# SHARED MEMORY
+# ============================================================================
+
+class SharedArray:
+    """
+    Array NumPy di atas segmen shared memory.
+
+    Proses pembuat memanggil create() dan bertanggung jawab atas release();
+    worker memanggil attach(spec) dengan spec (name, shape, dtype) yang kecil
+    untuk di-pickle, sehingga data array tidak pernah diserialisasi.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, ...], dtype: str, owner: bool):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype).str
+        self.owner = owner
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], dtype: Any = np.float64) -> "SharedArray":
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        return cls(shm, shape, np.dtype(dtype).str, owner=True)
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> "SharedArray":
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        return (self.shm.name, self.shape, self.dtype)
+
+    def release(self) -> None:
+        """Lepas view dan tutup segmen (pemilik juga unlink)."""
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ============================================================================
+# FUNGSI WORKER (dieksekusi di proses pool)
+# ============================================================================
+
+def _worker_init() -> None:
+    """Initializer worker: muat model semua slot sekali saat proses dibuat."""
+    from src.services.model_registry import model_registry
+    for slot in model_registry.slots:
+        # Model kandidat hanya dipakai shadow evaluator di proses utama
+        if slot != "candidate":
+            model_registry.get(slot)
+
+
+def _worker_ping() -> int:
+    """No-op untuk memaksa pool membuat (dan warm) semua worker."""
+    return os.getpid()
+
+
+def _worker_predict_chunk(
+    model_ref: Tuple[str, Optional[str], str, Optional[str]],
+    in_spec: Tuple[str, Tuple[int, ...], str],
+    out_spec: Tuple[str, Tuple[int, ...], str],
+    start: int,
+    stop: int,
+    quantiles: Optional[Tuple[float, ...]] = None
+) -> int:
+    """
+    Prediksi baris [start, stop) dari matriks di shared memory.
+
+    Args:
+        model_ref: (slot, content_hash, model_path, feature_names_path) versi model
+            yang dipakai proses web
+        in_spec: Spec SharedArray matriks fitur
+        out_spec: Spec SharedArray output prediksi
+        start: Baris awal
+        stop: Baris akhir (eksklusif)
+        quantiles: Jika diisi, kolom 1.. output diisi [std, kuantil...] antar tree
+
+    Returns:
+        Jumlah baris yang diprediksi
+    """
+    from src.services.feature_encoder import predict_rows
+    from src.services.model_registry import model_registry
+
+    slot, content_hash, model_path, feature_names_path = model_ref
+    bundle = model_registry.get(slot)
+    if bundle is None or bundle.content_hash != content_hash:
+        # Proses web memakai versi/file lain (hot reload): muat file yang sama
+        bundle = model_registry.load_files(
+            slot, Path(model_path), Path(feature_names_path) if feature_names_path else None
+        )
+        if bundle is None or bundle.content_hash != content_hash:
+            raise RuntimeError(f"Versi model slot '{slot}' di worker tidak sama dengan proses web")
+
+    X = SharedArray.attach(in_spec)
+    out = SharedArray.attach(out_spec)
+    try:
+        if quantiles is None:
+            out.array[start:stop] = predict_rows(bundle.model, X.array[start:stop])
+        else:
+            out.array[start:stop, 0] = predict_rows(bundle.model, X.array[start:stop])
+            out.array[start:stop, 1:] = bundle.forest().predict_stats(X.array[start:stop], quantiles, dedupe=True)[:, 1:]
+        return stop - start
+    finally:
+        X.release()
+        out.release()
+
+
+def _worker_call(module: str, attribute: str, method: str, kwargs: Dict[str, Any]) -> Any:
+    """
+    Memanggil method singleton service di dalam worker.
+
+    Args:
+        module: Nama modul (mis. src.services.downtime_service)
+        attribute: Nama instance global di modul (mis. downtime_service)
+        method: Nama method
+        kwargs: Argumen keyword
+
+    Returns:
+        Hasil method (harus bisa di-pickle)
+    """
+    service = getattr(importlib.import_module(module), attribute)
+    return getattr(service, method)(**kwargs)
+
+
+# ============================================================================
+# JOB
+# ============================================================================
+
+class Job:
+    """Satu job yang dijalankan di process pool."""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = JOB_QUEUED
+        self.progress = {"completed": 0, "total": 0}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Status job tanpa hasil (untuk polling)."""
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round(((self.finished_at or datetime.now()) - self.started_at).total_seconds(), 3)
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": elapsed
+        }
+
+
+class JobExecutor:
+    """
+    Process pool pre-warmed + registry job (submit, poll, fetch).
+
+    - Worker dibuat dengan konteks spawn (aman terhadap thread MQTT/DB di proses web)
+      dan memuat model registry saat start.
+    - Setiap job dikoordinasikan oleh thread ringan di proses web; pekerjaan berat
+      dijalankan di pool.
+    - Hasil job disimpan in-memory dan dihapus setelah JOB_RESULT_TTL_SECONDS.
+    """
+
+    def __init__(self, max_workers: int = JOB_POOL_WORKERS):
+        """
+        Args:
+            max_workers: Jumlah proses worker
+        """
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._worker_pids: List[int] = []
+
+    # =========================================================================
+    # POOL
+    # =========================================================================
+
+    def start(self) -> None:
+        """Membuat pool dan warm semua worker (model dimuat sebelum job pertama)."""
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_worker_init
+            )
+            pool = self._pool
+
+        started = time.perf_counter()
+        # Submit ping sebanyak worker agar semua proses dibuat dan initializer selesai
+        pings = [pool.submit(_worker_ping) for _ in range(self.max_workers * 2)]
+        self._worker_pids = sorted({f.result() for f in pings})
+        logger.info(
+            f"Job executor started: {len(self._worker_pids)} workers warm "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def stop(self) -> None:
+        """Menghentikan pool (job yang sedang berjalan diselesaikan)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+            logger.info("Job executor stopped")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self.start()
+        return self._pool
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Menjalankan satu fungsi di pool dan menunggu hasilnya."""
+        return self._get_pool().submit(fn, *args).result()
+
+    def predict_shared(
+        self,
+        bundle: Any,
+        X: SharedArray,
+        progress: Optional[Dict[str, int]] = None,
+        quantiles: Optional[Tuple[float, ...]] = None
+    ) -> np.ndarray:
+        """
+        Prediksi matriks di shared memory, dibagi per chunk ke semua worker.
+
+        Args:
+            bundle: ModelBundle yang dipakai proses web (worker memakai versi yang sama)
+            X: Matriks fitur (n_rows, n_features) di shared memory
+            progress: Dict progress yang diperbarui per chunk selesai
+            quantiles: Jika diisi, sertakan statistik per tree (std + kuantil) per baris
+
+        Returns:
+            Array prediksi (n_rows,), atau (n_rows, 2 + k) [prediksi, std, kuantil...]
+            jika quantiles diisi
+        """
+        n_rows = X.shape[0]
+        shape = (n_rows,) if quantiles is None else (n_rows, 2 + len(quantiles))
+        out = SharedArray.create(shape, np.float64)
+        try:
+            pool = self._get_pool()
+            # Chunk cukup kecil agar semua worker terpakai, cukup besar agar overhead kecil
+            chunk = max(1, min(JOB_CHUNK_ROWS, -(-n_rows // self.max_workers)))
+            model_ref = (
+                bundle.slot, bundle.content_hash, str(bundle.model_path),
+                str(bundle.feature_names_path) if bundle.feature_names_path else None
+            )
+            futures: List[Future] = [
+                pool.submit(_worker_predict_chunk, model_ref, X.spec, out.spec, start,
+                            min(start + chunk, n_rows), quantiles)
+                for start in range(0, n_rows, chunk)
+            ]
+            if progress is not None:
+                progress["total"] = n_rows
+            completed = 0
+            for future in as_completed(futures):
+                completed += future.result()
+                if progress is not None:
+                    progress["completed"] = completed
+            return out.array.copy()
+        finally:
+            out.release()
+
+    # =========================================================================
+    # JOB API
+    # =========================================================================
+
+    def submit(self, kind: str, runner: Callable[[Job], Any], params: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Mendaftarkan job dan menjalankan koordinatornya di background thread.
+
+        Args:
+            kind: Jenis job (untuk status/logging)
+            runner: Fungsi job -> hasil; boleh memakai predict_shared/run
+            params: Parameter job (ditampilkan di status)
+
+        Returns:
+            Job yang terdaftar
+
+        Raises:
+            RuntimeError: Jika job aktif sudah mencapai JOB_MAX_ACTIVE
+        """
+        self._expire_jobs()
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j.status in (JOB_QUEUED, JOB_RUNNING))
+            if active >= JOB_MAX_ACTIVE:
+                raise RuntimeError(f"Terlalu banyak job aktif ({active}), coba lagi nanti")
+            job = Job(kind, params or {})
+            self._jobs[job.id] = job
+
+        thread = threading.Thread(target=self._run_job, args=(job, runner), name=f"job-{job.id[:8]}", daemon=True)
+        thread.start()
+        logger.info(f"Job {job.id} submitted ({kind})")
+        return job
+
+    def _run_job(self, job: Job, runner: Callable[[Job], Any]) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now()
+        try:
+            job.result = runner(job)
+            job.status = JOB_DONE
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = datetime.now()
+            logger.info(f"Job {job.id} {job.status} in {(job.finished_at - job.started_at).total_seconds():.2f}s")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Mendapatkan job berdasarkan ID (None jika tidak ada/kedaluwarsa)."""
+        self._expire_jobs()
+        return self._jobs.get(job_id)
+
+    def _expire_jobs(self) -> None:
+        """Hapus job selesai yang lebih tua dari JOB_RESULT_TTL_SECONDS."""
+        now = datetime.now()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and (now - job.finished_at).total_seconds() > JOB_RESULT_TTL_SECONDS
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def status(self) -> Dict[str, Any]:
+        """Status pool dan jumlah job per status."""
+        counts: Dict[str, int] = {}
+        for job in list(self._jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "running": self._pool is not None,
+            "max_workers": self.max_workers,
+            "worker_pids": self._worker_pids,
+            "jobs": counts
+        }
+
+
+# Global instance
+job_executor = JobExecutor()
@@ -0,0 +1,386 @@
+"""
+Machine Log Detectors
+Detektor event streaming untuk satu kali scan machine_logs: setiap baris di-decode
+sekali lalu diumpankan ke semua detektor aktif (transisi status, metric drop,
+counter stall) yang masing-masing menjaga state machine sendiri
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+# Urutan kolom baris yang di-scan (lihat DowntimeService.detect_machine_log_events)
+# (timestamp, machine_status, performance_rate, quality_rate,
+#  cumulative_production, cumulative_defects)
+SCAN_COLUMNS = (
+    'timestamp', 'machine_status', 'performance_rate', 'quality_rate',
+    'cumulative_production', 'cumulative_defects'
+)
+
+RUNNING_STATUS = 'Running'
+
+# Ambang metric drop (persen)
+METRIC_DROP_THRESHOLD = 20.0
+
+
+def decode_row(row: tuple) -> tuple:
+    """
+    Decode satu baris machine_logs sekali untuk semua detektor.
+
+    Numeric/Decimal dari driver diubah ke float/int; None dipertahankan.
+
+    Args:
+        row: Baris mentah sesuai SCAN_COLUMNS
+
+    Returns:
+        Tuple (timestamp, status, performance, quality, production, defects)
+    """
+    timestamp, status, performance, quality, production, defects = row
+    return (
+        timestamp,
+        status,
+        float(performance) if performance is not None else None,
+        float(quality) if quality is not None else None,
+        int(production) if production is not None else None,
+        int(defects) if defects is not None else None
+    )
+
+
+def _isoformat(value) -> str:
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class LogDetector:
+    """
+    Basis detektor: menerima sampel terurut timestamp naik lewat feed() dan
+    menyimpan maksimal `limit` event terbaru.
+    """
+
+    name = ''
+
+    def __init__(self, service, limit: int = 50):
+        """
+        Args:
+            service: DowntimeService (helper durasi, severity, format event)
+            limit: Maksimal event yang disimpan (terbaru)
+        """
+        self.service = service
+        self.events = deque(maxlen=limit)
+        self.detected = 0
+
+    def feed(self, sample: tuple) -> None:
+        """Memproses satu sampel hasil decode_row."""
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """Menutup state yang masih terbuka setelah baris terakhir."""
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        event["detector"] = self.name
+        self.events.append(event)
+        self.detected += 1
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Event terdeteksi, terbaru dulu."""
+        return list(reversed(self.events))
+
+
+class StatusTransitionDetector(LogDetector):
+    """
+    Segmen downtime dari transisi machine_status (aturan sama dengan
+    DowntimeService.build_status_segments_query), dengan agregat metrik inkremental.
+    Ini satu-satunya implementasi Python aturan segmen; referensi
+    DowntimeService._walk_status_segments memakai StatusSegmentCollector.
+    """
+
+    name = 'status_transition'
+
+    def __init__(self, service, limit: int = 50):
+        super().__init__(service, limit)
+        self.prev_status = None
+        self.current = None
+
+    def feed(self, sample: tuple) -> None:
+        timestamp, status, performance, quality, production, defects = sample
+        if self.current is None:
+            if ((self.prev_status == RUNNING_STATUS and status != RUNNING_STATUS)
+                    or status in self.service.DOWNTIME_STATUS):
+                self.current = {
+                    "start": timestamp, "status": status,
+                    "performance": performance, "quality": quality,
+                    "samples": 0, "perf_sum": 0.0, "perf_count": 0, "perf_min": None,
+                    "qual_sum": 0.0, "qual_count": 0,
+                    "production": (None, None), "defects": (None, None)
+                }
+
+        current = self.current
+        if current is not None:
+            current["production"] = self._span(current["production"], production)
+            current["defects"] = self._span(current["defects"], defects)
+            if status == RUNNING_STATUS:
+                self._close(timestamp)
+            else:
+                current["samples"] += 1
+                if performance is not None:
+                    current["perf_sum"] += performance
+                    current["perf_count"] += 1
+                    if current["perf_min"] is None or performance < current["perf_min"]:
+                        current["perf_min"] = performance
+                if quality is not None:
+                    current["qual_sum"] += quality
+                    current["qual_count"] += 1
+
+        self.prev_status = status
+
+    def finish(self) -> None:
+        if self.current is not None:
+            self._close(None)
+
+    @staticmethod
+    def _span(span: tuple, value) -> tuple:
+        low, high = span
+        if value is None:
+            return span
+        return (value if low is None or value < low else low,
+                value if high is None or value > high else high)
+
+    def _close(self, end_time) -> None:
+        current, self.current = self.current, None
+        duration = (self.service._calculate_duration(current["start"], end_time)
+                    if end_time is not None else None)
+        if duration is not None and duration < 1:
+            return
+
+        production_low, production_high = current["production"]
+        defects_low, defects_high = current["defects"]
+        self.emit_segment((
+            current["start"],
+            end_time,
+            current["status"],
+            current["performance"],
+            current["quality"],
+            duration,
+            current["samples"],
+            current["perf_sum"] / current["perf_count"] if current["perf_count"] else None,
+            current["perf_min"],
+            current["qual_sum"] / current["qual_count"] if current["qual_count"] else None,
+            production_high - production_low if production_low is not None else None,
+            defects_high - defects_low if defects_low is not None else None
+        ))
+
+    def emit_segment(self, segment: tuple) -> None:
+        """
+        Args:
+            segment: Tuple dengan kolom yang sama seperti hasil build_status_segments_query
+        """
+        self.emit(self.service._status_segment_event(segment))
+
+
+class StatusSegmentCollector(StatusTransitionDetector):
+    """StatusTransitionDetector yang menyimpan tuple segmen mentah, bukan event."""
+
+    def emit_segment(self, segment: tuple) -> None:
+        self.events.append(segment)
+        self.detected += 1
+
+
+class MetricDropDetector(LogDetector):
+    """
+    Periode kritis: performance atau quality < 20% atau status bukan 'Running'
+    (logika DowntimeService._analyze_health_drops).
+    """
+
+    name = 'metric_drop'
+
+    def __init__(self, service, limit: int = 50, threshold: float = METRIC_DROP_THRESHOLD):
+        super().__init__(service, limit)
+        self.threshold = threshold
+        self.start = None
+        self.start_metrics = None
+        self.critical_samples = 0
+
+    def feed(self, sample: tuple) -> None:
+        timestamp, status, performance, quality, _, _ = sample
+        performance = performance or 0.0
+        quality = quality or 0.0
+        is_critical = (
+            performance < self.threshold
+            or quality < self.threshold
+            or status != RUNNING_STATUS
+        )
+
+        if is_critical:
+            self.critical_samples += 1
+            if self.start is None:
+                self.start = timestamp
+                self.start_metrics = {
+                    'performance': performance,
+                    'quality': quality,
+                    'status': status
+                }
+        elif self.start is not None:
+            self._close(timestamp)
+
+    def finish(self) -> None:
+        if self.start is None:
+            return
+        downtime_end = datetime.now(self.start.tzinfo) if isinstance(self.start, datetime) else datetime.now()
+        self.emit({
+            "id": "DT-ONGOING",
+            "timestamp": _isoformat(self.start),
+            "end_timestamp": downtime_end.isoformat(),
+            "component": "Multiple",
+            "reason": "Ongoing downtime - system still degraded",
+            "duration": self.service._calculate_duration(self.start, downtime_end),
+            "type": "reactive",
+            "severity": "high",
+            "status": "ongoing",
+            "technician": "Pending",
+            "notes": "Downtime is currently ongoing. Waiting for resolution.",
+            "ongoing": True
+        })
+        self.start = None
+
+    def _close(self, downtime_end) -> None:
+        downtime_start, metrics = self.start, self.start_metrics
+        self.start = None
+        duration = self.service._calculate_duration(downtime_start, downtime_end)
+
+        # Komponen berdasarkan metric yang turun
+        if metrics['quality'] < self.threshold:
+            component = 'Printing'
+        elif metrics['performance'] < 30:
+            component = 'Feeder'
+        elif metrics['performance'] < 50:
+            component = 'Pre-Feeder'
+        else:
+            import random
+            component = random.choice(['Slotter', 'Stacker'])
+
+        # Event < 1 menit ditampilkan dalam detik (minimal 1)
+        if duration == 0 and hasattr(downtime_start, 'timestamp') and hasattr(downtime_end, 'timestamp'):
+            duration_display = max(int(downtime_end.timestamp() - downtime_start.timestamp()), 1)
+        else:
+            duration_display = duration or 1
+
+        self.emit({
+            "id": f"DT-{int(downtime_start.timestamp() * 1000) % 100000}" if hasattr(downtime_start, 'timestamp') else f"DT-{self.detected}",
+            "timestamp": _isoformat(downtime_start),
+            "end_timestamp": _isoformat(downtime_end),
+            "component": component,
+            "reason": f"{component} downtime detected - Status: {metrics['status']} (P:{metrics['performance']:.1f}% Q:{metrics['quality']:.1f}%)",
+            "duration": duration_display,
+            "type": "preventive" if metrics['status'] == 'Maintenance' else "reactive",
+            "severity": self.service._determine_severity(duration, metrics['status']),
+            "status": "resolved",
+            "technician": "System Auto-detected",
+            "notes": f"Detected from machine logs. Performance: {metrics['performance']:.1f}%, Quality: {metrics['quality']:.1f}%, Status: {metrics['status']}",
+            "ongoing": False
+        })
+
+
+class CounterStallDetector(LogDetector):
+    """
+    Counter stall: mesin 'Running' tetapi cumulative_production tidak bertambah
+    selama minimal `min_minutes`.
+    """
+
+    name = 'counter_stall'
+
+    def __init__(self, service, limit: int = 50, min_minutes: float = 5.0):
+        super().__init__(service, limit)
+        self.min_minutes = min_minutes
+        self.since = None
+        self.last_timestamp = None
+        self.production = None
+
+    def feed(self, sample: tuple) -> None:
+        timestamp, status, _, _, production, _ = sample
+        running = status == RUNNING_STATUS and production is not None
+        if running and self.since is not None and production == self.production:
+            # Counter masih diam
+            self.last_timestamp = timestamp
+            return
+
+        # Counter bergerak, reset, atau mesin berhenti: tutup stall yang berjalan
+        if self.since is not None:
+            self._close(timestamp, ongoing=False)
+        self.since = timestamp if running else None
+        self.last_timestamp = timestamp
+        self.production = production
+
+    def finish(self) -> None:
+        if self.since is not None and self.last_timestamp != self.since:
+            self._close(self.last_timestamp, ongoing=True)
+        self.since = None
+
+    def _close(self, end_time, ongoing: bool) -> None:
+        start = self.since
+        if start is None or end_time is None:
+            return
+        minutes = (end_time - start).total_seconds() / 60.0 if isinstance(start, datetime) else 0.0
+        if minutes < self.min_minutes:
+            return
+        duration = int(minutes)
+        self.emit({
+            "id": f"DT-STALL-{int(start.timestamp() * 1000) % 100000}",
+            "timestamp": _isoformat(start),
+            "end_timestamp": _isoformat(end_time),
+            "component": "Feeder",
+            "reason": f"Production counter stalled at {self.production} while Running",
+            "duration": duration,
+            "type": "reactive",
+            "severity": self.service._determine_severity(duration, 'Stopped'),
+            "status": "ongoing" if ongoing else "resolved",
+            "technician": "System Auto-detected",
+            "notes": f"cumulative_production tidak bertambah selama {minutes:.1f} menit dengan status Running.",
+            "ongoing": ongoing,
+            "metrics": {"production": self.production}
+        })
+
+
+# Detektor yang tersedia -> class
+DETECTORS = {
+    StatusTransitionDetector.name: StatusTransitionDetector,
+    MetricDropDetector.name: MetricDropDetector,
+    CounterStallDetector.name: CounterStallDetector
+}
+
+
+def scan_rows(rows: Iterable[tuple], detectors: List[LogDetector]) -> int:
+    """
+    Satu pass atas baris machine_logs (timestamp naik) untuk semua detektor.
+
+    Args:
+        rows: Iterable baris mentah sesuai SCAN_COLUMNS (mis. server-side cursor)
+        detectors: Detektor aktif
+
+    Returns:
+        Jumlah baris yang di-scan
+    """
+    feeds = [detector.feed for detector in detectors]
+    scanned = 0
+    for row in rows:
+        sample = decode_row(row)
+        for feed in feeds:
+            feed(sample)
+        scanned += 1
+    for detector in detectors:
+        detector.finish()
+    return scanned
+
+
+def merge_events(detectors: List[LogDetector], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Menggabungkan event semua detektor, terbaru dulu.
+
+    Args:
+        detectors: Detektor yang sudah selesai scan
+        limit: Maksimal event gabungan (None = semua)
+
+    Returns:
+        List event gabungan
+    """
+    events = [event for detector in detectors for event in detector.events]
+    events.sort(key=lambda e: e["timestamp"], reverse=True)
+    return events[:limit] if limit is not None else events
@@ -0,0 +1,518 @@
+"""
+Model Registry
+Registry model ML bersama dengan versioning berbasis content hash dan hot reload atomik
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from config import PREDICTION_ENGINE, MODEL_REGISTRY_HISTORY
+from src.utils.logger import get_logger
+from src.services.forest_engine import FlatForest, get_flat_model_path, get_mmap_model_path
+from src.services.feature_encoder import predict_rows
+
+logger = get_logger(__name__)
+
+# Backend/src/services -> Backend -> Parent -> Model
+MODEL_DIR = Path(__file__).resolve().parent.parent.parent.parent / "Model"
+
+# Slot model: daftar kandidat (model, feature names) berurutan prioritas
+MODEL_SLOTS: Dict[str, List[Tuple[str, str]]] = {
+    "standard": [("model.pkl", "feature_names.pkl")],
+    "improved": [
+        ("model_improved.pkl", "feature_names_improved.pkl"),
+        ("model.pkl", "feature_names.pkl")
+    ],
+    # Model kandidat untuk shadow evaluation (lihat shadow_service)
+    "candidate": [("model_candidate.pkl", "feature_names_candidate.pkl")]
+}
+
+# Slot yang boleh kosong (file tidak ada bukan error)
+OPTIONAL_SLOTS = {"candidate"}
+
+
+class ModelBundle:
+    """
+    Satu versi model yang sudah dimuat dan di-warm.
+
+    Bundle bersifat immutable setelah dipublikasikan; artefak turunan per
+    service (encoder, lookup table) dibangun oleh warmer sebelum swap.
+    """
+
+    def __init__(
+        self,
+        slot: str,
+        version: str,
+        content_hash: str,
+        model: Any,
+        feature_names: Optional[List[str]],
+        model_path: Path,
+        feature_names_path: Optional[Path],
+        engine: str
+    ):
+        self.slot = slot
+        self.version = version
+        self.content_hash = content_hash
+        self.model = model
+        self.feature_names = feature_names
+        self.model_path = model_path
+        self.feature_names_path = feature_names_path
+        self.engine = engine
+        self.loaded_at = datetime.now()
+        self.artifacts: Dict[str, Any] = {}
+
+    def forest(self) -> Optional[FlatForest]:
+        """
+        View FlatForest dari model (untuk output per tree), dibangun sekali per bundle.
+
+        Returns:
+            FlatForest, atau None jika model bukan tree ensemble
+        """
+        if "flat_forest" not in self.artifacts:
+            if isinstance(self.model, FlatForest):
+                forest = self.model
+            elif hasattr(self.model, "estimators_") or hasattr(self.model, "tree_"):
+                forest = FlatForest.from_model(self.model)
+            else:
+                forest = None
+            self.artifacts["flat_forest"] = forest
+        return self.artifacts["flat_forest"]
+
+    def describe(self) -> Dict[str, Any]:
+        """Ringkasan bundle untuk API/logging."""
+        return {
+            "slot": self.slot,
+            "version": self.version,
+            "content_hash": self.content_hash,
+            "model_type": type(self.model).__name__,
+            "engine": self.engine,
+            "memory_mapped": bool(getattr(self.model, "memory_mapped", False)),
+            "model_path": str(self.model_path),
+            "feature_names_path": str(self.feature_names_path) if self.feature_names_path else None,
+            "total_features": len(self.feature_names) if self.feature_names is not None else None,
+            "loaded_at": self.loaded_at.isoformat(),
+            "artifacts": sorted(self.artifacts.keys())
+        }
+
+
+class ModelRegistry:
+    """
+    Registry model bersama untuk semua prediction service.
+
+    - Setiap slot menunjuk ke bundle aktif; service mengambil referensi bundle
+      sekali per prediksi, sehingga prediksi yang sedang berjalan tetap memakai
+      versi lama sampai selesai meskipun terjadi swap.
+    - Bundle di-cache berdasarkan content hash: file identik tidak dimuat ulang dan
+      beberapa slot/service berbagi satu instance model.
+    - Reload berjalan di background thread: load -> warm -> swap atomik.
+    """
+
+    def __init__(self, model_dir: Path = MODEL_DIR, slots: Dict[str, List[Tuple[str, str]]] = MODEL_SLOTS):
+        """
+        Args:
+            model_dir: Direktori artefak model
+            slots: Definisi slot -> kandidat (model file, feature names file)
+        """
+        self.model_dir = Path(model_dir)
+        self.slots = slots
+
+        self._lock = threading.RLock()
+        self._current: Dict[str, Optional[ModelBundle]] = {}
+        self._by_hash: Dict[str, ModelBundle] = {}
+        self._history: Dict[str, List[Dict[str, Any]]] = {slot: [] for slot in slots}
+        self._version_counter: Dict[str, int] = {slot: 0 for slot in slots}
+        self._warmers: Dict[str, Dict[str, Callable[[ModelBundle], Any]]] = {slot: {} for slot in slots}
+        self._reloading: Dict[str, threading.Thread] = {}
+        self._last_error: Dict[str, Optional[str]] = {}
+
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    # =========================================================================
+    # AKSES BUNDLE
+    # =========================================================================
+
+    def get(self, slot: str) -> Optional[ModelBundle]:
+        """
+        Mendapatkan bundle aktif untuk slot (dimuat sinkron saat pertama kali diminta).
+
+        Args:
+            slot: Nama slot (standard/improved)
+
+        Returns:
+            ModelBundle aktif atau None jika model tidak tersedia
+        """
+        bundle = self._current.get(slot)
+        if bundle is not None or slot in self._current:
+            return bundle
+
+        with self._lock:
+            if slot not in self._current:
+                self._load_slot(slot)
+            return self._current.get(slot)
+
+    def register_warmer(self, slot: str, name: str, warmer: Callable[[ModelBundle], Any]) -> None:
+        """
+        Mendaftarkan fungsi yang membangun artefak turunan untuk setiap bundle baru.
+
+        Warmer dijalankan sebelum bundle dipublikasikan, sehingga hasilnya sudah
+        siap (bundle.artifacts[name]) saat service pertama kali memakainya.
+
+        Args:
+            slot: Nama slot
+            name: Nama artefak (unik per service)
+            warmer: Fungsi bundle -> artefak
+        """
+        with self._lock:
+            self._warmers[slot][name] = warmer
+            # Terapkan juga ke bundle yang sudah aktif
+            bundle = self._current.get(slot)
+            if bundle is not None and name not in bundle.artifacts:
+                self._run_warmer(bundle, name, warmer)
+
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
+    def _resolve_files(self, slot: str) -> Tuple[Optional[Path], Optional[Path]]:
+        """Kandidat pertama yang file modelnya ada."""
+        if slot not in self.slots:
+            raise ValueError(f"Slot model tidak dikenal: {slot}")
+
+        for model_file, feature_file in self.slots[slot]:
+            model_path = self.model_dir / model_file
+            if (model_path.exists() or get_flat_model_path(model_path).exists()
+                    or get_mmap_model_path(model_path).exists()):
+                feature_path = self.model_dir / feature_file if feature_file else None
+                return model_path, feature_path if feature_path is not None and feature_path.exists() else None
+        return None, None
+
+    def _artifact_path(self, model_path: Path) -> Tuple[Path, str]:
+        """
+        File yang benar-benar dimuat sesuai PREDICTION_ENGINE.
+
+        Untuk engine flat, layout direktori mmap (model.flat/) diutamakan karena
+        array-nya dibagi lewat page cache antar worker; .flat.npz dimuat penuh per proses.
+        """
+        if PREDICTION_ENGINE == 'flat':
+            mmap_path = get_mmap_model_path(model_path)
+            if (mmap_path / "metadata.json").exists():
+                return mmap_path, 'flat'
+            flat_path = get_flat_model_path(model_path)
+            if flat_path.exists():
+                return flat_path, 'flat'
+            logger.warning(
+                f"PREDICTION_ENGINE=flat tetapi {mmap_path.name}/ atau {flat_path.name} tidak ditemukan, "
+                f"fallback ke scikit-learn (jalankan export_flat_model.py)"
+            )
+        return model_path, 'sklearn'
+
+    @staticmethod
+    def _expand(path: Path) -> List[Path]:
+        """File penyusun artefak (direktori mmap -> semua file di dalamnya)."""
+        return sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+
+    @classmethod
+    def _hash_files(cls, paths: List[Optional[Path]]) -> str:
+        """SHA-256 gabungan isi file (menentukan identitas versi)."""
+        digest = hashlib.sha256()
+        for path in paths:
+            if path is None:
+                digest.update(b"<none>")
+                continue
+            for file in cls._expand(path):
+                if file != path:
+                    # Nama file di dalam direktori artefak ikut menentukan identitas
+                    digest.update(file.name.encode())
+                with open(file, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def file_signature(self, slot: str) -> Tuple:
+        """Signature murah (path, mtime, size) untuk deteksi perubahan oleh watcher."""
+        model_path, feature_path = self._resolve_files(slot)
+        if model_path is None:
+            return ()
+        artifact_path, _ = self._artifact_path(model_path)
+        signature = []
+        for path in (artifact_path, feature_path):
+            if path is None or not path.exists():
+                continue
+            for file in self._expand(path):
+                stat = file.stat()
+                signature.append((str(file), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _run_warmer(self, bundle: ModelBundle, name: str, warmer: Callable[[ModelBundle], Any]) -> None:
+        try:
+            bundle.artifacts[name] = warmer(bundle)
+        except Exception as e:
+            logger.error(f"Warmer '{name}' gagal untuk {bundle.slot} {bundle.version}: {e}")
+            bundle.artifacts[name] = None
+
+    def _build_bundle(self, slot: str) -> Optional[ModelBundle]:
+        """
+        Memuat dan warm bundle untuk slot tanpa mempublikasikannya.
+
+        Returns:
+            Bundle baru, bundle yang sudah ada (hash sama), atau None jika tidak ada file
+        """
+        model_path, feature_path = self._resolve_files(slot)
+        if model_path is None:
+            log = logger.info if slot in OPTIONAL_SLOTS else logger.error
+            log(f"Model file untuk slot '{slot}' tidak ditemukan di {self.model_dir}")
+            return None
+
+        artifact_path, engine = self._artifact_path(model_path)
+        content_hash = self._hash_files([artifact_path, feature_path])
+
+        with self._lock:
+            cached = self._by_hash.get(content_hash)
+        if cached is not None:
+            logger.info(f"Model slot '{slot}' reuse instance {cached.version} ({content_hash[:12]})")
+            bundle = cached
+        else:
+            logger.info(f"Loading model for slot '{slot}' from: {artifact_path}")
+            model = FlatForest.load(artifact_path) if engine == 'flat' else joblib.load(artifact_path)
+            feature_names = list(joblib.load(feature_path)) if feature_path is not None else None
+
+            with self._lock:
+                self._version_counter[slot] += 1
+                version = f"v{self._version_counter[slot]}"
+
+            bundle = ModelBundle(slot, version, content_hash, model, feature_names,
+                                 model_path, feature_path, engine)
+            self._warm_model(bundle)
+
+        # Artefak per service (encoder, lookup table) untuk warmer yang belum punya
+        for name, warmer in list(self._warmers[slot].items()):
+            if name not in bundle.artifacts:
+                self._run_warmer(bundle, name, warmer)
+
+        return bundle
+
+    @staticmethod
+    def _warm_model(bundle: ModelBundle) -> None:
+        """Satu prediksi dummy agar lazy init model (thread pool, cache) terjadi sebelum swap."""
+        n_features = getattr(bundle.model, 'n_features_in_', None)
+        if not n_features:
+            return
+        try:
+            predict_rows(bundle.model, np.zeros((1, n_features)))
+        except Exception as e:
+            logger.warning(f"Warm-up prediction gagal untuk {bundle.slot} {bundle.version}: {e}")
+
+    def _publish(self, slot: str, bundle: Optional[ModelBundle]) -> bool:
+        """Swap atomik bundle aktif. Returns True jika versi berubah."""
+        with self._lock:
+            previous = self._current.get(slot)
+            self._current[slot] = bundle
+            if bundle is None:
+                return previous is not None
+
+            self._by_hash[bundle.content_hash] = bundle
+            changed = previous is None or previous.content_hash != bundle.content_hash
+            if changed:
+                self._history[slot].append({
+                    "version": bundle.version,
+                    "content_hash": bundle.content_hash,
+                    "model_path": str(bundle.model_path),
+                    "activated_at": datetime.now().isoformat()
+                })
+                del self._history[slot][:-MODEL_REGISTRY_HISTORY]
+                self._evict_unused()
+            return changed
+
+    def _evict_unused(self) -> None:
+        """Buang instance yang tidak aktif dan tidak ada di riwayat terbaru."""
+        keep = {b.content_hash for b in self._current.values() if b is not None}
+        for history in self._history.values():
+            keep.update(h["content_hash"] for h in history)
+        for content_hash in list(self._by_hash):
+            if content_hash not in keep:
+                del self._by_hash[content_hash]
+
+    def _load_slot(self, slot: str) -> Dict[str, Any]:
+        """Load + warm + publish satu slot (dipanggil di background thread atau sinkron)."""
+        started = time.perf_counter()
+        try:
+            bundle = self._build_bundle(slot)
+            if bundle is None and self._current.get(slot) is not None:
+                # File hilang sementara (misal sedang ditulis ulang): pertahankan versi aktif
+                return {"slot": slot, "status": "unchanged", "message": "Model file tidak ditemukan"}
+
+            changed = self._publish(slot, bundle)
+            self._last_error[slot] = None
+            status = "activated" if changed else "unchanged"
+            if bundle is not None and changed:
+                logger.info(
+                    f"Model slot '{slot}' activated {bundle.version} ({bundle.content_hash[:12]}) "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            return {
+                "slot": slot,
+                "status": status if bundle is not None else "unavailable",
+                "bundle": bundle.describe() if bundle is not None else None
+            }
+        except Exception as e:
+            self._last_error[slot] = str(e)
+            logger.error(f"Failed to load model slot '{slot}': {e}")
+            # Tetap tandai slot sudah dicoba agar get() tidak mengulang load setiap request
+            with self._lock:
+                self._current.setdefault(slot, None)
+            return {"slot": slot, "status": "failed", "message": str(e)}
+
+    def reload(self, slot: Optional[str] = None, wait: bool = False) -> List[Dict[str, Any]]:
+        """
+        Reload slot di background (load -> warm -> swap atomik).
+
+        Args:
+            slot: Nama slot (None = semua slot)
+            wait: Tunggu sampai reload selesai dan kembalikan hasilnya
+
+        Returns:
+            List status per slot
+        """
+        slots = [slot] if slot else list(self.slots)
+        for name in slots:
+            if name not in self.slots:
+                raise ValueError(f"Slot model tidak dikenal: {name}")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        threads = []
+
+        for name in slots:
+            with self._lock:
+                running = self._reloading.get(name)
+                if running is not None and running.is_alive():
+                    results[name] = {"slot": name, "status": "in_progress"}
+                    threads.append((name, running))
+                    continue
+
+                def run(slot_name=name):
+                    results[slot_name] = self._load_slot(slot_name)
+
+                thread = threading.Thread(target=run, name=f"model-reload-{name}", daemon=True)
+                self._reloading[name] = thread
+                thread.start()
+                threads.append((name, thread))
+
+        if not wait:
+            return [results.get(name, {"slot": name, "status": "scheduled"}) for name in slots]
+
+        for _, thread in threads:
+            thread.join()
+        return [results.get(name, {"slot": name, "status": "unchanged"}) for name in slots]
+
+    def load_files(self, slot: str, model_path: Path, feature_names_path: Optional[Path]) -> Optional[ModelBundle]:
+        """
+        Memuat slot dari file tertentu secara sinkron (untuk script evaluasi/benchmark).
+
+        Args:
+            slot: Nama slot
+            model_path: Path model .pkl
+            feature_names_path: Path feature names .pkl
+
+        Returns:
+            Bundle yang diaktifkan
+        """
+        with self._lock:
+            feature_file = str(feature_names_path) if feature_names_path is not None else ""
+            self.slots = {**self.slots, slot: [(str(model_path), feature_file)]}
+            self._warmers.setdefault(slot, {})
+            self._history.setdefault(slot, [])
+            self._version_counter.setdefault(slot, 0)
+        self._load_slot(slot)
+        return self._current.get(slot)
+
+    # =========================================================================
+    # WATCHER
+    # =========================================================================
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Memantau direktori Model/ dan reload slot yang file-nya berubah.
+
+        Perubahan baru diproses setelah signature file stabil selama satu interval
+        agar file yang masih ditulis (training sedang menyimpan) tidak dimuat.
+
+        Args:
+            interval: Interval polling (detik); <= 0 menonaktifkan watcher
+        """
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="model-registry-watcher", daemon=True
+        )
+        self._watcher.start()
+        logger.info(f"Model registry watching {self.model_dir} every {interval}s")
+
+    def stop_watcher(self) -> None:
+        """Menghentikan watcher."""
+        self._watcher_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch_loop(self, interval: float) -> None:
+        seen = {slot: self.file_signature(slot) for slot in self.slots}
+        pending: Dict[str, Tuple] = {}
+
+        while not self._watcher_stop.wait(interval):
+            for slot in list(self.slots):
+                try:
+                    signature = self.file_signature(slot)
+                except Exception as e:
+                    logger.warning(f"Watcher gagal membaca file slot '{slot}': {e}")
+                    continue
+
+                if signature == seen.get(slot):
+                    pending.pop(slot, None)
+                    continue
+
+                if pending.get(slot) != signature:
+                    # Tunggu satu interval lagi sampai file stabil
+                    pending[slot] = signature
+                    continue
+
+                logger.info(f"Model files changed for slot '{slot}', reloading in background")
+                seen[slot] = signature
+                pending.pop(slot, None)
+                self.reload(slot)
+
+    # =========================================================================
+    # STATUS
+    # =========================================================================
+
+    def status(self) -> Dict[str, Any]:
+        """Status registry: bundle aktif, riwayat versi, reload berjalan."""
+        with self._lock:
+            return {
+                "model_dir": str(self.model_dir),
+                "engine": PREDICTION_ENGINE,
+                "watching": self._watcher is not None and self._watcher.is_alive(),
+                "cached_instances": len(self._by_hash),
+                "slots": {
+                    slot: {
+                        "active": self._current[slot].describe() if self._current.get(slot) else None,
+                        "history": list(self._history.get(slot, [])),
+                        "reloading": bool(self._reloading.get(slot) and self._reloading[slot].is_alive()),
+                        "last_error": self._last_error.get(slot)
+                    }
+                    for slot in self.slots
+                }
+            }
+
+
+# Global instance (dipakai bersama oleh PredictionService & EnhancedPredictionService)
+model_registry = ModelRegistry()
@@ -0,0 +1,536 @@
+"""
+Prediction Log Service
+Audit log prediksi yang dilayani (tabel prediction_log) dengan writer batch
+asinkron, query log, dan back-test akurasi terhadap durasi perbaikan aktual
+di riwayat perbaikan (RIWAYAT_PERBAIKAN)
+"""
+
+import hashlib
+import json
+import math
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from psycopg2 import DataError, IntegrityError
+from psycopg2.extras import execute_values
+
+from config import (
+    PREDICTION_LOG_ENABLED,
+    PREDICTION_LOG_BATCH_SIZE,
+    PREDICTION_LOG_FLUSH_SECONDS,
+    PREDICTION_LOG_MAX_BUFFER,
+    PREDICTION_LOG_QUERY_LIMIT,
+    PREDICTION_LOG_BACKTEST_MAX_ROWS,
+    PREDICTION_INTERVAL_QUANTILES
+)
+from src.utils.logger import get_logger
+from src.utils.batch_writer import BatchWriter
+from src.services.database_service import db_service
+from src.services.feature_encoder import ReasonColumnIndex
+from src.services.model_registry import ModelBundle, MODEL_DIR
+from src.services.reason_matcher import reason_matcher
+
+logger = get_logger(__name__)
+
+# Riwayat perbaikan dengan durasi aktual (kolom DURATION_MINUTES)
+REPAIR_HISTORY_FILE = MODEL_DIR / "RIWAYAT_PERBAIKAN_REALISTIC.csv"
+
+# Token yang muncul di hampir semua ISSUE dan tidak membedakan kerusakan
+BACKTEST_IGNORED_TOKENS = {"FLEXO", "104", "MESIN", "ABNORMAL", "PROBLEM", "NONE"}
+
+# Panjang maksimum kolom teks (migrations/003_create_prediction_log.sql);
+# reason dibatasi agar input sembarang tidak membengkakkan tabel
+MAX_SOURCE_LENGTH = 32
+MAX_SHIFT_LENGTH = 16
+MAX_SLOT_LENGTH = 32
+MAX_VERSION_LENGTH = 16
+MAX_REASON_LENGTH = 256
+
+INTERVAL_LOW_KEY = f"p{min(PREDICTION_INTERVAL_QUANTILES):g}"
+INTERVAL_HIGH_KEY = f"p{max(PREDICTION_INTERVAL_QUANTILES):g}"
+
+
+def _clip(value: Any, length: int) -> Optional[str]:
+    """Teks ter-strip dan dipotong ke panjang kolom; None untuk nilai kosong."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text[:length] if text else None
+
+
+def input_hash(data: Dict[str, Any]) -> str:
+    """
+    Hash input prediksi (urutan key tidak berpengaruh).
+
+    Args:
+        data: Dictionary input prediksi
+
+    Returns:
+        blake2b 64-bit dalam hex (16 karakter)
+    """
+    canonical = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class PredictionLogService:
+    """
+    Service untuk mencatat setiap prediksi yang dilayani dan membacanya kembali.
+
+    record() hanya menambahkan tuple ke buffer BatchWriter; hashing input,
+    resolusi reason, dan INSERT dilakukan oleh background writer dalam satu
+    statement per batch.
+    """
+
+    def __init__(self, enabled: bool = PREDICTION_LOG_ENABLED):
+        """
+        Args:
+            enabled: Nonaktifkan untuk tidak mencatat apa pun
+        """
+        self.enabled = enabled
+        self.writer = BatchWriter(
+            name="prediction-log",
+            flush_fn=self._write_records,
+            batch_size=PREDICTION_LOG_BATCH_SIZE,
+            flush_interval=PREDICTION_LOG_FLUSH_SECONDS,
+            max_buffer=PREDICTION_LOG_MAX_BUFFER
+        )
+        self._repair_cache: Optional[Tuple[Tuple[str, float], List[Dict[str, Any]]]] = None
+        self._repair_lock = threading.Lock()
+
+    # =========================================================================
+    # PENCATATAN (JALUR REQUEST)
+    # =========================================================================
+
+    def record(
+        self,
+        source: str,
+        slot: str,
+        bundle: Optional[ModelBundle],
+        real_time_data: Dict[str, Any],
+        result: Dict[str, Any],
+        latency_ms: float
+    ) -> None:
+        """
+        Mencatat satu prediksi (non-blocking, ditulis batch di background).
+
+        Args:
+            source: Pemicu prediksi (api, health_auto_trigger, ...)
+            slot: Slot model registry yang melayani
+            bundle: Bundle model yang melayani (None jika model tidak tersedia)
+            real_time_data: Input prediksi
+            result: Hasil prediksi (format predict_downtime)
+            latency_ms: Waktu layanan prediksi (ms)
+        """
+        if not self.enabled:
+            return
+        self.writer.append((
+            datetime.now(timezone.utc),
+            source,
+            slot,
+            bundle.version if bundle is not None else None,
+            bundle.content_hash[:12] if bundle is not None else None,
+            dict(real_time_data),
+            bool(result.get('success')),
+            result.get('prediction'),
+            result.get('prediction_interval'),
+            float(latency_ms)
+        ))
+
+    def flush(self) -> int:
+        """Menulis semua record yang masih di buffer. Returns jumlah record."""
+        return self.writer.flush()
+
+    def stop(self) -> None:
+        """Menghentikan background writer dengan flush terakhir."""
+        self.writer.stop()
+
+    @staticmethod
+    def _to_rows(records: List[Tuple]) -> List[Tuple]:
+        """
+        Mengubah record buffer menjadi baris insert prediction_log.
+
+        Kolom teks dipotong ke panjang kolom sehingga satu input yang terlalu
+        panjang tidak menggagalkan INSERT seluruh batch.
+
+        Args:
+            records: List tuple dari record()
+
+        Returns:
+            List tuple sesuai urutan kolom INSERT
+        """
+        rows = []
+        for created_at, source, slot, version, model_hash, data, success, prediction, interval, latency in records:
+            raw_reason = data.get('reason')
+            reason = _clip(str(raw_reason).upper(), MAX_REASON_LENGTH) if raw_reason else None
+            interval = interval or {}
+            rows.append((
+                created_at,
+                _clip(source, MAX_SOURCE_LENGTH),
+                input_hash(data),
+                reason,
+                reason_matcher.match(reason).mapped_reason if reason else None,
+                _clip(data.get('shift'), MAX_SHIFT_LENGTH),
+                _clip(slot, MAX_SLOT_LENGTH),
+                _clip(version, MAX_VERSION_LENGTH),
+                model_hash,
+                success,
+                float(prediction) if prediction is not None else None,
+                interval.get(INTERVAL_LOW_KEY),
+                interval.get(INTERVAL_HIGH_KEY),
+                round(latency, 3)
+            ))
+        return rows
+
+    def _write_records(self, records: List[Tuple]) -> int:
+        """
+        Flush callback: insert semua record batch dalam satu statement.
+
+        Jika statement batch ditolak karena data tidak valid, baris dimasukkan
+        satu per satu dan hanya baris yang ditolak yang dibuang (tidak diulang
+        oleh writer).
+
+        Returns:
+            Jumlah record yang ditolak database
+        """
+        rows = self._to_rows(records)
+        if not rows:
+            return 0
+
+        query = """
+            INSERT INTO prediction_log (
+                created_at, source, input_hash, reason, mapped_reason, shift,
+                model_slot, model_version, model_hash, success,
+                prediction, interval_low, interval_high, latency_ms
+            ) VALUES %s
+        """
+
+        rejected = 0
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                try:
+                    execute_values(cursor, query, rows, page_size=1000)
+                except (DataError, IntegrityError) as e:
+                    conn.rollback()
+                    logger.warning(f"Prediction log batch rejected ({e.__class__.__name__}), inserting rows individually")
+                    rejected = self._insert_isolated(cursor, query, rows)
+            conn.commit()
+
+        logger.debug(f"Persisted {len(rows) - rejected} prediction log records")
+        return rejected
+
+    @staticmethod
+    def _insert_isolated(cursor, query: str, rows: List[Tuple]) -> int:
+        """
+        Insert baris satu per satu dalam savepoint; baris yang ditolak dilewati.
+
+        Returns:
+            Jumlah baris yang ditolak
+        """
+        rejected = 0
+        for row in rows:
+            cursor.execute("SAVEPOINT prediction_log_row")
+            try:
+                execute_values(cursor, query, [row])
+                cursor.execute("RELEASE SAVEPOINT prediction_log_row")
+            except (DataError, IntegrityError) as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT prediction_log_row")
+                rejected += 1
+                logger.error(f"Dropped invalid prediction log record (source={row[1]}, "
+                             f"input_hash={row[2]}): {str(e).strip()[:200]}")
+        return rejected
+
+    def status(self) -> Dict[str, Any]:
+        """Counter writer (appended, written, dropped, ...) dan jumlah record tertunda."""
+        return {
+            "enabled": self.enabled,
+            "pending": self.writer.pending(),
+            **self.writer.stats
+        }
+
+    # =========================================================================
+    # QUERY
+    # =========================================================================
+
+    def get_log(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        source: Optional[str] = None,
+        reason: Optional[str] = None,
+        limit: int = PREDICTION_LOG_QUERY_LIMIT
+    ) -> Dict[str, Any]:
+        """
+        Mengambil record prediction_log terbaru dalam rentang waktu.
+
+        Args:
+            start: Awal rentang (default: 24 jam terakhir)
+            end: Akhir rentang (default: sekarang)
+            source: Filter sumber pemicu (opsional)
+            reason: Filter reason terjemahan (opsional, nama training data)
+            limit: Jumlah baris maksimum (terbaru lebih dulu)
+
+        Returns:
+            Dictionary berisi record dan rentang query
+        """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=1)
+
+        query = """
+            SELECT created_at, source, input_hash, reason, mapped_reason, shift,
+                   model_slot, model_version, model_hash, success,
+                   prediction, interval_low, interval_high, latency_ms
+            FROM prediction_log
+            WHERE created_at >= %s AND created_at < %s
+        """
+        params: List[Any] = [start, end]
+        if source:
+            query += " AND source = %s"
+            params.append(source)
+        if reason:
+            query += " AND mapped_reason = %s"
+            params.append(reason_matcher.match(reason).mapped_reason)
+        query += " ORDER BY created_at DESC LIMIT %s"
+        params.append(int(limit))
+
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                columns = [desc[0] for desc in cursor.description]
+                rows = cursor.fetchall()
+
+        records = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            record['created_at'] = record['created_at'].isoformat()
+            records.append(record)
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "count": len(records),
+            "records": records
+        }
+
+    # =========================================================================
+    # BACK-TEST
+    # =========================================================================
+
+    def load_repairs(self, repair_file: Path = REPAIR_HISTORY_FILE) -> List[Dict[str, Any]]:
+        """
+        Memuat riwayat perbaikan dengan durasi aktual (di-cache per mtime file).
+
+        Args:
+            repair_file: CSV riwayat perbaikan (separator ';', kolom TANGGAL/Date,
+                ISSUE, DURATION_MINUTES)
+
+        Returns:
+            List kejadian {date, issue, mapped_reason, tokens, actual_minutes}
+
+        Raises:
+            FileNotFoundError: Jika file tidak ada
+            ValueError: Jika file tidak memiliki kolom durasi
+        """
+        signature = (str(repair_file), Path(repair_file).stat().st_mtime)
+        with self._repair_lock:
+            if self._repair_cache is not None and self._repair_cache[0] == signature:
+                return self._repair_cache[1]
+
+            df = pd.read_csv(repair_file, sep=';', encoding='utf-8-sig')
+            if 'DURATION_MINUTES' not in df.columns:
+                raise ValueError(f"{Path(repair_file).name} tidak memiliki kolom DURATION_MINUTES")
+            date_col = 'TANGGAL' if 'TANGGAL' in df.columns else 'Date'
+            df['Date'] = pd.to_datetime(df[date_col], format='%d/%m/%Y', errors='coerce')
+            df['DURATION_MINUTES'] = pd.to_numeric(df['DURATION_MINUTES'], errors='coerce')
+            df = df.dropna(subset=['Date', 'DURATION_MINUTES', 'ISSUE'])
+
+            repairs = []
+            for day, issue, minutes in zip(df['Date'], df['ISSUE'], df['DURATION_MINUTES']):
+                issue = str(issue).strip().upper()
+                repairs.append({
+                    "date": day.date(),
+                    "issue": issue,
+                    "mapped_reason": reason_matcher.match(issue).mapped_reason,
+                    "tokens": set(ReasonColumnIndex.tokenize(issue)) - BACKTEST_IGNORED_TOKENS,
+                    "actual_minutes": float(minutes)
+                })
+            self._repair_cache = (signature, repairs)
+            logger.info(f"Loaded {len(repairs)} repair events from {Path(repair_file).name}")
+            return repairs
+
+    def _fetch_predictions(
+        self,
+        start: datetime,
+        end: datetime,
+        source: Optional[str]
+    ) -> List[Tuple]:
+        """Prediksi sukses dalam rentang (created_at, mapped_reason, prediction, low, high, version)."""
+        query = """
+            SELECT created_at, mapped_reason, prediction, interval_low, interval_high, model_version
+            FROM prediction_log
+            WHERE success AND prediction IS NOT NULL
+              AND created_at >= %s AND created_at < %s
+        """
+        params: List[Any] = [start, end]
+        if source:
+            query += " AND source = %s"
+            params.append(source)
+        query += " ORDER BY created_at DESC LIMIT %s"
+        params.append(PREDICTION_LOG_BACKTEST_MAX_ROWS)
+
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+    @staticmethod
+    def match_repairs(
+        predictions: List[Tuple],
+        repairs: List[Dict[str, Any]],
+        window_days: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Memasangkan setiap kejadian perbaikan dengan prediksi yang paling relevan.
+
+        Kandidat adalah prediksi pada tanggal perbaikan atau hingga window_days
+        sebelumnya. Reason terjemahan yang sama dengan ISSUE diprioritaskan,
+        selanjutnya kemiripan token (Jaccard); seri diputus oleh prediksi
+        terbaru. Kejadian tanpa kandidat yang mirip tidak dipasangkan.
+
+        Args:
+            predictions: Tuple (created_at, mapped_reason, prediction, low, high, version)
+            repairs: Kejadian dari load_repairs()
+            window_days: Jumlah hari sebelum tanggal perbaikan yang ikut dicari
+
+        Returns:
+            List pasangan {date, issue, actual_minutes, predicted_minutes, ...};
+            predicted_minutes None untuk kejadian yang tidak terpasangkan
+        """
+        by_day: Dict[date, List[Tuple]] = {}
+        token_cache: Dict[str, set] = {}
+        for row in predictions:
+            by_day.setdefault(row[0].date(), []).append(row)
+
+        pairs = []
+        for repair in repairs:
+            best, best_key = None, None
+            for offset in range(window_days + 1):
+                for row in by_day.get(repair["date"] - timedelta(days=offset), ()):
+                    created_at, mapped_reason = row[0], row[1] or ''
+                    if mapped_reason == repair["mapped_reason"]:
+                        score = 2.0
+                    else:
+                        tokens = token_cache.get(mapped_reason)
+                        if tokens is None:
+                            tokens = token_cache[mapped_reason] = (
+                                set(ReasonColumnIndex.tokenize(mapped_reason)) - BACKTEST_IGNORED_TOKENS
+                            )
+                        union = tokens | repair["tokens"]
+                        score = len(tokens & repair["tokens"]) / len(union) if union else 0.0
+                    if score > 0 and (best_key is None or (score, created_at) > best_key):
+                        best, best_key = row, (score, created_at)
+
+            pair = {
+                "date": repair["date"].isoformat(),
+                "issue": repair["issue"],
+                "actual_minutes": repair["actual_minutes"],
+                "predicted_minutes": None
+            }
+            if best is not None:
+                created_at, mapped_reason, prediction, low, high, version = best
+                pair.update({
+                    "predicted_minutes": float(prediction),
+                    "predicted_at": created_at.isoformat(),
+                    "predicted_reason": mapped_reason,
+                    "interval_low": float(low) if low is not None else None,
+                    "interval_high": float(high) if high is not None else None,
+                    "model_version": version,
+                    "match_score": round(best_key[0], 3)
+                })
+            pairs.append(pair)
+        return pairs
+
+    @staticmethod
+    def summarize(pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Metrik akurasi dari pasangan back-test.
+
+        Args:
+            pairs: Hasil match_repairs()
+
+        Returns:
+            Dictionary MAE, RMSE, bias, cakupan interval, dan metrik per versi model
+        """
+        def metrics(items):
+            if not items:
+                return {"matched": 0}
+            errors = [p["predicted_minutes"] - p["actual_minutes"] for p in items]
+            with_interval = [p for p in items if p.get("interval_low") is not None and p.get("interval_high") is not None]
+            covered = sum(1 for p in with_interval if p["interval_low"] <= p["actual_minutes"] <= p["interval_high"])
+            return {
+                "matched": len(items),
+                "mae": round(sum(abs(e) for e in errors) / len(errors), 2),
+                "rmse": round(math.sqrt(sum(e * e for e in errors) / len(errors)), 2),
+                "bias": round(sum(errors) / len(errors), 2),
+                "interval_coverage": round(covered / len(with_interval), 4) if with_interval else None
+            }
+
+        matched = [p for p in pairs if p["predicted_minutes"] is not None]
+        versions: Dict[str, List[Dict[str, Any]]] = {}
+        for p in matched:
+            versions.setdefault(p.get("model_version") or "unknown", []).append(p)
+
+        return {
+            "repairs": len(pairs),
+            "unmatched": len(pairs) - len(matched),
+            **metrics(matched),
+            "by_model_version": {version: metrics(items) for version, items in sorted(versions.items())}
+        }
+
+    def backtest(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        source: Optional[str] = None,
+        window_days: int = 1,
+        include_pairs: bool = False,
+        repair_file: Path = REPAIR_HISTORY_FILE
+    ) -> Dict[str, Any]:
+        """
+        Back-test akurasi prediksi yang tercatat terhadap durasi perbaikan aktual.
+
+        Args:
+            start: Awal rentang kejadian perbaikan (default: 30 hari terakhir)
+            end: Akhir rentang (default: sekarang)
+            source: Hanya prediksi dari sumber ini (opsional)
+            window_days: Jumlah hari sebelum perbaikan untuk mencari prediksi
+            include_pairs: Sertakan daftar pasangan per kejadian
+            repair_file: CSV riwayat perbaikan
+
+        Returns:
+            Dictionary ringkasan metrik (dan pasangan jika diminta)
+        """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=30)
+
+        repairs = [r for r in self.load_repairs(repair_file) if start.date() <= r["date"] <= end.date()]
+        predictions = self._fetch_predictions(start - timedelta(days=window_days), end + timedelta(days=1), source)
+        pairs = self.match_repairs(predictions, repairs, window_days)
+
+        result = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "source": source,
+            "window_days": window_days,
+            "predictions_scanned": len(predictions),
+            "summary": self.summarize(pairs)
+        }
+        if include_pairs:
+            result["pairs"] = pairs
+        return result
+
+
+# Global instance
+prediction_log_service = PredictionLogService()
@@ -3,167 +3,38 @@ Prediction Service
 Service layer untuk machine learning predictions dengan feature engineering
 """
 
-import joblib
+import logging
+import threading
+import time
 import numpy as np
-import pandas as pd
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from config import (
+    PREDICTION_LOOKUP_TABLE, PREDICTION_LOOKUP_VERIFY_SAMPLES, PREDICTION_INTERVAL_QUANTILES, JOB_MAX_BATCH_ITEMS,
+    PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_MAX_ENTRIES
+)
 from src.utils.logger import get_logger
+from src.utils.single_flight import SingleFlight, freeze_key
+from src.services.feature_encoder import FeatureEncoder, predict_rows
+from src.services.forest_engine import FlatForest
+from src.services.reason_matcher import FMEA_SEVERITY_MAP, DEFAULT_SEVERITY, reason_matcher
+from src.services.model_registry import model_registry, ModelBundle, MODEL_DIR
+from src.services.job_executor import job_executor, Job, SharedArray
+from src.services.shadow_service import shadow_evaluator
+from src.services.prediction_log_service import prediction_log_service
 
 logger = get_logger(__name__)
 
 # Konstanta untuk perhitungan OEE
 TOTAL_SHIFT_TIME_MINUTES = 480.0  # 8 jam = 480 menit
 
-# ============================================================================
-# MAPPING FMEA SEVERITY (Skor S dari Analisis FMEA Tabel 4.5 Skripsi)
-# ============================================================================
-# Mapping dari Deskripsi Downtime ke Skor Severity (S) FMEA
-# Skor 1-10: 1=sangat ringan, 10=sangat parah/berbahaya
-# CATATAN: Harus sinkron dengan FMEA_SEVERITY_MAP di train_model.py
-FMEA_SEVERITY_MAP = {
-    # PRE-FEEDER UNIT FAILURES
-    'BELT CONVEYOR SLIP': 7,
-    'PENUMPUKAN KARTON TIDAK RATA': 7,
-    'SENSOR TIDAK MENDETEKSI LEMBARAN': 8,
-    
-    # FEEDER UNIT FAILURES
-    'FEEDER UNIT TROUBLE MEKANIK': 8,
-    'FEEDER UNIT TROUBLE ELEKTRIK': 8,
-    'VACUM KURANG': 8,
-    'VACUUM KURANG': 8,
-    'SHEET NYANGKUT/ MACET': 7,
-    'LEMBARAN TIDAK TERAMBIL': 8,
-    
-    # PRINTING UNIT FAILURES
-    'PRINTING UNIT TROUBLE MEKANIK': 9,
-    'PRINTING UNIT TROUBLE ELEKTRIK': 9,
-    'REGISTER GESER': 9,
-    'PRINT BLOBOR': 9,
-    'PRINTING BOTAK': 8,
-    'PRINT LARI': 8,
-    'PRINT BLUR': 8,
-    'TINTA BOCOR': 8,
-    'LIMBAH TINTA BANJIR': 8,
-    'WARNA TIDAK SESUAI': 7,
-    'WARNA LUNTUR': 7,
-    'TINTA TIDAK KONSISTEN': 8,
-    'ANILOX ROLLER TERSUMBAT': 8,
-    
-    # SLOTTER & CREASING UNIT FAILURES
-    'SLOTTER UNIT TROUBLE MEKANIK': 8,
-    'SLOTTER UNIT TROUBLE ELEKTRIK': 9,
-    'SLOTER LARI': 8,
-    'SLOTTER LARI': 8,
-    'SLOTTER MIRING': 8,
-    'SLOTTER PECAH': 9,
-    'PISAU TUMPUL': 8,
-    'CREASING PECAH': 9,
-    'CREASING LARI': 8,
-    'CREASING MIRING': 8,
-    'ROLLER CREASING AUS': 8,
-    
-    # DIE-CUT UNIT FAILURES
-    'DIECUT UNIT TROUBLE MEKANIK': 8,
-    'DIECUT UNIT TROUBLE ELEKTRIK': 9,
-    'DIECUT LARI': 8,
-    'DIECUT PECAH': 9,
-    'DIECUT TIDAK PUTUS': 8,
-    'DIECUT MIRING': 8,
-    
-    # STACKER UNIT FAILURES
-    'STACKER TROUBLE MEKANIK': 6,
-    'STACKER TROUBLE ELEKTRIK': 9,
-    'COUNTER PROBLEM': 6,
-    'SENSOR PENGHITUNG ERROR': 6,
-    'PNEUMATIC LEMAH': 6,
-    'CONVEYOR SLIP': 6,
-    
-    # PLATE & SETUP ISSUES
-    'LAP KLISE (Plate)': 4,
-    'MOUNTING PLATE (during operati': 5,
-    'GANTI/PASANG PISAU SLOTTER': 5,
-    'PLATE CYLINDER TIDAK SEJAJAR': 9,
-    
-    # MATERIAL & SUPPLY ISSUES
-    'TUNGGU TINTA': 6,
-    'TUNGGU BAHAN SHEETS': 6,
-    'CARI BAHAN SHEETS': 6,
-    'TUNGGU KLISE (Plate)': 6,
-    'CHEMICAL PROBLEM>OTHERS': 7,
-    
-    # OPERATIONAL & MAINTENANCE
-    'SETTING TIME': 3,
-    'ADJUST TINTA': 4,
-    'REPAIR RINGAN BY OPERATOR': 5,
-    'MECHANICAL REPAIR>OTHER': 6,
-    'BUANG SAMPAH': 2,
-    'CUCI MESIN': 3,
-    'RAPIH SHIFT': 2,
-    'BRIEFING': 1,
-    'SHOLAT JUMAT': 1,
-    'ISTIRAHAT': 1,
-    
-    # PLANNED DOWNTIME
-    'TIDAK ADA SHIFT': 1,
-    'OFF TIME LIBUR NASIONAL': 1,
-    'TUNGGU ORDER': 2,
-    'SCHEDULED PREVENTIVE MAINTENANCE': 2,
-    'OVERHAUL': 3,
-    
-    # QUALITY REJECTION ISSUES
-    'REJECT SETTING': 7,
-    'OTHERS REJECTED SHEETS': 7,
-    'REJECTED KARTON': 7,
-    
-    # OTHERS & DEFAULT
-    'OTHERS': 5,
-    '_NONE_': 1,
-}
-
-# Skor default jika deskripsi tidak ditemukan di map
-DEFAULT_SEVERITY = 5
-
-# ============================================================================
-# KAMUS PENERJEMAH: Sensor Error Names -> Training Data Names
-# ============================================================================
-# Memetakan nama error dari sensor_simulator.py (kiri) ke nama dari
-# data training CSV (kanan). Ini memungkinkan sensor real-time menggunakan
-# nama yang berbeda dari data historis.
-SENSOR_TO_TRAINING_MAP = {
-    # Format: "SENSOR_ERROR_NAME": "TRAINING_DATA_NAME"
-    
-    # Mechanical Issues
-    "SLOTTER_MISALIGNMENT": "SLOTER LARI",
-    "CREASING_CRACK": "CREASING PECAH",
-    "CREASING_MISALIGNMENT": "CREASING MIRING",
-    "DIECUT_CRACK": "DIECUT PECAH",
-    "DIECUT_MISALIGNMENT": "DIECUT LARI",
-    
-    # Printing Issues
-    "INK_BLOBBING": "PRINT BLOBOR",
-    "PRINT_GHOSTING": "PRINTING BOTAK",
-    "PRINT_BLUR": "PRINT BLUR",
-    "WARNA_TIDAK_SESUAI": "WARNA TIDAK SESUAI",
-    
-    # Electrical Issues
-    "FEEDER_JAM_ELEC": "FEEDER UNIT TROUBLE ELEKTRIK",
-    "PRINTING_UNIT_ELEC_FAULT": "PRINTING UNIT TROUBLE ELEKTRIK",
-    "SLOTTER_UNIT_ELEC_FAULT": "SLOTTER UNIT TROUBLE ELEKTRIK",
-    
-    # Mechanical Failures
-    "FEEDER_JAM_MECH": "FEEDER UNIT TROUBLE MEKANIK",
-    "PRINTING_UNIT_MECH_FAULT": "PRINTING UNIT TROUBLE MEKANIK",
-    "SLOTTER_UNIT_MECH_FAULT": "SLOTTER UNIT TROUBLE MEKANIK",
-    
-    # Other Issues
-    "INK_LEAK": "LIMBAH TINTA BANJIR",
-    "WAITING_INK": "TUNGGU TINTA",
-    
-    # Fallback
-    "_NONE_": "_NONE_",
-    "": "_NONE_"
-}
+# Single-flight bersama semua instance PredictionService (hanya hasil sukses di-cache)
+prediction_coalescer = SingleFlight(
+    "prediction_service", PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_MAX_ENTRIES,
+    cacheable=lambda result: result.get('success', False)
+)
 
 
 def get_fmea_severity_from_reason(reason: str) -> int:
@@ -192,84 +63,332 @@ def get_fmea_severity_from_reason(reason: str) -> int:
     return DEFAULT_SEVERITY
 
 
+def pinned_state(method):
+    """Decorator: jalankan method dengan snapshot ServingState yang tetap selama pemanggilan."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._pin_state():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ServingState:
+    """
+    Model dan artefak turunan PredictionService untuk satu versi model registry.
+    
+    Dibangun sekali per versi (warmer registry) sebelum versi tersebut diaktifkan,
+    sehingga model, feature names, encoder, dan lookup table selalu konsisten.
+    """
+    
+    def __init__(self, bundle: ModelBundle):
+        """
+        Args:
+            bundle: Bundle model dari registry
+        """
+        self.bundle = bundle
+        self.version = bundle.version
+        self.model = bundle.model
+        self.feature_names = list(bundle.feature_names) if bundle.feature_names is not None else None
+        self.model_path = bundle.model_path
+        self.feature_names_path = bundle.feature_names_path
+        self.feature_encoder = None
+        self.prediction_table = None
+        # Output per tree untuk interval prediksi (None jika model bukan tree ensemble)
+        self.forest = None
+        # key -> (std, q_1, ..., q_k) untuk ruang input yang sama dengan prediction_table
+        self.interval_table = None
+
+
 class PredictionService:
     """Service untuk machine learning predictions dan model management."""
     
+    # Slot registry yang dilayani service ini
+    MODEL_SLOT = "standard"
+    
     def __init__(self):
-        """Initialize prediction service dan load model."""
-        self.model = None
-        self.feature_names = None
-        self.model_loaded = False
-        self.model_path = self._get_model_path()
-        self.feature_names_path = self._get_feature_names_path()
-        self._load_model()
-        self._load_feature_names()
+        """Initialize prediction service dan load model melalui model registry."""
+        self._pinned = threading.local()
+        model_registry.register_warmer(self.MODEL_SLOT, "prediction_service", self._build_serving_state)
+        
+        state = self.current_state()
+        if state is None:
+            logger.error("Model tidak tersedia untuk PredictionService")
+        else:
+            logger.info(f"PredictionService using model {state.version} ({type(state.model).__name__})")
+    
+    # =========================================================================
+    # SERVING STATE (snapshot per request)
+    # =========================================================================
     
-    def _get_model_path(self) -> Path:
+    def current_state(self) -> Optional[ServingState]:
         """
-        Mendapatkan path ke file model.
+        State serving yang berlaku untuk thread ini.
+        
+        Di dalam request (lihat _pin_state) state di-snapshot sekali, sehingga
+        prediksi yang sedang berjalan tetap memakai versi lama walaupun registry
+        melakukan hot reload di tengah request.
         
         Returns:
-            Path ke model.pkl
+            ServingState atau None jika model tidak tersedia
         """
-        # Backend/src/services -> Backend -> Parent -> Model
-        current_dir = Path(__file__).resolve().parent
-        backend_dir = current_dir.parent.parent  # Backend directory
-        model_path = backend_dir.parent / "Model" / "model.pkl"
-        return model_path
+        pinned = getattr(self._pinned, 'state', None)
+        if pinned is not None:
+            return pinned
+        bundle = model_registry.get(self.MODEL_SLOT)
+        if bundle is None:
+            return None
+        return bundle.artifacts.get("prediction_service")
+    
+    @contextmanager
+    def _pin_state(self, state: Optional[ServingState] = None):
+        """Snapshot state aktif (atau state tertentu) untuk durasi satu pemanggilan publik."""
+        if getattr(self._pinned, 'state', None) is not None:
+            yield self._pinned.state
+            return
+        self._pinned.state = state or self.current_state()
+        try:
+            yield self._pinned.state
+        finally:
+            self._pinned.state = None
+    
+    @property
+    def model(self):
+        state = self.current_state()
+        return state.model if state is not None else None
+    
+    @property
+    def model_loaded(self) -> bool:
+        return self.current_state() is not None
+    
+    @property
+    def feature_names(self) -> Optional[List[str]]:
+        state = self.current_state()
+        return state.feature_names if state is not None else None
     
-    def _get_feature_names_path(self) -> Path:
+    @property
+    def feature_encoder(self) -> Optional[FeatureEncoder]:
+        state = self.current_state()
+        return state.feature_encoder if state is not None else None
+    
+    @property
+    def prediction_table(self) -> Optional[Dict]:
+        state = self.current_state()
+        return state.prediction_table if state is not None else None
+    
+    @property
+    def model_path(self) -> Path:
+        state = self.current_state()
+        return state.model_path if state is not None else MODEL_DIR / "model.pkl"
+    
+    @property
+    def feature_names_path(self) -> Path:
+        state = self.current_state()
+        if state is not None and state.feature_names_path is not None:
+            return state.feature_names_path
+        return MODEL_DIR / "feature_names.pkl"
+    
+    def _build_serving_state(self, bundle: ModelBundle) -> ServingState:
         """
-        Mendapatkan path ke file feature names.
+        Warmer registry: membangun encoder dan lookup table untuk bundle baru.
         
+        Args:
+            bundle: Bundle model yang akan diaktifkan
+            
         Returns:
-            Path ke feature_names.pkl
+            ServingState siap pakai
         """
-        current_dir = Path(__file__).resolve().parent
-        backend_dir = current_dir.parent.parent  # Backend directory
-        feature_names_path = backend_dir.parent / "Model" / "feature_names.pkl"
-        return feature_names_path
-    
-    def _load_model(self) -> None:
-        """Load model dari file dengan error handling."""
+        state = ServingState(bundle)
+        if state.feature_names is None:
+            logger.warning("Feature names tidak tersedia, model akan menggunakan mode fallback (2 fitur sederhana)")
+        else:
+            logger.info(f"Feature names loaded successfully! Total features: {len(state.feature_names)}")
+        
+        self._build_feature_encoder(state)
         try:
-            logger.info(f"Loading model from: {self.model_path}")
+            state.forest = bundle.forest()
+        except Exception as e:
+            logger.warning(f"Per-tree output tidak tersedia, interval prediksi dinonaktifkan: {e}")
+        self._build_prediction_table(state)
+        return state
+    
+    def _resolve_reason(self, reason: str):
+        """
+        Menerjemahkan reason sensor ke nama training data dan menghitung severity-nya.
+        
+        Args:
+            reason: Reason uppercase dari sensor/client
             
-            if not self.model_path.exists():
-                raise FileNotFoundError(f"Model file tidak ditemukan: {self.model_path}")
+        Returns:
+            Tuple (reason terjemahan, FMEA severity)
+        """
+        # Sensor simulator menggunakan nama seperti "SLOTTER_MISALIGNMENT",
+        # training data menggunakan nama seperti "SLOTER LARI"; terjemahan dan
+        # severity diselesaikan dalam satu scan automaton
+        match = reason_matcher.match(reason)
+        if match.fmea_severity is None:
+            logger.warning(
+                f"FMEA Severity tidak ditemukan untuk reason '{match.mapped_reason}', using default={DEFAULT_SEVERITY}"
+            )
+        return match.mapped_reason, match.severity
+    
+    def _build_feature_encoder(self, state: ServingState) -> None:
+        """Membangun encoder fitur pra-indeks setelah model dan feature names dimuat."""
+        state.feature_encoder = None
+        if state.feature_names is None:
+            return
+        
+        feature_names = list(state.feature_names)
+        model_features = getattr(state.model, 'feature_names_in_', None)
+        if model_features is not None and list(model_features) != feature_names:
+            # Ikuti urutan kolom saat model di-fit agar input ndarray tetap sejajar
+            logger.warning("feature_names.pkl tidak sama dengan urutan fitur model, menggunakan urutan model")
+            feature_names = list(model_features)
+            state.feature_names = feature_names
+        
+        state.feature_encoder = FeatureEncoder(feature_names, self._resolve_reason, DEFAULT_SEVERITY)
+    
+    def _build_prediction_table(self, state: ServingState) -> None:
+        """
+        Menghitung prediksi untuk seluruh ruang input (reason × shift × severity) sekaligus.
+        
+        Model hanya memakai fitur one-hot reason/shift dan FMEA_Severity, sehingga
+        ruang inputnya terbatas. Seluruh kombinasi di-score dalam satu batch dan
+        disimpan sebagai dict key -> prediksi mentah.
+        """
+        state.prediction_table = None
+        if not PREDICTION_LOOKUP_TABLE or state.feature_encoder is None:
+            return
+        
+        try:
+            severities = list(FMEA_SEVERITY_MAP.values()) + [DEFAULT_SEVERITY]
+            keys = state.feature_encoder.enumerate_keys(severities)
+            rows = state.feature_encoder.rows_from_keys(keys)
+            predictions = predict_rows(state.model, rows)
+            table = dict(zip(keys, (float(p) for p in predictions)))
             
-            self.model = joblib.load(self.model_path)
-            self.model_loaded = True
+            if not self._verify_prediction_table(state, table, PREDICTION_LOOKUP_VERIFY_SAMPLES)["consistent"]:
+                logger.error("Prediction lookup table tidak konsisten dengan model, menggunakan inference live")
+                return
             
-            logger.info("Model loaded successfully!")
-            logger.info(f"Model type: {type(self.model).__name__}")
+            state.prediction_table = table
+            if state.forest is not None:
+                stats = state.forest.predict_stats(rows, PREDICTION_INTERVAL_QUANTILES)[:, 1:]
+                state.interval_table = dict(zip(keys, map(tuple, stats.tolist())))
+            logger.info(f"Prediction lookup table built: {len(table)} entries")
             
         except Exception as e:
-            logger.error(f"Failed to load model: {e}")
-            self.model = None
-            self.model_loaded = False
+            logger.error(f"Failed to build prediction lookup table: {e}")
+            state.prediction_table = None
+            state.interval_table = None
     
-    def _load_feature_names(self) -> None:
-        """Load feature names dari file dengan error handling."""
-        try:
-            logger.info(f"Loading feature names from: {self.feature_names_path}")
+    def _verify_prediction_table(self, state: ServingState, table: Dict, samples: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Membandingkan entri lookup table dengan inference live satu per satu.
+        
+        Args:
+            state: ServingState pemilik model dan encoder
+            table: Lookup table key -> prediksi
+            samples: Jumlah entri yang dicek (None = semua)
             
-            if not self.feature_names_path.exists():
-                logger.warning(f"Feature names file tidak ditemukan: {self.feature_names_path}")
-                logger.warning("Model akan menggunakan mode fallback (2 fitur sederhana)")
-                self.feature_names = None
-                return
+        Returns:
+            Dictionary berisi jumlah entri dicek, mismatch, dan selisih maksimum
+        """
+        keys = list(table.keys())
+        if samples is not None and samples < len(keys):
+            step = len(keys) / samples
+            keys = [keys[int(i * step)] for i in range(samples)]
+        
+        max_diff = 0.0
+        mismatches = 0
+        for key in keys:
+            live = float(predict_rows(state.model, state.feature_encoder.rows_from_keys([key]))[0])
+            diff = abs(live - table[key])
+            max_diff = max(max_diff, diff)
+            if diff > 1e-9:
+                mismatches += 1
+        
+        return {
+            "checked": len(keys),
+            "mismatches": mismatches,
+            "max_abs_diff": max_diff,
+            "consistent": mismatches == 0
+        }
+    
+    def verify_prediction_table(self, samples: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Consistency check lookup table terhadap model live.
+        
+        Args:
+            samples: Jumlah entri yang dicek (None = semua)
+            
+        Returns:
+            Dictionary hasil pengecekan
+        """
+        state = self.current_state()
+        if state is None or state.prediction_table is None:
+            return {"enabled": False, "consistent": None}
+        return {"enabled": True, **self._verify_prediction_table(state, state.prediction_table, samples)}
+    
+    def _predict_raw(self, real_time_data: Dict[str, Any]) -> float:
+        """
+        Prediksi mentah untuk satu input: lookup table, fallback ke inference live.
+        
+        Args:
+            real_time_data: Dictionary dengan keys reason dan shift
             
-            self.feature_names = joblib.load(self.feature_names_path)
+        Returns:
+            Nilai prediksi model (belum di-clamp/round)
+        """
+        if self.prediction_table is not None:
+            value = self.prediction_table.get(self.feature_encoder.encode_key(real_time_data))
+            if value is not None:
+                return value
+        
+        features = self._prepare_feature_array(real_time_data)
+        return float(predict_rows(self.model, features)[0])
+    
+    def _predict_interval(self, real_time_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Interval prediksi untuk satu input dari sebaran output per tree.
+        
+        Args:
+            real_time_data: Dictionary dengan keys reason dan shift
             
-            logger.info(f"Feature names loaded successfully! Total features: {len(self.feature_names)}")
-            logger.info(f"Sample features: {self.feature_names[:5]}")
+        Returns:
+            Dictionary interval (lihat _format_interval) atau None jika tidak tersedia
+        """
+        state = self.current_state()
+        if state.forest is None:
+            return None
+        
+        if state.interval_table is not None:
+            stats = state.interval_table.get(state.feature_encoder.encode_key(real_time_data))
+            if stats is not None:
+                return self._format_interval(stats)
+        
+        features = state.feature_encoder.encode(real_time_data).reshape(1, -1)
+        return self._format_interval(state.forest.predict_stats(features, PREDICTION_INTERVAL_QUANTILES)[0, 1:])
+    
+    def _format_interval(self, stats) -> Dict[str, Any]:
+        """
+        Format (std, q_1, ..., q_k) menjadi dictionary response.
+        
+        Args:
+            stats: Standar deviasi dan kuantil antar tree
             
-        except Exception as e:
-            logger.error(f"Failed to load feature names: {e}")
-            self.feature_names = None
+        Returns:
+            Dictionary {'p10': ..., 'p90': ..., 'std': ..., ...}
+        """
+        interval = {
+            f"p{q:g}": round(max(float(value), 0.0), 2)
+            for q, value in zip(PREDICTION_INTERVAL_QUANTILES, stats[1:])
+        }
+        interval['std'] = round(float(stats[0]), 2)
+        interval['method'] = 'per-tree quantiles'
+        interval['n_estimators'] = self.current_state().forest.n_estimators
+        return interval
     
-    def _prepare_feature_array(self, real_time_data: Dict[str, Any]) -> pd.DataFrame:
+    def _prepare_feature_array(self, real_time_data: Dict[str, Any]) -> np.ndarray:
         """
         Menyiapkan array fitur dari data real-time sensor.
         Model "Murni Fishbone + Shift" - Menggunakan fitur kategorikal (alasan downtime + shift).
@@ -283,155 +402,17 @@ class PredictionService:
                 - defects (int): TIDAK DIGUNAKAN (backward compatibility)
         
         Returns:
-            DataFrame 1xN dengan fitur kategorikal yang dibutuhkan model
+            numpy array 1xN dengan fitur kategorikal yang dibutuhkan model
         """
-        # Validasi input - reason adalah field paling penting
-        reason = real_time_data.get('reason', '').strip().upper()
-        
-        if not reason:
+        if not real_time_data.get('reason'):
             logger.warning("No reason provided. Model murni fishbone membutuhkan 'reason' untuk prediksi akurat.")
         
-        logger.info(f"Preparing features for: reason='{reason}'")
-        logger.info(f"⚠ Model Murni Fishbone: Mengabaikan data produksi (production={real_time_data.get('production', 'N/A')}, defects={real_time_data.get('defects', 'N/A')})")
-        
-        # Buat DataFrame kosong dengan semua fitur (inisialisasi ke 0)
-        df = pd.DataFrame(0, index=[0], columns=self.feature_names)
-        
-        # ========================================================================
-        # FITUR PRODUKSI & OEE: DIHAPUS
-        # ========================================================================
-        # Model "Murni Fishbone" TIDAK menggunakan:
-        # - Total Produksi (Pcs)
-        # - Produk Cacat (Pcs)  
-        # - Quality_Rate
-        # - Availability_Rate
-        #
-        # Alasan: Mencegah kebocoran data dan memaksa model belajar 100% dari
-        # pola alasan downtime (Fishbone Analysis).
-        
-        logger.info(f"⚠ Melewati fitur produksi/OEE (Model Murni Fishbone)")
-        
-        # ========================================================================
-        # FITUR FMEA SEVERITY: HITUNG SKOR KEPARAHAN
-        # ========================================================================
-        # Model baru menggunakan FMEA Severity Score sebagai fitur numerik
-        # untuk memberikan konteks keparahan dari alasan downtime
-        
-        # Inisialisasi severity dengan default
-        severity_score = DEFAULT_SEVERITY
-        mapped_reason = reason  # Akan diupdate saat translasi
-        
-        # ========================================================================
-        # PETAKAN FITUR KATEGORIKAL (ONE-HOT ENCODING) - INI SATU-SATUNYA INPUT
-        # ========================================================================
-        if reason:
-            # ====================================================================
-            # STEP 1: TERJEMAHKAN REASON MENGGUNAKAN KAMUS
-            # ====================================================================
-            # Sensor simulator menggunakan nama seperti "SLOTTER_MISALIGNMENT"
-            # Training data menggunakan nama seperti "SLOTER LARI"
-            # Kamus SENSOR_TO_TRAINING_MAP menghubungkan keduanya
-            
-            raw_reason = reason  # Simpan reason asli untuk logging
-            mapped_reason = SENSOR_TO_TRAINING_MAP.get(reason, reason)
-            
-            if mapped_reason != reason:
-                logger.info(f"🔄 Translating reason: '{raw_reason}' -> '{mapped_reason}'")
-            else:
-                logger.info(f"✓ Using reason as-is: '{reason}'")
-            
-            # Hitung FMEA Severity berdasarkan mapped_reason
-            severity_score = get_fmea_severity_from_reason(mapped_reason)
-            logger.info(f"📊 FMEA Severity Score: {severity_score}/10")
-            
-            # ====================================================================
-            # STEP 2: BUAT KEY UNTUK ONE-HOT ENCODING
-            # ====================================================================
-            # Coba cari kolom yang cocok dengan reason yang sudah diterjemahkan
-            # Possible formats: "Scrab Description_REASON" atau "Break Time Description_REASON"
-            key_scrab = f"Scrab Description_{mapped_reason}"
-            key_break = f"Break Time Description_{mapped_reason}"
-            
-            matched = False
-            
-            # Cek apakah reason ada di Scrab Description
-            if key_scrab in df.columns:
-                df[key_scrab] = 1
-                matched = True
-                logger.info(f"✓ Matched to feature: '{key_scrab}'")
-            
-            # Cek apakah reason ada di Break Time Description
-            elif key_break in df.columns:
-                df[key_break] = 1
-                matched = True
-                logger.info(f"✓ Matched to feature: '{key_break}'")
-            
-            # Jika tidak ada yang cocok, set ke _NONE_
-            else:
-                logger.warning(f"⚠ Reason '{mapped_reason}' tidak ditemukan di training data, using _NONE_")
-                
-                # Set ke kolom _NONE_ sebagai fallback
-                if "Scrab Description__NONE_" in df.columns:
-                    df["Scrab Description__NONE_"] = 1
-                if "Break Time Description__NONE_" in df.columns:
-                    df["Break Time Description__NONE_"] = 1
-        
-        else:
-            # Jika tidak ada reason, set ke _NONE_
-            logger.info("No reason provided, using _NONE_ category")
-            if "Scrab Description__NONE_" in df.columns:
-                df["Scrab Description__NONE_"] = 1
-            if "Break Time Description__NONE_" in df.columns:
-                df["Break Time Description__NONE_"] = 1
-        
-        # ========================================================================
-        # PETAKAN FITUR SHIFT (ONE-HOT ENCODING)
-        # ========================================================================
-        # Shift adalah konteks waktu produksi (1=Pagi, 2=Siang, 3=Malam)
-        # Training data menggunakan format: Shift_1.0, Shift_2.0, Shift_3.0, Shift__NONE_
-        
-        current_shift = str(real_time_data.get('shift', '_NONE_')).strip()
-        
-        if current_shift and current_shift != '_NONE_':
-            # Konversi ke format float (pandas one-hot encoding membuat Shift_1.0, Shift_2.0)
-            try:
-                # Coba parse sebagai angka dan konversi ke format X.0
-                shift_num = float(current_shift)
-                current_shift = f"{shift_num:.1f}"  # Format: "1.0", "2.0", "3.0"
-            except ValueError:
-                # Jika bukan angka, biarkan sebagai string
-                logger.warning(f"⚠ Shift value '{current_shift}' bukan angka, menggunakan as-is")
-            
-            shift_key = f"Shift_{current_shift}"
-            
-            if shift_key in df.columns:
-                df[shift_key] = 1
-                logger.info(f"✓ Matched shift to feature: '{shift_key}'")
-            else:
-                # Fallback ke _NONE_ jika shift tidak dikenal
-                logger.warning(f"⚠ Shift '{current_shift}' tidak ditemukan di training data, using _NONE_")
-                if "Shift__NONE_" in df.columns:
-                    df["Shift__NONE_"] = 1
-        
-        else:
-            # Jika tidak ada shift, set ke _NONE_
-            logger.info("No shift provided, using Shift__NONE_ category")
-            if "Shift__NONE_" in df.columns:
-                df["Shift__NONE_"] = 1
-        
-        # ========================================================================
-        # TAMBAHKAN FITUR FMEA SEVERITY
-        # ========================================================================
-        # Pastikan kolom FMEA_Severity ada di DataFrame
-        if "FMEA_Severity" in df.columns:
-            df["FMEA_Severity"] = severity_score
-            logger.info(f"✓ FMEA_Severity set to: {severity_score}")
-        else:
-            logger.warning("⚠ FMEA_Severity column not found in feature names. Model might be old version.")
+        features = self.feature_encoder.encode(real_time_data).reshape(1, -1)
         
-        logger.info(f"Feature array prepared successfully: shape={df.shape}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Feature array prepared: {self.feature_encoder.describe(real_time_data)}")
         
-        return df
+        return features
     
     def _validate_input_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -494,11 +475,16 @@ class PredictionService:
         else:
             return f"{remaining_minutes} menit"
     
-    def predict_downtime(self, real_time_data: Dict[str, Any]) -> Dict[str, Any]:
+    @pinned_state
+    def predict_downtime(self, real_time_data: Dict[str, Any], source: str = "api") -> Dict[str, Any]:
         """
         Memprediksi durasi downtime berdasarkan data real-time sensor.
         Fungsi ini dipanggil oleh health_service saat downtime terdeteksi.
         
+        Request identik yang bersamaan (versi model dan input sama) berbagi satu
+        komputasi; hasilnya di-cache selama PREDICTION_CACHE_TTL_SECONDS.
+        Setiap prediksi yang dilayani dicatat ke prediction_log (asinkron).
+        
         Args:
             real_time_data: Dictionary dengan format:
                 {
@@ -506,10 +492,24 @@ class PredictionService:
                     "defects": 806,       # Total produk cacat (pcs)
                     "reason": "SLOTER LARI"  # Alasan downtime (opsional)
                 }
+            source: Pemicu prediksi untuk audit log (api, health_auto_trigger, ...)
         
         Returns:
             Dictionary dengan hasil prediksi dan metadata
         """
+        started = time.perf_counter()
+        state = self.current_state()
+        input_key = freeze_key(real_time_data)
+        key = (state.bundle.content_hash if state is not None else None, input_key) if input_key is not None else None
+        result = prediction_coalescer.do(key, lambda: self._predict_downtime(real_time_data))
+        prediction_log_service.record(
+            source, self.MODEL_SLOT, state.bundle if state is not None else None,
+            real_time_data, result, (time.perf_counter() - started) * 1000
+        )
+        return result
+    
+    def _predict_downtime(self, real_time_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Prediksi downtime tanpa coalescing (dipanggil dalam state yang sudah di-pin)."""
         try:
             # Validasi model availability
             if not self.model_loaded or self.model is None:
@@ -531,20 +531,19 @@ class PredictionService:
                 # Fallback ke mode sederhana (2 fitur)
                 return self._predict_simple_mode(real_time_data)
             
-            logger.info(f"Predicting downtime for: {real_time_data}")
+            logger.debug(f"Predicting downtime for: {real_time_data}")
             
-            # Siapkan feature array (1x62)
-            feature_df = self._prepare_feature_array(real_time_data)
-            
-            # Lakukan prediksi
-            prediction = self.model.predict(feature_df)
-            prediction_value = float(prediction[0])
+            # Lakukan prediksi (lookup table atau inference live)
+            prediction_value = self._predict_raw(real_time_data)
             
             # Pastikan prediksi tidak negatif
             if prediction_value < 0:
                 logger.warning(f"Negative prediction detected: {prediction_value}, setting to 0")
                 prediction_value = 0
             
+            # Mirror sampel ke model kandidat (non-blocking, diproses di background)
+            shadow_evaluator.offer(self.current_state().bundle, real_time_data, prediction_value)
+            
             prediction_value = round(prediction_value, 2)
             
             logger.info(f"Prediction completed: {prediction_value} minutes")
@@ -553,6 +552,7 @@ class PredictionService:
             result = {
                 'success': True,
                 'prediction': prediction_value,
+                'prediction_interval': self._predict_interval(real_time_data),
                 'prediction_formatted': self._format_prediction_time(prediction_value),
                 'input': real_time_data,
                 'message': 'Prediksi berhasil',
@@ -639,34 +639,199 @@ class PredictionService:
                 'error_type': 'PredictionError'
             }
     
-    def predict_maintenance_duration(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _to_real_time_data(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Alias untuk backward compatibility.
-        Konversi format lama ke format baru.
+        Konversi format lama (total_produksi/produk_cacat) ke format real-time.
         
         Args:
-            input_data: Dictionary dengan total_produksi dan produk_cacat (format lama)
+            input_data: Dictionary format lama
             
         Returns:
-            Dictionary dengan hasil prediksi
+            Dictionary format predict_downtime
         """
-        # Konversi format lama ke format baru
         real_time_data = {
             'production': input_data.get('total_produksi', 0),
             'defects': input_data.get('produk_cacat', 0),
             'reason': input_data.get('reason', '')
         }
+        if 'shift' in input_data:
+            real_time_data['shift'] = input_data['shift']
+        return real_time_data
+    
+    def predict_maintenance_duration(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Alias untuk backward compatibility.
+        Konversi format lama ke format baru.
+        
+        Args:
+            input_data: Dictionary dengan total_produksi dan produk_cacat (format lama)
+            
+        Returns:
+            Dictionary dengan hasil prediksi
+        """
+        logger.debug("Using backward compatibility mode (predict_maintenance_duration)")
+        return self.predict_downtime(self._to_real_time_data(input_data))
+    
+    def _validate_batch_item(self, item: Any) -> Dict[str, Any]:
+        """
+        Validasi satu item batch dan konversi ke format real-time.
+        
+        Args:
+            item: Item dari list batch
+            
+        Returns:
+            Dictionary format predict_downtime
+            
+        Raises:
+            ValueError: Jika item tidak valid
+        """
+        if not isinstance(item, dict):
+            raise ValueError("Item harus berupa object")
+        
+        reason = item.get('reason', '')
+        if reason is not None and not isinstance(reason, str):
+            raise ValueError("'reason' harus berupa string")
+        
+        real_time_data = self._to_real_time_data(item)
+        
+        if self.feature_names is None:
+            # Mode sederhana membutuhkan production dan defects numerik
+            try:
+                real_time_data['production'] = float(real_time_data['production'] or 0)
+                real_time_data['defects'] = float(real_time_data['defects'] or 0)
+            except (ValueError, TypeError):
+                raise ValueError("'total_produksi' dan 'produk_cacat' harus berupa angka")
+        
+        return real_time_data
+    
+    def _predict_live_batch(self, inputs: List[Dict[str, Any]]) -> Tuple[List[float], Optional[np.ndarray]]:
+        """Inference live satu matriks di proses ini (prediksi + statistik per tree)."""
+        X = self.feature_encoder.encode_batch(inputs)
+        forest = self.current_state().forest
+        stats = forest.predict_stats(X, PREDICTION_INTERVAL_QUANTILES, dedupe=True)[:, 1:] if forest is not None else None
+        return predict_rows(self.model, X).tolist(), stats
+    
+    def _predict_batch_raw(
+        self,
+        inputs: List[Dict[str, Any]],
+        live_predict=None
+    ) -> Tuple[List[float], Optional[np.ndarray]]:
+        """
+        Prediksi mentah untuk banyak input: lookup table, sisanya satu batch inference live.
+        
+        Args:
+            inputs: List dictionary dengan keys reason dan shift
+            live_predict: Fungsi inference live untuk baris yang tidak ada di tabel
+                (default: _predict_live_batch di proses ini)
+            
+        Returns:
+            Tuple (list nilai prediksi, array (n, 1 + k) [std, kuantil...] atau None)
+        """
+        live_predict = live_predict or self._predict_live_batch
+        state = self.current_state()
+        if state.prediction_table is None:
+            return live_predict(inputs)
+        
+        keys = [state.feature_encoder.encode_key(d) for d in inputs]
+        predictions: List[Optional[float]] = [state.prediction_table.get(k) for k in keys]
+        stats = None
+        if state.interval_table is not None:
+            stats = np.empty((len(inputs), 1 + len(PREDICTION_INTERVAL_QUANTILES)), dtype=np.float64)
+            for i, key in enumerate(keys):
+                if predictions[i] is not None:
+                    stats[i] = state.interval_table[key]
         
-        logger.info("Using backward compatibility mode (predict_maintenance_duration)")
-        return self.predict_downtime(real_time_data)
+        misses = [i for i, p in enumerate(predictions) if p is None]
+        if misses:
+            live, live_stats = live_predict([inputs[i] for i in misses])
+            for i, value in zip(misses, live):
+                predictions[i] = value
+            if stats is not None and live_stats is not None:
+                stats[misses] = live_stats
+        return predictions, stats
     
+    def _predict_live_batch_pooled(
+        self,
+        inputs: List[Dict[str, Any]],
+        job: Job
+    ) -> Tuple[List[float], Optional[np.ndarray]]:
+        """
+        Inference live di process pool: matriks fitur di-encode langsung ke shared
+        memory dan dibagi per chunk ke worker (prediksi + statistik per tree).
+        """
+        state = self.current_state()
+        quantiles = PREDICTION_INTERVAL_QUANTILES if state.forest is not None else None
+        X = SharedArray.create((len(inputs), state.feature_encoder.n_features), np.float64)
+        try:
+            state.feature_encoder.encode_batch(inputs, out=X.array)
+            out = job_executor.predict_shared(state.bundle, X, job.progress, quantiles)
+        finally:
+            X.release()
+        if quantiles is None:
+            return out.tolist(), None
+        return out[:, 0].tolist(), out[:, 1:]
+    
+    @pinned_state
     def batch_predict_maintenance_duration(self, data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Memprediksi durasi maintenance untuk multiple inputs.
         
+        Semua item valid di-encode menjadi satu matriks fitur dan diprediksi dengan
+        satu panggilan model.predict. Item yang tidak valid dilaporkan per item
+        tanpa menggagalkan batch.
+        
+        Args:
+            data_list: List of input dictionaries
+            
+        Returns:
+            Dictionary dengan hasil batch prediction
+        """
+        return self._batch_predict(data_list)
+    
+    def submit_batch_job(self, data_list: List[Dict[str, Any]]) -> Job:
+        """
+        Menjalankan batch prediction besar sebagai job di process pool.
+        
+        Model di-snapshot saat submit; inference live dijalankan worker pool
+        dengan matriks fitur di shared memory. Hasil (format sama dengan
+        batch_predict_maintenance_duration) diambil lewat job API.
+        
         Args:
             data_list: List of input dictionaries
             
+        Returns:
+            Job yang terdaftar
+            
+        Raises:
+            ValueError: Jika input tidak valid atau model tidak tersedia
+        """
+        if not isinstance(data_list, list) or len(data_list) == 0:
+            raise ValueError("Input harus berupa list yang tidak kosong")
+        if len(data_list) > JOB_MAX_BATCH_ITEMS:
+            raise ValueError(f"Maksimal {JOB_MAX_BATCH_ITEMS} item per job")
+        
+        state = self.current_state()
+        if state is None:
+            raise ValueError("Model tidak tersedia")
+        
+        def run(job: Job) -> Dict[str, Any]:
+            with self._pin_state(state):
+                return self._batch_predict(
+                    data_list, live_predict=lambda inputs: self._predict_live_batch_pooled(inputs, job)
+                )
+        
+        return job_executor.submit(
+            "prediction_batch", run, {"total_items": len(data_list), "model_version": state.version}
+        )
+    
+    def _batch_predict(self, data_list: List[Dict[str, Any]], live_predict=None) -> Dict[str, Any]:
+        """
+        Implementasi batch prediction (sinkron maupun job).
+        
+        Args:
+            data_list: List of input dictionaries
+            live_predict: Fungsi inference live (lihat _predict_batch_raw)
+            
         Returns:
             Dictionary dengan hasil batch prediction
         """
@@ -677,21 +842,73 @@ class PredictionService:
             if len(data_list) == 0:
                 raise ValueError("List input tidak boleh kosong")
             
-            results = []
-            successful_count = 0
+            results: List[Optional[Dict[str, Any]]] = [None] * len(data_list)
+            valid_indices = []
+            valid_inputs = []
             
-            for idx, data in enumerate(data_list):
-                logger.info(f"Processing batch item {idx + 1}/{len(data_list)}")
-                
-                # Predict individual item
-                result = self.predict_maintenance_duration(data)
-                results.append({
-                    'item_index': idx,
-                    **result
-                })
-                
-                if result['success']:
-                    successful_count += 1
+            # Validasi per item
+            for idx, item in enumerate(data_list):
+                try:
+                    valid_inputs.append(self._validate_batch_item(item))
+                    valid_indices.append(idx)
+                except ValueError as e:
+                    results[idx] = {
+                        'item_index': idx,
+                        'success': False,
+                        'prediction': None,
+                        'input': item,
+                        'message': f"Validation error: {str(e)}",
+                        'error_type': 'ValidationError'
+                    }
+            
+            if valid_inputs:
+                if not self.model_loaded or self.model is None:
+                    for idx, real_time_data in zip(valid_indices, valid_inputs):
+                        results[idx] = {
+                            'item_index': idx,
+                            'success': False,
+                            'prediction': None,
+                            'input': real_time_data,
+                            'message': 'Model tidak tersedia. Silakan restart server atau periksa file model.'
+                        }
+                else:
+                    # Satu matriks fitur, satu panggilan model
+                    if self.feature_names is None:
+                        X = np.array([[d['production'], d['defects']] for d in valid_inputs], dtype=np.float64)
+                        predictions = self.model.predict(X).tolist()
+                        interval_stats = None
+                        metadata = {
+                            'model_type': type(self.model).__name__,
+                            'total_features': 2,
+                            'prediction_unit': 'minutes',
+                            'mode': 'Simple (Fallback)'
+                        }
+                    else:
+                        predictions, interval_stats = self._predict_batch_raw(valid_inputs, live_predict)
+                        metadata = {
+                            'model_type': type(self.model).__name__,
+                            'total_features': len(self.feature_names),
+                            'prediction_unit': 'minutes',
+                            'feature_engineering': 'OEE + Fishbone Analysis',
+                            'model_version': '2.0 (Advanced Features)'
+                        }
+                    
+                    for row, (idx, real_time_data, raw) in enumerate(zip(valid_indices, valid_inputs, predictions)):
+                        value = round(max(raw, 0.0), 2)
+                        results[idx] = {
+                            'item_index': idx,
+                            'success': True,
+                            'prediction': value,
+                            'prediction_interval': (
+                                self._format_interval(interval_stats[row]) if interval_stats is not None else None
+                            ),
+                            'prediction_formatted': self._format_prediction_time(value),
+                            'input': real_time_data,
+                            'message': 'Prediksi berhasil',
+                            'metadata': metadata
+                        }
+            
+            successful_count = sum(1 for r in results if r['success'])
             
             # Compile batch results
             batch_result = {
@@ -704,7 +921,8 @@ class PredictionService:
                 'message': f'Batch prediction completed: {successful_count}/{len(data_list)} berhasil',
                 'summary': {
                     'total_processing_time': 'Real-time',
-                    'model_consistency': 'Same model used for all predictions'
+                    'model_consistency': 'Same model used for all predictions',
+                    'vectorized': True
                 }
             }
             
@@ -724,6 +942,7 @@ class PredictionService:
                 'error_type': 'BatchPredictionError'
             }
     
+    @pinned_state
     def get_model_info(self) -> Dict[str, Any]:
         """
         Mendapatkan informasi detail tentang model.
@@ -750,7 +969,8 @@ class PredictionService:
                 'model_details': {
                     'type': type(self.model).__name__,
                     'class': str(self.model.__class__),
-                    'path': str(self.model_path)
+                    'path': str(self.model_path),
+                    'engine': 'flat' if isinstance(self.model, FlatForest) else 'sklearn'
                 },
                 'model_parameters': {
                     'n_estimators': getattr(self.model, 'n_estimators', None),
@@ -764,6 +984,15 @@ class PredictionService:
                     'feature_names_loaded': self.feature_names is not None,
                     'feature_names_path': str(self.feature_names_path)
                 },
+                'lookup_table': {
+                    'enabled': self.prediction_table is not None,
+                    'entries': len(self.prediction_table) if self.prediction_table is not None else 0
+                },
+                'prediction_interval': {
+                    'enabled': self.current_state().forest is not None,
+                    'quantiles': list(PREDICTION_INTERVAL_QUANTILES),
+                    'method': 'per-tree quantiles'
+                },
                 'performance_info': {
                     'prediction_unit': 'minutes',
                     'mae': '60.29 minutes (from evaluation)',
@@ -824,4 +1053,8 @@ class PredictionService:
                 'basic_info': {
                     'type': type(self.model).__name__ if self.model else 'Unknown'
                 }
-            }
\ No newline at end of file
+            }
+
+
+# Global instance
+prediction_service = PredictionService()
@@ -0,0 +1,263 @@
+"""
+Production CSV Loader
+Loader laporan produksi bulanan ("Laporan Flexo *.csv") dengan dtype eksplisit,
+parsing paralel, dan cache gabungan yang di-key dengan hash isi file sumber
+
+Modul ini sengaja hanya bergantung pada standard library, pandas, dan
+src.utils.logger agar bisa di-import dari Model/train_model.py dan
+Sensor/sensor_simulator.py tanpa konfigurasi backend. Progres dicatat ke
+logger; script pemanggil mencetak ringkasannya sendiri.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CSV_OPTIONS = {"encoding": "utf-8-sig", "delimiter": ";"}
+
+# Dtype eksplisit per kolom laporan. Kolom tanggal/jam tetap di-infer: sebagian
+# file menyimpan tanggal sebagai serial Excel (float), sama seperti parsing lama
+NUMERIC_DTYPES = {
+    "Machine": "float64",
+    "Shift": "float64",
+    "Prod Order": "float64",
+    "Confirm Qty": "int64",
+    "Scrab Qty": "int64",
+    "Confirm KG": "float64",
+    "Act Confirm KG": "float64",
+    "Scrab KG": "float64",
+    "Stop Time": "int64"
+}
+
+# Kolom berulang dengan kardinalitas rendah -> categorical (Shift: kategori angka 1.0/2.0/3.0)
+CATEGORICAL_COLUMNS = ("Work Center", "Group", "Shift", "Scrab Description", "Break Time Description")
+
+# Naikkan jika skema/parsing berubah agar cache lama tidak dipakai
+CACHE_VERSION = 1
+CACHE_DIR_NAME = ".cache"
+
+
+def file_digest(path: Path) -> str:
+    """Hash isi file (blake2b, 16 hex)."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_production_csv(path: Path) -> pd.DataFrame:
+    """
+    Parse satu file laporan dengan dtype eksplisit.
+
+    Jika file tidak cocok dengan dtype yang dideklarasikan (mis. kolom integer
+    berisi nilai kosong), file di-parse ulang dengan inferensi dtype lalu kolom
+    categorical tetap dikonversi.
+
+    Args:
+        path: File CSV
+
+    Returns:
+        DataFrame satu bulan
+    """
+    dtypes = dict(NUMERIC_DTYPES)
+    dtypes.update({c: "category" for c in CATEGORICAL_COLUMNS if c not in NUMERIC_DTYPES})
+    try:
+        df = pd.read_csv(path, dtype=dtypes, **CSV_OPTIONS)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{Path(path).name}: explicit dtypes failed ({e}), falling back to dtype inference")
+        df = pd.read_csv(path, **CSV_OPTIONS)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def concat_production_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Menggabungkan frame bulanan; kategori disatukan agar kolom tetap categorical.
+
+    Args:
+        frames: DataFrame per bulan (urutan dipertahankan)
+
+    Returns:
+        DataFrame gabungan dengan index 0..n-1
+    """
+    frames = [f.copy() for f in frames]
+    for col in CATEGORICAL_COLUMNS:
+        parts = [f[col] for f in frames if col in f.columns]
+        if len(parts) != len(frames):
+            continue
+        categories = union_categoricals(parts, sort_categories=True).categories
+        for f in frames:
+            f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+class ProductionCsvCache:
+    """
+    Cache laporan produksi di <data_dir>/.cache:
+
+    - month-<hash>.pkl: hasil parse satu file, di-key dengan hash isinya, sehingga
+      hanya bulan yang berubah yang di-parse ulang
+    - flexo-<set>-<urutan>.pkl: DataFrame gabungan, di-key dengan daftar (nama, hash)
+      semua file sumber; run berikutnya cukup membaca satu file ini
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def _month_path(self, digest: str) -> Path:
+        return self.cache_dir / f"month-{CACHE_VERSION}-{digest}.pkl"
+
+    @staticmethod
+    def _key(value) -> str:
+        return hashlib.blake2b(repr((CACHE_VERSION, value)).encode(), digest_size=8).hexdigest()
+
+    def _combined_prefix(self, sources: List[Tuple[str, str]]) -> str:
+        # Prefix = himpunan file; pemanggil dengan urutan berbeda (training vs simulator)
+        # berbagi prefix sehingga tidak saling menghapus cache gabungan
+        return f"flexo-{self._key(sorted(sources))}-"
+
+    def _combined_path(self, sources: List[Tuple[str, str]]) -> Path:
+        return self.cache_dir / f"{self._combined_prefix(sources)}{self._key(sources)}.pkl"
+
+    def load(
+        self,
+        files: Sequence[Path],
+        workers: Optional[int] = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Memuat dan menggabungkan file (urutan dipertahankan) lewat cache.
+
+        Args:
+            files: File CSV sumber
+            workers: Jumlah thread parse (default: min(jumlah file, CPU))
+
+        Returns:
+            (dataframe_gabungan, jumlah_file_terbaca)
+
+        Raises:
+            ValueError: Jika tidak ada file yang berhasil dibaca
+        """
+        started = time.perf_counter()
+        files = [Path(f) for f in files]
+        digests = {f: file_digest(f) for f in files}
+        sources = [(f.name, digests[f]) for f in files]
+
+        combined_path = self._combined_path(sources)
+        if combined_path.exists():
+            try:
+                combined = pd.read_pickle(combined_path)
+                logger.info(f"Loaded {len(files)} production files from combined cache "
+                            f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+                return combined, len(files)
+            except Exception as e:
+                logger.warning(f"Combined production cache unreadable ({e}), rebuilding")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        frames: Dict[Path, pd.DataFrame] = {}
+        for f in files:
+            month_path = self._month_path(digests[f])
+            if month_path.exists():
+                try:
+                    frames[f] = pd.read_pickle(month_path)
+                    logger.debug(f"Loaded {f.name} from cache")
+                except Exception:
+                    pass
+
+        # Bulan baru/berubah di-parse paralel
+        missing = [f for f in files if f not in frames]
+        if missing:
+            workers = workers or min(len(missing), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {f: pool.submit(parse_production_csv, f) for f in missing}
+                for f in missing:
+                    try:
+                        frames[f] = futures[f].result()
+                        frames[f].to_pickle(self._month_path(digests[f]))
+                        logger.debug(f"Parsed {f.name} ({len(frames[f])} rows)")
+                    except Exception as e:
+                        logger.error(f"Failed to load {f.name}: {e}")
+
+        loaded = [f for f in files if f in frames]
+        if not loaded:
+            raise ValueError("Tidak ada data yang berhasil dibaca dari file CSV.")
+
+        combined = concat_production_frames([frames[f] for f in loaded])
+        # Cache gabungan hanya jika semua file terbaca
+        if len(loaded) == len(files):
+            combined.to_pickle(combined_path)
+        self._prune(
+            {self._month_path(digests[f]) for f in loaded},
+            self._combined_prefix(sources)
+        )
+
+        parsed = len([f for f in missing if f in frames])
+        logger.info(f"Loaded {len(files) - len(missing)}/{len(files)} production files from cache, "
+                    f"{parsed} parsed ({(time.perf_counter() - started) * 1000:.0f} ms)")
+        return combined, len(loaded)
+
+    def _prune(self, keep: set, combined_prefix: str) -> None:
+        """Menghapus entri cache yang tidak lagi cocok dengan file sumber."""
+        for path in self.cache_dir.glob("*.pkl"):
+            if path not in keep and not path.name.startswith(combined_prefix):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def load_production_csv(
+    files: Sequence[Path],
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    workers: Optional[int] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Memuat laporan produksi bulanan dengan dtype eksplisit dan cache.
+
+    Args:
+        files: File CSV sumber (urutan dipertahankan pada hasil gabungan)
+        cache_dir: Direktori cache (default: <folder file pertama>/.cache)
+        use_cache: False untuk selalu parse ulang tanpa membaca/menulis cache
+        workers: Jumlah thread parse
+
+    Returns:
+        (dataframe_gabungan, jumlah_file_terbaca)
+
+    Raises:
+        FileNotFoundError: Jika daftar file kosong
+        ValueError: Jika tidak ada file yang berhasil dibaca
+    """
+    files = [Path(f) for f in files]
+    if not files:
+        raise FileNotFoundError("Tidak ada file CSV untuk dimuat.")
+
+    if use_cache:
+        cache_dir = Path(cache_dir) if cache_dir else files[0].parent / CACHE_DIR_NAME
+        return ProductionCsvCache(cache_dir).load(files, workers)
+
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    frames = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_production_csv, f) for f in files]
+        for f, future in zip(files, futures):
+            try:
+                frames.append(future.result())
+                logger.debug(f"Parsed {f.name}")
+            except Exception as e:
+                logger.error(f"Failed to load {f.name}: {e}")
+    if not frames:
+        raise ValueError("Tidak ada data yang berhasil dibaca dari file CSV.")
+    return concat_production_frames(frames), len(frames)
@@ -0,0 +1,432 @@
+"""
+Reason Matcher
+Mapping reason downtime (FMEA severity, nama sensor -> nama training, kategori masalah)
+yang dikompilasi menjadi satu automaton Aho-Corasick, dipakai bersama oleh training
+dan serving
+
+Modul ini sengaja hanya bergantung pada standard library agar bisa di-import
+dari Model/train_model.py tanpa konfigurasi backend.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+# ============================================================================
+# MAPPING FMEA SEVERITY (Skor S dari Analisis FMEA Tabel 4.5 Skripsi)
+# ============================================================================
+# Mapping dari Deskripsi Downtime ke Skor Severity (S) FMEA
+# Skor 1-10: 1=sangat ringan, 10=sangat parah/berbahaya
+# 
+# CATATAN PENTING: Mapping ini dibuat berdasarkan estimasi dampak bisnis
+# dan harus divalidasi/disesuaikan dengan Tabel 4.5 FMEA dari skripsi Anda.
+# Satu-satunya salinan: dipakai training (Model/train_model.py) dan serving.
+FMEA_SEVERITY_MAP = {
+    # ========================================================================
+    # PRE-FEEDER UNIT FAILURES (S = 6-8)
+    # ========================================================================
+    'BELT CONVEYOR SLIP': 7,                    # Belt slip - menghambat feeding
+    'PENUMPUKAN KARTON TIDAK RATA': 7,          # Penumpukan tidak rata - waste tinggi
+    'SENSOR TIDAK MENDETEKSI LEMBARAN': 8,      # Sensor error - stop produksi total
+    
+    # ========================================================================
+    # FEEDER UNIT FAILURES (S = 7-9)
+    # ========================================================================
+    'FEEDER UNIT TROUBLE MEKANIK': 8,           # Kerusakan mekanik - perbaikan lama
+    'FEEDER UNIT TROUBLE ELEKTRIK': 8,          # Kerusakan elektrik - downtime signifikan
+    'VACUM KURANG': 8,                          # Vakum lemah - feeding error berulang
+    'VACUUM KURANG': 8,                         # Variant spelling
+    'SHEET NYANGKUT/ MACET': 7,                 # Sheet macet - dapat diperbaiki cepat
+    'LEMBARAN TIDAK TERAMBIL': 8,               # Feed failure - stop produksi
+    
+    # ========================================================================
+    # PRINTING UNIT FAILURES (S = 8-10)
+    # ========================================================================
+    'PRINTING UNIT TROUBLE MEKANIK': 9,         # Kerusakan printing - defect rate tinggi
+    'PRINTING UNIT TROUBLE ELEKTRIK': 9,        # Elektrik printing - downtime panjang
+    'REGISTER GESER': 9,                        # Misalignment - reject rate sangat tinggi
+    'PRINT BLOBOR': 9,                          # Ink blobbing - waste besar
+    'PRINTING BOTAK': 8,                        # Incomplete print - defect sedang-tinggi
+    'PRINT LARI': 8,                            # Print offset - adjustment needed
+    'PRINT BLUR': 8,                            # Print blur - quality issue
+    'TINTA BOCOR': 8,                           # Ink leak - downtime + waste
+    'LIMBAH TINTA BANJIR': 8,                   # Ink flooding - cleanup + downtime
+    'WARNA TIDAK SESUAI': 7,                    # Color mismatch - rework/reject
+    'WARNA LUNTUR': 7,                          # Color fade - quality issue
+    'TINTA TIDAK KONSISTEN': 8,                 # Ink inconsistency - defect tinggi
+    'ANILOX ROLLER TERSUMBAT': 8,               # Anilox blocked - print quality issue
+    
+    # ========================================================================
+    # SLOTTER & CREASING UNIT FAILURES (S = 7-9)
+    # ========================================================================
+    'SLOTTER UNIT TROUBLE MEKANIK': 8,          # Slotter mechanical - structural damage
+    'SLOTTER UNIT TROUBLE ELEKTRIK': 9,         # Slotter electrical - stop total
+    'SLOTER LARI': 8,                           # Slotter misalignment - reject tinggi
+    'SLOTTER LARI': 8,                          # Variant spelling
+    'SLOTTER MIRING': 8,                        # Slotter angle error - defect
+    'SLOTTER PECAH': 9,                         # Slotter crack - product unusable
+    'PISAU TUMPUL': 8,                          # Dull blade - quality degradation
+    'CREASING PECAH': 9,                        # Creasing crack - product failure
+    'CREASING LARI': 8,                         # Creasing offset - folding issues
+    'CREASING MIRING': 8,                       # Creasing angle - assembly problems
+    'ROLLER CREASING AUS': 8,                   # Worn creasing roller
+    
+    # ========================================================================
+    # DIE-CUT UNIT FAILURES (S = 7-9)
+    # ========================================================================
+    'DIECUT UNIT TROUBLE MEKANIK': 8,           # Die-cut mechanical failure
+    'DIECUT UNIT TROUBLE ELEKTRIK': 9,          # Die-cut electrical failure
+    'DIECUT LARI': 8,                           # Die-cut misalignment
+    'DIECUT PECAH': 9,                          # Die-cut crack - unusable
+    'DIECUT TIDAK PUTUS': 8,                    # Incomplete die-cut
+    'DIECUT MIRING': 8,                         # Die-cut angle error
+    
+    # ========================================================================
+    # STACKER UNIT FAILURES (S = 5-8)
+    # ========================================================================
+    'STACKER TROUBLE MEKANIK': 6,               # Stacker mechanical - minor impact
+    'STACKER TROUBLE ELEKTRIK': 9,              # Stacker electrical - stop produksi
+    'COUNTER PROBLEM': 6,                       # Counter error - tracking issue saja
+    'SENSOR PENGHITUNG ERROR': 6,               # Count sensor error
+    'PNEUMATIC LEMAH': 6,                       # Weak pneumatic
+    'CONVEYOR SLIP': 6,                         # Conveyor slip di stacker
+    
+    # ========================================================================
+    # PLATE & SETUP ISSUES (S = 4-7)
+    # ========================================================================
+    'LAP KLISE (Plate)': 4,                     # Plate cleaning - planned maintenance
+    'MOUNTING PLATE (during operati': 5,        # Plate mounting - setup time
+    'GANTI/PASANG PISAU SLOTTER': 5,            # Blade change - setup
+    'PLATE CYLINDER TIDAK SEJAJAR': 9,          # Plate misalignment - critical
+    
+    # ========================================================================
+    # MATERIAL & SUPPLY ISSUES (S = 5-7)
+    # ========================================================================
+    'TUNGGU TINTA': 6,                          # Waiting ink - supply delay
+    'TUNGGU BAHAN SHEETS': 6,                   # Waiting sheets - supply chain
+    'CARI BAHAN SHEETS': 6,                     # Looking for sheets
+    'TUNGGU KLISE (Plate)': 6,                  # Waiting plate
+    'CHEMICAL PROBLEM>OTHERS': 7,               # Chemical issue - quality impact
+    
+    # ========================================================================
+    # OPERATIONAL & MAINTENANCE (S = 2-5)
+    # ========================================================================
+    'SETTING TIME': 3,                          # Setup time - normal operation
+    'ADJUST TINTA': 4,                          # Ink adjustment - fine tuning
+    'REPAIR RINGAN BY OPERATOR': 5,             # Minor repair by operator
+    'MECHANICAL REPAIR>OTHER': 6,               # Mechanical repair - general
+    'BUANG SAMPAH': 2,                          # Waste disposal - routine
+    'CUCI MESIN': 3,                            # Machine cleaning - maintenance
+    'RAPIH SHIFT': 2,                           # Shift cleanup
+    'BRIEFING': 1,                              # Meeting - planned
+    'SHOLAT JUMAT': 1,                          # Friday prayer - scheduled
+    'ISTIRAHAT': 1,                             # Break - scheduled
+    
+    # ========================================================================
+    # PLANNED DOWNTIME (S = 1-3)
+    # ========================================================================
+    'TIDAK ADA SHIFT': 1,                       # No shift - planned
+    'OFF TIME LIBUR NASIONAL': 1,               # National holiday
+    'TUNGGU ORDER': 2,                          # Waiting order - business decision
+    'SCHEDULED PREVENTIVE MAINTENANCE': 2,      # Planned maintenance
+    'OVERHAUL': 3,                              # Major overhaul - planned
+    
+    # ========================================================================
+    # QUALITY REJECTION ISSUES (S = 6-8)
+    # ========================================================================
+    'REJECT SETTING': 7,                        # Setup rejection - waste
+    'OTHERS REJECTED SHEETS': 7,                # General rejection
+    'REJECTED KARTON': 7,                       # Rejected carton
+    
+    # ========================================================================
+    # OTHERS & DEFAULT (S = 5)
+    # ========================================================================
+    'OTHERS': 5,                                # General others - medium severity
+    '_NONE_': 1,                                # No reason - minimal severity
+}
+
+# Skor default jika deskripsi tidak ditemukan di map
+DEFAULT_SEVERITY = 5  # Medium severity sebagai fallback
+
+
+# ============================================================================
+# KAMUS PENERJEMAH: Sensor Error Names -> Training Data Names
+# ============================================================================
+# Memetakan nama error dari sensor_simulator.py (kiri) ke nama dari
+# data training CSV (kanan). Ini memungkinkan sensor real-time menggunakan
+# nama yang berbeda dari data historis.
+SENSOR_TO_TRAINING_MAP = {
+    # Format: "SENSOR_ERROR_NAME": "TRAINING_DATA_NAME"
+    
+    # Mechanical Issues
+    "SLOTTER_MISALIGNMENT": "SLOTER LARI",
+    "CREASING_CRACK": "CREASING PECAH",
+    "CREASING_MISALIGNMENT": "CREASING MIRING",
+    "DIECUT_CRACK": "DIECUT PECAH",
+    "DIECUT_MISALIGNMENT": "DIECUT LARI",
+    
+    # Printing Issues
+    "INK_BLOBBING": "PRINT BLOBOR",
+    "PRINT_GHOSTING": "PRINTING BOTAK",
+    "PRINT_BLUR": "PRINT BLUR",
+    "WARNA_TIDAK_SESUAI": "WARNA TIDAK SESUAI",
+    
+    # Electrical Issues
+    "FEEDER_JAM_ELEC": "FEEDER UNIT TROUBLE ELEKTRIK",
+    "PRINTING_UNIT_ELEC_FAULT": "PRINTING UNIT TROUBLE ELEKTRIK",
+    "SLOTTER_UNIT_ELEC_FAULT": "SLOTTER UNIT TROUBLE ELEKTRIK",
+    
+    # Mechanical Failures
+    "FEEDER_JAM_MECH": "FEEDER UNIT TROUBLE MEKANIK",
+    "PRINTING_UNIT_MECH_FAULT": "PRINTING UNIT TROUBLE MEKANIK",
+    "SLOTTER_UNIT_MECH_FAULT": "SLOTTER UNIT TROUBLE MEKANIK",
+    
+    # Other Issues
+    "INK_LEAK": "LIMBAH TINTA BANJIR",
+    "WAITING_INK": "TUNGGU TINTA",
+    
+    # Fallback
+    "_NONE_": "_NONE_",
+    "": "_NONE_"
+}
+
+# ============================================================================
+# KATEGORI MASALAH (keyword substring, urutan = prioritas)
+# ============================================================================
+# Adjustment berdasarkan kategori masalah
+CATEGORY_ADJUSTMENTS = {
+    # Printing issues - kompleks karena melibatkan warna, register, dll
+    'printing': {
+        'base_multiplier': 1.4,
+        'keywords': ['PRINTING', 'PRINT', 'TINTA', 'WARNA', 'REGISTER', 'ANILOX']
+    },
+    
+    # Mechanical issues - butuh spare part dan skill tinggi  
+    'mechanical': {
+        'base_multiplier': 1.6,
+        'keywords': ['MEKANIK', 'BEARING', 'GEAR', 'PECAH', 'AUS', 'PNEUMATIC']
+    },
+    
+    # Electrical issues - troubleshooting kompleks
+    'electrical': {
+        'base_multiplier': 1.5,
+        'keywords': ['ELEKTRIK', 'LISTRIK', 'SENSOR', 'WIRING', 'MOTOR']
+    },
+    
+    # Feeder issues - kritis untuk kontinuitas produksi
+    'feeder': {
+        'base_multiplier': 1.3,
+        'keywords': ['FEEDER', 'VACUUM', 'BELT', 'CONVEYOR', 'FEEDING']
+    },
+    
+    # Quality issues - butuh fine tuning
+    'quality': {
+        'base_multiplier': 1.2,
+        'keywords': ['BLUR', 'BOTAK', 'LARI', 'MIRING', 'CACAT', 'REJECT']
+    }
+}
+
+# ============================================================================
+# SEVERITY HEURISTIK (keyword substring, severity tertinggi menang)
+# ============================================================================
+# Simplified FMEA mapping untuk reason bebas di EnhancedPredictionService
+SEVERITY_PATTERNS = {
+    10: ['EXPLOSION', 'FIRE', 'SAFETY'],
+    9: ['PECAH', 'CRACK', 'BROKEN', 'TOTAL_FAILURE', 'REGISTER_GESER'],
+    8: ['ELEKTRIK', 'ELECTRICAL', 'MEKANIK', 'MECHANICAL', 'SENSOR_ERROR'],
+    7: ['PRINTING', 'QUALITY', 'DEFECT', 'LARI', 'MIRING'],
+    6: ['FEEDER', 'VACUUM', 'CONVEYOR', 'FEEDING'],
+    5: ['ADJUSTMENT', 'SETTING', 'CLEANING'],
+    4: ['MINOR_REPAIR', 'OPERATOR_REPAIR'],
+    3: ['SETUP', 'CHANGEOVER', 'MOUNTING'],
+    2: ['BREAK', 'ISTIRAHAT', 'SCHEDULED'],
+    1: ['MEETING', 'BRIEFING', 'PRAYER']
+}
+
+# Severity heuristik jika tidak ada pattern yang cocok
+DEFAULT_PATTERN_SEVERITY = 5
+
+# Rank "tidak ada hit" (lebih besar dari rank keyword mana pun)
+_NO_HIT = 1 << 30
+
+
+class ReasonMatch:
+    """Hasil resolusi satu reason."""
+
+    __slots__ = ('reason', 'mapped_reason', 'fmea_severity', 'category', 'pattern_severity')
+
+    def __init__(
+        self,
+        reason: str,
+        mapped_reason: str,
+        fmea_severity: Optional[int],
+        category: Optional[str],
+        pattern_severity: int
+    ):
+        """
+        Args:
+            reason: Reason ternormalisasi (strip + uppercase)
+            mapped_reason: Nama training data (SENSOR_TO_TRAINING_MAP) atau reason itu sendiri
+            fmea_severity: Severity FMEA_SEVERITY_MAP dari mapped_reason, None jika tidak ada
+            category: Kategori CATEGORY_ADJUSTMENTS pertama yang keyword-nya muncul, atau None
+            pattern_severity: Severity heuristik dari SEVERITY_PATTERNS
+        """
+        self.reason = reason
+        self.mapped_reason = mapped_reason
+        self.fmea_severity = fmea_severity
+        self.category = category
+        self.pattern_severity = pattern_severity
+
+    @property
+    def severity(self) -> int:
+        """Severity FMEA, DEFAULT_SEVERITY jika reason tidak ada di map."""
+        return self.fmea_severity if self.fmea_severity is not None else DEFAULT_SEVERITY
+
+
+class ReasonMatcher:
+    """
+    Automaton Aho-Corasick atas semua nama dan keyword reason.
+
+    Dibangun sekali: trie dari nama exact (SENSOR_TO_TRAINING_MAP, FMEA_SEVERITY_MAP)
+    dan keyword substring (CATEGORY_ADJUSTMENTS, SEVERITY_PATTERNS), lalu failure
+    link dilipat menjadi tabel transisi DFA penuh. Satu scan linear atas reason
+    menghasilkan nama terjemahan, severity FMEA, kategori, dan severity heuristik
+    sekaligus, menggantikan lookup dict + loop any(keyword in reason) per kategori.
+    """
+
+    def __init__(
+        self,
+        severity_map: Dict[str, int] = FMEA_SEVERITY_MAP,
+        sensor_map: Dict[str, str] = SENSOR_TO_TRAINING_MAP,
+        category_keywords: Optional[Dict[str, List[str]]] = None,
+        severity_patterns: Dict[int, List[str]] = SEVERITY_PATTERNS
+    ):
+        """
+        Args:
+            severity_map: Nama reason -> severity FMEA
+            sensor_map: Nama sensor -> nama training data
+            category_keywords: Kategori -> keyword (default dari CATEGORY_ADJUSTMENTS);
+                urutan dict adalah prioritas
+            severity_patterns: Severity -> keyword; urutan dict adalah prioritas
+        """
+        if category_keywords is None:
+            category_keywords = {c: cfg['keywords'] for c, cfg in CATEGORY_ADJUSTMENTS.items()}
+
+        self.categories: List[str] = list(category_keywords)
+        self.pattern_severities: List[int] = list(severity_patterns)
+
+        # Trie: transisi per node, kedalaman node, hit keyword (rank kategori, rank severity)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth: List[int] = [0]
+        self._hits: List[Optional[Tuple[int, int]]] = [None]
+        # Node -> (mapped_reason, fmea_severity) untuk nama yang cocok persis
+        self._exact: Dict[int, Tuple[str, Optional[int]]] = {}
+
+        for name, severity in severity_map.items():
+            self._exact[self._insert(name)] = (name, severity)
+        for name, mapped in sensor_map.items():
+            self._exact[self._insert(name)] = (mapped, severity_map.get(mapped))
+        for rank, keywords in enumerate(category_keywords.values()):
+            for keyword in keywords:
+                self._add_hit(self._insert(keyword), rank, _NO_HIT)
+        for rank, keywords in enumerate(severity_patterns.values()):
+            for keyword in keywords:
+                self._add_hit(self._insert(keyword), _NO_HIT, rank)
+
+        self._delta = self._compile()
+        # Reason kosong hanya bisa cocok persis di root
+        self._empty = self._exact.get(0)
+
+    def _insert(self, pattern: str) -> int:
+        """Tambah pattern ke trie, return node akhirnya."""
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._depth.append(self._depth[node] + 1)
+                self._hits.append(None)
+                self._goto[node][ch] = nxt
+            node = nxt
+        return node
+
+    def _add_hit(self, node: int, category_rank: int, severity_rank: int) -> None:
+        """Gabungkan hit keyword di node (rank terkecil = prioritas tertinggi)."""
+        current = self._hits[node] or (_NO_HIT, _NO_HIT)
+        self._hits[node] = (min(current[0], category_rank), min(current[1], severity_rank))
+
+    def _compile(self) -> List[Dict[str, int]]:
+        """
+        Hitung failure link (BFS) dan lipat menjadi tabel transisi DFA penuh.
+
+        Hit keyword setiap node digabung dengan hit node failure-nya, sehingga
+        scan cukup membaca satu entri per karakter.
+
+        Returns:
+            List dict per node: karakter -> node berikutnya (karakter lain -> root)
+        """
+        delta: List[Dict[str, int]] = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            hit = self._hits[fail[node]]
+            if hit is not None:
+                self._add_hit(node, *hit)
+            delta[node] = dict(delta[fail[node]])
+            for ch, child in self._goto[node].items():
+                fail[child] = delta[fail[node]].get(ch, 0)
+                delta[node][ch] = child
+                queue.append(child)
+        return delta
+
+    def match(self, reason: str) -> ReasonMatch:
+        """
+        Resolusi reason dalam satu scan.
+
+        Args:
+            reason: Reason mentah (akan di-strip dan uppercase)
+
+        Returns:
+            ReasonMatch
+        """
+        text = str(reason or '').strip().upper()
+        delta = self._delta
+        hits = self._hits
+        node = 0
+        category_rank = severity_rank = _NO_HIT
+        for ch in text:
+            node = delta[node].get(ch, 0)
+            hit = hits[node]
+            if hit is not None:
+                if hit[0] < category_rank:
+                    category_rank = hit[0]
+                if hit[1] < severity_rank:
+                    severity_rank = hit[1]
+
+        # Node akhir = suffix terpanjang yang ada di trie; cocok persis jika sepanjang teks
+        exact = self._exact.get(node) if self._depth[node] == len(text) else None
+        mapped_reason, fmea_severity = exact if exact is not None else (text, None)
+        return ReasonMatch(
+            text,
+            mapped_reason,
+            fmea_severity,
+            self.categories[category_rank] if category_rank != _NO_HIT else None,
+            self.pattern_severities[severity_rank] if severity_rank != _NO_HIT else DEFAULT_PATTERN_SEVERITY
+        )
+
+    def resolve(self, reason: str) -> Tuple[str, int]:
+        """
+        Nama training data dan severity FMEA (default jika tidak dikenal).
+
+        Args:
+            reason: Reason mentah
+
+        Returns:
+            Tuple (mapped_reason, severity)
+        """
+        match = self.match(reason)
+        return match.mapped_reason, match.severity
+
+
+# Global instance (automaton dibangun sekali per proses)
+reason_matcher = ReasonMatcher()
@@ -0,0 +1,371 @@
+"""
+Reliability Service
+KPI reliabilitas per komponen / per alasan kegagalan: MTBF, MTTR, Pareto menit
+downtime, dan clustering kegagalan berulang. Dihitung dari interval downtime yang
+sudah dipra-hitung (tabel downtime_events) dan riwayat perbaikan CSV di Model/,
+lalu disajikan dari cache yang dapat di-refresh
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    RELIABILITY_CACHE_TTL_SECONDS, RELIABILITY_CACHE_MAX_ENTRIES, RELIABILITY_TOP_N,
+    RELIABILITY_REPEAT_WINDOW_HOURS
+)
+from src.utils.logger import get_logger
+from src.services.database_service import db_service
+from src.services.downtime_service import MIN_EVENT_MINUTES
+from src.services.prediction_log_service import prediction_log_service
+
+logger = get_logger(__name__)
+
+# Sumber interval kegagalan
+RELIABILITY_SOURCES = ('machine', 'repairs')
+RELIABILITY_GROUP_BY = ('component', 'reason')
+
+# Komponen dari teks ISSUE riwayat perbaikan (keyword pertama yang cocok)
+REPAIR_COMPONENT_KEYWORDS = (
+    ('PREFEEDER', 'Pre-Feeder'),
+    ('PRE FEEDER', 'Pre-Feeder'),
+    ('FEEDER', 'Feeder'),
+    ('IMPRESSION', 'Printing'),
+    ('PRINT', 'Printing'),
+    ('SLOT', 'Slotter'),
+    ('DIE', 'Die-cut'),
+    ('STACK', 'Stacker')
+)
+OTHER_COMPONENT = 'Other'
+
+# Batas cluster kegagalan berulang yang dikembalikan
+MAX_REPEAT_CLUSTERS = 20
+
+
+def repair_component(issue: str) -> str:
+    """
+    Menentukan komponen dari teks ISSUE riwayat perbaikan.
+
+    Args:
+        issue: Teks ISSUE (huruf besar)
+
+    Returns:
+        Nama komponen, atau 'Other' jika tidak ada keyword yang cocok
+    """
+    for keyword, component in REPAIR_COMPONENT_KEYWORDS:
+        if keyword in issue:
+            return component
+    return OTHER_COMPONENT
+
+
+def _parse_date(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    """Parse YYYY-MM-DD / ISO 8601 ke datetime UTC (tanggal saja = awal/akhir hari)."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1) - timedelta(microseconds=1)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def compute_reliability(
+    failures: List[Dict[str, Any]],
+    window_start: datetime,
+    window_end: datetime,
+    group_by: str = 'component',
+    top: int = RELIABILITY_TOP_N,
+    repeat_window_hours: float = RELIABILITY_REPEAT_WINDOW_HOURS
+) -> Dict[str, Any]:
+    """
+    Menghitung KPI reliabilitas dari daftar interval kegagalan.
+
+    MTBF = (durasi jendela observasi - total downtime) / jumlah kegagalan,
+    MTTR = rata-rata durasi downtime. Kegagalan berulang: kegagalan pada grup
+    yang sama yang terjadi <= repeat_window_hours setelah kegagalan sebelumnya;
+    rantai kegagalan berulang membentuk satu cluster.
+
+    Args:
+        failures: List {start (datetime), minutes, component, reason}
+        window_start: Awal jendela observasi
+        window_end: Akhir jendela observasi
+        group_by: 'component' atau 'reason'
+        top: Jumlah grup teratas di Pareto
+        repeat_window_hours: Jarak maksimal antar kegagalan dalam satu cluster
+
+    Returns:
+        Dict ringkasan, KPI per grup, Pareto, dan cluster kegagalan berulang
+    """
+    window_minutes = max((window_end - window_start).total_seconds() / 60.0, 0.0)
+    repeat_gap = timedelta(hours=repeat_window_hours)
+
+    def kpis(count: int, downtime: float) -> Dict[str, Any]:
+        mtbf = (window_minutes - downtime) / count / 60.0 if count else None
+        mttr = downtime / count if count else None
+        availability = (window_minutes - downtime) / window_minutes if window_minutes else None
+        return {
+            "failures": count,
+            "downtime_minutes": round(downtime, 1),
+            "mtbf_hours": round(max(mtbf, 0.0), 2) if mtbf is not None else None,
+            "mttr_minutes": round(mttr, 1) if mttr is not None else None,
+            "availability": round(max(availability, 0.0), 4) if availability is not None else None
+        }
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for failure in failures:
+        groups.setdefault(failure[group_by] or OTHER_COMPONENT, []).append(failure)
+
+    group_rows = []
+    clusters = []
+    for key, items in groups.items():
+        items.sort(key=lambda f: f["start"])
+        downtime = sum(f["minutes"] for f in items)
+
+        # Rantai kegagalan berjarak <= repeat_gap
+        repeat_failures = 0
+        chain = [items[0]]
+        for prev, current in zip(items, items[1:]):
+            if current["start"] - prev["start"] <= repeat_gap:
+                repeat_failures += 1
+                chain.append(current)
+                continue
+            if len(chain) > 1:
+                clusters.append((key, chain))
+            chain = [current]
+        if len(chain) > 1:
+            clusters.append((key, chain))
+
+        row = {"key": key, **kpis(len(items), downtime)}
+        row["repeat_failures"] = repeat_failures
+        row["repeat_rate"] = round(repeat_failures / len(items), 4)
+        group_rows.append(row)
+
+    group_rows.sort(key=lambda r: (-r["downtime_minutes"], r["key"]))
+    total_downtime = sum(f["minutes"] for f in failures)
+
+    pareto = []
+    cumulative = 0.0
+    for row in group_rows[:top]:
+        cumulative += row["downtime_minutes"]
+        pareto.append({
+            "key": row["key"],
+            "downtime_minutes": row["downtime_minutes"],
+            "share": round(row["downtime_minutes"] / total_downtime, 4) if total_downtime else 0.0,
+            "cumulative_share": round(cumulative / total_downtime, 4) if total_downtime else 0.0
+        })
+    # Grup "vital few": jumlah grup teratas yang mencakup 80% downtime
+    vital_few = next(
+        (i + 1 for i, row in enumerate(pareto) if row["cumulative_share"] >= 0.8),
+        None
+    )
+
+    clusters.sort(key=lambda c: (-len(c[1]), -sum(f["minutes"] for f in c[1])))
+    repeat_clusters = [{
+        "key": key,
+        "failures": len(chain),
+        "start": chain[0]["start"].isoformat(),
+        "end": chain[-1]["start"].isoformat(),
+        "downtime_minutes": round(sum(f["minutes"] for f in chain), 1)
+    } for key, chain in clusters[:MAX_REPEAT_CLUSTERS]]
+
+    return {
+        "window": {
+            "start": window_start.isoformat(),
+            "end": window_end.isoformat(),
+            "minutes": round(window_minutes, 1)
+        },
+        "summary": {
+            **kpis(len(failures), total_downtime),
+            "repeat_failures": sum(r["repeat_failures"] for r in group_rows),
+            "repeat_clusters": len(clusters)
+        },
+        "groups": group_rows,
+        "pareto": pareto,
+        "vital_few": vital_few,
+        "repeat_clusters": repeat_clusters
+    }
+
+
+class ReliabilityService:
+    """
+    Laporan KPI reliabilitas dengan cache TTL per kombinasi parameter.
+
+    Cache di-refresh otomatis setelah TTL habis, atau manual lewat refresh()
+    (endpoint admin) misalnya setelah backfill downtime_events. Cache dibatasi
+    max_entries (LRU); entri kedaluwarsa dibuang setiap kali entri baru disimpan.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = RELIABILITY_CACHE_TTL_SECONDS,
+        max_entries: int = RELIABILITY_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+    def get_report(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        sources: Optional[List[str]] = None,
+        group_by: str = 'component',
+        top: int = RELIABILITY_TOP_N,
+        repeat_window_hours: float = RELIABILITY_REPEAT_WINDOW_HOURS
+    ) -> Dict[str, Any]:
+        """
+        Laporan reliabilitas per sumber (machine = downtime_events, repairs = CSV).
+
+        Args:
+            start_date: Awal jendela (YYYY-MM-DD / ISO 8601, opsional)
+            end_date: Akhir jendela (YYYY-MM-DD / ISO 8601, opsional)
+            sources: Subset RELIABILITY_SOURCES (default semua)
+            group_by: 'component' atau 'reason'
+            top: Jumlah grup di Pareto
+            repeat_window_hours: Jarak maksimal antar kegagalan berulang
+
+        Returns:
+            Dict laporan per sumber beserta waktu komputasi
+
+        Raises:
+            ValueError: Jika parameter tidak valid
+        """
+        sources = list(dict.fromkeys(sources or RELIABILITY_SOURCES))
+        unknown = [s for s in sources if s not in RELIABILITY_SOURCES]
+        if unknown:
+            raise ValueError(f"Sumber tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(RELIABILITY_SOURCES)}")
+        if group_by not in RELIABILITY_GROUP_BY:
+            raise ValueError(f"group_by tidak dikenal: {group_by}. Pilihan: {', '.join(RELIABILITY_GROUP_BY)}")
+        if top < 1:
+            raise ValueError("top harus >= 1")
+        if not math.isfinite(repeat_window_hours) or not 0 < repeat_window_hours <= timedelta.max.days * 24:
+            raise ValueError("repeat_window_hours harus bilangan berhingga > 0")
+        start = _parse_date(start_date)
+        end = _parse_date(end_date, end_of_day=True)
+        if start and end and start >= end:
+            raise ValueError("start_date harus lebih awal dari end_date")
+
+        key = (start_date, end_date, tuple(sources), group_by, top, repeat_window_hours)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl_seconds:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return {**cached[1], "cached": True}
+            self.stats["misses"] += 1
+
+        started = time.perf_counter()
+        report = {
+            "group_by": group_by,
+            "repeat_window_hours": repeat_window_hours,
+            "generated_at": datetime.now(timezone.utc).isoformat()
+        }
+        for source in sources:
+            failures = self._load_machine_failures(start, end) if source == 'machine' else self._load_repair_failures(start, end)
+            window_start = start or min((f["start"] for f in failures), default=None)
+            window_end = end or max((f["end"] for f in failures), default=None)
+            if window_start is None or window_end is None:
+                report[source] = None
+                continue
+            report[source] = compute_reliability(
+                failures, window_start, window_end, group_by, top, repeat_window_hours
+            )
+        report["compute_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        with self._lock:
+            now = time.monotonic()
+            for stale in [k for k, (stored_at, _) in self._cache.items() if now - stored_at >= self.ttl_seconds]:
+                del self._cache[stale]
+            self._cache[key] = (now, report)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        logger.info(f"Reliability report computed in {report['compute_ms']} ms (sources={sources}, group_by={group_by})")
+        return {**report, "cached": False}
+
+    def refresh(self) -> int:
+        """
+        Mengosongkan cache laporan; request berikutnya dihitung ulang.
+
+        Returns:
+            Jumlah entri cache yang dihapus
+        """
+        with self._lock:
+            dropped = len(self._cache)
+            self._cache.clear()
+            self.stats["refreshes"] += 1
+        logger.info(f"Reliability cache refreshed ({dropped} entries dropped)")
+        return dropped
+
+    def status(self) -> Dict[str, Any]:
+        """Status cache laporan."""
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+                "entries": len(self._cache),
+                **self.stats
+            }
+
+    def _load_machine_failures(self, start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+        """
+        Interval downtime_events (kegagalan tertutup dan yang masih berjalan) dalam jendela.
+
+        Event di bawah MIN_EVENT_MINUTES diabaikan, sama dengan history/statistics/heatmap.
+        """
+        query = f"""
+            SELECT
+                start_time,
+                COALESCE(end_time, NOW()),
+                component,
+                machine_status,
+                COALESCE(duration_minutes, EXTRACT(EPOCH FROM (NOW() - start_time)) / 60.0)::float8
+            FROM downtime_events
+            WHERE (end_time IS NULL OR duration_minutes >= {MIN_EVENT_MINUTES})
+        """
+        params: List[Any] = []
+        if start:
+            query += " AND start_time >= %s"
+            params.append(start)
+        if end:
+            query += " AND start_time <= %s"
+            params.append(end)
+
+        with db_service.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+        return [{
+            "start": start_time,
+            "end": end_time,
+            "minutes": float(minutes),
+            "component": component,
+            "reason": status or 'Unknown'
+        } for start_time, end_time, component, status, minutes in rows]
+
+    def _load_repair_failures(self, start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+        """Kejadian riwayat perbaikan (resolusi harian) dalam jendela."""
+        failures = []
+        for repair in prediction_log_service.load_repairs():
+            day = repair["date"]
+            started = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            if (start and started < start) or (end and started > end):
+                continue
+            failures.append({
+                "start": started,
+                "end": started + timedelta(days=1),
+                "minutes": repair["actual_minutes"],
+                "component": repair_component(repair["issue"]),
+                "reason": repair["mapped_reason"]
+            })
+        return failures
+
+
+# Global instance
+reliability_service = ReliabilityService()
@@ -0,0 +1,345 @@
+"""
+Shadow Service
+Evaluasi shadow model kandidat: sampel input prediksi live dicerminkan ke model
+kandidat di background thread, output kedua model diagregasi berdampingan
+(histogram + statistik selisih) tanpa menambah latency jalur response utama
+"""
+
+import math
+import queue
+import random
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    SHADOW_ENABLED, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE, SHADOW_BATCH_SIZE,
+    SHADOW_AGREEMENT_TOLERANCE_MINUTES
+)
+from src.utils.logger import get_logger
+from src.services.feature_encoder import FeatureEncoder, predict_rows
+from src.services.model_registry import model_registry, ModelBundle, ModelRegistry
+from src.services.reason_matcher import reason_matcher, DEFAULT_SEVERITY
+
+logger = get_logger(__name__)
+
+# Slot registry model kandidat (Model/model_candidate.pkl, dimuat watcher saat file muncul)
+SHADOW_SLOT = "candidate"
+
+# Bin histogram durasi prediksi (menit) dan selisih kandidat - primary (menit)
+DURATION_BINS = (0, 15, 30, 60, 120, 180, 240, 360, 480, 720, 960, math.inf)
+DIFF_BINS = (-math.inf, -240, -120, -60, -30, -15, -5, 5, 15, 30, 60, 120, 240, math.inf)
+
+# Batas reason yang dilacak per pasangan model (sisanya masuk '_OTHER_')
+MAX_TRACKED_REASONS = 200
+
+
+def _bin_labels(edges: Tuple[float, ...]) -> List[str]:
+    """Label bin histogram, mis. '15-30' dan '>=960'."""
+    labels = []
+    for low, high in zip(edges[:-1], edges[1:]):
+        if math.isinf(low):
+            labels.append(f"<{high:g}")
+        elif math.isinf(high):
+            labels.append(f">={low:g}")
+        else:
+            labels.append(f"{low:g}-{high:g}")
+    return labels
+
+
+class ShadowStats:
+    """
+    Agregat output primary vs kandidat untuk satu pasangan versi model.
+
+    Hanya menyimpan jumlahan dan histogram (ukuran tetap), bukan pasangan
+    prediksi mentah.
+    """
+
+    def __init__(self, primary: ModelBundle, candidate: ModelBundle):
+        self.primary = {"slot": primary.slot, "version": primary.version, "content_hash": primary.content_hash}
+        self.candidate = {"slot": candidate.slot, "version": candidate.version, "content_hash": candidate.content_hash}
+        self.count = 0
+        self.agreements = 0
+        self.sums = np.zeros(5)  # primary, candidate, primary², candidate², primary×candidate
+        self.diff_sum = 0.0
+        self.diff_sq_sum = 0.0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.primary_hist = np.zeros(len(DURATION_BINS) - 1, dtype=np.int64)
+        self.candidate_hist = np.zeros(len(DURATION_BINS) - 1, dtype=np.int64)
+        self.diff_hist = np.zeros(len(DIFF_BINS) - 1, dtype=np.int64)
+        # reason -> [count, jumlah selisih, jumlah |selisih|]
+        self.by_reason: Dict[str, List[float]] = {}
+        self.first_seen = datetime.now()
+        self.last_seen = self.first_seen
+
+    def add(self, primary: np.ndarray, candidate: np.ndarray, reasons: List[str]) -> None:
+        """
+        Tambah satu batch pasangan prediksi.
+
+        Args:
+            primary: Prediksi model primary (menit)
+            candidate: Prediksi model kandidat untuk input yang sama (menit)
+            reasons: Reason terjemahan per baris
+        """
+        diff = candidate - primary
+        abs_diff = np.abs(diff)
+
+        self.count += len(diff)
+        self.agreements += int(np.count_nonzero(abs_diff <= SHADOW_AGREEMENT_TOLERANCE_MINUTES))
+        self.sums += (primary.sum(), candidate.sum(), (primary ** 2).sum(), (candidate ** 2).sum(),
+                      (primary * candidate).sum())
+        self.diff_sum += float(diff.sum())
+        self.diff_sq_sum += float((diff ** 2).sum())
+        self.abs_diff_sum += float(abs_diff.sum())
+        self.max_abs_diff = max(self.max_abs_diff, float(abs_diff.max()))
+        self.primary_hist += np.histogram(primary, DURATION_BINS)[0]
+        self.candidate_hist += np.histogram(candidate, DURATION_BINS)[0]
+        self.diff_hist += np.histogram(diff, DIFF_BINS)[0]
+
+        for reason, d, a in zip(reasons, diff.tolist(), abs_diff.tolist()):
+            if reason not in self.by_reason and len(self.by_reason) >= MAX_TRACKED_REASONS:
+                reason = '_OTHER_'
+            entry = self.by_reason.setdefault(reason, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += d
+            entry[2] += a
+        self.last_seen = datetime.now()
+
+    def describe(self, top_reasons: int = 10) -> Dict[str, Any]:
+        """Ringkasan agregat (statistik selisih, korelasi, histogram, reason dengan selisih terbesar)."""
+        n = self.count
+        if n == 0:
+            return {"primary": self.primary, "candidate": self.candidate, "samples": 0}
+
+        sum_p, sum_c, sum_pp, sum_cc, sum_pc = self.sums.tolist()
+        var_p = sum_pp / n - (sum_p / n) ** 2
+        var_c = sum_cc / n - (sum_c / n) ** 2
+        cov = sum_pc / n - (sum_p / n) * (sum_c / n)
+        correlation = cov / math.sqrt(var_p * var_c) if var_p > 1e-12 and var_c > 1e-12 else None
+        mean_diff = self.diff_sum / n
+
+        reasons = sorted(self.by_reason.items(), key=lambda item: item[1][2] / item[1][0], reverse=True)
+        return {
+            "primary": self.primary,
+            "candidate": self.candidate,
+            "samples": n,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "primary_mean": round(sum_p / n, 2),
+            "candidate_mean": round(sum_c / n, 2),
+            "diff": {
+                "mean": round(mean_diff, 2),
+                "std": round(math.sqrt(max(self.diff_sq_sum / n - mean_diff ** 2, 0.0)), 2),
+                "mae": round(self.abs_diff_sum / n, 2),
+                "rmse": round(math.sqrt(self.diff_sq_sum / n), 2),
+                "max_abs": round(self.max_abs_diff, 2)
+            },
+            "correlation": round(correlation, 4) if correlation is not None else None,
+            "agreement_rate": round(self.agreements / n, 4),
+            "agreement_tolerance_minutes": SHADOW_AGREEMENT_TOLERANCE_MINUTES,
+            "histograms": {
+                "duration_bins": _bin_labels(DURATION_BINS),
+                "primary": self.primary_hist.tolist(),
+                "candidate": self.candidate_hist.tolist(),
+                "diff_bins": _bin_labels(DIFF_BINS),
+                "diff": self.diff_hist.tolist()
+            },
+            "top_reasons_by_mae": [
+                {
+                    "reason": reason,
+                    "samples": int(count),
+                    "mean_diff": round(diff_sum / count, 2),
+                    "mae": round(abs_sum / count, 2)
+                }
+                for reason, (count, diff_sum, abs_sum) in reasons[:top_reasons]
+            ]
+        }
+
+
+class ShadowEvaluator:
+    """
+    Mirror sampel input prediksi ke model kandidat di background thread.
+
+    Jalur request hanya melakukan sampling dan put_nowait ke queue berukuran
+    tetap; jika queue penuh sampel dibuang (dihitung sebagai dropped), tidak
+    pernah menunggu. Worker memproses queue per batch: encode input dengan
+    encoder model kandidat, satu panggilan predict, lalu agregasi.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry = model_registry,
+        slot: str = SHADOW_SLOT,
+        sample_rate: float = SHADOW_SAMPLE_RATE,
+        queue_size: int = SHADOW_QUEUE_SIZE,
+        batch_size: int = SHADOW_BATCH_SIZE,
+        enabled: bool = SHADOW_ENABLED
+    ):
+        self.registry = registry
+        self.slot = slot
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.enabled = enabled
+
+        self._queue: "queue.Queue[Tuple[ModelBundle, Dict[str, Any], float]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._warmer_registered = False
+
+        # (hash primary, hash kandidat) -> ShadowStats
+        self._stats: Dict[Tuple[str, str], ShadowStats] = {}
+        self._counters = {
+            "offered": 0,          # Sampel yang masuk queue
+            "dropped": 0,          # Queue penuh
+            "evaluated": 0,        # Sampel yang sudah dibandingkan
+            "no_candidate": 0,     # Tidak ada model kandidat saat diproses
+            "errors": 0            # Batch gagal diproses
+        }
+
+    # =========================================================================
+    # JALUR REQUEST
+    # =========================================================================
+
+    def offer(self, primary: ModelBundle, real_time_data: Dict[str, Any], primary_value: float) -> bool:
+        """
+        Mirror satu input prediksi (dengan probabilitas sample_rate) ke queue shadow.
+
+        Args:
+            primary: Bundle model yang melayani request
+            real_time_data: Input prediksi
+            primary_value: Prediksi primary (menit, sebelum pembulatan)
+
+        Returns:
+            True jika sampel masuk queue
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return False
+        if self._thread is None:
+            self.start()
+        self._idle.clear()
+        try:
+            self._queue.put_nowait((primary, dict(real_time_data), float(primary_value)))
+        except queue.Full:
+            self._counters["dropped"] += 1
+            return False
+        self._counters["offered"] += 1
+        return True
+
+    # =========================================================================
+    # WORKER
+    # =========================================================================
+
+    def start(self) -> None:
+        """Menjalankan worker shadow (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._warmer_registered:
+                self.registry.register_warmer(self.slot, "shadow_service", self._build_encoder)
+                self._warmer_registered = True
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+            self._thread.start()
+        logger.info(f"Shadow evaluator started (slot '{self.slot}', sample rate {self.sample_rate})")
+
+    def stop(self) -> None:
+        """Menghentikan worker (sampel yang tersisa di queue diproses dulu)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu sampai queue kosong dan batch terakhir selesai diagregasi."""
+        return self._idle.wait(timeout)
+
+    def _build_encoder(self, bundle: ModelBundle) -> Optional[FeatureEncoder]:
+        """Warmer registry: encoder fitur untuk model kandidat."""
+        if bundle.feature_names is None:
+            return None
+        return FeatureEncoder(bundle.feature_names, reason_matcher.resolve, DEFAULT_SEVERITY)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                items = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                self._idle.set()
+                if self._stop.is_set():
+                    return
+                continue
+
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._evaluate(items)
+            except Exception as e:
+                self._counters["errors"] += 1
+                logger.error(f"Shadow evaluation batch failed: {e}")
+            if self._queue.empty():
+                self._idle.set()
+
+    def _evaluate(self, items: List[Tuple[ModelBundle, Dict[str, Any], float]]) -> None:
+        """Prediksi kandidat untuk satu batch dan tambahkan ke agregat per pasangan model."""
+        candidate = self.registry.get(self.slot)
+        encoder = candidate.artifacts.get("shadow_service") if candidate is not None else None
+        if encoder is None:
+            self._counters["no_candidate"] += len(items)
+            return
+
+        X = encoder.encode_batch([data for _, data, _ in items])
+        candidate_values = np.maximum(np.asarray(predict_rows(candidate.model, X), dtype=np.float64), 0.0)
+        primary_values = np.maximum(np.array([value for _, _, value in items], dtype=np.float64), 0.0)
+        reasons = [reason_matcher.match(data.get('reason', '')).mapped_reason for _, data, _ in items]
+
+        groups: Dict[str, List[int]] = {}
+        for i, (primary, _, _) in enumerate(items):
+            groups.setdefault(primary.content_hash, []).append(i)
+
+        with self._lock:
+            for primary_hash, rows in groups.items():
+                key = (primary_hash, candidate.content_hash)
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = ShadowStats(items[rows[0]][0], candidate)
+                stats.add(primary_values[rows], candidate_values[rows], [reasons[i] for i in rows])
+            self._counters["evaluated"] += len(items)
+
+    # =========================================================================
+    # STATUS
+    # =========================================================================
+
+    def reset(self) -> None:
+        """Hapus semua agregat (counter tetap)."""
+        with self._lock:
+            self._stats.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """Konfigurasi, counter, dan agregat per pasangan (primary, kandidat)."""
+        candidate = self.registry.get(self.slot) if self._thread is not None else None
+        with self._lock:
+            comparisons = [stats.describe() for stats in self._stats.values()]
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "slot": self.slot,
+            "candidate": candidate.describe() if candidate is not None else None,
+            "sample_rate": self.sample_rate,
+            "queue_depth": self._queue.qsize(),
+            **self._counters,
+            "comparisons": comparisons
+        }
+
+
+# Global instance
+shadow_evaluator = ShadowEvaluator()
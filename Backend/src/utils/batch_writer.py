@@ -0,0 +1,163 @@
+"""
+batch_writer.py
+Utility untuk menulis record ke database secara batch di background thread
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+from .logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class BatchWriter:
+    """
+    Buffer record di memori dan flush ke callback secara batch.
+
+    Record ditambahkan dengan append() tanpa menyentuh database, sehingga
+    request path tidak pernah menunggu I/O. Background thread melakukan flush
+    ketika buffer mencapai batch_size atau setiap flush_interval detik.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: Callable[[List[Any]], Optional[int]],
+        batch_size: int = 100,
+        flush_interval: float = 10.0,
+        max_buffer: int = 10000
+    ):
+        """
+        Args:
+            name: Nama writer (untuk logging)
+            flush_fn: Callback yang menerima list record dan menulisnya ke storage.
+                Boleh mengembalikan jumlah record yang ditolak storage (data tidak
+                valid); record tersebut tidak diulang. Exception berarti seluruh
+                batch gagal dan dicoba lagi.
+            batch_size: Jumlah record yang memicu flush lebih awal
+            flush_interval: Interval flush periodik (detik)
+            max_buffer: Batas buffer; record tertua dibuang jika terlampaui
+        """
+        self.name = name
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_flush_failed = False
+
+        self.stats = {
+            "appended": 0,
+            "written": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "flushes": 0,
+            "failed_flushes": 0
+        }
+
+    def start(self) -> None:
+        """Menjalankan background flush thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"batch-writer-{self.name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record: Any) -> None:
+        """
+        Menambahkan record ke buffer (non-blocking).
+
+        Args:
+            record: Record yang akan ditulis pada flush berikutnya
+        """
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.stats["dropped"] += 1
+            self._buffer.append(record)
+            self.stats["appended"] += 1
+            pending = len(self._buffer)
+
+        if self._thread is None:
+            self.start()
+
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """Jumlah record yang belum ditulis."""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Menulis semua record di buffer secara sinkron.
+
+        Returns:
+            Jumlah record yang berhasil ditulis (tanpa record yang ditolak)
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                batch = list(self._buffer)
+                self._buffer.clear()
+
+            try:
+                rejected = self.flush_fn(batch) or 0
+                self._last_flush_failed = False
+                self.stats["written"] += len(batch) - rejected
+                self.stats["rejected"] += rejected
+                self.stats["flushes"] += 1
+                return len(batch) - rejected
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                self._last_flush_failed = True
+                logger.error(f"[{self.name}] Batch flush failed ({len(batch)} records): {e}")
+                self._requeue(batch)
+                return 0
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Menghentikan background thread dan melakukan flush terakhir."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def _requeue(self, batch: List[Any]) -> None:
+        """Kembalikan batch gagal ke depan buffer agar dicoba lagi."""
+        with self._lock:
+            room = self.max_buffer - len(self._buffer)
+            if room < len(batch):
+                self.stats["dropped"] += len(batch) - max(room, 0)
+                batch = batch[len(batch) - max(room, 0):]
+            self._buffer.extendleft(reversed(batch))
+
+    def _run(self) -> None:
+        """Loop background flush."""
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            self.flush()
+            if self._last_flush_failed:
+                # Backoff singkat setelah kegagalan agar tidak membanjiri database
+                time.sleep(min(self.flush_interval, 5.0))
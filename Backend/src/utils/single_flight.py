@@ -0,0 +1,188 @@
+"""
+single_flight.py
+Utility untuk menggabungkan (coalescing) pemanggilan identik yang bersamaan menjadi
+satu komputasi, dengan cache hasil berumur pendek di belakangnya
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def freeze_key(data: Any) -> Optional[Hashable]:
+    """
+    Key hashable untuk dictionary input (urutan key tidak berpengaruh).
+
+    Args:
+        data: Dictionary input (nilai boleh scalar atau dict/list bersarang)
+
+    Returns:
+        Key hashable, atau None jika input tidak bisa dijadikan key
+    """
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        hash(value)
+        # Bedakan 1 dan "1" (hasil prediksi menyertakan input apa adanya)
+        return (type(value).__name__, value)
+
+    try:
+        return freeze(data)
+    except TypeError:
+        return None
+
+
+class _Call:
+    """Komputasi in-flight yang ditunggu oleh pemanggil lain dengan key sama."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Single-flight + cache TTL.
+
+    Pemanggilan dengan key yang sama saat komputasinya masih berjalan menunggu
+    hasil komputasi tersebut (tidak menghitung ulang). Hasil yang lolos
+    `cacheable` disimpan selama `ttl_seconds` untuk pemanggilan berikutnya.
+    Setiap pemanggil menerima salinan hasil sendiri, sehingga modifikasi oleh
+    satu pemanggil tidak terlihat oleh yang lain.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_entries: int,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ):
+        """
+        Args:
+            name: Nama (untuk status/logging)
+            ttl_seconds: Umur entri cache hasil (0 = hanya coalescing, tanpa cache)
+            max_entries: Batas entri cache (entri tertua dibuang lebih dulu)
+            cacheable: Predikat hasil boleh di-cache (default: semua hasil)
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cacheable = cacheable or (lambda result: True)
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._cache: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._counters = {
+            "calls": 0,        # Semua pemanggilan dengan key valid
+            "computed": 0,     # Komputasi yang benar-benar dijalankan
+            "coalesced": 0,    # Menunggu komputasi in-flight yang sama
+            "cache_hits": 0,   # Dilayani dari cache TTL
+            "errors": 0,       # Komputasi yang melempar exception
+            "bypassed": 0      # Input tanpa key (selalu dihitung langsung)
+        }
+
+    def do(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Any:
+        """
+        Jalankan fn sekali per key untuk semua pemanggil bersamaan.
+
+        Args:
+            key: Key komputasi (None = tanpa coalescing/cache)
+            fn: Fungsi tanpa argumen yang menghasilkan hasil
+
+        Returns:
+            Salinan hasil fn
+
+        Raises:
+            Exception dari fn (diteruskan ke semua pemanggil yang menunggu)
+        """
+        if key is None:
+            with self._lock:
+                self._counters["bypassed"] += 1
+            return fn()
+
+        with self._lock:
+            self._counters["calls"] += 1
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._counters["cache_hits"] += 1
+                    return copy.deepcopy(result)
+                del self._cache[key]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self._counters["computed"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._counters["errors"] += 1
+                del self._inflight[key]
+            call.event.set()
+            raise
+
+        call.result = result
+        with self._lock:
+            del self._inflight[key]
+            if self.ttl_seconds > 0 and self._cacheable(result):
+                self._cache[key] = (time.monotonic() + self.ttl_seconds, result)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        call.event.set()
+        return copy.deepcopy(result)
+
+    def clear(self) -> None:
+        """Kosongkan cache hasil (komputasi in-flight tidak terpengaruh)."""
+        with self._lock:
+            self._cache.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Counter dan ukuran cache.
+
+        Returns:
+            Dictionary counter, jumlah pekerjaan yang dihemat, dan ukuran cache
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            cache_entries = len(self._cache)
+            inflight = len(self._inflight)
+
+        saved = counters["coalesced"] + counters["cache_hits"]
+        return {
+            "name": self.name,
+            **counters,
+            "saved": saved,
+            "saved_ratio": round(saved / counters["calls"], 4) if counters["calls"] else 0.0,
+            "inflight": inflight,
+            "cache_entries": cache_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries
+        }
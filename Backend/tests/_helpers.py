@@ -0,0 +1,52 @@
+"""
+Helper bersama untuk test dan benchmark prediksi
+
+- load_service: PredictionService dengan fallback ke model_improved.pkl
+- model_reasons / build_inputs: input prediksi sintetis dari reason yang dikenal model
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.prediction_service import PredictionService  # noqa: E402
+from src.services.reason_matcher import SENSOR_TO_TRAINING_MAP  # noqa: E402
+from src.services.feature_encoder import REASON_PREFIXES  # noqa: E402
+from src.services.model_registry import model_registry  # noqa: E402
+
+MODEL_DIR = backend_dir.parent / "Model"
+
+
+def load_service(live_inference: bool = False) -> PredictionService:
+    """
+    PredictionService global; jika model.pkl tidak tersedia, slot standard diisi
+    model_improved.pkl (fitur reason/shift/FMEA_Severity yang sama).
+
+    Args:
+        live_inference: True untuk mematikan lookup table (semua baris lewat model)
+    """
+    service = PredictionService()
+    if not service.model_loaded:
+        print("model.pkl tidak tersedia, menggunakan model_improved.pkl")
+        model_registry.load_files(PredictionService.MODEL_SLOT, MODEL_DIR / "model_improved.pkl",
+                                  MODEL_DIR / "feature_names_improved.pkl")
+    if live_inference:
+        service.current_state().prediction_table = None
+    return service
+
+
+def model_reasons(feature_names, extra=("UNKNOWN REASON",)):
+    """Reason training dari nama fitur + reason sensor + reason tambahan."""
+    reasons = [c.split("_", 1)[1] for c in feature_names if c.startswith(REASON_PREFIXES)]
+    return reasons + list(SENSOR_TO_TRAINING_MAP.keys()) + list(extra)
+
+
+def build_inputs(service, size, seed=42, shifts=(1, 2, 3), extra_reasons=("UNKNOWN REASON",)):
+    """Input {reason, shift} acak (deterministik per seed)."""
+    rng = random.Random(seed)
+    reasons = model_reasons(service.feature_names, extra_reasons)
+    return [{"reason": rng.choice(reasons), "shift": rng.choice(shifts)} for _ in range(size)]
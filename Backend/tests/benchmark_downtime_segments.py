@@ -0,0 +1,204 @@
+"""
+Benchmark: Deteksi segmen downtime machine_status - SQL window function vs loop Python
+
+Script ini:
+1. Membuat machine_logs sintetis (jutaan baris, status Markov per menit) di SQLite
+   in-memory (SQLite >= 3.30 mendukung window function dan FILTER)
+2. Memverifikasi query gaps-and-islands (build_status_segments_query) menghasilkan
+   segmen yang sama dengan loop referensi (_walk_status_segments), termasuk
+   filter start_date/end_date, limit, dan segmen yang masih berjalan
+3. Mengukur waktu: ambil semua baris + loop Python vs satu query segmen,
+   beserta jumlah baris yang dikirim ke aplikasi
+
+Di produksi query yang sama berjalan di PostgreSQL (EXTRACT(EPOCH ...)); di sini
+selisih menit memakai strftime('%s'). Kolom timestamp dikonversi ke datetime saat
+fetch (seperti psycopg2), sehingga biaya per baris jalur lama ikut terukur; biaya
+jaringan tidak terukur karena SQLite berjalan di proses yang sama.
+
+Jalankan:
+    python tests/benchmark_downtime_segments.py [jumlah_baris]
+"""
+
+import sys
+import time
+import random
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.downtime_service import DowntimeService
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+SQLITE_MINUTES = "(strftime('%s', {end}) - strftime('%s', {start})) / 60.0"
+RAW_QUERY = """
+    SELECT timestamp, machine_status, performance_rate, quality_rate,
+           cumulative_production, cumulative_defects
+    FROM machine_logs
+    WHERE 1=1{filters}
+    ORDER BY timestamp ASC
+"""
+
+# Peluang pindah status per menit
+TRANSITIONS = {
+    'Running': [('Running', 0.985), ('Idle', 0.006), ('Stopped', 0.004), ('Error', 0.003),
+                ('Maintenance', 0.001), ('Setup', 0.001)],
+    'Idle': [('Idle', 0.85), ('Running', 0.15)],
+    'Stopped': [('Stopped', 0.9), ('Running', 0.08), ('Error', 0.02)],
+    'Error': [('Error', 0.93), ('Running', 0.06), ('Maintenance', 0.01)],
+    'Maintenance': [('Maintenance', 0.98), ('Running', 0.02)],
+    'Setup': [('Setup', 0.9), ('Running', 0.1)]
+}
+
+
+def build_database(n_rows):
+    rng = random.Random(42)
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("""
+        CREATE TABLE machine_logs (
+            id INTEGER PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL,
+            machine_status TEXT,
+            performance_rate REAL,
+            quality_rate REAL,
+            cumulative_production INTEGER,
+            cumulative_defects INTEGER
+        )
+    """)
+    start = datetime(2023, 1, 1)
+    # Diawali status downtime agar aturan awal rentang ikut teruji
+    status = 'Setup'
+    production = defects = 0
+
+    def rows():
+        nonlocal status, production, defects
+        for i in range(n_rows):
+            if status == 'Running':
+                production += rng.randint(8, 12)
+                defects += rng.random() < 0.05
+                performance = rng.uniform(70, 100)
+            else:
+                performance = rng.uniform(0, 40)
+            yield ((start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"), status,
+                   round(performance, 2), round(rng.uniform(60, 100), 2), production, defects)
+            r = rng.random()
+            for candidate, p in TRANSITIONS[status]:
+                r -= p
+                if r <= 0:
+                    status = candidate
+                    break
+
+    conn.executemany(
+        "INSERT INTO machine_logs (timestamp, machine_status, performance_rate, quality_rate, "
+        "cumulative_production, cumulative_defects) VALUES (?, ?, ?, ?, ?, ?)", rows())
+    # Akhiri dengan segmen yang masih berjalan
+    end = (start + timedelta(minutes=n_rows)).strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute("INSERT INTO machine_logs (timestamp, machine_status, performance_rate, quality_rate, "
+                 "cumulative_production, cumulative_defects) VALUES (?, 'Error', 10, 80, ?, ?)",
+                 (end, production, defects))
+    conn.execute("CREATE INDEX idx_machine_logs_timestamp ON machine_logs (timestamp)")
+    conn.commit()
+    return conn
+
+
+def python_segments(service, conn, limit, start_date=None, end_date=None):
+    filters, params = "", []
+    if start_date:
+        filters += " AND timestamp >= ?"
+        params.append(start_date)
+    if end_date:
+        filters += " AND timestamp <= ?"
+        params.append(end_date)
+    rows = conn.execute(RAW_QUERY.format(filters=filters), params).fetchall()
+    return service._walk_status_segments(rows, limit), len(rows)
+
+
+def sql_segments(service, conn, limit, start_date=None, end_date=None):
+    query, params = service.build_status_segments_query(
+        limit, start_date, end_date, minutes_sql=SQLITE_MINUTES, placeholder="?")
+    rows = conn.execute(query, params).fetchall()
+    return rows, len(rows)
+
+
+def normalize(segment):
+    start, end, status, perf, quality, duration, samples, avg_perf, min_perf, avg_quality, prod, defects = segment
+    return (str(start), None if end is None else str(end), status, perf, quality, None if duration is None else int(duration), samples,
+            None if avg_perf is None else round(avg_perf, 4), min_perf,
+            None if avg_quality is None else round(avg_quality, 4), prod, defects)
+
+
+def test_parity(service, conn):
+    print("\n" + "=" * 70)
+    print("TEST 1: HASIL QUERY == LOOP REFERENSI")
+    print("=" * 70)
+    cases = [
+        ("semua baris, limit besar", 10 ** 9, None, None),
+        ("limit 50", 50, None, None),
+        ("rentang tanggal", 200, "2023-01-03 07:13:00", "2023-01-20 00:00:00"),
+        ("mulai di tengah downtime", 10 ** 6, "2023-01-01 00:00:00", "2023-01-01 12:00:00"),
+        ("hanya start_date", 30, "2023-02-01 00:00:00", None)
+    ]
+    for label, limit, start_date, end_date in cases:
+        expected, _ = python_segments(service, conn, limit, start_date, end_date)
+        actual, _ = sql_segments(service, conn, limit, start_date, end_date)
+        expected = [normalize(s) for s in expected]
+        actual = [normalize(s) for s in actual]
+        print(f"  {label:<28s}: {len(actual):6d} segmen")
+        assert actual == expected, f"{label}: {actual[:2]} != {expected[:2]}"
+
+    segments, _ = sql_segments(service, conn, 5)
+    assert segments[0][1] is None, "Segmen terakhir harus masih berjalan"
+    events = [service._status_segment_event(s) for s in segments]
+    assert events[0]["ongoing"] and not events[1]["ongoing"]
+    assert events[1]["duration"] >= 1 and events[1]["metrics"]["samples"] >= 1
+    print(f"  Contoh event: {events[1]}")
+    print("  ✓ PASS")
+    return True
+
+
+def benchmark(service, conn):
+    print("\n" + "=" * 70)
+    print(f"TEST 2: WAKTU DETEKSI ({N_ROWS:,} baris)")
+    print("=" * 70)
+    for label, limit in (("limit 50", 50), ("semua segmen", 10 ** 9)):
+        start = time.perf_counter()
+        expected, transferred_py = python_segments(service, conn, limit)
+        python_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual, transferred_sql = sql_segments(service, conn, limit)
+        sql_time = time.perf_counter() - start
+
+        assert [normalize(s) for s in actual] == [normalize(s) for s in expected]
+        print(f"  {label}")
+        print(f"    Loop Python : {python_time:7.2f} s | {transferred_py:>10,} baris dikirim")
+        print(f"    Query SQL   : {sql_time:7.2f} s | {transferred_sql:>10,} baris dikirim")
+        print(f"    Speedup     : {python_time / sql_time:.1f}x")
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    print(f"SQLite {sqlite3.sqlite_version}, membuat {N_ROWS:,} baris machine_logs...")
+    started = time.perf_counter()
+    conn = build_database(N_ROWS)
+    print(f"  selesai dalam {time.perf_counter() - started:.1f} s")
+
+    service = DowntimeService()
+    results = []
+    for test in (test_parity, benchmark):
+        try:
+            results.append(test(service, conn))
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
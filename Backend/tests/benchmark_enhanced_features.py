@@ -0,0 +1,184 @@
+"""
+Benchmark: Inverted index reason -> kolom vs scan substring semua kolom
+
+EnhancedPredictionService dulu membangun DataFrame dan mengecek
+`reason.upper() in col` untuk setiap kolom per request. Script ini:
+1. Memverifikasi setiap deskripsi reason training ter-encode ke kolomnya sendiri
+   dan nama sensor ke kolom nama training-nya
+2. Membandingkan kolom hasil index dengan scan lama untuk reason parsial/bebas
+   dan menampilkan perbedaannya (scan lama ikut mencocokkan teks prefix kolom)
+3. Memverifikasi encoding identik di setiap pemanggilan
+4. Mengukur waktu encoding per request: DataFrame + scan vs template + index
+
+Jalankan:
+    python tests/benchmark_enhanced_features.py
+"""
+
+import sys
+import time
+import logging
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.enhanced_prediction_service import EnhancedPredictionService
+from src.services.feature_encoder import REASON_PREFIXES
+from src.services.model_registry import model_registry
+from src.services.reason_matcher import SENSOR_TO_TRAINING_MAP
+
+MODEL_DIR = backend_dir.parent / "Model"
+N_ROUNDS = 5
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def legacy_prepare(service, real_time_data, feature_names):
+    """Replika _prepare_feature_array lama (DataFrame + scan substring kolom)."""
+    df = pd.DataFrame(0, index=[0], columns=feature_names)
+    reason = real_time_data.get('reason', '')
+    severity = service._get_fmea_severity_from_reason(reason)
+    if 'FMEA_Severity' in df.columns:
+        df['FMEA_Severity'] = severity
+    if reason:
+        for col in df.columns:
+            if col.startswith('Scrab Description_') and reason.upper() in col:
+                df[col] = 1
+                break
+            elif col.startswith('Break Time Description_') and reason.upper() in col:
+                df[col] = 1
+                break
+    shift = str(real_time_data.get('shift', '_NONE_'))
+    shift_col = f'Shift_{shift}'
+    if shift_col in df.columns:
+        df[shift_col] = 1
+    elif 'Shift__NONE_' in df.columns:
+        df['Shift__NONE_'] = 1
+    return df
+
+
+def reason_column(feature_names, row):
+    """Nama kolom reason aktif di sebuah baris fitur (None jika tidak ada)."""
+    active = [feature_names[i] for i in np.flatnonzero(np.asarray(row).ravel())
+              if feature_names[i].startswith(REASON_PREFIXES)]
+    return active[0] if active else None
+
+
+def build_inputs(feature_names):
+    descriptions = [c.split("_", 1)[1] for c in feature_names if c.startswith(REASON_PREFIXES)]
+    tokens = sorted({t for d in descriptions for t in d.upper().split()})
+    history = pd.read_csv(MODEL_DIR / "RIWAYAT_PERBAIKAN.csv", sep=";", usecols=["ISSUE"])
+    free_text = history["ISSUE"].dropna().astype(str).drop_duplicates().head(200).tolist()
+    sensors = [s for s in SENSOR_TO_TRAINING_MAP if s and s != "_NONE_"]
+    return descriptions, tokens + free_text + [d.lower() for d in descriptions], sensors
+
+
+def test_exact(service, layout, descriptions, sensors):
+    print("\n" + "=" * 70)
+    print("TEST 1: DESKRIPSI TRAINING & NAMA SENSOR")
+    print("=" * 70)
+    names = layout.feature_names
+    wrong = []
+    for d in descriptions:
+        column = reason_column(names, service._prepare_feature_array({"reason": d, "shift": 1}, layout))
+        if column is None or column.split("_", 1)[1] != d:
+            wrong.append((d, column))
+    print(f"  Deskripsi        : {len(descriptions)} | salah kolom: {len(wrong)}")
+    for d, column in wrong[:5]:
+        print(f"    {d!r} -> {column}")
+
+    legacy_sensor = sum(1 for s in sensors if reason_column(names, legacy_prepare(
+        service, {"reason": s, "shift": 1}, names).values) is not None)
+    mapped_sensor = [s for s in sensors if reason_column(
+        names, service._prepare_feature_array({"reason": s, "shift": 1}, layout)) is not None]
+    print(f"  Nama sensor      : {len(sensors)} | ter-encode lama {legacy_sensor}, "
+          f"index {len(mapped_sensor)} (sisanya tidak ada di model)")
+    return not wrong
+
+
+def test_partial(service, layout, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 2: REASON PARSIAL/BEBAS vs SCAN LAMA")
+    print("=" * 70)
+    names = layout.feature_names
+    same = diff = 0
+    examples = []
+    for reason in inputs:
+        data = {"reason": reason, "shift": 1}
+        old = reason_column(names, legacy_prepare(service, data, names).values)
+        new = reason_column(names, service._prepare_feature_array(data, layout))
+        if old == new:
+            same += 1
+        else:
+            diff += 1
+            examples.append((reason, old, new))
+    print(f"  Input            : {len(inputs)} | sama {same} | berbeda {diff}")
+    for reason, old, new in examples[:8]:
+        print(f"    {reason[:40]!r:44s} lama={old} | index={new}")
+
+
+def test_deterministic(service, layout, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 3: ENCODING IDENTIK DI SETIAP PEMANGGILAN")
+    print("=" * 70)
+    data = [{"reason": r, "shift": s} for r in inputs for s in (1, 2, 3)]
+    first = [service._prepare_feature_array(d, layout) for d in data]
+    rebuilt = service._build_feature_layout(model_registry.get(service.MODEL_SLOT))
+    unstable = sum(
+        1 for d, row in zip(data, first)
+        if not (np.array_equal(row, service._prepare_feature_array(d, layout))
+                and np.array_equal(row, service._prepare_feature_array(d, rebuilt)))
+    )
+    print(f"  Encoding         : {len(data)} | tidak stabil: {unstable}")
+    return unstable == 0
+
+
+def test_speed(service, layout, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 4: WAKTU ENCODING PER REQUEST")
+    print("=" * 70)
+    names = layout.feature_names
+    data = [{"reason": r, "shift": 1} for r in inputs]
+
+    def measure(fn):
+        best = float("inf")
+        for _ in range(N_ROUNDS):
+            start = time.perf_counter()
+            for d in data:
+                fn(d)
+            best = min(best, time.perf_counter() - start)
+        return best / len(data) * 1e6
+
+    legacy = measure(lambda d: legacy_prepare(service, d, names))
+    new = measure(lambda d: service._prepare_feature_array(d, layout))
+    print(f"  DataFrame + scan : {legacy:8.1f} µs")
+    print(f"  Template + index : {new:8.1f} µs ({legacy / new:.0f}x)")
+    print(f"  Index            : {len(layout.reason_index.index)} key -> "
+          f"{layout.reason_index.n_columns} kolom")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    service = EnhancedPredictionService()
+    bundle = model_registry.get(service.MODEL_SLOT)
+    if bundle is None:
+        print("✗ Model improved tidak tersedia")
+        sys.exit(1)
+    layout = bundle.artifacts["enhanced_prediction_service"]
+
+    descriptions, inputs, sensors = build_inputs(layout.feature_names)
+    ok = test_exact(service, layout, descriptions, sensors)
+    test_partial(service, layout, inputs)
+    ok = test_deterministic(service, layout, descriptions + inputs) and ok
+    test_speed(service, layout, descriptions + inputs)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ PASS" if ok else "✗ FAIL"))
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
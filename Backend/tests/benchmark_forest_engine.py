@@ -0,0 +1,97 @@
+"""
+Benchmark: Flat Forest Engine vs scikit-learn RandomForestRegressor
+
+Mengukur:
+1. Latency single-row predict dan throughput batch
+2. Startup: waktu import + load model di proses Python baru
+   (scikit-learn: import sklearn + joblib.load; flat: import numpy + np.load)
+
+Jalankan:
+    python tests/benchmark_forest_engine.py [path/model.pkl]
+"""
+
+import sys
+import time
+import tempfile
+import subprocess
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.forest_engine import export_forest, FlatForest
+
+MODEL_DIR = backend_dir.parent / "Model"
+N_SINGLE = 300
+BATCH_SIZES = [100, 1000, 10000]
+STARTUP_RUNS = 3
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def startup_time(code):
+    """Median wall time sebuah snippet di interpreter baru."""
+    times = []
+    for _ in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=str(backend_dir))
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+if __name__ == "__main__":
+    model_path = Path(sys.argv[1]) if len(sys.argv) > 1 else MODEL_DIR / "model.pkl"
+    if not model_path.exists():
+        model_path = MODEL_DIR / "model_improved.pkl"
+    print(f"Model: {model_path}")
+
+    model = joblib.load(model_path)
+    flat_path = Path(tempfile.mkdtemp()) / "model.flat.npz"
+    flat = FlatForest.load(export_forest(model, flat_path))
+
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(max(BATCH_SIZES), flat.n_features_in_)).astype(np.float64)
+
+    print("\n" + "=" * 70)
+    print("LATENCY SINGLE ROW")
+    print("=" * 70)
+    rows = iter(range(10 ** 9))
+    sk = timed(lambda: model.predict(X[next(rows) % len(X)].reshape(1, -1)), N_SINGLE)
+    fl = timed(lambda: flat.predict(X[next(rows) % len(X)]), N_SINGLE)
+    print(f"  scikit-learn : {sk * 1e6:10.1f} µs")
+    print(f"  flat forest  : {fl * 1e6:10.1f} µs")
+    print(f"  speedup      : {sk / fl:.1f}x")
+
+    print("\n" + "=" * 70)
+    print("THROUGHPUT BATCH")
+    print("=" * 70)
+    for size in BATCH_SIZES:
+        batch = X[:size]
+        sk = timed(lambda: model.predict(batch), 3)
+        fl = timed(lambda: flat.predict(batch), 3)
+        print(f"  {size:6d} rows : sklearn {size / sk:10.0f} rows/s | flat {size / fl:10.0f} rows/s")
+
+    print("\n" + "=" * 70)
+    print("STARTUP (proses baru: import + load model)")
+    print("=" * 70)
+    sk = startup_time(f"import joblib, sklearn.ensemble; joblib.load(r'{model_path}')")
+    fl = startup_time(
+        "from src.services.forest_engine import FlatForest; "
+        f"FlatForest.load(r'{flat_path}')"
+    )
+    print(f"  scikit-learn : {sk * 1000:8.0f} ms")
+    print(f"  flat forest  : {fl * 1000:8.0f} ms")
+    print(f"  artefak      : {model_path.stat().st_size / 1024:.0f} KB (.pkl) vs "
+          f"{flat_path.stat().st_size / 1024:.0f} KB (.npz)")
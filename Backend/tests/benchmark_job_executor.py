@@ -0,0 +1,148 @@
+"""
+Benchmark: Batch prediction di process pool vs di thread request
+
+Script ini:
+1. Memverifikasi hasil job pool (shared memory) identik dengan batch sinkron
+2. Mengukur throughput batch besar: sinkron (thread) vs job process pool
+3. Mengukur latency prediksi interaktif (inference live) selama batch besar
+   berjalan: di thread lain proses yang sama (berebut GIL) vs di process pool
+
+Lookup table dimatikan agar semua baris melewati inference live.
+Jika Model/model.pkl tidak tersedia, benchmark memakai model_improved.pkl.
+
+Jalankan:
+    python tests/benchmark_job_executor.py
+"""
+
+import sys
+import time
+import logging
+import threading
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.prediction_service import prediction_coalescer
+from src.services.job_executor import job_executor, JOB_DONE
+from _helpers import load_service, build_inputs
+
+BATCH_SIZE = 200000
+N_INTERACTIVE = 200
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def wait_job(job):
+    while job.status not in (JOB_DONE, "failed"):
+        time.sleep(0.01)
+    assert job.status == JOB_DONE, job.error
+    return job.result
+
+
+def interactive_latency(service, inputs, stop):
+    """Latency prediksi single-row live sampai stop di-set (minimal N_INTERACTIVE sampel)."""
+    samples = []
+    i = 0
+    while not stop.is_set() or len(samples) < N_INTERACTIVE:
+        start = time.perf_counter()
+        service.predict_downtime(inputs[i % len(inputs)])
+        samples.append(time.perf_counter() - start)
+        i += 1
+        if len(samples) >= N_INTERACTIVE * 20:
+            break
+    return np.array(samples) * 1000
+
+
+def report(label, samples):
+    print(f"  {label:<32s} p50 {np.percentile(samples, 50):7.1f} ms | "
+          f"p99 {np.percentile(samples, 99):7.1f} ms | n={len(samples)}")
+
+
+def test_parity(service, data):
+    print("\n" + "=" * 70)
+    print("TEST 1: PARITY JOB POOL vs BATCH SINKRON")
+    print("=" * 70)
+    sample = data[:20000]
+    sync = service.batch_predict_maintenance_duration(sample)
+    pooled = wait_job(service.submit_batch_job(sample))
+    a = [p["prediction"] for p in sync["predictions"]]
+    b = [p["prediction"] for p in pooled["predictions"]]
+    mismatches = sum(1 for x, y in zip(a, b) if x != y)
+    print(f"  Items        : {len(sample)}")
+    print(f"  Mismatches   : {mismatches}")
+    return mismatches == 0 and pooled["successful_predictions"] == len(sample)
+
+
+def test_throughput_and_latency(service, data):
+    print("\n" + "=" * 70)
+    print(f"TEST 2: BATCH {BATCH_SIZE} BARIS + PREDIKSI INTERAKTIF BERSAMAAN")
+    print("=" * 70)
+    interactive = data[:500]
+
+    stop = threading.Event()
+    stop.set()
+    report("Interaktif (idle)", interactive_latency(service, interactive, stop))
+
+    # Batch sinkron di thread lain proses yang sama (seperti endpoint batch biasa)
+    stop = threading.Event()
+    result = {}
+
+    def run_sync():
+        start = time.perf_counter()
+        service.batch_predict_maintenance_duration(data)
+        result["sync"] = time.perf_counter() - start
+        stop.set()
+
+    thread = threading.Thread(target=run_sync)
+    thread.start()
+    report("Interaktif + batch di thread", interactive_latency(service, interactive, stop))
+    thread.join()
+
+    # Batch sebagai job process pool
+    stop = threading.Event()
+    start = time.perf_counter()
+    job = service.submit_batch_job(data)
+
+    def run_job():
+        wait_job(job)
+        result["pool"] = time.perf_counter() - start
+        stop.set()
+
+    thread = threading.Thread(target=run_job)
+    thread.start()
+    report("Interaktif + batch di pool", interactive_latency(service, interactive, stop))
+    thread.join()
+
+    print(f"\n  Batch sinkron : {result['sync']:6.2f} s ({BATCH_SIZE / result['sync']:8.0f} rows/s)")
+    print(f"  Batch pool    : {result['pool']:6.2f} s ({BATCH_SIZE / result['pool']:8.0f} rows/s, "
+          f"{job_executor.max_workers} workers)")
+
+
+if __name__ == "__main__":
+    # Ukur komputasi prediksi, bukan cache single-flight
+    prediction_coalescer.ttl_seconds = 0
+    logging.disable(logging.WARNING)
+
+    # Semua baris lewat inference live
+    service = load_service(live_inference=True)
+    data = build_inputs(service, BATCH_SIZE)
+
+    started = time.perf_counter()
+    job_executor.start()
+    print(f"Pool warm-up: {time.perf_counter() - started:.2f}s ({job_executor.max_workers} workers)")
+
+    try:
+        ok = test_parity(service, data)
+        test_throughput_and_latency(service, data)
+    finally:
+        job_executor.stop()
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ PASS" if ok else "✗ FAIL"))
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,144 @@
+"""
+Benchmark: Memory-mapped model artifacts vs joblib.load per worker
+
+Mensimulasikan beberapa worker WSGI yang masing-masing memuat model yang sama
+lalu melayani prediksi, dan mengukur:
+1. Cold load: page cache file artefak dibuang (posix_fadvise DONTNEED) lalu dimuat
+   di proses baru (import + load)
+2. Resident memory per worker setelah load + predict:
+   - RSS  : memori resident (halaman bersama dihitung penuh di setiap worker)
+   - PSS  : proportional set size (halaman bersama dibagi jumlah proses) -> biaya nyata
+   - Delta: kenaikan RSS/PSS karena model (dibanding sebelum load)
+
+Jalankan:
+    python tests/benchmark_mmap_model.py [jumlah_worker]
+"""
+
+import os
+import sys
+import time
+import subprocess
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.forest_engine import export_forest, FlatForest
+
+MODEL_DIR = backend_dir.parent / "Model"
+N_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+
+def memory_kb():
+    """(RSS, PSS) proses ini dalam KB dari /proc/self/smaps_rollup."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values["Rss"], values["Pss"]
+
+
+def evict_page_cache(path):
+    """Buang halaman file dari page cache agar load berikutnya benar-benar cold."""
+    files = sorted(p for p in path.iterdir()) if path.is_dir() else [path]
+    for file in files:
+        fd = os.open(file, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def worker(kind, path, X, barrier, results):
+    """Satu worker: load model, predict, tunggu semua worker aktif, ukur memori."""
+    import warnings
+    import sklearn.ensemble  # noqa: F401 - import library tidak dihitung sebagai biaya model
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    # Baseline saat semua worker sudah hidup (library bersama sudah terbagi di PSS)
+    barrier.wait()
+    rss_before, pss_before = memory_kb()
+    start = time.perf_counter()
+    model = joblib.load(path) if kind == "joblib" else FlatForest.load(path, mmap_mode="r")
+    load_time = time.perf_counter() - start
+    model.predict(X)
+
+    # Ukur saat semua worker hidup bersamaan (halaman bersama dibagi rata di PSS)
+    barrier.wait()
+    rss_after, pss_after = memory_kb()
+    results.put((kind, load_time, rss_after, pss_after, rss_after - rss_before, pss_after - pss_before))
+    barrier.wait()
+
+
+def run_workers(ctx, kind, path, X):
+    barrier = ctx.Barrier(N_WORKERS)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(kind, path, X, barrier, results)) for _ in range(N_WORKERS)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def cold_load(kind, path):
+    """Waktu import + load di proses baru dengan page cache artefak kosong."""
+    evict_page_cache(path)
+    code = (
+        f"import time, joblib; s = time.perf_counter(); joblib.load(r'{path}'); print(time.perf_counter() - s)"
+        if kind == "joblib" else
+        "import time; from src.services.forest_engine import FlatForest; "
+        f"s = time.perf_counter(); FlatForest.load(r'{path}'); print(time.perf_counter() - s)"
+    )
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], check=True, cwd=str(backend_dir),
+                         capture_output=True, text=True).stdout
+    return time.perf_counter() - start, float(out.strip())
+
+
+if __name__ == "__main__":
+    model_path = MODEL_DIR / "model.pkl"
+    if not model_path.exists():
+        model_path = MODEL_DIR / "model_improved.pkl"
+    print(f"Model   : {model_path}")
+    print(f"Workers : {N_WORKERS}")
+
+    model = joblib.load(model_path)
+    mmap_path = export_forest(model, Path(tempfile.mkdtemp()) / "model.flat", layout="mmap")
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(1000, model.n_features_in_)).astype(np.float64)
+    del model
+
+    ctx = mp.get_context("spawn")
+
+    print("\n" + "=" * 70)
+    print("COLD LOAD (proses baru, page cache artefak dibuang)")
+    print("=" * 70)
+    for kind, path in (("joblib", model_path), ("mmap", mmap_path)):
+        total, load = cold_load(kind, path)
+        print(f"  {kind:<7s}: load {load * 1000:8.1f} ms | proses total {total * 1000:8.0f} ms")
+
+    print("\n" + "=" * 70)
+    print(f"MEMORI PER WORKER ({N_WORKERS} worker aktif bersamaan, setelah load + predict 1000 baris)")
+    print("=" * 70)
+    for kind, path in (("joblib", model_path), ("mmap", mmap_path)):
+        rows = run_workers(ctx, kind, path, X)
+        rss = np.mean([r[2] for r in rows])
+        pss = np.mean([r[3] for r in rows])
+        d_rss = np.mean([r[4] for r in rows])
+        d_pss = np.mean([r[5] for r in rows])
+        load = np.mean([r[1] for r in rows])
+        print(f"  {kind:<7s}: RSS {rss / 1024:7.1f} MB | PSS {pss / 1024:7.1f} MB | "
+              f"model ΔRSS {d_rss / 1024:6.2f} MB | model ΔPSS {d_pss / 1024:6.2f} MB | "
+              f"warm load {load * 1000:6.1f} ms")
+        print(f"           total model ΔPSS semua worker: {d_pss * N_WORKERS / 1024:.2f} MB")
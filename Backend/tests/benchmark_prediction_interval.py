@@ -0,0 +1,141 @@
+"""
+Benchmark: Interval prediksi (P10/P90 + std) dari output per tree
+
+Script ini:
+1. Memverifikasi mean output per tree (FlatForest) identik dengan model.predict
+2. Memverifikasi interval dari lookup table sama dengan hitungan live
+3. Mengukur latency single-row: prediksi titik vs prediksi + interval
+   (lookup table aktif dan inference live)
+4. Mengukur overhead interval pada batch (inference live, statistik per baris unik)
+
+Jika Model/model.pkl tidak tersedia, benchmark memakai model_improved.pkl.
+
+Jalankan:
+    python tests/benchmark_prediction_interval.py
+"""
+
+import sys
+import time
+import logging
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from config import PREDICTION_INTERVAL_QUANTILES
+from _helpers import load_service, build_inputs
+
+N_SINGLE = 2000
+BATCH_SIZE = 20000
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def time_per_call(fn, inputs):
+    samples = []
+    for data in inputs:
+        start = time.perf_counter()
+        fn(data)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1e6
+
+
+def report(label, samples):
+    print(f"  {label:<30s} p50 {np.percentile(samples, 50):8.1f} µs | p99 {np.percentile(samples, 99):8.1f} µs")
+
+
+def test_parity(service, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 1: PARITY FLAT FOREST + LOOKUP TABLE")
+    print("=" * 70)
+    state = service.current_state()
+    assert state.forest is not None, "Model bukan tree ensemble"
+    X = state.feature_encoder.encode_batch(inputs)
+    stats = state.forest.predict_stats(X, PREDICTION_INTERVAL_QUANTILES)
+    deduped = state.forest.predict_stats(X, PREDICTION_INTERVAL_QUANTILES, dedupe=True)
+    dedupe_equal = bool(np.array_equal(stats, deduped))
+    mean_diff = float(np.max(np.abs(stats[:, 0] - state.model.predict(X))))
+    ordered = bool(np.all(stats[:, 2] <= stats[:, 3]))
+    print(f"  Max |mean - model.predict| : {mean_diff:.2e}")
+    print(f"  P10 <= P90                 : {ordered}")
+    print(f"  Dedupe == tanpa dedupe     : {dedupe_equal}")
+
+    table_mismatch = 0
+    for data, row in zip(inputs, stats):
+        cached = state.interval_table.get(state.feature_encoder.encode_key(data))
+        if cached is not None and not np.allclose(cached, row[1:]):
+            table_mismatch += 1
+    print(f"  Interval table mismatches  : {table_mismatch}")
+
+    result = service.predict_downtime(inputs[0])
+    print(f"  Contoh                     : {result['prediction']} -> {result['prediction_interval']}")
+    return mean_diff < 1e-6 and ordered and dedupe_equal and table_mismatch == 0
+
+
+def test_single_latency(service, inputs):
+    print("\n" + "=" * 70)
+    print(f"TEST 2: LATENCY SINGLE-ROW ({len(inputs)} request)")
+    print("=" * 70)
+    state = service.current_state()
+
+    print("  Lookup table aktif:")
+    point = time_per_call(service._predict_raw, inputs)
+    full = time_per_call(lambda d: (service._predict_raw(d), service._predict_interval(d)), inputs)
+    report("prediksi titik", point)
+    report("prediksi + interval", full)
+
+    table, intervals = state.prediction_table, state.interval_table
+    state.prediction_table = state.interval_table = None
+    try:
+        print("  Inference live:")
+        point_live = time_per_call(service._predict_raw, inputs)
+        full_live = time_per_call(lambda d: (service._predict_raw(d), service._predict_interval(d)), inputs)
+        report("prediksi titik", point_live)
+        report("prediksi + interval", full_live)
+    finally:
+        state.prediction_table, state.interval_table = table, intervals
+
+    overhead = np.percentile(full_live, 50) / np.percentile(point_live, 50) - 1
+    print(f"  Overhead interval (live, p50): {overhead * 100:+.1f}%")
+
+
+def test_batch_overhead(service, inputs):
+    print("\n" + "=" * 70)
+    print(f"TEST 3: BATCH {len(inputs)} BARIS (INFERENCE LIVE)")
+    print("=" * 70)
+    state = service.current_state()
+    X = state.feature_encoder.encode_batch(inputs)
+
+    start = time.perf_counter()
+    state.model.predict(X)
+    point = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state.model.predict(X)
+    state.forest.predict_stats(X, PREDICTION_INTERVAL_QUANTILES, dedupe=True)
+    full = time.perf_counter() - start
+
+    print(f"  model.predict          : {point * 1000:8.1f} ms")
+    print(f"  predict + per-tree stats: {full * 1000:8.1f} ms ({(full / point - 1) * 100:+.1f}%, "
+          f"stats dihitung per baris unik)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    service = load_service()
+    inputs = build_inputs(service, BATCH_SIZE)
+
+    with service._pin_state():
+        ok = test_parity(service, inputs[:2000])
+        test_single_latency(service, inputs[:N_SINGLE])
+        test_batch_overhead(service, inputs)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ PASS" if ok else "✗ FAIL"))
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,107 @@
+"""
+Benchmark: Prediction lookup table vs inference live
+
+Script ini:
+1. Membangun lookup table untuk seluruh ruang input (reason × shift × severity)
+2. Consistency check: SEMUA entri dibandingkan dengan model.predict live per baris
+3. Memverifikasi input acak (termasuk reason sensor & reason tidak dikenal) selalu
+   menghasilkan prediksi yang sama dengan/tanpa lookup table
+4. Mengukur latency predict_downtime dengan dan tanpa lookup table
+
+Jika Model/model.pkl tidak tersedia, benchmark memakai model_improved.pkl.
+
+Jalankan:
+    python tests/benchmark_prediction_table.py
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.prediction_service import prediction_coalescer
+from _helpers import load_service, build_inputs
+
+N_ITERATIONS = 2000
+
+
+def test_full_consistency(service):
+    print("\n" + "=" * 70)
+    print("TEST 1: CONSISTENCY CHECK SELURUH TABEL")
+    print("=" * 70)
+    result = service.verify_prediction_table()
+    print(f"  Entries      : {len(service.prediction_table)}")
+    print(f"  Checked      : {result['checked']}")
+    print(f"  Mismatches   : {result['mismatches']}")
+    print(f"  Max abs diff : {result['max_abs_diff']:.3e}")
+    return result["consistent"]
+
+
+def test_table_vs_live(service, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 2: PREDIKSI DENGAN vs TANPA LOOKUP TABLE")
+    print("=" * 70)
+    state = service.current_state()
+    table = state.prediction_table
+
+    with_table = [service.predict_downtime(d)["prediction"] for d in inputs]
+    hits = sum(1 for d in inputs if service.feature_encoder.encode_key(d) in table)
+
+    state.prediction_table = None
+    live = [service.predict_downtime(d)["prediction"] for d in inputs]
+    state.prediction_table = table
+
+    mismatches = sum(1 for a, b in zip(with_table, live) if a != b)
+    print(f"  Inputs       : {len(inputs)}")
+    print(f"  Table hits   : {hits}")
+    print(f"  Mismatches   : {mismatches}")
+    return mismatches == 0
+
+
+def test_latency(service, inputs):
+    print("\n" + "=" * 70)
+    print("TEST 3: LATENCY predict_downtime")
+    print("=" * 70)
+    state = service.current_state()
+    table = state.prediction_table
+
+    def run(n):
+        start = time.perf_counter()
+        for i in range(n):
+            service.predict_downtime(inputs[i % len(inputs)])
+        return (time.perf_counter() - start) / n * 1e6
+
+    state.prediction_table = None
+    live = run(200)
+    state.prediction_table = table
+    lookup = run(N_ITERATIONS)
+
+    print(f"  Inference live : {live:10.1f} µs/prediction")
+    print(f"  Lookup table   : {lookup:10.1f} µs/prediction")
+    print(f"  Speedup        : {live / lookup:.0f}x")
+
+
+if __name__ == "__main__":
+    # Ukur komputasi prediksi, bukan cache single-flight
+    prediction_coalescer.ttl_seconds = 0
+    logging.disable(logging.WARNING)
+
+    service = load_service()
+    if service.prediction_table is None:
+        print("Lookup table tidak aktif (PREDICTION_LOOKUP_TABLE=false atau model tidak tersedia)")
+        sys.exit(1)
+
+    inputs = build_inputs(service, 300, seed=7, shifts=(1, 2, 3, "3", "_NONE_", 9),
+                          extra_reasons=("UNKNOWN REASON", "counter problem", ""))
+    results = [test_full_consistency(service), test_table_vs_live(service, inputs)]
+    test_latency(service, inputs)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ PASS" if all(results) else "✗ FAIL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,122 @@
+"""
+Benchmark: Automaton reason bersama vs lookup dict + loop keyword
+
+Script ini:
+1. Memverifikasi ReasonMatcher identik dengan implementasi lama
+   (SENSOR_TO_TRAINING_MAP + FMEA_SEVERITY_MAP, loop CATEGORY_ADJUSTMENTS dan
+   severity_patterns) untuk nama FMEA, nama sensor, reason training, ISSUE
+   dari RIWAYAT_PERBAIKAN.csv, dan variasi huruf kecil/spasi
+2. Mengukur waktu resolusi per reason (tanpa cache): loop lama vs satu scan automaton
+
+Jalankan:
+    python tests/benchmark_reason_matcher.py
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.reason_matcher import (
+    reason_matcher, FMEA_SEVERITY_MAP, DEFAULT_SEVERITY, SENSOR_TO_TRAINING_MAP,
+    CATEGORY_ADJUSTMENTS, SEVERITY_PATTERNS, DEFAULT_PATTERN_SEVERITY
+)
+
+MODEL_DIR = backend_dir.parent / "Model"
+N_ROUNDS = 20
+
+
+def legacy_match(reason):
+    """Implementasi lama: dict lookup + loop any(keyword in reason)."""
+    text = str(reason or '').strip().upper()
+    mapped = SENSOR_TO_TRAINING_MAP.get(text, text)
+    severity = FMEA_SEVERITY_MAP.get(mapped, DEFAULT_SEVERITY)
+
+    category = None
+    for name, config in CATEGORY_ADJUSTMENTS.items():
+        if any(keyword in text for keyword in config['keywords']):
+            category = name
+            break
+
+    pattern_severity = DEFAULT_PATTERN_SEVERITY
+    for value, patterns in SEVERITY_PATTERNS.items():
+        if any(pattern in text for pattern in patterns):
+            pattern_severity = value
+            break
+    return mapped, severity, category, pattern_severity
+
+
+def new_match(reason):
+    match = reason_matcher.match(reason)
+    return match.mapped_reason, match.severity, match.category, match.pattern_severity
+
+
+def build_corpus():
+    reasons = list(FMEA_SEVERITY_MAP) + list(SENSOR_TO_TRAINING_MAP)
+    for name in ("feature_names.pkl", "feature_names_improved.pkl"):
+        path = MODEL_DIR / name
+        if path.exists():
+            reasons += [c.split("_", 1)[1] for c in joblib.load(path)
+                        if c.startswith(("Scrab Description_", "Break Time Description_"))]
+    history = pd.read_csv(MODEL_DIR / "RIWAYAT_PERBAIKAN.csv", sep=";", usecols=["ISSUE"])
+    reasons += history["ISSUE"].dropna().astype(str).tolist()
+
+    rng = random.Random(0)
+    variants = [r.lower() for r in reasons[:200]] + [f"  {r} " for r in reasons[:200]]
+    variants += ["".join(rng.choice("ABCDEFGHIKLMNOPRSTU _") for _ in range(rng.randint(1, 40)))
+                 for _ in range(500)]
+    return reasons + variants + ["", "_NONE_"]
+
+
+def test_parity(corpus):
+    print("\n" + "=" * 70)
+    print("TEST 1: PARITY AUTOMATON vs IMPLEMENTASI LAMA")
+    print("=" * 70)
+    mismatches = [r for r in corpus if legacy_match(r) != new_match(r)]
+    print(f"  Reason diuji : {len(corpus)}")
+    print(f"  Mismatches   : {len(mismatches)}")
+    for r in mismatches[:5]:
+        print(f"    {r!r}: lama={legacy_match(r)} baru={new_match(r)}")
+    return not mismatches
+
+
+def measure(fn, corpus):
+    best = float("inf")
+    for _ in range(N_ROUNDS):
+        start = time.perf_counter()
+        for reason in corpus:
+            fn(reason)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+def test_speed(corpus):
+    print("\n" + "=" * 70)
+    print("TEST 2: WAKTU RESOLUSI PER REASON (tanpa cache, best of %d)" % N_ROUNDS)
+    print("=" * 70)
+    lengths = np.array([len(r) for r in corpus])
+    print(f"  Panjang reason: median {np.median(lengths):.0f}, max {lengths.max()} karakter")
+    print(f"  Trie          : {len(reason_matcher._delta)} node")
+    legacy = measure(legacy_match, corpus)
+    new = measure(new_match, corpus)
+    print(f"  Loop lama     : {legacy:6.2f} µs/reason")
+    print(f"  Automaton     : {new:6.2f} µs/reason ({legacy / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    corpus = build_corpus()
+    ok = test_parity(corpus)
+    test_speed(corpus)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ PASS" if ok else "✗ FAIL"))
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,80 @@
+"""
+Test Script untuk token keyset pagination /api/downtime/history
+
+Script ini menguji tanpa database:
+1. Token round-trip: kunci (start_time, id) kembali utuh dan token URL-safe
+2. Token ditolak jika filter berbeda atau token rusak
+
+Jalankan:
+    python tests/test_downtime_page_token.py
+"""
+
+import sys
+import logging
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.downtime_service import encode_page_token, decode_page_token
+
+FILTERS = {"component": None, "start_date": "2025-10-01", "end_date": None}
+
+
+def test_round_trip():
+    print("\n" + "=" * 70)
+    print("TEST 1: TOKEN ROUND-TRIP")
+    print("=" * 70)
+    wib = timezone(timedelta(hours=7))
+    start_time = datetime(2025, 10, 24, 8, 30, 15, 123456, tzinfo=wib)
+    token = encode_page_token(start_time, 4821, FILTERS)
+    print(f"  Token : {token}")
+    assert all(c.isalnum() or c in "-_" for c in token), "Token tidak URL-safe"
+
+    key = decode_page_token(token, dict(FILTERS))
+    print(f"  Kunci : {key}")
+    assert key == (start_time, 4821)
+    assert key[0].utcoffset() == timedelta(hours=7)
+    print("  ✓ PASS")
+    return True
+
+
+def test_rejected_tokens():
+    print("\n" + "=" * 70)
+    print("TEST 2: TOKEN DITOLAK")
+    print("=" * 70)
+    token = encode_page_token(datetime(2025, 10, 24, tzinfo=timezone.utc), 7, FILTERS)
+    cases = {
+        "filter lain": (token, {**FILTERS, "component": "System"}),
+        "bukan base64": ("%%%", FILTERS),
+        "bukan JSON": ("bm90LWpzb24", FILTERS),
+        "field hilang": ("eyJ0IjoiMjAyNS0xMC0yNCJ9", FILTERS),
+        "timestamp rusak": (token[:6] + token[7:], FILTERS)
+    }
+    for label, (value, filters) in cases.items():
+        try:
+            decode_page_token(value, filters)
+            raise AssertionError(f"{label}: token diterima")
+        except ValueError as e:
+            print(f"  {label:<16s}: {e}")
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_round_trip, test_rejected_tokens):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,136 @@
+"""
+Test Script untuk Flat Forest Engine
+
+Script ini menguji bahwa:
+1. FlatForest menghasilkan prediksi identik dengan RandomForestRegressor.predict
+   pada SELURUH training set model_improved.pkl (dibangun ulang dari CSV produksi
+   + RIWAYAT_PERBAIKAN_REALISTIC.csv dengan pipeline train_model_improved.py)
+2. Prediksi single row (1-D) sama dengan prediksi batch
+3. Layout direktori mmap menghasilkan prediksi identik dengan layout .npz
+4. Jika model.pkl tersedia, parity juga dicek pada seluruh ruang input reason × shift
+
+Jalankan:
+    python tests/test_forest_engine.py
+"""
+
+import io
+import sys
+import contextlib
+import tempfile
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.forest_engine import export_forest, FlatForest
+
+MODEL_DIR = backend_dir.parent / "Model"
+DATA_DIR = backend_dir.parent / "Data Flexo CSV"
+TOLERANCE = 1e-9
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def build_improved_training_matrix():
+    """Bangun ulang matriks fitur (train + test) model_improved.pkl dari data mentah."""
+    sys.path.insert(0, str(MODEL_DIR))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import train_model_improved as tmi
+        df_prod, _ = tmi.load_and_concat_csv(DATA_DIR)
+        df_repair = tmi.load_repair_history(MODEL_DIR / "RIWAYAT_PERBAIKAN_REALISTIC.csv")
+        df_merged = tmi.merge_production_with_repairs(df_prod, df_repair)
+        df_processed = tmi.preprocess_with_outlier_filter(df_merged, max_duration=1000)
+        X, _, feature_cols = tmi.build_feature_matrix(df_processed)
+    return X, feature_cols
+
+
+def flatten(model, layout="npz"):
+    tmp = Path(tempfile.mkdtemp()) / ("model.flat.npz" if layout == "npz" else "model.flat")
+    return FlatForest.load(export_forest(model, tmp, layout=layout))
+
+
+def test_parity_full_training_set():
+    """Parity FlatForest vs scikit-learn pada seluruh training set model_improved.pkl"""
+    print("\n" + "=" * 70)
+    print("TEST 1: PARITY PADA SELURUH TRAINING SET (model_improved.pkl)")
+    print("=" * 70)
+
+    model = joblib.load(MODEL_DIR / "model_improved.pkl")
+    X, feature_cols = build_improved_training_matrix()
+    assert list(model.feature_names_in_) == list(feature_cols), "Urutan fitur training tidak cocok dengan model"
+
+    flat = flatten(model)
+    expected = model.predict(X)
+    actual = flat.predict(X.to_numpy(dtype=np.float64))
+    max_diff = float(np.abs(expected - actual).max())
+
+    print(f"  Rows         : {len(X)}")
+    print(f"  Trees        : {flat.n_estimators}")
+    print(f"  Max |diff|   : {max_diff:.3e}")
+    assert max_diff <= TOLERANCE, f"Parity gagal: max diff {max_diff}"
+
+    # Single row (1-D) harus sama dengan batch
+    rows = X.to_numpy(dtype=np.float64)[:200]
+    single = np.array([flat.predict(row)[0] for row in rows])
+    assert np.array_equal(single, actual[:200]), "Prediksi single row berbeda dengan batch"
+
+    # Per-tree output konsisten dengan estimator individual
+    per_tree = flat.predict_per_tree(rows[:20])
+    sk_per_tree = np.column_stack([est.predict(rows[:20].astype(np.float32)) for est in model.estimators_])
+    assert np.allclose(per_tree, sk_per_tree, rtol=0, atol=TOLERANCE), "Prediksi per tree berbeda"
+
+    # Layout mmap: array dibaca lewat memory map, hasil identik
+    mapped = flatten(model, layout="mmap")
+    assert mapped.memory_mapped, "Layout mmap tidak di-memory-map"
+    assert np.array_equal(mapped.predict(X.to_numpy(dtype=np.float64)), actual), "Prediksi layout mmap berbeda"
+
+    print("  ✓ PASS")
+    return True
+
+
+def test_parity_served_model():
+    """Parity model.pkl (model yang dilayani PredictionService) pada ruang input reason × shift"""
+    print("\n" + "=" * 70)
+    print("TEST 2: PARITY MODEL SERVING (model.pkl)")
+    print("=" * 70)
+
+    model_path = MODEL_DIR / "model.pkl"
+    if not model_path.exists():
+        print("  (model.pkl tidak tersedia - dilewati)")
+        return True
+
+    from src.services.prediction_service import PredictionService, FMEA_SEVERITY_MAP, DEFAULT_SEVERITY
+
+    service = PredictionService()
+    model = service.model
+    flat = flatten(model)
+
+    keys = service.feature_encoder.enumerate_keys(list(FMEA_SEVERITY_MAP.values()) + [DEFAULT_SEVERITY])
+    X = service.feature_encoder.rows_from_keys(keys)
+    max_diff = float(np.abs(model.predict(X) - flat.predict(X)).max())
+
+    print(f"  Rows         : {len(X)}")
+    print(f"  Max |diff|   : {max_diff:.3e}")
+    assert max_diff <= TOLERANCE, f"Parity gagal: max diff {max_diff}"
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    results = []
+    for test in (test_parity_full_training_set, test_parity_served_model):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,144 @@
+"""
+Test Script untuk Health History (snapshot health index + BatchWriter)
+
+Script ini menguji tanpa database:
+1. _aggregate: beberapa sampel digabung ke satu bucket, rata-rata RPN/OEE
+   hanya atas sampel yang memiliki nilai (termasuk NULL)
+2. resolve_bucket_seconds: kelipatan interval snapshot dan tidak melebihi max_points
+3. BatchWriter: batch yang gagal dikembalikan ke buffer, record tertua dibuang
+   pada max_buffer
+
+Jalankan:
+    python tests/test_health_history.py
+"""
+
+import sys
+import math
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.health_history_service import HealthHistoryService
+from src.utils.batch_writer import BatchWriter
+
+
+def test_aggregate():
+    print("\n" + "=" * 70)
+    print("TEST 1: AGREGASI SAMPEL PER BUCKET")
+    print("=" * 70)
+    service = HealthHistoryService(interval_seconds=300)
+    base = datetime(2025, 11, 3, 8, 0, tzinfo=timezone.utc)
+    bucket = service._bucket_start(base + timedelta(seconds=42))
+    assert bucket == base
+    assert service._bucket_start(datetime(2025, 11, 3, 8, 4, 59)) == base  # Naive dianggap UTC
+
+    records = [
+        ("Printing", bucket, 80.0, 90.0, 70.0),
+        ("Printing", bucket, 60.0, None, 50.0),
+        ("Printing", bucket, 70.0, 60.0, None),
+        ("Printing", bucket, 50.0, None, None),
+        ("Feeder", bucket, 40.0, None, None),
+        ("Printing", bucket + timedelta(seconds=300), 90.0, 100.0, 80.0)
+    ]
+    rows = {(r[0], r[1]): r for r in service._aggregate(records)}
+    for row in rows.values():
+        print(f"  {row}")
+    assert len(rows) == 3
+
+    component, _, health, rpn, oee, lo, hi, count, n_rpn, n_oee = rows[("Printing", bucket)]
+    assert health == 65.0 and lo == 50.0 and hi == 80.0 and count == 4
+    assert rpn == 75.0 and n_rpn == 2, "RPN harus dirata-rata atas sampel non-NULL saja"
+    assert oee == 60.0 and n_oee == 2, "OEE harus dirata-rata atas sampel non-NULL saja"
+
+    feeder = rows[("Feeder", bucket)]
+    assert feeder[3] is None and feeder[4] is None and feeder[7:] == (1, 0, 0)
+    assert rows[("Printing", bucket + timedelta(seconds=300))][7:] == (1, 1, 1)
+    print("  ✓ PASS")
+    return True
+
+
+def test_resolve_bucket_seconds():
+    print("\n" + "=" * 70)
+    print("TEST 2: LEBAR BUCKET DOWNSAMPLING")
+    print("=" * 70)
+    service = HealthHistoryService(interval_seconds=300)
+    end = datetime(2025, 11, 10, tzinfo=timezone.utc)
+    cases = [
+        (timedelta(hours=1), None, 500),
+        (timedelta(days=7), None, 500),
+        (timedelta(days=30), None, 100),
+        (timedelta(days=7), 7, 500),
+        (timedelta(days=7), 3601, 500),
+        (timedelta(days=365), 60, 1),
+        (timedelta(0), None, 500)
+    ]
+    for span, requested, max_points in cases:
+        seconds = service.resolve_bucket_seconds(end - span, end, requested, max_points)
+        points = math.ceil(span.total_seconds() / seconds)
+        print(f"  span {str(span):>18s} diminta {str(requested):>5s} max {max_points:>3d} -> {seconds:>8d} s ({points} titik)")
+        assert seconds % service.interval_seconds == 0 and seconds >= service.interval_seconds
+        assert points <= max_points
+        if requested:
+            assert seconds >= requested
+    print("  ✓ PASS")
+    return True
+
+
+def test_batch_writer():
+    print("\n" + "=" * 70)
+    print("TEST 3: BATCH WRITER (REQUEUE & MAX BUFFER)")
+    print("=" * 70)
+    written = []
+    failing = [True]
+
+    def flush_fn(batch):
+        if failing[0]:
+            raise ConnectionError("database tidak tersedia")
+        written.extend(batch)
+
+    # batch_size besar dan thread tidak dijalankan: flush hanya manual
+    writer = BatchWriter("test", flush_fn, batch_size=1000, flush_interval=3600, max_buffer=5)
+    writer._thread = object()
+    for i in range(3):
+        writer.append(i)
+    assert writer.flush() == 0
+    assert writer.pending() == 3 and writer.stats["failed_flushes"] == 1
+    print(f"  Setelah flush gagal : pending {writer.pending()}, stats {writer.stats}")
+
+    # Record baru ditambahkan di belakang batch yang dikembalikan; buffer penuh membuang yang tertua
+    for i in range(3, 8):
+        writer.append(i)
+    assert writer.pending() == 5 and writer.stats["dropped"] == 3
+
+    failing[0] = False
+    assert writer.flush() == 5
+    print(f"  Ditulis             : {written}")
+    assert written == [3, 4, 5, 6, 7], "urutan atau record yang dibuang salah"
+    assert writer.pending() == 0 and writer.stats["written"] == 5 and writer.stats["appended"] == 8
+
+    # Requeue tidak melebihi max_buffer: sisa batch gagal yang tidak muat dihitung dropped
+    writer._requeue(list(range(7)))
+    assert list(writer._buffer) == [2, 3, 4, 5, 6] and writer.stats["dropped"] == 5
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_aggregate, test_resolve_bucket_seconds, test_batch_writer):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,141 @@
+"""
+Test Script untuk simulasi what-if health index (/api/health/simulate)
+
+Script ini menguji tanpa database (rpn_max dan oee_values diberikan di request):
+1. fmea_actions + baseline RPN: baseline di urutan pertama, label sejajar dengan nilai
+2. Nilai tidak terhingga ditolak dengan 400
+3. Fungsi vektor (calculate_rpn_scores, calculate_final_health_indices,
+   determine_health_statuses) == fungsi skalar pada grid, termasuk nilai ambang
+
+Jalankan:
+    python tests/test_health_simulation.py
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+import numpy as np
+from flask import Flask
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from config import HEALTH_THRESHOLD_GOOD, RPN_WEIGHT, OEE_WEIGHT
+from src.controllers.health_controller import health_bp
+from src.services.health_service import HealthService
+
+
+def make_client():
+    app = Flask(__name__)
+    app.register_blueprint(health_bp, url_prefix='/api')
+    return app.test_client()
+
+
+def test_fmea_actions_with_baseline():
+    print("\n" + "=" * 70)
+    print("TEST 1: FMEA ACTIONS + BASELINE RPN")
+    print("=" * 70)
+    response = make_client().post('/api/health/simulate', json={
+        "rpn_value": 120,
+        "rpn_max": 200,
+        "oee_values": [50, 80],
+        "fmea_actions": [
+            {"name": "Ganti roller", "rpn": 40},
+            {"name": "SOP cleaning", "rpn_reduction_pct": 50},
+            {"name": "Kalibrasi", "severity": 5, "occurrence": 2, "detection": 3}
+        ]
+    })
+    data = response.get_json()["data"]
+    print(f"  Status     : {response.status_code}")
+    print(f"  RPN values : {data['rpn_values']}")
+    print(f"  Labels     : {data['rpn_labels']}")
+    assert response.status_code == 200
+    assert data["rpn_values"] == [120.0, 40.0, 60.0, 30.0]
+    assert data["rpn_labels"] == ["Baseline", "Ganti roller", "SOP cleaning", "Kalibrasi"]
+    assert len(data["rpn_labels"]) == len(data["rpn_values"]) == len(data["health_index"])
+    assert data["scenario_count"] == 8
+
+    # Tanpa baseline: hanya aksi dengan RPN eksplisit/S×O×D
+    response = make_client().post('/api/health/simulate', json={
+        "rpn_max": 200,
+        "oee_values": [50],
+        "fmea_actions": [{"name": "Ganti roller", "rpn": 40}]
+    })
+    data = response.get_json()["data"]
+    assert response.status_code == 200
+    assert data["rpn_values"] == [40.0] and data["rpn_labels"] == ["Ganti roller"]
+    print("  ✓ PASS")
+    return True
+
+
+def test_non_finite_rejected():
+    print("\n" + "=" * 70)
+    print("TEST 2: NILAI TIDAK TERHINGGA DITOLAK (400)")
+    print("=" * 70)
+    client = make_client()
+    bodies = [
+        '{"rpn_max": 200, "rpn_values": [1e400, 10], "oee_values": [50]}',
+        '{"rpn_max": 1e400, "rpn_values": [10], "oee_values": [50]}',
+        '{"rpn_max": 200, "rpn_values": {"start": 0, "stop": 1e400, "step": 10}, "oee_values": [50]}',
+        '{"rpn_max": 200, "rpn_value": 100, "fmea_actions": [{"name": "x", "rpn": 1e400}], "oee_values": [50]}'
+    ]
+    for body in bodies:
+        response = client.post('/api/health/simulate', data=body, content_type='application/json')
+        print(f"  {response.status_code} : {response.get_json()['message']}")
+        assert response.status_code == 400
+    print("  ✓ PASS")
+    return True
+
+
+def test_vector_matches_scalar():
+    print("\n" + "=" * 70)
+    print("TEST 3: FUNGSI VEKTOR == FUNGSI SKALAR")
+    print("=" * 70)
+    service = HealthService()
+    # OEE yang membuat health tepat di ambang untuk RPN score 100 dan 0, ± 0.01
+    threshold_oee = [(HEALTH_THRESHOLD_GOOD - score * RPN_WEIGHT) / OEE_WEIGHT for score in (100.0, 0.0)]
+    oee_values = np.unique(np.concatenate([
+        np.arange(0, 100.01, 0.5),
+        np.arange(0, 100, 0.13),
+        [v + d for v in threshold_oee for d in (-0.01, 0.0, 0.01)]
+    ]))
+    checked = 0
+    for rpn_max in (200.0, 1000.0, 0.0):
+        rpn_values = np.concatenate([np.arange(0, 201, 1.0), np.arange(0, 200, 0.37)])
+        rpn_scores = service.calculate_rpn_scores(rpn_values, rpn_max)
+        health = service.calculate_final_health_indices(rpn_scores[:, None], oee_values[None, :])
+        statuses = service.determine_health_statuses(health)
+        for i, rpn in enumerate(rpn_values):
+            rpn_score = service.calculate_rpn_score(rpn, rpn_max)
+            assert rpn_score == rpn_scores[i], f"rpn {rpn}/{rpn_max}: {rpn_score} != {rpn_scores[i]}"
+            for j, oee in enumerate(oee_values):
+                index = service.calculate_final_health_index(rpn_score, oee)
+                assert index == health[i, j], f"health {rpn_score}, {oee}: {index} != {health[i, j]}"
+                assert service.determine_health_status(index) == statuses[i, j]
+                checked += 1
+
+    at_threshold = service.calculate_final_health_indices(np.array([100.0]), np.array([threshold_oee[0]]))
+    assert at_threshold[0] == HEALTH_THRESHOLD_GOOD
+    assert service.determine_health_statuses(at_threshold)[0] == service.determine_health_status(HEALTH_THRESHOLD_GOOD)
+    print(f"  Skenario dibandingkan : {checked}")
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_fmea_actions_with_baseline, test_non_finite_rejected, test_vector_matches_scalar):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
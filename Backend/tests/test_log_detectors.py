@@ -0,0 +1,182 @@
+"""
+Test Script untuk scan tunggal machine_logs (log_detectors)
+
+Script ini menguji tanpa database:
+1. Segmen status transition (aturan mulai/selesai, agregat, segmen < 1 menit)
+2. MetricDropDetector dan CounterStallDetector pada data sintetis
+3. Semua detektor dalam satu pass: setiap baris di-decode sekali, event digabung
+
+Jalankan:
+    python tests/test_log_detectors.py
+"""
+
+import sys
+import random
+import logging
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import src.services.log_detectors as log_detectors
+from src.services.downtime_service import downtime_service
+from src.services.log_detectors import (
+    StatusTransitionDetector, MetricDropDetector, CounterStallDetector,
+    scan_rows, merge_events
+)
+
+START = datetime(2025, 10, 1, 6, 0, tzinfo=timezone.utc)
+
+
+def simulate_rows(n: int, seed: int = 7):
+    """Baris machine_logs sintetis per 30 detik (format mentah driver)."""
+    rng = random.Random(seed)
+    statuses = ['Running'] * 40 + ['Error', 'Stopped', 'Idle', 'Maintenance', 'Setup']
+    rows = []
+    status = 'Running'
+    production = defects = stalled = 0
+    for i in range(n):
+        if rng.random() < 0.05:
+            status = rng.choice(statuses)
+        if stalled:
+            stalled -= 1
+        elif rng.random() < 0.005:
+            stalled = rng.randint(5, 30)  # counter macet 2.5-15 menit
+        elif status == 'Running' and rng.random() < 0.9:
+            production += rng.randint(1, 5)
+            defects += rng.random() < 0.1
+        rows.append((
+            START + timedelta(seconds=30 * i),
+            status,
+            Decimal(str(round(rng.uniform(5, 100), 2))),
+            Decimal(str(round(rng.uniform(10, 100), 2))),
+            production,
+            defects
+        ))
+    return rows
+
+
+def test_status_segments():
+    print("\n" + "=" * 70)
+    print("TEST 1: SEGMEN STATUS TRANSITION (REFERENSI _walk_status_segments)")
+    print("=" * 70)
+    minute = timedelta(minutes=1)
+    rows = [
+        (START, 'Stopped', 0, 90, 100, 1),                    # downtime di awal rentang
+        (START + 2 * minute, 'Running', 80, 95, 100, 1),      # segmen 1: 2 menit
+        (START + 5 * minute, 'Idle', 40, 95, 110, 2),         # segmen 2 mulai (setelah Running)
+        (START + 6 * minute, 'Error', 20, 90, 112, 3),
+        (START + 9 * minute, 'Running', 85, 95, 115, 4),      # segmen 2: 4 menit
+        (START + 10 * minute, 'Setup', 60, 95, 120, 4),
+        (START + 10.5 * minute, 'Running', 85, 95, 120, 4),   # < 1 menit, dibuang
+        (START + 12 * minute, 'Maintenance', 10, 80, 125, 5)  # segmen 3 masih berjalan
+    ]
+    segments = downtime_service._walk_status_segments(rows, limit=10)
+    print(f"  Segmen : {[(s[0].strftime('%H:%M'), s[2], s[5], s[6]) for s in segments]}")
+    assert [(s[2], s[5], s[6]) for s in segments] == [
+        ('Maintenance', None, 1), ('Idle', 4, 2), ('Stopped', 2, 1)
+    ]
+    idle = segments[1]
+    assert idle[7] == 30 and idle[8] == 20 and idle[9] == 92.5  # avg/min performance, avg quality
+    assert idle[10] == 5 and idle[11] == 2                      # delta produksi/defect s.d. Running
+    assert downtime_service._walk_status_segments(rows, limit=1) == segments[:1]
+
+    # Detektor event memakai state machine yang sama
+    detector = StatusTransitionDetector(downtime_service, limit=10)
+    scan_rows(rows, [detector])
+    events = detector.results()
+    assert [e["timestamp"] for e in events] == [s[0].isoformat() for s in segments]
+    assert events[0]["ongoing"] and events[1]["duration"] == 4
+    print("  ✓ PASS")
+    return True
+
+
+def test_drop_and_stall():
+    print("\n" + "=" * 70)
+    print("TEST 2: METRIC DROP + COUNTER STALL")
+    print("=" * 70)
+    minute = timedelta(minutes=1)
+    rows = [
+        (START, 'Running', 90, 95, 100, 1),
+        (START + 1 * minute, 'Running', 15, 95, 110, 1),   # drop mulai (P < 20)
+        (START + 3 * minute, 'Running', 80, 95, 120, 1),   # drop selesai
+        (START + 4 * minute, 'Running', 80, 95, 120, 1),   # counter diam dari menit 3
+        (START + 9 * minute, 'Running', 80, 95, 120, 1),
+        (START + 10 * minute, 'Running', 80, 95, 130, 1),  # stall 7 menit selesai
+        (START + 11 * minute, 'Running', 80, 95, 131, 1),  # mulai diam (2 menit, diabaikan)
+        (START + 13 * minute, 'Error', 80, 5, 131, 1),     # drop (status + Q)
+        (START + 20 * minute, 'Running', 85, 90, 140, 1),
+        (START + 30 * minute, 'Running', 85, 90, 140, 1)   # stall berjalan 10 menit
+    ]
+    drop = MetricDropDetector(downtime_service)
+    stall = CounterStallDetector(downtime_service, min_minutes=5)
+    scanned = scan_rows(rows, [drop, stall])
+    assert scanned == len(rows)
+
+    drops = drop.results()
+    print(f"  Drops  : {[(e['timestamp'][11:16], e['duration'], e['component']) for e in drops]}")
+    assert [e["duration"] for e in drops] == [7, 2]
+    assert drops[0]["component"] == 'Printing' and drops[1]["component"] == 'Feeder'
+
+    stalls = stall.results()
+    print(f"  Stalls : {[(e['timestamp'][11:16], e['duration'], e['status']) for e in stalls]}")
+    assert [(e["duration"], e["ongoing"]) for e in stalls] == [(10, True), (7, False)]
+    assert stalls[1]["metrics"]["production"] == 120
+    print("  ✓ PASS")
+    return True
+
+
+def test_single_pass():
+    print("\n" + "=" * 70)
+    print("TEST 3: SEMUA DETEKTOR DALAM SATU PASS")
+    print("=" * 70)
+    rows = simulate_rows(20000, seed=11)
+    decoded = []
+    original = log_detectors.decode_row
+
+    def counting_decode(row):
+        decoded.append(row)
+        return original(row)
+
+    log_detectors.decode_row = counting_decode
+    try:
+        detectors = [
+            StatusTransitionDetector(downtime_service, 50),
+            MetricDropDetector(downtime_service, 50),
+            CounterStallDetector(downtime_service, 50, min_minutes=5)
+        ]
+        scanned = scan_rows(iter(rows), detectors)
+    finally:
+        log_detectors.decode_row = original
+
+    counts = {d.name: d.detected for d in detectors}
+    merged = merge_events(detectors, limit=50)
+    print(f"  Baris di-scan  : {scanned} (decode {len(decoded)}x)")
+    print(f"  Per detektor   : {counts}")
+    assert scanned == len(rows) == len(decoded)
+    assert all(counts.values())
+    assert len(merged) == 50
+    assert [e["timestamp"] for e in merged] == sorted((e["timestamp"] for e in merged), reverse=True)
+    assert {e["detector"] for e in merged} <= set(counts)
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_status_segments, test_drop_and_stall, test_single_pass):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
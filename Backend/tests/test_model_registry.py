@@ -0,0 +1,168 @@
+"""
+Test Script untuk Model Registry (versioning + hot reload)
+
+Script ini menguji di direktori model sementara:
+1. Slot dengan file identik berbagi satu instance model (content hash sama)
+2. Reload mengaktifkan versi baru; snapshot lama tetap utuh untuk request berjalan
+3. PredictionService memakai encoder/lookup table versi baru setelah swap
+4. File model rusak tidak menggantikan versi aktif
+5. Watcher mendeteksi perubahan file dan reload otomatis
+
+Jalankan:
+    python tests/test_model_registry.py
+"""
+
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.model_registry import ModelRegistry
+from src.services import prediction_service as prediction_module
+
+MODEL_DIR = backend_dir.parent / "Model"
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def make_model_dir():
+    """Direktori model sementara berisi model_improved.pkl sebagai model.pkl & model_improved.pkl."""
+    tmp = Path(tempfile.mkdtemp())
+    for name in ("model.pkl", "model_improved.pkl"):
+        shutil.copy(MODEL_DIR / "model_improved.pkl", tmp / name)
+    for name in ("feature_names.pkl", "feature_names_improved.pkl"):
+        shutil.copy(MODEL_DIR / "feature_names_improved.pkl", tmp / name)
+    return tmp
+
+
+def write_retrained_model(model_dir, seed):
+    """Model pengganti kecil dengan fitur yang sama (simulasi hasil training ulang)."""
+    feature_names = joblib.load(model_dir / "feature_names.pkl")
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, 2, size=(200, len(feature_names))).astype(float)
+    y = rng.uniform(10, 500, size=200)
+    model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=seed).fit(X, y)
+    joblib.dump(model, model_dir / "model.pkl")
+    return model
+
+
+def test_shared_instance():
+    print("\n" + "=" * 70)
+    print("TEST 1: INSTANCE BERSAMA UNTUK FILE IDENTIK")
+    print("=" * 70)
+    registry = ModelRegistry(make_model_dir())
+    standard = registry.get("standard")
+    improved = registry.get("improved")
+    print(f"  standard : {standard.version} {standard.content_hash[:12]}")
+    print(f"  improved : {improved.version} {improved.content_hash[:12]}")
+    assert standard.model is improved.model, "Model identik dimuat dua kali"
+    print("  ✓ PASS")
+    return True
+
+
+def test_reload_swap():
+    print("\n" + "=" * 70)
+    print("TEST 2: RELOAD + SWAP ATOMIK")
+    print("=" * 70)
+    model_dir = make_model_dir()
+    registry = ModelRegistry(model_dir)
+    prediction_module.model_registry = registry
+    service = prediction_module.PredictionService()
+
+    old_state = service.current_state()
+    sample = {"reason": "COUNTER PROBLEM", "shift": 1}
+    old_prediction = service.predict_downtime(sample)["prediction"]
+
+    new_model = write_retrained_model(model_dir, seed=1)
+    result = registry.reload("standard", wait=True)[0]
+    new_state = service.current_state()
+    print(f"  Reload status : {result['status']} ({old_state.version} -> {new_state.version})")
+    assert result["status"] == "activated"
+    assert new_state is not old_state and new_state.model is not old_state.model
+
+    # Snapshot lama tetap konsisten (model + lookup table versi lama)
+    key = old_state.feature_encoder.encode_key(sample)
+    assert old_state.prediction_table[key] == old_state.model.predict(
+        old_state.feature_encoder.rows_from_keys([key]))[0]
+
+    expected = round(max(float(new_model.predict(new_state.feature_encoder.encode(sample).reshape(1, -1))[0]), 0), 2)
+    new_prediction = service.predict_downtime(sample)["prediction"]
+    print(f"  Prediksi      : {old_prediction} -> {new_prediction}")
+    assert new_prediction == expected, "Service belum memakai model baru"
+    assert new_state.prediction_table is not None, "Lookup table tidak dibangun ulang"
+
+    # Reload tanpa perubahan file tidak membuat versi baru
+    assert registry.reload("standard", wait=True)[0]["status"] == "unchanged"
+    history = registry.status()["slots"]["standard"]["history"]
+    assert [h["version"] for h in history] == ["v1", "v2"], history
+    print("  ✓ PASS")
+    return True
+
+
+def test_broken_file_keeps_active():
+    print("\n" + "=" * 70)
+    print("TEST 3: FILE RUSAK TIDAK MENGGANTIKAN VERSI AKTIF")
+    print("=" * 70)
+    model_dir = make_model_dir()
+    registry = ModelRegistry(model_dir)
+    active = registry.get("standard")
+
+    (model_dir / "model.pkl").write_bytes(b"not a pickle")
+    result = registry.reload("standard", wait=True)[0]
+    print(f"  Reload status : {result['status']}")
+    assert result["status"] == "failed"
+    assert registry.get("standard") is active
+    assert registry.status()["slots"]["standard"]["last_error"]
+    print("  ✓ PASS")
+    return True
+
+
+def test_watcher():
+    print("\n" + "=" * 70)
+    print("TEST 4: WATCHER RELOAD OTOMATIS")
+    print("=" * 70)
+    model_dir = make_model_dir()
+    registry = ModelRegistry(model_dir)
+    active = registry.get("standard")
+    registry.start_watcher(0.1)
+    try:
+        write_retrained_model(model_dir, seed=2)
+        deadline = time.time() + 10
+        while registry.get("standard") is active and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        registry.stop_watcher()
+
+    current = registry.get("standard")
+    print(f"  Versi aktif   : {active.version} -> {current.version}")
+    assert current is not active, "Watcher tidak me-reload model"
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_shared_instance, test_reload_swap, test_broken_file_keeps_active, test_watcher):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
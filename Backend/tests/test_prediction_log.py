@@ -0,0 +1,224 @@
+"""
+Test Script untuk Prediction Log (audit log + back-test)
+
+Script ini menguji tanpa database (flush callback writer diganti penampung):
+1. predict_downtime mencatat record (source, versi model, input hash, interval)
+   dan record() tidak menunggu flush yang lambat
+2. Baris insert: input hash tidak bergantung urutan key, reason sensor diterjemahkan,
+   teks dipotong ke panjang kolom; record yang ditolak database tidak diulang
+3. Back-test: pasangan perbaikan-prediksi dan metrik (MAE, RMSE, bias, cakupan)
+4. Back-test end-to-end dengan RIWAYAT_PERBAIKAN_REALISTIC.csv
+
+Jalankan:
+    python tests/test_prediction_log.py
+"""
+
+import sys
+import time
+import logging
+import threading
+import warnings
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import src.services.prediction_service as prediction_service_module
+from src.services.prediction_service import PredictionService, prediction_coalescer
+from src.services.prediction_log_service import (
+    PredictionLogService, input_hash, MAX_SHIFT_LENGTH, MAX_REASON_LENGTH
+)
+from src.services.model_registry import MODEL_DIR
+from _helpers import load_service
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+original_log_service = prediction_service_module.prediction_log_service
+
+
+def test_record_from_service():
+    print("\n" + "=" * 70)
+    print("TEST 1: predict_downtime MENCATAT KE AUDIT LOG TANPA MENUNGGU FLUSH")
+    print("=" * 70)
+    service = load_service()
+    written = []
+    flushing = threading.Event()
+
+    def slow_flush(records):
+        flushing.set()
+        time.sleep(0.2)  # Simulasi INSERT lambat
+        written.extend(PredictionLogService._to_rows(records))
+
+    # Log service baru: record dari test lain di buffer global tidak ikut terhitung
+    log = PredictionLogService(enabled=True)
+    log.writer.flush_fn = slow_flush
+    log.writer.batch_size = 50
+
+    inputs = [{"reason": "SLOTTER_MISALIGNMENT", "shift": 1 + i % 3} for i in range(200)]
+    latencies = []
+    prediction_service_module.prediction_log_service = log
+    try:
+        for data in inputs:
+            start = time.perf_counter()
+            service.predict_downtime(data, source="health_auto_trigger")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        prediction_service_module.prediction_log_service = original_log_service
+    log.stop()
+
+    assert flushing.is_set()
+    print(f"  Record ditulis : {len(written)}")
+    print(f"  Latency maks   : {max(latencies) * 1000:.2f} ms (flush 200 ms per batch)")
+    assert len(written) == len(inputs), len(written)
+    assert max(latencies) < 0.1, "predict_downtime menunggu flush audit log"
+
+    row = written[0]
+    state = service.current_state()
+    assert row[1] == "health_auto_trigger"
+    assert row[2] == input_hash(inputs[0])
+    assert row[3] == "SLOTTER_MISALIGNMENT" and row[4] == "SLOTER LARI", row[3:5]
+    assert row[6] == PredictionService.MODEL_SLOT and row[7] == state.version
+    assert row[9] is True and row[10] is not None
+    assert row[11] is None or row[11] <= row[12]
+    print(f"  Contoh baris   : {row}")
+    print("  ✓ PASS")
+    return True
+
+
+def test_row_mapping():
+    print("\n" + "=" * 70)
+    print("TEST 2: INPUT HASH & MAPPING BARIS")
+    print("=" * 70)
+    a = {"reason": "sloter lari", "shift": 2, "health_index": 41.5}
+    b = {"health_index": 41.5, "shift": 2, "reason": "sloter lari"}
+    assert input_hash(a) == input_hash(b) and len(input_hash(a)) == 16
+    assert input_hash(a) != input_hash({**a, "shift": "2"})
+
+    now = datetime.now(timezone.utc)
+    rows = PredictionLogService._to_rows([
+        (now, "api", "standard", "v1", "abc", a, True, 120.5, {"p10": 80.0, "p90": 200.0}, 1.23456),
+        (now, "api", "standard", None, None, {}, False, None, None, 0.5)
+    ])
+    print(f"  Baris 1 : {rows[0]}")
+    print(f"  Baris 2 : {rows[1]}")
+    assert rows[0][3] == "SLOTER LARI" and rows[0][5] == "2"
+    assert rows[0][11:] == (80.0, 200.0, 1.235)
+    assert rows[1][3] is None and rows[1][10] is None and rows[1][11] is None
+
+    # Shift/reason sembarang dipotong ke panjang kolom (VARCHAR(16) / batas reason)
+    long_input = {"reason": "x" * 1000, "shift": "  night-shift-overtime-B  "}
+    row = PredictionLogService._to_rows([(now, "api", "standard", "v1", "abc", long_input, True, 1.0, None, 0.1)])[0]
+    print(f"  Shift panjang : {row[5]!r}")
+    assert row[5] == "night-shift-over" and len(row[5]) == MAX_SHIFT_LENGTH
+    assert len(row[3]) == MAX_REASON_LENGTH and row[3] == "X" * MAX_REASON_LENGTH
+
+    # Record yang ditolak database dihitung, tidak dikembalikan ke buffer
+    log = PredictionLogService(enabled=True)
+    log.writer.flush_fn = lambda records: 1
+    log.writer.append((now, "api", "standard", "v1", "abc", a, True, 1.0, None, 0.1))
+    log.writer.append((now, "api", "standard", "v1", "abc", long_input, True, 1.0, None, 0.1))
+    assert log.flush() == 1
+    assert log.status()["rejected"] == 1 and log.status()["pending"] == 0
+    log.stop()
+    print("  ✓ PASS")
+    return True
+
+
+def test_match_and_summary():
+    print("\n" + "=" * 70)
+    print("TEST 3: PASANGAN BACK-TEST & METRIK")
+    print("=" * 70)
+    day = date(2025, 3, 10)
+    at = lambda d, h: datetime(d.year, d.month, d.day, h, tzinfo=timezone.utc)
+    predictions = [
+        (at(day, 8), "SLOTER LARI", 100.0, 60.0, 150.0, "v1"),
+        (at(day, 9), "SLOTER LARI", 110.0, 70.0, 160.0, "v2"),       # Terbaru, dipilih
+        (at(day, 10), "COUNTER PROBLEM", 500.0, None, None, "v2"),
+        (at(day - timedelta(days=1), 12), "FEEDER ROLL", 40.0, 20.0, 50.0, "v1"),
+        (at(day - timedelta(days=5), 12), "PRINTING UNIT", 300.0, None, None, "v1")  # Di luar window
+    ]
+    repairs = [
+        {"date": day, "issue": "SLOTER LARI", "mapped_reason": "SLOTER LARI",
+         "tokens": {"SLOTER", "LARI"}, "actual_minutes": 120.0},
+        {"date": day, "issue": "FEEDER ROLL F4 AUS", "mapped_reason": "FEEDER ROLL F4 AUS",
+         "tokens": {"FEEDER", "ROLL", "F4", "AUS"}, "actual_minutes": 60.0},
+        {"date": day, "issue": "PRINTING UNIT MACET", "mapped_reason": "PRINTING UNIT MACET",
+         "tokens": {"PRINTING", "UNIT", "MACET"}, "actual_minutes": 90.0}
+    ]
+    pairs = PredictionLogService.match_repairs(predictions, repairs, window_days=1)
+    for p in pairs:
+        print(f"  {p['issue']:<22s} actual {p['actual_minutes']:6.1f} -> predicted {p['predicted_minutes']}")
+    assert pairs[0]["predicted_minutes"] == 110.0 and pairs[0]["match_score"] == 2.0
+    assert pairs[1]["predicted_minutes"] == 40.0
+    assert pairs[2]["predicted_minutes"] is None
+
+    summary = PredictionLogService.summarize(pairs)
+    print(f"  Ringkasan: {summary}")
+    assert summary["repairs"] == 3 and summary["matched"] == 2 and summary["unmatched"] == 1
+    assert summary["mae"] == 15.0 and summary["bias"] == -15.0
+    assert summary["rmse"] == round(((10 ** 2 + 20 ** 2) / 2) ** 0.5, 2)
+    assert summary["interval_coverage"] == 0.5
+    assert summary["by_model_version"]["v2"]["matched"] == 1
+    print("  ✓ PASS")
+    return True
+
+
+def test_backtest_repair_file():
+    print("\n" + "=" * 70)
+    print("TEST 4: BACK-TEST DENGAN RIWAYAT_PERBAIKAN_REALISTIC.csv")
+    print("=" * 70)
+    log = PredictionLogService(enabled=False)
+    repairs = log.load_repairs()
+    assert repairs and log.load_repairs() is repairs, "Riwayat perbaikan tidak di-cache"
+    print(f"  Kejadian perbaikan : {len(repairs)}")
+
+    try:
+        log.load_repairs(MODEL_DIR / "RIWAYAT_PERBAIKAN.csv")
+        raise AssertionError("File tanpa DURATION_MINUTES diterima")
+    except ValueError as e:
+        print(f"  Tanpa durasi       : {e}")
+
+    # Log prediksi sintetis: satu prediksi per kejadian (reason = ISSUE) pada hari yang sama
+    service = load_service()
+    prediction_coalescer.ttl_seconds = 0
+    predictions = []
+    for repair in repairs:
+        result = service.predict_downtime({"reason": repair["issue"], "shift": 1})
+        interval = result.get("prediction_interval") or {}
+        created = datetime(repair["date"].year, repair["date"].month, repair["date"].day, 7, tzinfo=timezone.utc)
+        predictions.append((created, repair["mapped_reason"], result["prediction"],
+                            interval.get("p10"), interval.get("p90"), "v1"))
+
+    first = min(r["date"] for r in repairs)
+    last = max(r["date"] for r in repairs)
+    log._fetch_predictions = lambda start, end, source: predictions
+    result = log.backtest(
+        start=datetime(first.year, first.month, first.day, tzinfo=timezone.utc),
+        end=datetime(last.year, last.month, last.day, 23, tzinfo=timezone.utc),
+        window_days=0
+    )
+    summary = result["summary"]
+    print(f"  Ringkasan          : {summary}")
+    assert summary["repairs"] == len(repairs) and summary["unmatched"] == 0
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    prediction_coalescer.ttl_seconds = 0
+
+    results = []
+    for test in (test_record_from_service, test_row_mapping, test_match_and_summary, test_backtest_repair_file):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,165 @@
+"""
+Test Script untuk loader laporan produksi (production_csv)
+
+Script ini menguji pada salinan "Data Flexo CSV" di folder sementara:
+1. Dtype eksplisit (categorical) dan isi sama dengan pd.read_csv + concat lama
+2. Run kedua dimuat dari cache gabungan, dan waktunya
+3. Hanya bulan yang berubah yang di-parse ulang; cache bulan lama dibersihkan
+
+Jalankan:
+    python tests/test_production_csv.py
+"""
+
+import sys
+import time
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import src.services.production_csv as production_csv
+from src.services.production_csv import load_production_csv, CATEGORICAL_COLUMNS, CSV_OPTIONS
+
+DATA_DIR = backend_dir.parent / "Data Flexo CSV"
+
+
+def copy_data(workdir: Path):
+    """Menyalin laporan ke folder sementara; mengembalikan (files, cache_dir)."""
+    sources = sorted(DATA_DIR.glob("Laporan Flexo *.csv"))
+    assert sources, f"Data tidak ditemukan: {DATA_DIR}"
+    files = []
+    for source in sources:
+        shutil.copy(source, workdir / source.name)
+        files.append(workdir / source.name)
+    return files, workdir / ".cache"
+
+
+def in_temp_copy(test):
+    """Menjalankan test tanpa argumen pada salinan data di folder sementara."""
+    def run():
+        workdir = Path(tempfile.mkdtemp(prefix="flexo_csv_"))
+        try:
+            return test(*copy_data(workdir))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+
+def count_parses():
+    """Membungkus parse_production_csv untuk menghitung file yang di-parse."""
+    parsed = []
+    original = production_csv.parse_production_csv
+
+    def counting_parse(path):
+        parsed.append(Path(path).name)
+        return original(path)
+
+    production_csv.parse_production_csv = counting_parse
+    return parsed, original
+
+
+@in_temp_copy
+def test_schema_and_parity(files, cache_dir):
+    print("\n" + "=" * 70)
+    print("TEST 1: DTYPE EKSPLISIT + PARITAS DENGAN CONCAT LAMA")
+    print("=" * 70)
+    started = time.perf_counter()
+    expected = pd.concat([pd.read_csv(f, **CSV_OPTIONS) for f in files], ignore_index=True)
+    baseline_ms = (time.perf_counter() - started) * 1000
+
+    df, n_loaded = load_production_csv(files, cache_dir=cache_dir)
+    assert n_loaded == len(files)
+    for col in CATEGORICAL_COLUMNS:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), f"{col}: {df[col].dtype}"
+
+    comparable = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        comparable[col] = comparable[col].astype(expected[col].dtype)
+    pd.testing.assert_frame_equal(expected, comparable, check_dtype=False)
+
+    print(f"  Baris              : {len(df)}")
+    print(f"  read_csv + concat  : {baseline_ms:.0f} ms")
+    print(f"  Memori lama / baru : {expected.memory_usage(deep=True).sum() / 1e6:.1f} MB / "
+          f"{df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print("  ✓ PASS")
+    return True
+
+
+@in_temp_copy
+def test_cache_hit(files, cache_dir):
+    print("\n" + "=" * 70)
+    print("TEST 2: RUN KEDUA DARI CACHE GABUNGAN")
+    print("=" * 70)
+    cold, _ = load_production_csv(files, cache_dir=cache_dir)
+
+    parsed, original = count_parses()
+    try:
+        started = time.perf_counter()
+        warm, _ = load_production_csv(files, cache_dir=cache_dir)
+        warm_ms = (time.perf_counter() - started) * 1000
+    finally:
+        production_csv.parse_production_csv = original
+
+    print(f"  Di-parse  : {len(parsed)} file")
+    print(f"  Cache hit : {warm_ms:.0f} ms")
+    assert parsed == []
+    pd.testing.assert_frame_equal(cold, warm)
+
+    # Urutan berbeda memakai entri gabungan sendiri, tanpa menghapus yang lain
+    reordered, _ = load_production_csv(list(reversed(files)), cache_dir=cache_dir)
+    assert len(list(Path(cache_dir).glob("flexo-*.pkl"))) == 2
+    assert len(reordered) == len(warm)
+    print("  ✓ PASS")
+    return True
+
+
+@in_temp_copy
+def test_changed_month(files, cache_dir):
+    print("\n" + "=" * 70)
+    print("TEST 3: HANYA BULAN YANG BERUBAH DI-PARSE ULANG")
+    print("=" * 70)
+    load_production_csv(files, cache_dir=cache_dir)
+
+    changed = files[-1]
+    original_df = pd.read_csv(changed, **CSV_OPTIONS)
+    original_df.head(len(original_df) - 10).to_csv(changed, sep=";", index=False, encoding="utf-8-sig")
+
+    parsed, original = count_parses()
+    try:
+        df, _ = load_production_csv(files, cache_dir=cache_dir)
+    finally:
+        production_csv.parse_production_csv = original
+
+    print(f"  Di-parse ulang : {parsed}")
+    assert parsed == [changed.name]
+    expected = pd.concat([pd.read_csv(f, **CSV_OPTIONS) for f in files], ignore_index=True)
+    assert len(df) == len(expected)
+    months = list(Path(cache_dir).glob("month-*.pkl"))
+    assert len(months) == len(files), f"{len(months)} entri bulan di cache"
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_schema_and_parity, test_cache_hit, test_changed_month):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
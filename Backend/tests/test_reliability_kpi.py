@@ -0,0 +1,158 @@
+"""
+Test Script untuk KPI reliabilitas /api/downtime/reliability
+
+Script ini menguji tanpa database:
+1. MTBF / MTTR / availability / Pareto / cluster kegagalan berulang pada data sintetis
+2. Laporan dari riwayat perbaikan CSV (source=repairs) dan cache TTL + refresh
+
+Jalankan:
+    python tests/test_reliability_kpi.py
+"""
+
+import sys
+import time
+import logging
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.reliability_service import (
+    ReliabilityService, compute_reliability, repair_component
+)
+
+
+def failure(hours, minutes, component, reason="Error"):
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc) + timedelta(hours=hours)
+    return {
+        "start": start,
+        "end": start + timedelta(minutes=minutes),
+        "minutes": float(minutes),
+        "component": component,
+        "reason": reason
+    }
+
+
+def test_kpis():
+    print("\n" + "=" * 70)
+    print("TEST 1: MTBF / MTTR / PARETO / KEGAGALAN BERULANG")
+    print("=" * 70)
+    failures = [
+        failure(1, 60, "Feeder"),
+        failure(10, 30, "Feeder"),     # berulang (9 jam setelah sebelumnya)
+        failure(50, 30, "Feeder"),     # lewat 24 jam -> cluster baru
+        failure(5, 150, "Printing"),
+        failure(20, 30, "Slotter")
+    ]
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    report = compute_reliability(failures, start, start + timedelta(days=4), top=2)
+
+    summary = report["summary"]
+    print(f"  Summary : {summary}")
+    assert summary["failures"] == 5
+    assert summary["downtime_minutes"] == 300.0
+    assert summary["mttr_minutes"] == 60.0
+    # (5760 - 300) / 5 menit = 18.2 jam
+    assert summary["mtbf_hours"] == 18.2
+    assert summary["availability"] == round(5460 / 5760, 4)
+    assert summary["repeat_failures"] == 1 and summary["repeat_clusters"] == 1
+
+    keys = [g["key"] for g in report["groups"]]
+    print(f"  Groups  : {keys}")
+    assert keys == ["Printing", "Feeder", "Slotter"]
+    feeder = report["groups"][1]
+    assert feeder["failures"] == 3 and feeder["mttr_minutes"] == 40.0
+    assert feeder["repeat_failures"] == 1
+
+    pareto = report["pareto"]
+    print(f"  Pareto  : {pareto}")
+    assert len(pareto) == 2
+    assert pareto[-1]["cumulative_share"] == round(270 / 300, 4)
+    assert report["vital_few"] == 2
+
+    cluster = report["repeat_clusters"][0]
+    assert cluster["key"] == "Feeder" and cluster["failures"] == 2
+    assert cluster["downtime_minutes"] == 90.0
+
+    by_reason = compute_reliability(failures, start, start + timedelta(days=4), group_by="reason")
+    assert [g["key"] for g in by_reason["groups"]] == ["Error"]
+    assert by_reason["summary"]["repeat_failures"] == 3
+    print("  ✓ PASS")
+    return True
+
+
+def test_repair_report():
+    print("\n" + "=" * 70)
+    print("TEST 2: LAPORAN RIWAYAT PERBAIKAN + CACHE")
+    print("=" * 70)
+    assert repair_component("PREFEEDER FLEXO 4 ABNORMAL") == "Pre-Feeder"
+    assert repair_component("GEAR BOX FEEDER PROBLEM") == "Feeder"
+    assert repair_component("PRINTING BOTAK") == "Printing"
+    assert repair_component("LAMPU MATI") == "Other"
+
+    service = ReliabilityService(ttl_seconds=60)
+    report = service.get_report(sources=["repairs"], top=5)
+    repairs = report["repairs"]
+    print(f"  Summary : {repairs['summary']}")
+    print(f"  Pareto  : {[(p['key'], p['cumulative_share']) for p in repairs['pareto']]}")
+    print(f"  Waktu   : {report['compute_ms']} ms")
+    assert "machine" not in report and not report["cached"]
+    assert repairs["summary"]["failures"] > 0
+    assert len(repairs["pareto"]) <= 5
+    shares = [p["cumulative_share"] for p in repairs["pareto"]]
+    assert shares == sorted(shares)
+
+    again = service.get_report(sources=["repairs"], top=5)
+    assert again["cached"] and again["generated_at"] == report["generated_at"]
+    assert service.refresh() == 1
+    assert not service.get_report(sources=["repairs"], top=5)["cached"]
+    print(f"  Cache   : {service.status()}")
+
+    # LRU: entri terlama dibuang saat penuh, hit memperbarui urutan
+    lru = ReliabilityService(ttl_seconds=60, max_entries=2)
+    for top in (1, 2):
+        lru.get_report(sources=["repairs"], top=top)
+    assert lru.get_report(sources=["repairs"], top=1)["cached"]
+    lru.get_report(sources=["repairs"], top=3)
+    assert lru.status()["entries"] == 2
+    assert lru.get_report(sources=["repairs"], top=1)["cached"]
+    assert not lru.get_report(sources=["repairs"], top=2)["cached"]
+
+    # Entri kedaluwarsa dibuang saat entri baru disimpan
+    expiring = ReliabilityService(ttl_seconds=0.05)
+    for top in (1, 2, 3):
+        expiring.get_report(sources=["repairs"], top=top)
+    time.sleep(0.06)
+    expiring.get_report(sources=["repairs"], top=4)
+    assert expiring.status()["entries"] == 1
+
+    for kwargs in ({"sources": ["sensor"]}, {"group_by": "shift"}, {"top": 0},
+                   {"start_date": "2025-10-02", "end_date": "2025-10-01"},
+                   {"repeat_window_hours": 0}, {"repeat_window_hours": float("inf")},
+                   {"repeat_window_hours": float("nan")}, {"repeat_window_hours": 1e300}):
+        try:
+            service.get_report(**kwargs)
+            raise AssertionError(f"{kwargs}: parameter diterima")
+        except ValueError as e:
+            print(f"  Ditolak : {e}")
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_kpis, test_repair_report):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,219 @@
+"""
+Test Script untuk Shadow Evaluation model kandidat
+
+Script ini menguji di direktori model sementara:
+1. Agregat shadow (count, selisih, histogram) sama dengan perhitungan manual
+   primary vs kandidat untuk input yang sama
+2. Tanpa model kandidat sampel hanya dihitung (no_candidate), tanpa agregat
+3. Queue penuh: sampel dibuang, offer() tidak pernah menunggu
+4. Latency predict_downtime dengan shadow (sample rate 100%) vs tanpa shadow
+
+Jalankan:
+    python tests/test_shadow_evaluation.py
+"""
+
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.model_registry import ModelRegistry
+from src.services import prediction_service as prediction_module
+from src.services.shadow_service import ShadowEvaluator, DURATION_BINS, DIFF_BINS
+from _helpers import build_inputs
+
+MODEL_DIR = backend_dir.parent / "Model"
+N_SAMPLES = 2000
+N_LATENCY = 1000
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def make_model_dir(with_candidate=True):
+    """Direktori model sementara: model_improved.pkl sebagai primary, model kecil sebagai kandidat."""
+    tmp = Path(tempfile.mkdtemp())
+    for name in ("model.pkl", "model_improved.pkl"):
+        shutil.copy(MODEL_DIR / "model_improved.pkl", tmp / name)
+    for name in ("feature_names.pkl", "feature_names_improved.pkl", "feature_names_candidate.pkl"):
+        shutil.copy(MODEL_DIR / "feature_names_improved.pkl", tmp / name)
+
+    if with_candidate:
+        feature_names = joblib.load(tmp / "feature_names.pkl")
+        rng = np.random.default_rng(7)
+        X = rng.integers(0, 2, size=(300, len(feature_names))).astype(float)
+        y = rng.uniform(10, 500, size=300)
+        model = RandomForestRegressor(n_estimators=10, max_depth=5, random_state=7).fit(X, y)
+        joblib.dump(model, tmp / "model_candidate.pkl")
+    return tmp
+
+
+def make_service(model_dir, evaluator_kwargs):
+    """PredictionService + ShadowEvaluator pada registry sementara (tanpa cache single-flight)."""
+    registry = ModelRegistry(model_dir)
+    prediction_module.model_registry = registry
+    prediction_module.prediction_coalescer.ttl_seconds = 0
+    evaluator = ShadowEvaluator(registry=registry, **evaluator_kwargs)
+    prediction_module.shadow_evaluator = evaluator
+    return prediction_module.PredictionService(), registry, evaluator
+
+
+def test_aggregates_match_manual():
+    print("\n" + "=" * 70)
+    print("TEST 1: AGREGAT SHADOW = PERHITUNGAN MANUAL")
+    print("=" * 70)
+    service, registry, evaluator = make_service(make_model_dir(), {"sample_rate": 1.0, "enabled": True})
+    inputs = build_inputs(service, N_SAMPLES)
+    try:
+        for data in inputs:
+            service.predict_downtime(data)
+        assert evaluator.wait_idle(timeout=30), "Worker shadow tidak selesai"
+        status = evaluator.status()
+    finally:
+        evaluator.stop()
+
+    state = service.current_state()
+    candidate = registry.get("candidate")
+    encoder = candidate.artifacts["shadow_service"]
+    primary = np.maximum(state.model.predict(state.feature_encoder.encode_batch(inputs)), 0)
+    shadow = np.maximum(candidate.model.predict(encoder.encode_batch(inputs)), 0)
+    diff = shadow - primary
+
+    assert status["evaluated"] == N_SAMPLES and status["dropped"] == 0, status
+    assert len(status["comparisons"]) == 1
+    comparison = status["comparisons"][0]
+    print(f"  Sampel         : {comparison['samples']}")
+    print(f"  Selisih        : {comparison['diff']}")
+    print(f"  Korelasi       : {comparison['correlation']}")
+    print(f"  Agreement      : {comparison['agreement_rate']}")
+
+    assert comparison["primary"]["content_hash"] == state.bundle.content_hash
+    assert comparison["candidate"]["content_hash"] == candidate.content_hash
+    assert comparison["samples"] == N_SAMPLES
+    assert abs(comparison["diff"]["mean"] - round(diff.mean(), 2)) <= 0.01
+    assert abs(comparison["diff"]["mae"] - round(np.abs(diff).mean(), 2)) <= 0.01
+    assert abs(comparison["diff"]["rmse"] - round(np.sqrt((diff ** 2).mean()), 2)) <= 0.01
+    assert comparison["histograms"]["primary"] == np.histogram(primary, DURATION_BINS)[0].tolist()
+    assert comparison["histograms"]["candidate"] == np.histogram(shadow, DURATION_BINS)[0].tolist()
+    assert comparison["histograms"]["diff"] == np.histogram(diff, DIFF_BINS)[0].tolist()
+    assert sum(r["samples"] for r in comparison["top_reasons_by_mae"]) <= N_SAMPLES
+    print("  ✓ PASS")
+    return True
+
+
+def test_no_candidate():
+    print("\n" + "=" * 70)
+    print("TEST 2: TANPA MODEL KANDIDAT")
+    print("=" * 70)
+    service, _, evaluator = make_service(make_model_dir(with_candidate=False),
+                                         {"sample_rate": 1.0, "enabled": True})
+    try:
+        for data in build_inputs(service, 50):
+            assert service.predict_downtime(data)["success"]
+        assert evaluator.wait_idle(timeout=30)
+        status = evaluator.status()
+    finally:
+        evaluator.stop()
+
+    print(f"  no_candidate   : {status['no_candidate']}")
+    assert status["no_candidate"] == 50 and status["comparisons"] == []
+    print("  ✓ PASS")
+    return True
+
+
+def test_queue_full_drops():
+    print("\n" + "=" * 70)
+    print("TEST 3: QUEUE PENUH -> SAMPEL DIBUANG TANPA MENUNGGU")
+    print("=" * 70)
+    service, _, evaluator = make_service(make_model_dir(),
+                                         {"sample_rate": 1.0, "enabled": True, "queue_size": 10, "batch_size": 1})
+    release = threading.Event()
+    evaluate = evaluator._evaluate
+    evaluator._evaluate = lambda items: (release.wait(), evaluate(items))
+    bundle = service.current_state().bundle
+    try:
+        start = time.perf_counter()
+        accepted = sum(evaluator.offer(bundle, {"reason": "SLOTER LARI", "shift": 1}, 60.0) for _ in range(100))
+        elapsed = time.perf_counter() - start
+        status = evaluator.status()
+    finally:
+        release.set()
+        evaluator.wait_idle(timeout=30)
+        evaluator.stop()
+
+    print(f"  Diterima       : {accepted} | dropped: {status['dropped']} | {elapsed * 1000:.2f} ms untuk 100 offer")
+    assert accepted <= 11 and status["dropped"] == 100 - accepted
+    assert elapsed < 0.5, "offer() menunggu worker"
+    print("  ✓ PASS")
+    return True
+
+
+def measure(service, inputs):
+    samples = []
+    for i in range(N_LATENCY):
+        start = time.perf_counter()
+        service.predict_downtime(inputs[i % len(inputs)])
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1e6
+
+
+def test_latency():
+    print("\n" + "=" * 70)
+    print("TEST 4: LATENCY predict_downtime DENGAN / TANPA SHADOW")
+    print("=" * 70)
+    model_dir = make_model_dir()
+    service, _, evaluator = make_service(model_dir, {"sample_rate": 1.0, "enabled": False})
+    inputs = build_inputs(service, 500)
+    measure(service, inputs)
+
+    off = measure(service, inputs)
+    evaluator.enabled = True
+    try:
+        on = measure(service, inputs)
+        evaluator.wait_idle(timeout=30)
+    finally:
+        evaluator.stop()
+
+    print(f"  Tanpa shadow   : p50 {np.percentile(off, 50):8.1f} µs | p99 {np.percentile(off, 99):8.1f} µs")
+    print(f"  Shadow 100%    : p50 {np.percentile(on, 50):8.1f} µs | p99 {np.percentile(on, 99):8.1f} µs")
+
+    # Biaya di jalur request hanya sampling + put_nowait
+    bundle = service.current_state().bundle
+    evaluator.enabled = True
+    evaluator.sample_rate = 0.0
+    start = time.perf_counter()
+    for data in inputs:
+        evaluator.offer(bundle, data, 60.0)
+    skipped = (time.perf_counter() - start) / len(inputs) * 1e6
+    print(f"  offer() tidak tersampel : {skipped:.2f} µs")
+    assert skipped < 20
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_aggregates_match_manual, test_no_candidate, test_queue_full_drops, test_latency):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,182 @@
+"""
+Test Script untuk Single-Flight Coalescing Prediksi
+
+Script ini menguji:
+1. Request identik bersamaan berbagi satu komputasi (semua menerima hasil yang sama)
+2. Cache TTL melayani request berikutnya dan kedaluwarsa setelah TTL
+3. Exception diteruskan ke semua penunggu dan tidak di-cache
+4. Setiap pemanggil menerima salinan hasil sendiri
+5. EnhancedPredictionService: polling bersamaan dengan input (reason, shift, health)
+   sama hanya menjalankan satu prediksi
+
+Jalankan:
+    python tests/test_single_flight.py
+"""
+
+import sys
+import time
+import logging
+import threading
+import warnings
+from pathlib import Path
+
+# Tambahkan Backend ke path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.utils.single_flight import SingleFlight, freeze_key
+from src.services import enhanced_prediction_service as enhanced_module
+
+N_CLIENTS = 16
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def run_concurrently(fn, n=N_CLIENTS):
+    """Jalankan fn di n thread yang dilepas bersamaan, return list hasil/exception."""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_coalescing():
+    print("\n" + "=" * 70)
+    print("TEST 1: REQUEST IDENTIK BERSAMAAN = SATU KOMPUTASI")
+    print("=" * 70)
+    flight = SingleFlight("test", ttl_seconds=0, max_entries=10)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        time.sleep(0.2)
+        return {"success": True, "prediction": 42}
+
+    key = freeze_key({"reason": "SLOTER LARI", "shift": 1, "health_index": 35.5})
+    results = run_concurrently(lambda: flight.do(key, compute))
+    status = flight.status()
+    print(f"  Klien: {N_CLIENTS} | komputasi: {len(computed)} | coalesced: {status['coalesced']}")
+    assert len(computed) == 1, "Komputasi dijalankan lebih dari sekali"
+    assert all(r == {"success": True, "prediction": 42} for r in results)
+    assert status["computed"] == 1 and status["coalesced"] == N_CLIENTS - 1
+    print("  ✓ PASS")
+    return True
+
+
+def test_ttl_cache():
+    print("\n" + "=" * 70)
+    print("TEST 2: CACHE TTL")
+    print("=" * 70)
+    flight = SingleFlight("test", ttl_seconds=0.2, max_entries=2,
+                          cacheable=lambda r: r.get("success", False))
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"success": True, "n": len(computed)}
+
+    key = freeze_key({"reason": "A", "shift": 1})
+    assert flight.do(key, compute)["n"] == 1
+    assert flight.do(key, compute)["n"] == 1, "Hasil tidak dilayani dari cache"
+    time.sleep(0.25)
+    assert flight.do(key, compute)["n"] == 2, "Entri cache tidak kedaluwarsa"
+
+    # Hasil gagal tidak di-cache; shift 1 dan "1" adalah key berbeda
+    fail_key = freeze_key({"reason": "B", "shift": "1"})
+    assert fail_key != freeze_key({"reason": "B", "shift": 1})
+    flight.do(fail_key, lambda: {"success": False})
+    assert flight.status()["cache_entries"] == 1
+
+    # Batas entri: entri tertua dibuang
+    for i in range(5):
+        flight.do(freeze_key({"reason": f"R{i}"}), compute)
+    status = flight.status()
+    print(f"  Counter: computed={status['computed']} cache_hits={status['cache_hits']} "
+          f"entries={status['cache_entries']}")
+    assert status["cache_hits"] == 1 and status["cache_entries"] == 2
+    print("  ✓ PASS")
+    return True
+
+
+def test_errors_and_copies():
+    print("\n" + "=" * 70)
+    print("TEST 3: EXCEPTION & SALINAN HASIL")
+    print("=" * 70)
+    flight = SingleFlight("test", ttl_seconds=10, max_entries=10)
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("model error")
+
+    results = run_concurrently(lambda: flight.do("k", boom), n=4)
+    assert all(isinstance(r, RuntimeError) for r in results), results
+    assert flight.status()["errors"] == 1 and flight.status()["cache_entries"] == 0
+
+    first = flight.do("ok", lambda: {"success": True, "metadata": {"a": 1}})
+    first["metadata"]["a"] = 999
+    assert flight.do("ok", lambda: None)["metadata"]["a"] == 1, "Hasil cache ikut termodifikasi"
+    assert flight.do(None, lambda: "direct") == "direct" and flight.status()["bypassed"] == 1
+    print("  ✓ PASS")
+    return True
+
+
+def test_enhanced_service():
+    print("\n" + "=" * 70)
+    print("TEST 4: POLLING DASHBOARD BERSAMAAN (EnhancedPredictionService)")
+    print("=" * 70)
+    service = enhanced_module.EnhancedPredictionService()
+    coalescer = enhanced_module.enhanced_prediction_coalescer
+    coalescer.clear()
+
+    calls = []
+    original = service._predict_enhanced
+
+    def counted(real_time_data, bundle):
+        calls.append(1)
+        time.sleep(0.1)  # Simulasi prediksi yang sedang berjalan saat klien lain datang
+        return original(real_time_data, bundle)
+
+    service._predict_enhanced = counted
+    data = {"reason": "SLOTTER_MISALIGNMENT", "shift": 2, "health_index": 33.7}
+    before = coalescer.status()
+    results = run_concurrently(lambda: service.predict_downtime(dict(data)))
+    after = coalescer.status()
+
+    predictions = {r["prediction"] for r in results}
+    print(f"  Klien: {N_CLIENTS} | prediksi dijalankan: {len(calls)} | hasil: {predictions}")
+    print(f"  Dihemat: {after['saved'] - before['saved']} "
+          f"(coalesced {after['coalesced'] - before['coalesced']}, "
+          f"cache {after['cache_hits'] - before['cache_hits']})")
+    assert len(calls) == 1 and len(predictions) == 1
+    assert all(r["success"] for r in results)
+    print("  ✓ PASS")
+    return True
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+
+    results = []
+    for test in (test_coalescing, test_ttl_cache, test_errors_and_copies, test_enhanced_service):
+        try:
+            results.append(test())
+        except AssertionError as e:
+            print(f"  ✗ FAIL: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 70)
+    print("HASIL: " + ("✓ SEMUA TEST PASS" if all(results) else "✗ ADA TEST GAGAL"))
+    print("=" * 70)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,299 @@
+"""
+Kompaksi model RandomForest dengan seleksi Pareto untuk serving
+
+Model produksi dilatih tanpa batas kedalaman (max_depth=None, min_samples_leaf=1)
+sehingga tree-nya sangat dalam, padahal prediksi dilayani satu baris per request.
+Script ini membangun ulang train-test split yang sama dengan script training,
+lalu membuat varian ringkas:
+  - lebih sedikit estimator (tree pertama dari forest yang sama)
+  - kedalaman dibatasi (max_depth)
+  - leaf dipangkas (min_samples_leaf lebih besar)
+
+Setiap varian diukur: MAE, RMSE, R² (test split, skala menit), latency
+single-row (scikit-learn dan flat engine), latency batch, ukuran pickle, dan
+jumlah node. Varian pada Pareto front (MAE × latency × ukuran) yang MAE-nya
+masih dalam toleransi dari baseline dan latency-nya terendah disimpan sebagai
+model kandidat (default Model/model_candidate.pkl, dievaluasi shadow oleh
+backend sebelum dipromosikan).
+
+Usage:
+    python compact_model.py                          # profil otomatis (standard jika model.pkl ada)
+    python compact_model.py --profile improved
+    python compact_model.py --max-mae-increase 0.05  # toleransi MAE +5% dari baseline
+    python compact_model.py --engine flat            # seleksi berdasarkan latency flat engine
+    python compact_model.py --output model_compact.pkl
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import pickle
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR.parent / "Data Flexo CSV"
+REPAIR_FILE = BASE_DIR / "RIWAYAT_PERBAIKAN_REALISTIC.csv"
+REPORT_DIR = BASE_DIR / "evaluation_results"
+
+sys.path.insert(0, str(BASE_DIR))
+from train_model import (  # noqa: E402
+    load_and_concat_csv, load_repair_history, merge_production_with_repairs,
+    preprocess_for_machine, build_training_matrix, TEST_SIZE, SPLIT_RANDOM_STATE
+)
+# train_model sudah menambahkan Backend ke sys.path
+from src.services.forest_engine import FlatForest  # noqa: E402
+
+# Grid kompaksi (hanya nilai yang lebih ringkas dari parameter baseline yang dipakai)
+ESTIMATOR_COUNTS = (10, 25, 50, 100)
+DEPTH_CAPS = (8, 12, 16)
+LEAF_SIZES = (5, 20, 50)
+
+LATENCY_SAMPLES = 200  # Jumlah baris test untuk latency single-row
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def build_standard():
+    """Matriks fitur model.pkl (pipeline train_model.py)."""
+    df_prod, _ = load_and_concat_csv(DATA_DIR)
+    df_repair = load_repair_history(REPAIR_FILE)
+    df_merged = merge_production_with_repairs(df_prod, df_repair)
+    X, y = build_training_matrix(preprocess_for_machine(df_merged, work_center="C_FL104"))
+    return X, y
+
+
+def build_improved():
+    """Matriks fitur model_improved.pkl (pipeline train_model_improved.py, target log1p)."""
+    import train_model_improved as tmi
+    df_prod, _ = tmi.load_and_concat_csv(DATA_DIR)
+    df_repair = tmi.load_repair_history(REPAIR_FILE)
+    df_merged = tmi.merge_production_with_repairs(df_prod, df_repair)
+    df_processed = tmi.preprocess_with_outlier_filter(df_merged, max_duration=1000)
+    X, y, _ = tmi.build_feature_matrix(df_processed)
+    return X, y
+
+
+# final_fit: data yang dipakai script training untuk model yang disimpan
+# ("full" = 100% data setelah evaluasi split, "train" = train split saja)
+PROFILES = {
+    "standard": {
+        "model": "model.pkl",
+        "features": "feature_names.pkl",
+        "build": build_standard,
+        "inverse": None,
+        "final_fit": "full"
+    },
+    "improved": {
+        "model": "model_improved.pkl",
+        "features": "feature_names_improved.pkl",
+        "build": build_improved,
+        "inverse": np.expm1,
+        "final_fit": "train"
+    }
+}
+
+
+def truncate(model, n_estimators):
+    """Forest dengan n_estimators tree pertama (tanpa training ulang)."""
+    compact = copy.copy(model)
+    compact.estimators_ = model.estimators_[:n_estimators]
+    compact.n_estimators = n_estimators
+    return compact
+
+
+def variant_grid(base_params):
+    """Kombinasi (max_depth, min_samples_leaf) yang ditraining; jumlah estimator dipotong dari hasilnya."""
+    base_depth = base_params["max_depth"]
+    base_leaf = base_params["min_samples_leaf"]
+    depths = [base_depth] + [d for d in DEPTH_CAPS if base_depth is None or d < base_depth]
+    leaves = [base_leaf] + [leaf for leaf in LEAF_SIZES if leaf > base_leaf]
+    return [(depth, leaf) for depth in depths for leaf in leaves]
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def measure(model, X_test, y_test, inverse):
+    """Akurasi, latency, dan ukuran satu varian."""
+    X = np.ascontiguousarray(X_test, dtype=np.float64)
+    y_true = inverse(y_test) if inverse else y_test
+
+    start = time.perf_counter()
+    raw = model.predict(X)
+    batch_seconds = time.perf_counter() - start
+    y_pred = inverse(raw) if inverse else raw
+
+    rows = X[:LATENCY_SAMPLES]
+    sklearn_single = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        sklearn_single.append(time.perf_counter() - start)
+
+    flat = FlatForest.from_model(model)
+    flat_single = []
+    for row in rows:
+        start = time.perf_counter()
+        flat.predict(row)
+        flat_single.append(time.perf_counter() - start)
+
+    return {
+        "mae": round(float(mean_absolute_error(y_true, y_pred)), 3),
+        "rmse": round(float(np.sqrt(mean_squared_error(y_true, y_pred))), 3),
+        "r2": round(float(r2_score(y_true, y_pred)), 4),
+        "sklearn_single_p50_ms": percentile_ms(sklearn_single, 50),
+        "sklearn_single_p99_ms": percentile_ms(sklearn_single, 99),
+        "flat_single_p50_ms": percentile_ms(flat_single, 50),
+        "flat_single_p99_ms": percentile_ms(flat_single, 99),
+        "batch_ms": round(batch_seconds * 1000, 2),
+        "batch_rows_per_s": round(len(X) / batch_seconds),
+        "size_kb": round(len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024, 1),
+        "n_nodes": int(sum(tree.tree_.node_count for tree in model.estimators_)),
+        "max_depth_reached": int(max(tree.tree_.max_depth for tree in model.estimators_))
+    }
+
+
+def pareto_front(variants, objectives):
+    """Tandai varian yang tidak didominasi varian lain pada semua objective (semua diminimalkan)."""
+    for v in variants:
+        v["pareto"] = not any(
+            all(o[k] <= v[k] for k in objectives) and any(o[k] < v[k] for k in objectives)
+            for o in variants if o is not v
+        )
+    return [v for v in variants if v["pareto"]]
+
+
+def select(front, baseline, latency_key, max_mae_increase):
+    """Varian Pareto dengan latency terendah yang MAE-nya dalam toleransi baseline."""
+    limit = baseline["mae"] * (1 + max_mae_increase)
+    eligible = [v for v in front if v["mae"] <= limit] or [baseline]
+    return min(eligible, key=lambda v: (v[latency_key], v["size_kb"], v["mae"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompaksi RandomForest + seleksi Pareto untuk serving")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="Default: standard jika model.pkl ada")
+    parser.add_argument("--engine", choices=("sklearn", "flat"), default="sklearn",
+                        help="Engine serving untuk objective latency (PREDICTION_ENGINE)")
+    parser.add_argument("--max-mae-increase", type=float, default=0.02,
+                        help="Toleransi kenaikan MAE relatif terhadap baseline (default 0.02 = +2%%)")
+    parser.add_argument("--output", default="model_candidate.pkl", help="Nama file artefak di Model/")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan output pipeline data")
+    args = parser.parse_args()
+
+    name = args.profile or ("standard" if (BASE_DIR / "model.pkl").exists() else "improved")
+    profile = PROFILES[name]
+    model_path = BASE_DIR / profile["model"]
+    if not model_path.exists():
+        print(f"❌ {model_path} tidak ditemukan")
+        return 1
+
+    print("=" * 70)
+    print(f"KOMPAKSI MODEL: {model_path.name} (profil {name})")
+    print("=" * 70)
+    model = joblib.load(model_path)
+    feature_names = list(joblib.load(BASE_DIR / profile["features"]))
+    base_params = model.get_params()
+    print(f"Model     : {model.n_estimators} trees, max_depth={base_params['max_depth']}, "
+          f"min_samples_leaf={base_params['min_samples_leaf']}")
+
+    print("\n[1] Membangun ulang data training dan train-test split...")
+    started = time.perf_counter()
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        X, y = profile["build"]()
+    missing = [c for c in feature_names if c not in X.columns]
+    if missing:
+        print(f"⚠ {len(missing)} fitur model tidak ada di data saat ini (diisi 0): {missing[:5]}")
+    X = X.reindex(columns=feature_names, fill_value=0)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE
+    )
+    y_test = y_test.to_numpy(dtype=np.float64)
+    print(f"    {len(X_train)} train / {len(X_test)} test, {X.shape[1]} fitur "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    print("\n[2] Training dan pengukuran varian...")
+    n_base = base_params["n_estimators"]
+    counts = sorted({k for k in ESTIMATOR_COUNTS if k < n_base} | {n_base})
+    variants, models = [], {}
+    for depth, leaf in variant_grid(base_params):
+        params = {**base_params, "max_depth": depth, "min_samples_leaf": leaf}
+        forest = RandomForestRegressor(**params).fit(X_train, y_train)
+        for k in counts:
+            key = f"n{k}_d{depth if depth is not None else 'none'}_l{leaf}"
+            compact = truncate(forest, k)
+            variant = {"name": key, "n_estimators": k, "max_depth": depth, "min_samples_leaf": leaf,
+                       **measure(compact, X_test, y_test, profile["inverse"])}
+            variant["baseline"] = (k == n_base and depth == base_params["max_depth"]
+                                   and leaf == base_params["min_samples_leaf"])
+            variants.append(variant)
+            models[key] = (compact, params)
+            print(f"    {key:<18s} MAE {variant['mae']:8.2f} | R² {variant['r2']:7.4f} | "
+                  f"single {variant['sklearn_single_p50_ms']:6.2f} ms (flat {variant['flat_single_p50_ms']:6.3f}) | "
+                  f"{variant['size_kb']:9.1f} KB")
+
+    latency_key = f"{args.engine}_single_p50_ms"
+    front = pareto_front(variants, ("mae", latency_key, "size_kb"))
+    baseline = next(v for v in variants if v["baseline"])
+    chosen = select(front, baseline, latency_key, args.max_mae_increase)
+
+    print("\n[3] Pareto front (MAE × latency × ukuran)")
+    print("-" * 70)
+    for v in sorted(front, key=lambda v: v[latency_key]):
+        mark = "→" if v is chosen else ("B" if v["baseline"] else " ")
+        print(f"  {mark} {v['name']:<18s} MAE {v['mae']:8.2f} | {latency_key} {v[latency_key]:7.3f} | "
+              f"{v['size_kb']:9.1f} KB | batch {v['batch_rows_per_s']:>9,} rows/s")
+
+    print(f"\nBaseline : {baseline['name']} MAE {baseline['mae']:.2f}, {baseline[latency_key]:.3f} ms, "
+          f"{baseline['size_kb']:.1f} KB")
+    print(f"Terpilih : {chosen['name']} MAE {chosen['mae']:.2f} ({(chosen['mae'] / baseline['mae'] - 1) * 100:+.1f}%), "
+          f"{chosen[latency_key]:.3f} ms ({baseline[latency_key] / chosen[latency_key]:.1f}x), "
+          f"{chosen['size_kb']:.1f} KB ({baseline['size_kb'] / chosen['size_kb']:.1f}x lebih kecil)")
+
+    # Artefak serving: dilatih pada data yang sama dengan model aslinya
+    compact, params = models[chosen["name"]]
+    if profile["final_fit"] == "full":
+        print("\nMelatih ulang konfigurasi terpilih dengan seluruh data (seperti model final)...")
+        compact = RandomForestRegressor(**{**params, "n_estimators": chosen["n_estimators"]}).fit(X, y)
+
+    output_path = BASE_DIR / args.output
+    features_path = output_path.with_name(output_path.name.replace("model", "feature_names", 1))
+    joblib.dump(compact, output_path)
+    joblib.dump(feature_names, features_path)
+
+    REPORT_DIR.mkdir(exist_ok=True)
+    report_path = REPORT_DIR / f"compaction_report_{name}.json"
+    report = {
+        "source_model": model_path.name,
+        "profile": name,
+        "engine": args.engine,
+        "max_mae_increase": args.max_mae_increase,
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "selected": chosen["name"],
+        "output": output_path.name,
+        "variants": variants
+    }
+    report_path.write_text(json.dumps(report, indent=2))
+
+    print(f"\n✅ Model ringkas : {output_path}")
+    print(f"   Feature names : {features_path}")
+    print(f"   Laporan       : {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
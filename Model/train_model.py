@@ -14,141 +14,14 @@ from difflib import SequenceMatcher
 
 # Konstanta untuk perhitungan OEE
 TOTAL_SHIFT_TIME_MINUTES = 480.0  # 8 jam = 480 menit
-
 # ============================================================================
 # MAPPING FMEA SEVERITY (Skor S dari Analisis FMEA Tabel 4.5 Skripsi)
 # ============================================================================
-# Mapping dari Deskripsi Downtime ke Skor Severity (S) FMEA
-# Skor 1-10: 1=sangat ringan, 10=sangat parah/berbahaya
-# 
-# CATATAN PENTING: Mapping ini dibuat berdasarkan estimasi dampak bisnis
-# dan harus divalidasi/disesuaikan dengan Tabel 4.5 FMEA dari skripsi Anda.
-FMEA_SEVERITY_MAP = {
-    # ========================================================================
-    # PRE-FEEDER UNIT FAILURES (S = 6-8)
-    # ========================================================================
-    'BELT CONVEYOR SLIP': 7,                    # Belt slip - menghambat feeding
-    'PENUMPUKAN KARTON TIDAK RATA': 7,          # Penumpukan tidak rata - waste tinggi
-    'SENSOR TIDAK MENDETEKSI LEMBARAN': 8,      # Sensor error - stop produksi total
-    
-    # ========================================================================
-    # FEEDER UNIT FAILURES (S = 7-9)
-    # ========================================================================
-    'FEEDER UNIT TROUBLE MEKANIK': 8,           # Kerusakan mekanik - perbaikan lama
-    'FEEDER UNIT TROUBLE ELEKTRIK': 8,          # Kerusakan elektrik - downtime signifikan
-    'VACUM KURANG': 8,                          # Vakum lemah - feeding error berulang
-    'VACUUM KURANG': 8,                         # Variant spelling
-    'SHEET NYANGKUT/ MACET': 7,                 # Sheet macet - dapat diperbaiki cepat
-    'LEMBARAN TIDAK TERAMBIL': 8,               # Feed failure - stop produksi
-    
-    # ========================================================================
-    # PRINTING UNIT FAILURES (S = 8-10)
-    # ========================================================================
-    'PRINTING UNIT TROUBLE MEKANIK': 9,         # Kerusakan printing - defect rate tinggi
-    'PRINTING UNIT TROUBLE ELEKTRIK': 9,        # Elektrik printing - downtime panjang
-    'REGISTER GESER': 9,                        # Misalignment - reject rate sangat tinggi
-    'PRINT BLOBOR': 9,                          # Ink blobbing - waste besar
-    'PRINTING BOTAK': 8,                        # Incomplete print - defect sedang-tinggi
-    'PRINT LARI': 8,                            # Print offset - adjustment needed
-    'PRINT BLUR': 8,                            # Print blur - quality issue
-    'TINTA BOCOR': 8,                           # Ink leak - downtime + waste
-    'LIMBAH TINTA BANJIR': 8,                   # Ink flooding - cleanup + downtime
-    'WARNA TIDAK SESUAI': 7,                    # Color mismatch - rework/reject
-    'WARNA LUNTUR': 7,                          # Color fade - quality issue
-    'TINTA TIDAK KONSISTEN': 8,                 # Ink inconsistency - defect tinggi
-    'ANILOX ROLLER TERSUMBAT': 8,               # Anilox blocked - print quality issue
-    
-    # ========================================================================
-    # SLOTTER & CREASING UNIT FAILURES (S = 7-9)
-    # ========================================================================
-    'SLOTTER UNIT TROUBLE MEKANIK': 8,          # Slotter mechanical - structural damage
-    'SLOTTER UNIT TROUBLE ELEKTRIK': 9,         # Slotter electrical - stop total
-    'SLOTER LARI': 8,                           # Slotter misalignment - reject tinggi
-    'SLOTTER LARI': 8,                          # Variant spelling
-    'SLOTTER MIRING': 8,                        # Slotter angle error - defect
-    'SLOTTER PECAH': 9,                         # Slotter crack - product unusable
-    'PISAU TUMPUL': 8,                          # Dull blade - quality degradation
-    'CREASING PECAH': 9,                        # Creasing crack - product failure
-    'CREASING LARI': 8,                         # Creasing offset - folding issues
-    'CREASING MIRING': 8,                       # Creasing angle - assembly problems
-    'ROLLER CREASING AUS': 8,                   # Worn creasing roller
-    
-    # ========================================================================
-    # DIE-CUT UNIT FAILURES (S = 7-9)
-    # ========================================================================
-    'DIECUT UNIT TROUBLE MEKANIK': 8,           # Die-cut mechanical failure
-    'DIECUT UNIT TROUBLE ELEKTRIK': 9,          # Die-cut electrical failure
-    'DIECUT LARI': 8,                           # Die-cut misalignment
-    'DIECUT PECAH': 9,                          # Die-cut crack - unusable
-    'DIECUT TIDAK PUTUS': 8,                    # Incomplete die-cut
-    'DIECUT MIRING': 8,                         # Die-cut angle error
-    
-    # ========================================================================
-    # STACKER UNIT FAILURES (S = 5-8)
-    # ========================================================================
-    'STACKER TROUBLE MEKANIK': 6,               # Stacker mechanical - minor impact
-    'STACKER TROUBLE ELEKTRIK': 9,              # Stacker electrical - stop produksi
-    'COUNTER PROBLEM': 6,                       # Counter error - tracking issue saja
-    'SENSOR PENGHITUNG ERROR': 6,               # Count sensor error
-    'PNEUMATIC LEMAH': 6,                       # Weak pneumatic
-    'CONVEYOR SLIP': 6,                         # Conveyor slip di stacker
-    
-    # ========================================================================
-    # PLATE & SETUP ISSUES (S = 4-7)
-    # ========================================================================
-    'LAP KLISE (Plate)': 4,                     # Plate cleaning - planned maintenance
-    'MOUNTING PLATE (during operati': 5,        # Plate mounting - setup time
-    'GANTI/PASANG PISAU SLOTTER': 5,            # Blade change - setup
-    'PLATE CYLINDER TIDAK SEJAJAR': 9,          # Plate misalignment - critical
-    
-    # ========================================================================
-    # MATERIAL & SUPPLY ISSUES (S = 5-7)
-    # ========================================================================
-    'TUNGGU TINTA': 6,                          # Waiting ink - supply delay
-    'TUNGGU BAHAN SHEETS': 6,                   # Waiting sheets - supply chain
-    'CARI BAHAN SHEETS': 6,                     # Looking for sheets
-    'TUNGGU KLISE (Plate)': 6,                  # Waiting plate
-    'CHEMICAL PROBLEM>OTHERS': 7,               # Chemical issue - quality impact
-    
-    # ========================================================================
-    # OPERATIONAL & MAINTENANCE (S = 2-5)
-    # ========================================================================
-    'SETTING TIME': 3,                          # Setup time - normal operation
-    'ADJUST TINTA': 4,                          # Ink adjustment - fine tuning
-    'REPAIR RINGAN BY OPERATOR': 5,             # Minor repair by operator
-    'MECHANICAL REPAIR>OTHER': 6,               # Mechanical repair - general
-    'BUANG SAMPAH': 2,                          # Waste disposal - routine
-    'CUCI MESIN': 3,                            # Machine cleaning - maintenance
-    'RAPIH SHIFT': 2,                           # Shift cleanup
-    'BRIEFING': 1,                              # Meeting - planned
-    'SHOLAT JUMAT': 1,                          # Friday prayer - scheduled
-    'ISTIRAHAT': 1,                             # Break - scheduled
-    
-    # ========================================================================
-    # PLANNED DOWNTIME (S = 1-3)
-    # ========================================================================
-    'TIDAK ADA SHIFT': 1,                       # No shift - planned
-    'OFF TIME LIBUR NASIONAL': 1,               # National holiday
-    'TUNGGU ORDER': 2,                          # Waiting order - business decision
-    'SCHEDULED PREVENTIVE MAINTENANCE': 2,      # Planned maintenance
-    'OVERHAUL': 3,                              # Major overhaul - planned
-    
-    # ========================================================================
-    # QUALITY REJECTION ISSUES (S = 6-8)
-    # ========================================================================
-    'REJECT SETTING': 7,                        # Setup rejection - waste
-    'OTHERS REJECTED SHEETS': 7,                # General rejection
-    'REJECTED KARTON': 7,                       # Rejected carton
-    
-    # ========================================================================
-    # OTHERS & DEFAULT (S = 5)
-    # ========================================================================
-    'OTHERS': 5,                                # General others - medium severity
-    '_NONE_': 1,                                # No reason - minimal severity
-}
-
-# Skor default jika deskripsi tidak ditemukan di map
-DEFAULT_SEVERITY = 5  # Medium severity sebagai fallback
+# Mapping dan automaton reason dipakai bersama dengan backend (satu salinan)
+# agar severity saat training dan serving selalu sama.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Backend"))
+from src.services.reason_matcher import DEFAULT_SEVERITY, reason_matcher  # noqa: E402
+from src.services.production_csv import load_production_csv, CACHE_DIR_NAME  # noqa: E402
 
 
 def normalize_text(text: str) -> str:
@@ -484,10 +357,16 @@ def sort_files_by_month(files: list) -> list:
     return sorted(files, key=get_sort_key)
 
 
-def load_and_concat_csv(data_dir: Path, pattern: str = "Laporan Flexo *.csv") -> tuple[pd.DataFrame, int]:
+def load_and_concat_csv(
+    data_dir: Path,
+    pattern: str = "Laporan Flexo *.csv",
+    use_cache: bool = True
+) -> tuple[pd.DataFrame, int]:
     """
     Memuat semua file CSV yang cocok dengan pola, lalu menggabungkannya.
     File diurutkan berdasarkan bulan (September 2024 - September 2025).
+    File di-parse paralel dengan dtype eksplisit dan di-cache di <data_dir>/.cache;
+    run berikutnya hanya mem-parse ulang bulan yang isinya berubah.
     Mengembalikan (dataframe_gabungan, jumlah_file_terbaca).
     """
     data_dir = Path(data_dir)
@@ -499,22 +378,9 @@ def load_and_concat_csv(data_dir: Path, pattern: str = "Laporan Flexo *.csv") ->
     # Urutkan file berdasarkan bulan
     files = sort_files_by_month(files)
 
-    frames = []
-    for f in files:
-        try:
-            # Membaca CSV dengan pemisah titik koma (;)
-            df = pd.read_csv(f, encoding="utf-8-sig", delimiter=';')
-            frames.append(df)
-            print(f"  ✓ Memuat: {Path(f).name}")
-        except Exception as e:
-            print(f"  ✗ Gagal memuat {Path(f).name}: {e}")
-            continue
-
-    if not frames:
-        raise ValueError("Tidak ada data yang berhasil dibaca dari file CSV.")
-        
-    combined = pd.concat(frames, ignore_index=True)
-    return combined, len(frames)
+    combined_df, n_loaded = load_production_csv(files, cache_dir=data_dir / CACHE_DIR_NAME, use_cache=use_cache)
+    print(f"  ✓ {n_loaded}/{len(files)} file dimuat{' (cache)' if use_cache else ''}")
+    return combined_df, n_loaded
 
 
 def get_fmea_severity(scrab_desc: str, break_desc: str) -> int:
@@ -539,13 +405,15 @@ def get_fmea_severity(scrab_desc: str, break_desc: str) -> int:
     
     # Prioritas 1: Cek Scrab Description (lebih spesifik)
     if scrab and scrab != '_NONE_' and scrab != 'NAN':
-        if scrab in FMEA_SEVERITY_MAP:
-            return FMEA_SEVERITY_MAP[scrab]
+        severity = reason_matcher.match(scrab).fmea_severity
+        if severity is not None:
+            return severity
     
     # Prioritas 2: Cek Break Time Description
     if break_time and break_time != '_NONE_' and break_time != 'NAN':
-        if break_time in FMEA_SEVERITY_MAP:
-            return FMEA_SEVERITY_MAP[break_time]
+        severity = reason_matcher.match(break_time).fmea_severity
+        if severity is not None:
+            return severity
     
     # Default: Tidak ditemukan di map
     return DEFAULT_SEVERITY
@@ -817,7 +685,8 @@ def preprocess_for_machine(df: pd.DataFrame, work_center: str = "C_FL104") -> pd
     # Ganti nilai NaN dengan '_NONE_' agar bisa diproses
     for col in text_features:
         if col in filtered.columns:
-            filtered[col] = filtered[col].fillna('_NONE_')
+            # astype(object): kolom categorical dari loader tidak menerima kategori baru
+            filtered[col] = filtered[col].astype(object).fillna('_NONE_')
             # Normalisasi: uppercase dan strip whitespace (kecuali Shift yang berupa angka)
             if col == 'Shift':
                 # Shift biasanya angka (1, 2, 3), konversi ke string
@@ -853,19 +722,28 @@ def preprocess_for_machine(df: pd.DataFrame, work_center: str = "C_FL104") -> pd
     return filtered_encoded
 
 
-def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl")):
-    """
-    Latih model RandomForestRegressor dengan evaluasi menggunakan train-test split,
-    kemudian latih ulang dengan seluruh data dan simpan.
-    Menggunakan SEMUA FITUR hasil feature engineering (OEE + Kategorikal).
+# Hyperparameter RandomForest (evaluasi train-test split dan model final)
+RF_PARAMS = {
+    "n_estimators": 100,
+    "random_state": 42,
+    "max_depth": None,
+    "min_samples_split": 2,
+    "min_samples_leaf": 1
+}
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 42
+
+
+def build_training_matrix(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
     """
-    # ========================================================================
-    # PERSIAPAN FITUR DAN TARGET
-    # ========================================================================
-    print("\n" + "="*70)
-    print("PERSIAPAN DATA UNTUK TRAINING")
-    print("="*70)
+    Memisahkan target dan fitur numerik dari hasil preprocess_for_machine.
     
+    Args:
+        df: DataFrame hasil preprocess_for_machine
+        
+    Returns:
+        Tuple (X, y) dengan y = Waktu Downtime (Menit)
+    """
     # Target (y): Waktu Downtime
     y = df["Waktu Downtime (Menit)"]
     
@@ -924,6 +802,24 @@ def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl"))
     numeric_cols = X.select_dtypes(include=[np.number]).columns
     X = X[numeric_cols]
     
+    return X, y
+
+
+def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl")):
+    """
+    Latih model RandomForestRegressor dengan evaluasi menggunakan train-test split,
+    kemudian latih ulang dengan seluruh data dan simpan.
+    Menggunakan SEMUA FITUR hasil feature engineering (OEE + Kategorikal).
+    """
+    # ========================================================================
+    # PERSIAPAN FITUR DAN TARGET
+    # ========================================================================
+    print("\n" + "="*70)
+    print("PERSIAPAN DATA UNTUK TRAINING")
+    print("="*70)
+    
+    X, y = build_training_matrix(df)
+    
     # Tampilkan informasi fitur
     print(f"\nJumlah sampel data: {len(X)}")
     print(f"Jumlah fitur: {len(X.columns)}")
@@ -1002,7 +898,7 @@ def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl"))
     
     # Split data: 80% training, 20% testing
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
+        X, y, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE
     )
     
     print(f"\nJumlah data training: {len(X_train)} baris ({len(X_train)/len(X)*100:.1f}%)")
@@ -1011,11 +907,7 @@ def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl"))
     # Latih model pada data training
     print("\nMelatih model pada data training...")
     model_eval = RandomForestRegressor(
-        n_estimators=100, 
-        random_state=42,
-        max_depth=None,
-        min_samples_split=2,
-        min_samples_leaf=1,
+        **RF_PARAMS,
         n_jobs=-1  # Gunakan semua CPU cores
     )
     model_eval.fit(X_train, y_train)
@@ -1088,11 +980,7 @@ def train_and_save_model(df: pd.DataFrame, model_path: Path = Path("model.pkl"))
     # Latih ulang model dengan SELURUH data (100%)
     print(f"\nMelatih ulang model dengan seluruh data ({len(X)} baris)...")
     model_final = RandomForestRegressor(
-        n_estimators=100, 
-        random_state=42,
-        max_depth=None,
-        min_samples_split=2,
-        min_samples_leaf=1,
+        **RF_PARAMS,
         n_jobs=-1
     )
     model_final.fit(X, y)
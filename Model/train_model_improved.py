@@ -97,9 +97,12 @@ def preprocess_with_outlier_filter(df: pd.DataFrame, max_duration: int = 1000) -
     
     return df
 
-def train_model_enhanced(df: pd.DataFrame) -> tuple:
+def build_feature_matrix(df: pd.DataFrame) -> tuple:
     """
-    Train model dengan hyperparameter tuning
+    Feature engineering: FMEA severity, teknisi, action plan, one-hot kategorikal.
+    
+    Returns:
+        (X, y, feature_cols) dengan y = Stop Time (log1p dari preprocess_with_outlier_filter)
     """
     print(f"\n[FEATURE ENGINEERING]")
     print(f"="*70)
@@ -183,6 +186,15 @@ def train_model_enhanced(df: pd.DataFrame) -> tuple:
     print(f"  - Action Plan: {len(action_cols)}")
     print(f"  - Other: {len(feature_cols) - len(teknisi_cols) - len(action_cols)}")
     
+    return X, y, feature_cols
+
+
+def train_model_enhanced(df: pd.DataFrame) -> tuple:
+    """
+    Train model dengan hyperparameter tuning
+    """
+    X, y, feature_cols = build_feature_matrix(df)
+    
     # Train-test split
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
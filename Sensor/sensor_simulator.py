@@ -6,6 +6,7 @@ HANYA untuk mesin C_FL104
 """
 
 import os
+import sys
 import json
 import random
 import time
@@ -15,6 +16,9 @@ from datetime import datetime
 import pandas as pd
 import paho.mqtt.client as mqtt
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Backend"))
+from src.services.production_csv import load_production_csv  # noqa: E402
+
 
 # ============================================================================
 # KONFIGURASI
@@ -99,21 +103,9 @@ def load_and_analyze_data():
         # ====================================================================
         print("\n[INFO] Membaca dan menggabungkan file CSV...")
         
-        dataframes = []
-        for csv_file in csv_files:
-            try:
-                df = pd.read_csv(csv_file, encoding='utf-8-sig', delimiter=';')
-                dataframes.append(df)
-                print(f"  ✓ {csv_file.name} ({len(df)} baris)")
-            except Exception as e:
-                print(f"  ✗ Error membaca {csv_file.name}: {e}")
-                continue
-        
-        if not dataframes:
-            raise ValueError("Tidak ada data yang berhasil dibaca")
-        
-        # Gabungkan semua DataFrame
-        combined_df = pd.concat(dataframes, ignore_index=True)
+        # Parse paralel + cache (hanya file yang berubah yang di-parse ulang)
+        combined_df, n_loaded = load_production_csv(sorted(csv_files))
+        print(f"  ✓ {n_loaded}/{len(csv_files)} file dimuat")
         print(f"\n[SUCCESS] Total data gabungan: {len(combined_df)} baris")
         
         # ====================================================================